@@ -0,0 +1,136 @@
+# backend/apps/Users/authentication.py
+# JWT authentication that trusts the token's claims instead of loading the
+# user row on every request.
+#
+# Tokens issued by tokens.RoleRefreshToken carry username, roles,
+# primary_role and role_type. For read requests the user is a ClaimsUser
+# built from those claims; the only database access is a revocation check
+# (user still exists and is active), cached per process for
+# JWT_USER_CHECK_TTL seconds. The full user row is still loaded for:
+#   - unsafe methods (POST/PUT/PATCH/DELETE)
+#   - views that set `requires_db_user = True` (permission-sensitive ones)
+#   - tokens issued before the claims existed
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+User = get_user_model()
+
+# Claims a token needs to be trusted without a user load (see tokens.py)
+PROFILE_CLAIMS = ("username", "roles", "role_type")
+
+# Seconds a user's revocation state is trusted before it is read again
+JWT_USER_CHECK_TTL = getattr(settings, "JWT_USER_CHECK_TTL", 30)
+
+
+class ClaimsUser(TokenUser):
+    # Read-only user built from JWT claims; `groups` is empty, use `roles`
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def roles(self):
+        return list(self.token.get("roles", []))
+
+    @cached_property
+    def primary_role(self):
+        return self.token.get("primary_role")
+
+    @cached_property
+    def role_type(self):
+        return self.token.get("role_type")
+
+
+class _RevocationCache:
+    # {user_id: (checked_at, is_active, password md5 or None)}, per process
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now - entry[0] < self.ttl:
+                return entry[1:]
+
+        row = (User.objects.filter(pk=user_id)
+               .values_list("is_active", "password").first())
+        if row is None:
+            state = None
+        else:
+            is_active, password = row
+            state = (is_active, get_md5_hash_password(password)
+                     if api_settings.CHECK_REVOKE_TOKEN else None)
+        if state is not None:
+            with self._lock:
+                self._entries[user_id] = (now,) + state
+        return state
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+revocation_cache = _RevocationCache(JWT_USER_CHECK_TTL)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        if self._needs_db_user(request, validated_token):
+            return self.get_user(validated_token), validated_token
+        return self.get_claims_user(validated_token), validated_token
+
+    def _needs_db_user(self, request, validated_token):
+        if request.method not in SAFE_METHODS:
+            return True
+        view = (getattr(request, "parser_context", None) or {}).get("view")
+        if getattr(view, "requires_db_user", False):
+            return True
+        return any(claim not in validated_token for claim in PROFILE_CLAIMS)
+
+    def get_claims_user(self, validated_token):
+        user = ClaimsUser(validated_token)
+        try:
+            user_id = user.id
+        except (KeyError, TypeError, ValueError):
+            return self.get_user(validated_token)  # Raises InvalidToken
+
+        state = revocation_cache.get(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        is_active, password_hash = state
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_hash:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed")
+        return user
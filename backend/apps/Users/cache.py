@@ -0,0 +1,102 @@
+# backend/apps/Users/cache.py
+# Cached user data: the admin user listing and each user's roles.
+#
+# User listing (UserViewSet.list)
+# -------------------------------
+# Every page of the listing is cached under the current "user list version".
+# The Users signals bump the version whenever a user, a group or a group
+# membership changes, so stale pages are never read again and simply expire.
+# The version also drives the ETag / Last-Modified headers of the listing.
+#
+# Roles (roles.get_user_roles)
+# ----------------------------
+# Group names are cached per user. signals.py drops a user's entry when their
+# memberships change, and bumps a roles generation (dropping every entry) when
+# a group is renamed or deleted or a group's members are cleared.
+#
+# NOTE: versions live in the Django cache, so with several server
+# processes CACHES must point to a shared backend (Redis, Memcached, database)
+# for a bump in one process to be seen by the others.
+import hashlib
+import time
+
+from django.core.cache import cache
+
+USER_LIST_VERSION_KEY = "users:list:version"
+ROLES_GENERATION_KEY = "users:roles:generation"
+
+# Seconds a cached page is kept; also bounds staleness from changes that
+# bypass signals (e.g. QuerySet.update)
+USER_LIST_CACHE_TIMEOUT = 300
+
+# Seconds a user's cached roles are kept
+ROLES_CACHE_TIMEOUT = 3600
+
+
+def _new_version():
+    # time_ns keeps versions unique across restarts and processes
+    now_ns = time.time_ns()
+    return {"version": str(now_ns), "modified": now_ns / 1e9}
+
+
+def get_user_list_version():
+    """Current {'version': str, 'modified': epoch seconds} of the user listing"""
+    state = cache.get(USER_LIST_VERSION_KEY)
+    if state is None:
+        cache.add(USER_LIST_VERSION_KEY, _new_version(), timeout=None)
+        state = cache.get(USER_LIST_VERSION_KEY) or _new_version()
+    return state
+
+
+def bump_user_list_version():
+    """Invalidate every cached page of the user listing"""
+    cache.set(USER_LIST_VERSION_KEY, _new_version(), timeout=None)
+
+
+def user_list_etag(version, page_url):
+    """Strong ETag of one listing page (query string included)"""
+    digest = hashlib.sha1(f"{version}:{page_url}".encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def get_cached_user_list(version, page_url):
+    return cache.get(_page_key(version, page_url))
+
+
+def set_cached_user_list(version, page_url, data):
+    cache.set(_page_key(version, page_url), data, timeout=USER_LIST_CACHE_TIMEOUT)
+
+
+def _page_key(version, page_url):
+    digest = hashlib.sha1(page_url.encode("utf-8")).hexdigest()
+    return f"users:list:{version}:{digest}"
+
+
+def _roles_generation():
+    generation = cache.get(ROLES_GENERATION_KEY)
+    if generation is None:
+        cache.add(ROLES_GENERATION_KEY, str(time.time_ns()), timeout=None)
+        generation = cache.get(ROLES_GENERATION_KEY, "0")
+    return generation
+
+
+def _roles_key(user_id):
+    return f"users:roles:{_roles_generation()}:{user_id}"
+
+
+def get_cached_roles(user_id):
+    """Cached group names of a user, or None"""
+    return cache.get(_roles_key(user_id))
+
+
+def set_cached_roles(user_id, roles):
+    cache.set(_roles_key(user_id), list(roles), timeout=ROLES_CACHE_TIMEOUT)
+
+
+def invalidate_user_roles(user_ids):
+    cache.delete_many([_roles_key(user_id) for user_id in user_ids])
+
+
+def bump_roles_generation():
+    """Invalidate the cached roles of every user"""
+    cache.set(ROLES_GENERATION_KEY, str(time.time_ns()), timeout=None)
@@ -0,0 +1,67 @@
+# backend/apps/Users/hashers.py
+# Password hashers whose cost comes from settings, so hashing cost (and with
+# it login throughput) can be tuned per deployment and benchmarked with
+# `python manage.py bench_login`.
+#
+# Algorithm names are Django's own, so existing hashes keep verifying. The
+# first entry of PASSWORD_HASHERS hashes new passwords; a user whose stored
+# hash uses another algorithm or another cost is re-hashed transparently the
+# next time they log in (check_password -> must_update).
+#
+#   PASSWORD_HASHER        "pbkdf2_sha256" (Django default), "bcrypt_sha256" or "argon2"
+#   PBKDF2_ITERATIONS      PBKDF2 rounds
+#   BCRYPT_ROUNDS          bcrypt log2 work factor
+#   ARGON2_TIME_COST / ARGON2_MEMORY_COST (KiB) / ARGON2_PARALLELISM
+#
+# bcrypt_sha256 needs the bcrypt package, argon2 needs argon2-cffi.
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, "PBKDF2_ITERATIONS", hashers.PBKDF2PasswordHasher.iterations)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return getattr(settings, "BCRYPT_ROUNDS", hashers.BCryptSHA256PasswordHasher.rounds)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return getattr(settings, "ARGON2_TIME_COST", hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, "ARGON2_MEMORY_COST", hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, "ARGON2_PARALLELISM", hashers.Argon2PasswordHasher.parallelism)
+
+
+TUNED_HASHERS = {
+    "pbkdf2_sha256": "apps.Users.hashers.PBKDF2PasswordHasher",
+    "bcrypt_sha256": "apps.Users.hashers.BCryptSHA256PasswordHasher",
+    "argon2": "apps.Users.hashers.Argon2PasswordHasher",
+}
+
+# Still verified (and upgraded on login) but never used for new hashes
+LEGACY_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+
+def password_hashers(preferred="pbkdf2_sha256"):
+    """PASSWORD_HASHERS list with the preferred algorithm first"""
+    if preferred not in TUNED_HASHERS:
+        raise ValueError(
+            f"Unknown password hasher {preferred!r}; choose from {', '.join(TUNED_HASHERS)}")
+    ordered = [TUNED_HASHERS[preferred]]
+    ordered += [path for name, path in TUNED_HASHERS.items() if name != preferred]
+    return ordered + LEGACY_HASHERS
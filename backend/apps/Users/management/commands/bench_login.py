@@ -0,0 +1,164 @@
+# backend/apps/Users/management/commands/bench_login.py
+# Login throughput benchmark:
+#
+#   python manage.py bench_login --requests 500 --users 50
+#   python manage.py bench_login --hasher bcrypt_sha256 --cost 10
+#   python manage.py bench_login --stored-hasher pbkdf2_sha256 --hasher bcrypt_sha256
+#
+# Posts to UserLoginAPIView through Django's test client (in process, no
+# network) and reports requests/second and p50/p99 latency. Benchmark users
+# are created inside a transaction that is rolled back, so the database is
+# left untouched.
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, identify_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from ...cache import invalidate_user_roles
+from ...hashers import TUNED_HASHERS, password_hashers
+
+User = get_user_model()
+
+BENCH_PASSWORD = "bench-password-123"
+
+# Setting holding each hasher's cost (see hashers.py)
+COST_SETTINGS = {
+    "pbkdf2_sha256": "PBKDF2_ITERATIONS",
+    "bcrypt_sha256": "BCRYPT_ROUNDS",
+    "argon2": "ARGON2_TIME_COST",
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = "Measure login requests/second and p50/p99 latency of the login endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Timed login requests")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed requests first")
+        parser.add_argument("--users", type=int, default=20, help="Benchmark accounts to rotate through")
+        parser.add_argument("--hasher", choices=sorted(TUNED_HASHERS),
+                            help="Hasher for new hashes (default: settings.PASSWORD_HASHER)")
+        parser.add_argument("--cost", type=int,
+                            help="Cost for --hasher (PBKDF2 iterations, bcrypt rounds or argon2 time cost)")
+        parser.add_argument("--stored-hasher", choices=sorted(TUNED_HASHERS),
+                            help="Hash the benchmark accounts with this hasher instead, "
+                                 "so the first login of each account includes the upgrade")
+        parser.add_argument("--by-email", action="store_true", help="Log in with the email address")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["users"] < 1:
+            raise CommandError("--requests and --users must be at least 1")
+
+        hasher_settings = {}
+        if options["hasher"]:
+            hasher_settings["PASSWORD_HASHERS"] = password_hashers(options["hasher"])
+        if options["cost"] is not None:
+            if not options["hasher"]:
+                raise CommandError("--cost needs --hasher")
+            hasher_settings[COST_SETTINGS[options["hasher"]]] = options["cost"]
+        for algorithm in (options["hasher"], options["stored_hasher"]):
+            if algorithm:
+                self._check_library(algorithm)
+
+        accounts = []
+        try:
+            with transaction.atomic():
+                with override_settings(**hasher_settings):
+                    accounts = self._create_accounts(options)
+                    latencies = self._run(accounts, options)
+                    upgraded = self._count_upgraded(accounts)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        finally:
+            # IDs are reused after the rollback; do not leave their roles cached
+            invalidate_user_roles([user.pk for user in accounts])
+
+        self._report(latencies, upgraded, len(accounts), options)
+
+    def _check_library(self, algorithm):
+        with override_settings(PASSWORD_HASHERS=password_hashers(algorithm)):
+            hasher = get_hasher(algorithm)
+            if hasher.library:
+                try:
+                    hasher._load_library()
+                except ValueError as e:
+                    raise CommandError(str(e))
+
+    def _create_accounts(self, options):
+        stored = options["stored_hasher"]
+        stamp = time.time_ns()
+        with override_settings(**({"PASSWORD_HASHERS": password_hashers(stored)} if stored else {})):
+            accounts = []
+            for i in range(options["users"]):
+                user = User(
+                    username=f"bench_{stamp}_{i}",
+                    email=f"bench_{stamp}_{i}@bench.invalid",
+                    institutional_id=f"B{stamp % 10**12}{i}"[:20],
+                    role_type="student",
+                )
+                user.set_password(BENCH_PASSWORD)
+                accounts.append(user)
+            User.objects.bulk_create(accounts)
+        return list(User.objects.filter(username__startswith=f"bench_{stamp}_").order_by("id"))
+
+    def _run(self, accounts, options):
+        client = Client(HTTP_HOST="localhost")
+        url = reverse("user-login")
+        field = "email" if options["by_email"] else "username"
+
+        def login(user):
+            response = client.post(
+                url, {"identifier": getattr(user, field), "password": BENCH_PASSWORD},
+                content_type="application/json")
+            if response.status_code != 200:
+                raise CommandError(f"Login failed: HTTP {response.status_code} {response.content[:200]!r}")
+
+        for i in range(options["warmup"]):
+            login(accounts[i % len(accounts)])
+
+        latencies = []
+        for i in range(options["requests"]):
+            user = accounts[i % len(accounts)]
+            started = time.perf_counter()
+            login(user)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    def _count_upgraded(self, accounts):
+        preferred = get_hasher("default")
+        rows = User.objects.filter(pk__in=[u.pk for u in accounts]).values_list("password", flat=True)
+        return sum(1 for encoded in rows
+                   if identify_hasher(encoded).algorithm == preferred.algorithm
+                   and not preferred.must_update(encoded))
+
+    def _report(self, latencies, upgraded, account_count, options):
+        ordered = sorted(latencies)
+        total = sum(latencies)
+        hasher = options["hasher"] or "settings default"
+        cost = f" (cost {options['cost']})" if options["cost"] is not None else ""
+        self.stdout.write(f"Hasher: {hasher}{cost}")
+        if options["stored_hasher"]:
+            self.stdout.write(f"Accounts stored with: {options['stored_hasher']} "
+                              f"({upgraded}/{account_count} on the preferred hasher afterwards)")
+        self.stdout.write(f"Requests: {len(latencies)} over {account_count} accounts")
+        self.stdout.write(self.style.SUCCESS(f"Throughput: {len(latencies) / total:.1f} logins/s"))
+        self.stdout.write(
+            f"Latency: p50 {percentile(ordered, 50) * 1000:.2f} ms, "
+            f"p99 {percentile(ordered, 99) * 1000:.2f} ms, "
+            f"mean {statistics.mean(ordered) * 1000:.2f} ms, "
+            f"max {ordered[-1] * 1000:.2f} ms")
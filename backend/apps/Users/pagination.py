@@ -0,0 +1,11 @@
+# backend/apps/Users/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class UserCursorPagination(CursorPagination):
+    # Cursor pages stay O(page) deep into a large roster (no OFFSET scans)
+    # and do not skip/repeat rows when users are added while paging.
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "id"
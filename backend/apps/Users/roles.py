@@ -1,6 +1,8 @@
 # backend/apps/Users/roles.py
 from django.contrib.auth.models import Group
 
+from .cache import get_cached_roles, set_cached_roles
+
 ROLES = [
     "org_officer",
     "student",
@@ -9,6 +11,27 @@ ROLES = [
     "admin",
 ]
 
+# Highest first: a user's primary role is the first of these they hold
+ROLE_PRIORITY = ("admin", "faculty", "staff", "student")
+
 def ensure_roles():
     for name in ROLES:
         Group.objects.get_or_create(name=name)
+
+def get_primary_role(roles):
+    return next((r for r in ROLE_PRIORITY if r in roles), None)
+
+def get_user_roles(user):
+    """Group names of a user, cached until their memberships change (see signals.py)"""
+    roles = get_cached_roles(user.pk)
+    if roles is None:
+        roles = list(user.groups.values_list("name", flat=True))
+        set_cached_roles(user.pk, roles)
+    return roles
+
+def get_request_roles(request):
+    """Roles of the requesting user, from the JWT claims when present (no query)"""
+    claims = getattr(request, "auth", None)
+    if claims is not None and "roles" in claims:
+        return list(claims["roles"])
+    return get_user_roles(request.user)
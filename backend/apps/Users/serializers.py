@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
 from .models import BaseUser
+from .roles import get_primary_role, get_user_roles
+from .tokens import RoleRefreshToken
 
 # serializers.py
 from rest_framework import serializers
@@ -107,33 +108,24 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, attrs):
         identifier = attrs.get("identifier")
         password = attrs.get("password")
-        user = authenticate(username=identifier, password=password)
-        roles = list(user.groups.values_list("name", flat=True))
-
-        if user is None and "@" in identifier:
-            try:
-                u = User.objects.get(email__iexact=identifier)
-                user = authenticate(username=u.username, password=password)
-            except User.DoesNotExist:
-                pass
+        # backends.UsernameOrEmailBackend finds the user in one query;
+        # roles come from the roles cache
+        user = authenticate(request=self.context.get("request"),
+                            username=identifier, password=password)
 
         if user is None:
             raise serializers.ValidationError("Invalid credentials.")
         if not user.is_active:
             raise serializers.ValidationError("Account is inactive.")
 
-        refresh = RefreshToken.for_user(user)
-        roles = list(user.groups.values_list("name", flat=True))
-
-        # Implement custom permissions
-        ROLE_PRIORITY = ["admin", "faculty", "staff", "student"]
-        primary_role = next((r for r in ROLE_PRIORITY if r in roles), None)
+        roles = get_user_roles(user)
+        refresh = RoleRefreshToken.for_user(user, roles=roles)
 
         return {
             "user": user,
             "access_token": str(refresh.access_token),
             "roles": roles,
-            "primary_role": primary_role,
+            "primary_role": get_primary_role(roles),
         }
     
 
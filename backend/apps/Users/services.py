@@ -1,4 +1,8 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.db.models import Q
+
+User = get_user_model()
 
 # Sample code to manipulate group membership
 class OrgOfficer:
@@ -17,3 +21,18 @@ class Registrar:
     def revoke(user):
         group, _ = Group.objects.get_or_create(name="registrar")
         user.groups.remove(group)
+
+
+# Login: resolve a username or email to a user in one query
+def find_login_user(identifier):
+    """User whose username (or, for identifiers with '@', email) matches, else None"""
+    lookup = Q(username=identifier)
+    if "@" in identifier:
+        lookup |= Q(email__iexact=identifier)
+    matches = list(User.objects.filter(lookup)[:3])
+
+    for user in matches:
+        if user.username == identifier:
+            return user
+    # An email shared by several accounts is ambiguous: do not guess
+    return matches[0] if len(matches) == 1 else None
@@ -1,9 +1,12 @@
 # backend/apps/Users/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 
+from .authentication import revocation_cache
+from .cache import bump_user_list_version, bump_roles_generation, invalidate_user_roles
+
 User = get_user_model()
 
 @receiver(post_save, sender=User)
@@ -19,4 +22,36 @@ def assign_default_role(sender, instance, created, **kwargs):
 
     if getattr(instance, "role_type", None) == "student":
         student_group, _ = Group.objects.get_or_create(name="student")
-        instance.groups.add(student_group)
\ No newline at end of file
+        instance.groups.add(student_group)
+
+# Any change to users, groups or memberships invalidates the cached user listing
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_list_on_change(sender, instance, **kwargs):
+    bump_user_list_version()
+    # Deactivation or a password change is seen by the next request here
+    revocation_cache.forget(instance.pk)
+
+
+# Renaming or deleting a group changes the roles of all its members
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_on_group_change(sender, **kwargs):
+    bump_user_list_version()
+    bump_roles_generation()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    bump_user_list_version()
+    if not reverse:
+        # user.groups.add/remove/clear
+        invalidate_user_roles([instance.pk])
+    elif pk_set:
+        # group.user_set.add/remove
+        invalidate_user_roles(pk_set)
+    else:
+        # group.user_set.clear: the members are no longer known
+        bump_roles_generation()
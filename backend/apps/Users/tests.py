@@ -1,3 +1,157 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model, user_login_failed
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.settings import api_settings
+
+from .roles import ensure_roles, get_user_roles
+from .tokens import RoleRefreshToken
+
+User = get_user_model()
+
+LOGIN_URL = "/api/users/login/api/"
+USERS_URL = "/api/users/?page_size=5"
+
+
+class UsersTestCase(APITestCase):
+
+    def setUp(self):
+        # Versions, pages and roles live in the Django cache
+        cache.clear()
+        self.addCleanup(cache.clear)
+        ensure_roles()
+        self.student = User.objects.create_user(
+            "kim", "kim@x.ph", "password123",
+            institutional_id="S1", role_type="student", first_name="K")
+        self.admin = User.objects.create_superuser(
+            "adm", "adm@x.ph", "adminpass",
+            institutional_id="A1", role_type="admin")
+
+    def login(self, identifier, password):
+        return self.client.post(LOGIN_URL, {"identifier": identifier, "password": password},
+                                format="json")
+
+    def use_token(self, user):
+        token = RoleRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+class LoginTests(UsersTestCase):
+
+    def test_username_login(self):
+        response = self.login("kim", "password123")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["roles"], ["student"])
+        self.assertEqual(response.data["primary_role"], "student")
+
+    def test_email_login(self):
+        for identifier in ("kim@x.ph", "KIM@X.PH"):
+            response = self.login(identifier, "password123")
+            self.assertEqual(response.status_code, 200, identifier)
+            self.assertIn("access_token", response.data)
+
+    def test_wrong_password(self):
+        failures = []
+        handler = lambda sender, credentials, **kwargs: failures.append(credentials)
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
+
+        self.assertEqual(self.login("kim@x.ph", "wrong").status_code, 400)
+        self.assertEqual(self.login("nobody", "password123").status_code, 400)
+        self.assertEqual(len(failures), 2)
+
+    def test_inactive_user_cannot_log_in(self):
+        self.student.is_active = False
+        self.student.save()
+        self.assertEqual(self.login("kim", "password123").status_code, 400)
+
+
+class TokenRevocationTests(UsersTestCase):
+    # The save signal must drop the cached state of the user
+
+    def log_in_and_read(self):
+        token = self.login("kim", "password123").data["access_token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        # Fills the revocation cache
+        self.assertEqual(self.client.get(USERS_URL).status_code, 200)
+
+    def test_deactivated_user(self):
+        self.log_in_and_read()
+        self.student.is_active = False
+        self.student.save()
+        self.assertEqual(self.client.get(USERS_URL).status_code, 401)
+
+    # simplejwt modules hold on to api_settings, so override_settings would not reach them
+    @mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True)
+    def test_password_changed(self):
+        self.log_in_and_read()
+        self.student.set_password("newpassword")
+        self.student.save()
+        self.assertEqual(self.client.get(USERS_URL).status_code, 401)
+
+
+class AdminViewTests(UsersTestCase):
+    # IsAdminUser reads is_staff, which the token claims do not carry
+
+    url = "/api/users/roles/org-officer/{}/promote/"
+
+    def test_admin_can_promote(self):
+        self.use_token(self.admin)
+        response = self.client.post(self.url.format(self.student.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("org_officer", get_user_roles(self.student))
+
+    def test_admin_read_loads_db_user(self):
+        # Passes IsAdminUser (405, not 403) only if the user row was loaded
+        self.use_token(self.admin)
+        self.assertEqual(self.client.get(self.url.format(self.student.pk)).status_code, 405)
+
+    def test_student_is_forbidden(self):
+        self.use_token(self.student)
+        self.assertEqual(self.client.post(self.url.format(self.student.pk)).status_code, 403)
+        self.assertEqual(self.client.get(self.url.format(self.student.pk)).status_code, 403)
+
+
+class RolesCacheTests(UsersTestCase):
+
+    def test_roles_are_cached(self):
+        self.assertEqual(get_user_roles(self.student), ["student"])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_roles(self.student), ["student"])
+
+    def test_groups_add_invalidates(self):
+        self.assertEqual(get_user_roles(self.student), ["student"])
+        self.student.groups.add(Group.objects.get(name="org_officer"))
+        self.assertEqual(sorted(get_user_roles(self.student)), ["org_officer", "student"])
+
+    def test_group_user_set_add_invalidates(self):
+        self.assertEqual(get_user_roles(self.student), ["student"])
+        Group.objects.get(name="faculty").user_set.add(self.student)
+        self.assertEqual(sorted(get_user_roles(self.student)), ["faculty", "student"])
+
+
+class UserListTests(UsersTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.use_token(self.student)
+
+    def test_unchanged_page_is_not_modified(self):
+        response = self.client.get(USERS_URL)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(USERS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_changed_page_is_sent_again(self):
+        etag = self.client.get(USERS_URL)["ETag"]
+        User.objects.create_user("lee", "lee@x.ph", "password123",
+                                 institutional_id="S2", role_type="student")
+
+        response = self.client.get(USERS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("lee", [user["username"] for user in response.data["results"]])
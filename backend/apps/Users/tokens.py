@@ -0,0 +1,21 @@
+# backend/apps/Users/tokens.py
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .roles import get_primary_role, get_user_roles
+
+
+class RoleRefreshToken(RefreshToken):
+    # The access token copies these claims, so later requests can read the
+    # user's roles from the token (roles.get_request_roles) instead of the DB.
+    # Claims are fixed for the token's lifetime (ACCESS_TOKEN_LIFETIME).
+
+    @classmethod
+    def for_user(cls, user, roles=None):
+        token = super().for_user(user)
+        if roles is None:
+            roles = get_user_roles(user)
+        token["username"] = user.username
+        token["roles"] = list(roles)
+        token["primary_role"] = get_primary_role(roles)
+        token["role_type"] = getattr(user, "role_type", None)
+        return token
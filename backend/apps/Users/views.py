@@ -6,16 +6,17 @@ from django.contrib.auth import authenticate,get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth.models import User
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from .serializers import (
     BaseUserSerializer, LoginSerializer
 )
+from .authentication import ClaimsUser
 
 # Create your views here.
 
 User = get_user_model()
 
-# Convert to dictionary
-ROLE_PRIORITY = ["admin", "faculty", "staff", "student"] 
 '''
     choices = {
 1:'ADMIN',
@@ -35,7 +36,7 @@ class UserLoginAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        ser = LoginSerializer(data=request.data)
+        ser = LoginSerializer(data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
         data = ser.validated_data
 
@@ -101,6 +102,11 @@ class UserProfileAPIView(APIView):
 
     def get(self, request):
         user = request.user
+        if isinstance(user, ClaimsUser):
+            # Token users only carry claims: read just the profile fields
+            profile_data = (User.objects.filter(pk=user.pk)
+                            .values('username', 'email', 'first_name', 'last_name').first())
+            return Response(profile_data, status=status.HTTP_200_OK)
         profile_data = {
             'username': user.username,
             'email': user.email,
@@ -149,8 +155,10 @@ from .services import OrgOfficer, Registrar
 
 User = get_user_model()
 
+# IsAdminUser checks is_staff, which token claims do not carry: load the user row
 class PromoteToOfficerAPIView(APIView):
     permission_classes = [permissions.IsAdminUser]
+    requires_db_user = True
 
     def post(self, request, user_id):
         user = User.objects.get(pk=user_id)
@@ -159,6 +167,7 @@ class PromoteToOfficerAPIView(APIView):
 
 class DemoteOfficerAPIView(APIView):
     permission_classes = [permissions.IsAdminUser]
+    requires_db_user = True
 
     def post(self, request, user_id):
         user = User.objects.get(pk=user_id)
@@ -167,22 +176,56 @@ class DemoteOfficerAPIView(APIView):
     
 class PromoteRegistrarAPIView(APIView):
     permission_classes = [permissions.IsAdminUser]
+    requires_db_user = True
     def post(self, request, user_id):
         user= User.objects.get(pk=user_id)
         Registrar.grant(user)
         return Response({"message": "User promoted to Registrar"}, status=200)
 class DemoteRegistrarAPIView(APIView):
     permission_classes = [permissions.IsAdminUser]
+    requires_db_user = True
     def post(self, request, user_id):
         user= User.objects.get(pk=user_id)
         Registrar.revoke(user)
         return Response({"message": "User retired from Registrar"}, status=200)
     
 from .serializers import AdminUserListSerializer
+from .pagination import UserCursorPagination
+from .cache import (
+    get_user_list_version, user_list_etag,
+    get_cached_user_list, set_cached_user_list,
+)
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = User.objects.all().order_by("id")
+    # groups are loaded in one extra query per page instead of one per user
+    queryset = User.objects.all().prefetch_related("groups").order_by("id")
     serializer_class = AdminUserListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserCursorPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["username", "email", "first_name", "last_name"]
     ordering_fields = ["id", "username", "email", "first_name", "last_name"]
+
+    def list(self, request, *args, **kwargs):
+        # Pages are cached per user-list version (bumped by the Users signals);
+        # unchanged pages answer conditional requests with 304 Not Modified.
+        state = get_user_list_version()
+        # next/previous links are absolute, so the host is part of the key
+        page_url = request.build_absolute_uri()
+        etag = user_list_etag(state["version"], page_url)
+        last_modified = int(state["modified"])
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        data = get_cached_user_list(state["version"], page_url)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            set_cached_user_list(state["version"], page_url, data)
+
+        response = Response(data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
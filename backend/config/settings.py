@@ -193,6 +193,8 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 AUTH_USER_MODEL='users.BaseUser'
+# Log in with a username or an email (apps/Users/backends.py)
+AUTHENTICATION_BACKENDS = ['apps.Users.backends.UsernameOrEmailBackend']
 
 TEMPLATES = [
     {
@@ -236,6 +238,16 @@ DATABASES={
 
 
 
+# Password hashing (apps/Users/hashers.py)
+# The first hasher hashes new passwords; users stored with another hasher or
+# cost are re-hashed when they next log in. Measure with: manage.py bench_login
+from apps.Users.hashers import password_hashers
+
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2_sha256')
+PASSWORD_HASHERS = password_hashers(PASSWORD_HASHER)
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -281,7 +293,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 #Added this lines
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Reads use the token's claims; writes load the user (apps/Users/authentication.py)
+        'apps.Users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -307,4 +320,15 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
 }
+# Seconds a token user's active/revoked state is cached per process
+JWT_USER_CHECK_TTL = 30
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Cache for the user listing (apps/Users/cache.py)
+# Use a shared backend (Redis/Memcached/database) when running several workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cmu-backend',
+    }
+}
@@ -5,6 +5,9 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+# Users requested per page of /api/users/ (the server caps it at 500)
+USERS_PAGE_SIZE = 500
+
 class AdminDashboard(QWidget):
     def __init__(self, username, roles, primary_role, token, parent=None):
         super().__init__(parent)
@@ -22,6 +25,8 @@ class AdminDashboard(QWidget):
         self.demote_registrar = self.api_base +"users/" + "roles/registrar/{user_id}/demote/"
 
         self.headers = {"Authorization": f"Bearer {self.token}"}
+        # {page url: {"etag", "data"}} for conditional reloads
+        self._users_pages = {}
 
         self.setWindowTitle("Dashboard")
         self.resize(900, 600)
@@ -83,20 +88,36 @@ class AdminDashboard(QWidget):
     #         self._error(f"Cannot reach backend: {e}")
 
     def load_users(self):
+        # Follow the cursor pages; pages we already have are revalidated with
+        # their ETag and reused when the server answers 304 Not Modified.
+        users = []
+        url = f"{self.users_url}?page_size={USERS_PAGE_SIZE}"
         try:
-            r = requests.get(self.users_url, headers=self.headers, timeout=10)
-            if r.status_code != 200:
-                return self._error(f"Load users failed: HTTP {r.status_code} {r.text[:200]}")
-
-            data = r.json()
-
-            # Handle both paginated (dict) and non-paginated (list)
-            if isinstance(data, dict):
-                users = data.get("results", [])
-            elif isinstance(data, list):
-                users = data
-            else:
-                users = []
+            while url:
+                cached = self._users_pages.get(url)
+                headers = dict(self.headers)
+                if cached:
+                    headers["If-None-Match"] = cached["etag"]
+                r = requests.get(url, headers=headers, timeout=10)
+
+                if r.status_code == 304 and cached:
+                    data = cached["data"]
+                elif r.status_code == 200:
+                    data = r.json()
+                    if r.headers.get("ETag"):
+                        self._users_pages[url] = {"etag": r.headers["ETag"], "data": data}
+                else:
+                    return self._error(f"Load users failed: HTTP {r.status_code} {r.text[:200]}")
+
+                # Handle both paginated (dict) and non-paginated (list)
+                if isinstance(data, dict):
+                    users.extend(data.get("results", []))
+                    url = data.get("next")
+                elif isinstance(data, list):
+                    users.extend(data)
+                    url = None
+                else:
+                    url = None
 
             self.populate_table(users)
 
@@ -105,11 +126,11 @@ class AdminDashboard(QWidget):
 
 
     def populate_table(self, users):
+        self.table.setUpdatesEnabled(False)
         self.table.setRowCount(0)
-        for u in users:
+        self.table.setRowCount(len(users))
+        for row, u in enumerate(users):
             # expected fields: id, username, email, first_name, last_name, groups (list of names)
-            row = self.table.rowCount()
-            self.table.insertRow(row)
             groups = u.get("groups", [])
             # allow backends that return groups as list of names OR list of objects
             if groups and isinstance(groups[0], dict):
@@ -127,6 +148,7 @@ class AdminDashboard(QWidget):
                 if col == 0:
                     item.setData(Qt.ItemDataRole.UserRole, u.get("id"))  # store selected user id
                 self.table.setItem(row, col, item)
+        self.table.setUpdatesEnabled(True)
         self.table.resizeColumnsToContents()
 
     def selected_user_id(self):
@@ -3,6 +3,7 @@ from PyQt6.QtGui import QFont
 from .Users.Admin.AdminDash import AdminDash
 from .Users.Non_Admin.Dash import UserDash
 from .utils.role_utils import RoleRouter
+from .utils.icon_utils import IconLoader
 from .Mock.initializer import initialize_documents_data
 
 
@@ -27,6 +28,9 @@ class DocumentsView(QWidget):
         # Initialize data files on first access
         initialize_documents_data()
         
+        # Read the packed icon set once, before any card or row asks for an icon
+        IconLoader.preload()
+        
         main_layout = QVBoxLayout(self)
         
         # Use RoleRouter to get appropriate dashboard
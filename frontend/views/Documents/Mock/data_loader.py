@@ -154,6 +154,19 @@ def get_collections():
     if not isinstance(collections, list):
         print("Warning: collections is not a list, returning empty list")
         return []
+    
+    # Normalized format: membership rows reference files_data.json by file_id
+    memberships = data.get('memberships')
+    if isinstance(memberships, list):
+        files_by_id = {f.get('file_id'): f for f in get_uploaded_files()}
+        members_by_collection = {}
+        for membership in memberships:
+            file_data = files_by_id.get(membership.get('file_id'))
+            if file_data is not None:
+                members_by_collection.setdefault(membership.get('collection_id'), []).append(file_data)
+        for collection in collections:
+            collection['files'] = members_by_collection.get(collection.get('id'), [])
+    
     return collections
 
 
@@ -26,7 +26,7 @@ def get_default_collections():
     Get the default collections structure to be created on initialization.
     
     Returns:
-        dict: Dictionary with collections array and next_collection_id counter
+        dict: Dictionary with collections array, memberships and next_collection_id counter
     """
     return {
         "collections": [
@@ -35,7 +35,6 @@ def get_default_collections():
                 "name": "Syllabus",
                 "icon": "folder1.png",
                 "description": "Course syllabi and curriculum documents",
-                "files": [],
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "created_by": "system"
             },
@@ -44,7 +43,6 @@ def get_default_collections():
                 "name": "Memo",
                 "icon": "folder1.png",
                 "description": "Official memorandums and announcements",
-                "files": [],
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "created_by": "system"
             },
@@ -53,7 +51,6 @@ def get_default_collections():
                 "name": "Forms",
                 "icon": "folder1.png",
                 "description": "Administrative forms and templates",
-                "files": [],
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "created_by": "system"
             },
@@ -62,11 +59,11 @@ def get_default_collections():
                 "name": "Others",
                 "icon": "folder1.png",
                 "description": "Miscellaneous documents and files",
-                "files": [],
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "created_by": "system"
             }
         ],
+        "memberships": [],  # (collection_id, file_id) rows; file metadata lives in files_data.json
         "next_collection_id": 5  # Next available collection ID (4 default collections created)
     }
 
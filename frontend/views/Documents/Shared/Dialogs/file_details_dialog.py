@@ -53,6 +53,8 @@ class FileDetailsDialog(QDialog):
         from ...utils.icon_utils import IconLoader
         file_icon = IconLoader.create_icon_label(icon_filename, size=(64, 64), alignment=Qt.AlignmentFlag.AlignCenter)
         icon_layout.addWidget(file_icon)
+        self.file_icon = file_icon
+        self._show_preview()
         main_layout.addLayout(icon_layout)
         
         # ========== FILENAME TITLE ==========
@@ -194,9 +196,9 @@ class FileDetailsDialog(QDialog):
     
     def _load_collections(self):
         """Load collections from data and populate dropdown"""
-        from ...Mock.data_loader import get_collections
+        from ...services.document_store import get_document_store
         
-        collections = get_collections()
+        collections = get_document_store().get_collections()
         
         # Add "None" option first
         self.collection_combo.addItem("None (Standalone)", "None")
@@ -215,6 +217,30 @@ class FileDetailsDialog(QDialog):
         # Set current selection
         self.collection_combo.setCurrentIndex(selected_index)
     
+    def _show_preview(self):
+        """Replace the extension icon with a content thumbnail once one is available"""
+        if self.controller is None or self.is_deleted or not self.controller.can_preview(self.file_data):
+            return
+        from ...utils.thumbnail_loader import DETAILS_THUMBNAIL_SIZE, get_thumbnail_loader
+        loader = get_thumbnail_loader(self.controller)
+        pixmap = loader.pixmap(self.file_data, DETAILS_THUMBNAIL_SIZE)
+        if pixmap is not None:
+            self.file_icon.setPixmap(pixmap)
+            return
+        # Generated in the background; swap it in when it arrives
+        loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+    
+    def _on_thumbnail_ready(self, sha256, size):
+        """Show the preview generated for this file"""
+        from ...utils.thumbnail_loader import DETAILS_THUMBNAIL_SIZE, get_thumbnail_loader
+        if sha256 != self.file_data.get('sha256') or size != DETAILS_THUMBNAIL_SIZE:
+            return
+        loader = get_thumbnail_loader(self.controller)
+        pixmap = loader.pixmap(self.file_data, DETAILS_THUMBNAIL_SIZE)
+        if pixmap is not None:
+            self.file_icon.setPixmap(pixmap)
+        loader.thumbnail_ready.disconnect(self._on_thumbnail_ready)
+    
     def _get_icon_for_extension(self, extension):
         """Get appropriate icon filename based on file extension"""
         extension = extension.lower().replace('.', '')
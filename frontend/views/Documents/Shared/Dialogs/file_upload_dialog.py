@@ -7,6 +7,11 @@ from PyQt6.QtGui import QPixmap
 import datetime
 import os
 from ...utils.icon_utils import IconLoader
+from ...utils.workers import Job, start_job
+
+
+# Progress bar resolution per file (byte progress of each copy is scaled to this)
+PROGRESS_STEPS_PER_FILE = 100
 
 
 class FileUploadDialog(QDialog):
@@ -22,8 +27,14 @@ class FileUploadDialog(QDialog):
     - Upload progress bar
     - Bulk upload action button
     
+    Files can also be dropped onto the dialog. Uploads copy several files at
+    once (DocumentController.upload_files) and show each file's progress in
+    the list.
+    
     Signals:
         file_uploaded: Emitted when each file is successfully uploaded
+        file_progress: Emitted from the upload worker with (row, progress step)
+        file_finished: Emitted from the upload worker with (row, status text)
     
     Args:
         parent (QWidget): Parent widget (typically AdminDash)
@@ -34,6 +45,8 @@ class FileUploadDialog(QDialog):
     
     # Signal emitted when each file is uploaded
     file_uploaded = pyqtSignal(dict)
+    file_progress = pyqtSignal(int, int)
+    file_finished = pyqtSignal(int, str)
     
     def __init__(self, parent=None, collection_id=None, username=None, role=None):
         super().__init__(parent)
@@ -45,8 +58,12 @@ class FileUploadDialog(QDialog):
         self.collection_id = collection_id
         self.username = username  # Store username
         self.role = role  # Store role (can be "student-org_officer")
+        self.upload_job = None  # Background upload job while running
         
         self.init_ui()
+        self.setAcceptDrops(True)
+        self.file_progress.connect(self._on_file_progress)
+        self.file_finished.connect(self._set_file_status)
     
     def init_ui(self):
         """Initialize the dialog UI components"""
@@ -160,6 +177,7 @@ class FileUploadDialog(QDialog):
         
         # ========== UPLOAD BUTTON ==========
         upload_btn = QPushButton("Upload All Files")
+        self.upload_btn = upload_btn
         upload_btn.setStyleSheet("""
             QPushButton {
                 background-color: #28a745;
@@ -213,17 +231,40 @@ class FileUploadDialog(QDialog):
         )
         
         if file_paths:
-            # Add selected files to the list
-            for file_path in file_paths:
-                if file_path not in self.selected_files:
-                    self.selected_files.append(file_path)
-                    filename = os.path.basename(file_path)
-                    self.files_list.addItem(filename)
-            
-            print(f"{len(file_paths)} file(s) selected. Total: {len(self.selected_files)}")
+            self._add_files(file_paths)
+    
+    def _add_files(self, file_paths):
+        """Add files to the selection, skipping ones already selected"""
+        if self.upload_job is not None:
+            return
+        already_selected = set(self.selected_files)
+        for file_path in file_paths:
+            if file_path not in already_selected:
+                already_selected.add(file_path)
+                self.selected_files.append(file_path)
+                self.files_list.addItem(os.path.basename(file_path))
+        
+        print(f"{len(file_paths)} file(s) selected. Total: {len(self.selected_files)}")
+    
+    def dragEnterEvent(self, event):
+        """Accept dragged local files"""
+        if event.mimeData().hasUrls() and self.upload_job is None:
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+    
+    def dropEvent(self, event):
+        """Add dropped local files to the selection"""
+        file_paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        file_paths = [path for path in file_paths if os.path.isfile(path)]
+        if file_paths:
+            self._add_files(file_paths)
+            event.acceptProposedAction()
     
     def handle_remove_file(self):
         """Handle removing a file from the selected files list"""
+        if self.upload_job is not None:
+            return
         current_row = self.files_list.currentRow()
         if current_row >= 0:
             # Remove from list widget
@@ -234,6 +275,10 @@ class FileUploadDialog(QDialog):
     
     def handle_upload(self):
         """Handle bulk upload button click with progress tracking"""
+        # Ignore clicks while an upload is already running
+        if self.upload_job is not None:
+            return
+        
         # Validate file selection
         if not self.selected_files:
             QMessageBox.warning(
@@ -243,160 +288,161 @@ class FileUploadDialog(QDialog):
             )
             return
         
+        # Read form values on the GUI thread; the worker must not touch widgets
         category = self.category_combo.currentText()
         collection_id = self.collection_combo.currentData()
+        collection_name = self.collection_combo.currentText()
+        if collection_name == "None (Standalone)":
+            collection_name = None
         description = self.description_text.toPlainText()
         
-        # Import services
-        from ...services.file_storage_service import FileStorageService
-        from ...services.document_crud_service import DocumentCRUDService
-        
         # Show progress bar
         self.progress_bar.setVisible(True)
-        self.progress_bar.setMaximum(len(self.selected_files))
+        # Scaled per file so large copies advance the bar while they stream
+        self.progress_bar.setMaximum(len(self.selected_files) * PROGRESS_STEPS_PER_FILE)
         self.progress_bar.setValue(0)
+        self.upload_btn.setText("Cancel Upload")
+        
+        # Copy files on a background worker so the dialog stays responsive
+        self.upload_job = Job(
+            self._run_upload,
+            list(self.selected_files),
+            category,
+            collection_id,
+            collection_name,
+            description,
+            report_progress=True
+        )
+        self.upload_btn.clicked.disconnect(self.handle_upload)
+        self.upload_btn.clicked.connect(self.upload_job.cancel)
+        start_job(
+            self.upload_job,
+            on_progress=self._on_upload_progress,
+            on_result=self._on_upload_finished,
+            on_error=self._on_upload_error
+        )
+    
+    def _run_upload(self, file_paths, category, collection_id, collection_name,
+                    description, progress_callback=None, cancel_token=None):
+        """
+        Upload the files through the controller's pipeline (runs on a worker thread).
         
-        # Track upload results
-        successful_uploads = 0
-        failed_uploads = []
-        
-        # Process each file
-        for index, file_path in enumerate(self.selected_files):
-            try:
-                filename = os.path.basename(file_path)
-                base_filename = os.path.splitext(filename)[0]
-                
-                # Check for duplicate filename
-                storage_service = FileStorageService()
-                is_duplicate = storage_service.check_duplicate_filename(base_filename)
-                
-                # Auto-rename if duplicate (no prompt for bulk uploads)
-                if is_duplicate:
-                    unique_filename = storage_service.generate_unique_filename(base_filename)
-                    _, ext = os.path.splitext(file_path)
-                    filename = unique_filename + ext
-                    print(f"Duplicate detected. Renamed to: {filename}")
-                
-                # Upload based on collection or standalone
-                if collection_id is not None:
-                    # Upload to collection
-                    result = self._upload_to_collection(
-                        file_path, filename, category, collection_id, storage_service
-                    )
-                else:
-                    # Standalone upload
-                    result = self._upload_standalone(
-                        file_path, filename, category, description
-                    )
-                
-                if result['success']:
-                    successful_uploads += 1
-                    # Emit signal for each successful upload
-                    self.file_uploaded.emit(result['file_data'])
-                else:
-                    failed_uploads.append((filename, result.get('error', 'Unknown error')))
-                
-            except Exception as e:
-                failed_uploads.append((os.path.basename(file_path), str(e)))
-            
-            # Update progress bar
-            self.progress_bar.setValue(index + 1)
+        Copies run concurrently; every file's progress is reported to its row
+        in the list and the metadata of the whole batch is committed at once.
         
-        # Hide progress bar
-        self.progress_bar.setVisible(False)
+        Returns:
+            tuple: (successful_uploads, failed_uploads, cancelled)
+        """
+        from ...controller.document_controller import DocumentController
         
-        # Show results summary
-        self._show_upload_summary(successful_uploads, failed_uploads)
+        controller = DocumentController(self.username, [], self.role, "")
+        total = len(file_paths)
+        steps = [0] * total  # Per-file progress, 0..PROGRESS_STEPS_PER_FILE
+        
+        def report_total():
+            if progress_callback:
+                progress_callback(sum(steps), total * PROGRESS_STEPS_PER_FILE, "")
+        
+        # Both callbacks are serialized by the pipeline
+        def file_progress(index, copied, size):
+            step = int(copied * PROGRESS_STEPS_PER_FILE / size) if size else 0
+            if step != steps[index]:
+                steps[index] = step
+                self.file_progress.emit(index, step)
+                report_total()
+        
+        def file_finished(item):
+            index = item['index']
+            steps[index] = PROGRESS_STEPS_PER_FILE
+            if item['stored'] is not None:
+                self.file_finished.emit(index, "✓")
+            elif item['cancelled']:
+                self.file_finished.emit(index, "cancelled")
+            else:
+                self.file_finished.emit(index, f"⚠ {item['error']}")
+            report_total()
+        
+        result = controller.upload_files(
+            file_paths,
+            category=category if category != "None" else None,
+            collection_id=collection_id,
+            collection=collection_name,
+            description=description,
+            file_progress=file_progress,
+            file_finished=file_finished,
+            cancel_token=cancel_token
+        )
+        
+        # Emit signal for each successful upload (queued to the GUI thread)
+        for file_data in result['uploaded']:
+            self.file_uploaded.emit(file_data)
+        
+        if result['cancelled']:
+            print(f"⚠ Upload cancelled after {len(result['uploaded'])} of {total} file(s)")
+        return len(result['uploaded']), result['failed'], result['cancelled']
     
-    def _upload_to_collection(self, file_path, filename, category, collection_id, storage_service):
-        """Upload a single file to a collection"""
-        from ...services.document_crud_service import DocumentCRUDService
+    def _on_file_progress(self, row, step):
+        """Show a file's copy progress in its list row"""
+        self._set_file_status(row, f"{step * 100 // PROGRESS_STEPS_PER_FILE}%")
+    
+    def _set_file_status(self, row, status):
+        """Show a status after the filename in a list row"""
+        item = self.files_list.item(row)
+        if item is not None and row < len(self.selected_files):
+            item.setText(f"{os.path.basename(self.selected_files[row])} — {status}")
+    
+    def _on_upload_progress(self, current, total, status_text):
+        """Update the progress bar from the upload worker"""
+        self.progress_bar.setValue(current)
+    
+    def _on_upload_finished(self, result):
+        """Handle the upload worker finishing"""
+        successful_uploads, failed_uploads, cancelled = result
+        self._reset_upload_state()
         
-        try:
-            # Save physical file
-            result = storage_service.save_file(
-                file_path, 
-                filename, 
-                category if category != "None" else None
-            )
-            
-            if not result['success']:
-                return {
-                    'success': False,
-                    'error': result.get('error', 'Failed to save file')
-                }
-            
-            # Add to collection (this also adds to uploaded_files automatically)
-            crud_service = DocumentCRUDService()
-            collection_result = crud_service.add_file_to_collection(
-                collection_id,
-                result['filename'],
-                result['file_path'],
-                category if category != "None" else None,
-                result['extension'],
-                self.username,
-                self.role
+        if cancelled:
+            QMessageBox.information(
+                self,
+                "Upload Cancelled",
+                f"Upload cancelled. {successful_uploads} file(s) were uploaded before cancelling."
             )
-            
-            if collection_result.get('success'):
-                return {
-                    'success': True,
-                    'file_data': collection_result.get('file')
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': collection_result.get('error', 'Failed to add file to collection')
-                }
-        
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            if successful_uploads:
+                self.accept()
+            return
+        
+        # Show results summary
+        self._show_upload_summary(successful_uploads, failed_uploads)
     
-    def _upload_standalone(self, file_path, filename, category, description):
-        """Upload a single file as standalone (not in collection)"""
-        from ...controller.document_controller import DocumentController
+    def _on_upload_error(self, message):
+        """Handle an unexpected error in the upload worker"""
+        self._reset_upload_state()
+        QMessageBox.critical(self, "Upload Failed", f"Upload failed: {message}")
+    
+    def _reset_upload_state(self):
+        """Restore the upload button and hide the progress bar"""
+        if self.upload_job is not None:
+            self.upload_btn.clicked.disconnect(self.upload_job.cancel)
+            self.upload_btn.clicked.connect(self.handle_upload)
+            self.upload_job = None
+        self.upload_btn.setText("Upload All Files")
         
-        try:
-            controller = DocumentController(
-                self.username, 
-                [], 
-                self.role, 
-                ""
-            )
-            
-            # Get collection name from combo box (not ID)
-            collection_name = self.collection_combo.currentText()
-            if collection_name == "None (Standalone)":
-                collection_name = None
-            
-            success, message, file_data = controller.upload_file(
-                file_path,
-                custom_name=filename,
-                category=category if category != "None" else None,
-                collection=collection_name,  # Pass collection name
-                description=description,
-                force_override=False  # Auto-rename duplicates in bulk upload
-            )
-            
-            if success:
-                return {
-                    'success': True,
-                    'file_data': file_data
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': message
-                }
-        
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Hide progress bar
+        self.progress_bar.setVisible(False)
+    
+    def reject(self):
+        """Cancel a running upload instead of closing mid-copy"""
+        if self.upload_job is not None:
+            self.upload_job.cancel()
+            return
+        super().reject()
+    
+    def closeEvent(self, event):
+        """Keep the dialog open until a running upload has stopped"""
+        if self.upload_job is not None:
+            self.upload_job.cancel()
+            event.ignore()
+            return
+        super().closeEvent(event)
     
     def _show_upload_summary(self, successful_uploads, failed_uploads):
         """Show summary dialog after bulk upload"""
@@ -1,13 +1,16 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, 
-                             QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QHBoxLayout, QTableView, QFileDialog,
                              QHeaderView, QLineEdit, QStackedWidget, QMessageBox)
-from PyQt6.QtGui import QFont, QStandardItemModel, QStandardItem
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QSize, pyqtSignal
 from ...controller.document_controller import DocumentController
-from ...Mock.data_loader import get_collection_by_name
 from ...utils.icon_utils import create_back_button, create_search_button, create_floating_add_button
-from ...utils.bulk_operations import execute_bulk_operation, get_selected_files_from_table
+from ...utils.bulk_operations import execute_bulk_operation, execute_streaming_operation
+from ...utils.change_notifier import get_document_change_notifier
+from ...utils.search_pipeline import SearchPipeline
+from ...utils.thumbnail_loader import TABLE_THUMBNAIL_SIZE, get_thumbnail_loader
 from ...widgets.empty_state import EmptyStateWidget
+from ...widgets.file_table_model import FileTableModel, FileActionsDelegate, FileRole, enable_header_sorting
 
 class CollectionView(QWidget):
     file_accepted = pyqtSignal(str)
@@ -31,9 +34,6 @@ class CollectionView(QWidget):
         self.stack: QStackedWidget = stack
         self.setWindowTitle(f"Collection: {collection_name}" if collection_name else "Collection")
         
-        # Track file data for efficient incremental updates
-        self.file_data_cache = {}  # {'filename': {'time': ..., 'extension': ..., 'row_index': ...}}
-        
         main_layout = QVBoxLayout()
 
         # Header with back button
@@ -44,7 +44,7 @@ class CollectionView(QWidget):
         header.setFont(QFont("Arial", 16))
 
         search_bar = QLineEdit()
-        search_button = create_search_button(callback=lambda: print("Search button clicked"))
+        search_button = create_search_button(callback=lambda: self.search_pipeline.search_now())
         search_bar.setPlaceholderText("Search files...")
         search_bar.setMinimumWidth(200)
 
@@ -92,22 +92,63 @@ class CollectionView(QWidget):
         """)
         bulk_delete_btn.clicked.connect(self.handle_bulk_delete)
         
+        # Export button (whole collection to one archive)
+        export_btn = QPushButton("Export")
+        export_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #0078d4;
+                color: white;
+                font-weight: bold;
+                padding: 6px 12px;
+                border: none;
+                border-radius: 4px;
+            }
+            QPushButton:hover {
+                background-color: #106ebe;
+            }
+        """)
+        export_btn.clicked.connect(self.handle_export_collection)
+        
         actions_layout.addWidget(add_file_btn)
         actions_layout.addWidget(bulk_delete_btn)
+        actions_layout.addWidget(export_btn)
         actions_layout.addStretch()
         main_layout.addLayout(actions_layout)
 
-        # Table logic with checkboxes for bulk selection
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)  # Added checkbox column
-        self.table.setHorizontalHeaderLabels(["", "Filename", "Time", "Extension", "Actions"])
-        
-        # Create "Select All" checkbox in header
-        self.select_all_checkbox = QTableWidgetItem()
-        self.select_all_checkbox.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-        self.select_all_checkbox.setCheckState(Qt.CheckState.Unchecked)
-        self.select_all_checkbox.setText("☑")
-        self.table.setHorizontalHeaderItem(0, self.select_all_checkbox)
+        # Table logic with checkboxes for bulk selection (rows served lazily by the model)
+        # Image/PDF previews are generated off the GUI thread and repainted when ready
+        self.thumbnail_loader = get_thumbnail_loader(self.controller)
+        self.thumbnail_loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+        
+        self.files_model = FileTableModel([
+            {'title': '', 'checkbox': True},
+            {'title': 'Filename', 'key': 'filename', 'decoration': self._file_thumbnail, 'sort': 'filename'},
+            {'title': 'Time', 'key': 'time', 'sort': 'timestamp'},
+            {'title': 'Extension', 'key': 'extension', 'sort': 'extension'},
+            {'title': 'Actions', 'actions': True}
+        ])
+        self.table = QTableView()
+        self.table.setModel(self.files_model)
+        self.table.setIconSize(QSize(TABLE_THUMBNAIL_SIZE, TABLE_THUMBNAIL_SIZE))
+        # Header clicks re-run the page query sorted by the store
+        enable_header_sorting(self.table)
+        
+        # Search ranks on a worker once typing pauses; the model pages in the results
+        self.search_pipeline = SearchPipeline(
+            self.files_model,
+            self._search_collection,
+            self.controller.query_search_results,
+            parent=self
+        )
+        self.search_pipeline.search_cleared.connect(self.on_search_cleared)
+        self.search_pipeline.search_finished.connect(lambda query, count: self._update_empty_state())
+        search_bar.textChanged.connect(self.search_pipeline.set_query)
+        search_bar.returnPressed.connect(self.search_pipeline.search_now)
+        
+        # Action buttons are painted by a delegate instead of per-row widgets
+        self.actions_delegate = FileActionsDelegate([('reject', 'Reject'), ('accept', 'Accept')], self.table)
+        self.actions_delegate.action_triggered.connect(self.handle_file_action)
+        self.table.setItemDelegateForColumn(4, self.actions_delegate)
         
         # Connect header click to toggle all checkboxes
         self.table.horizontalHeader().sectionClicked.connect(self.handle_header_checkbox_clicked)
@@ -117,11 +158,11 @@ class CollectionView(QWidget):
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)  # Single selection only (use checkboxes for bulk)
-        self.table.itemClicked.connect(self.handle_item_clicked)
-        self.table.itemDoubleClicked.connect(self.handle_item_double_clicked)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)  # Single selection only (use checkboxes for bulk)
+        self.table.clicked.connect(self.handle_item_clicked)
+        self.table.doubleClicked.connect(self.handle_item_double_clicked)
 
         # Create container for table and empty state
         self.table_container = QWidget()
@@ -129,12 +170,14 @@ class CollectionView(QWidget):
         self.table_container_layout.setContentsMargins(0, 0, 0, 0)
 
         # Load collection data from JSON
-        collection_data = get_collection_by_name(collection_name)
-        if collection_data:
-            files_data = collection_data.get('files', [])
+        self._feed_revision = self.controller.get_revision()
+        self.collection_id = self.controller.get_collection_id(collection_name)
+        if self.collection_id is not None:
+            # Only the first page is loaded; later pages are queried as the table scrolls
+            self.files_model.set_query(self._query_files)
             
             # Show empty state or populate table
-            if len(files_data) == 0:
+            if self.files_model.file_count() == 0:
                 # Show empty state
                 self.empty_state = EmptyStateWidget(
                     icon_name="folder-open.png",
@@ -146,17 +189,6 @@ class CollectionView(QWidget):
                 self.table_container_layout.addWidget(self.empty_state)
                 self.table.setVisible(False)
             else:
-                # Populate table
-                for idx, file_data in enumerate(files_data):
-                    self.add_file_to_table(file_data['filename'], file_data['time'], file_data['extension'])
-                    # Track file data in cache (including file_id for deletion)
-                    self.file_data_cache[file_data['filename']] = {
-                        'time': file_data['time'],
-                        'extension': file_data['extension'],
-                        'row_index': idx,
-                        'file_id': file_data.get('file_id'),  # Store file_id for bulk operations
-                        'timestamp': file_data.get('timestamp')  # Store timestamp as fallback
-                    }
                 self.table.setVisible(True)
         else:
             # Fallback if collection not found
@@ -172,6 +204,10 @@ class CollectionView(QWidget):
         
         self.table_container_layout.addWidget(self.table)
         main_layout.addWidget(self.table_container)
+        
+        # Later changes arrive as file_id deltas instead of full reloads
+        get_document_change_notifier(self.controller).changed.connect(
+            self.apply_document_changes, Qt.ConnectionType.QueuedConnection)
 
         # Floating Add Button (bottom-right corner)
         self.floating_add_btn = create_floating_add_button(callback=self.handle_add_file)
@@ -197,83 +233,41 @@ class CollectionView(QWidget):
     def handle_header_checkbox_clicked(self, logical_index):
         """Handle click on header checkbox to select/deselect all"""
         if logical_index == 0:  # Checkbox column
-            # Toggle the select all state
-            current_state = self.select_all_checkbox.checkState()
-            new_state = Qt.CheckState.Unchecked if current_state == Qt.CheckState.Checked else Qt.CheckState.Checked
-            
-            # Update header checkbox
-            self.select_all_checkbox.setCheckState(new_state)
-            
-            # Update all row checkboxes
-            for row in range(self.table.rowCount()):
-                checkbox_item = self.table.item(row, 0)
-                if checkbox_item:
-                    checkbox_item.setCheckState(new_state)
-            
-            print(f"Select All: {'Checked' if new_state == Qt.CheckState.Checked else 'Unchecked'}")
+            # Toggle the select all state (covers rows not fetched yet)
+            select_all = not self.files_model.all_checked()
+            self.files_model.set_all_checked(select_all)
+            print(f"Select All: {'Checked' if select_all else 'Unchecked'}")
 
-    def create_actions_widget(self, filename):
-        widget = QWidget()
-        layout = QHBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        reject_btn = QPushButton("Reject")
-        accept_btn = QPushButton("Accept")
-        reject_btn.clicked.connect(lambda: print(f"Reject clicked for {filename}"))
-        accept_btn.clicked.connect(lambda: print(f"Accept clicked for {filename}"))
-        layout.addWidget(reject_btn)
-        layout.addWidget(accept_btn)
-        widget.setLayout(layout)
-        return widget
+    def handle_file_action(self, action, file_data):
+        """Handle an action button painted in a file row"""
+        filename = file_data.get('filename')
+        if action == 'reject':
+            print(f"Reject clicked for {filename}")
+        elif action == 'accept':
+            print(f"Accept clicked for {filename}")
 
     def go_back(self):
         print("Back button clicked")  # Added this
         if self.stack:
             self.stack.setCurrentIndex(0)  # Assuming dashboard is at index 0
 
-    def add_file_to_table(self, name, time, ext):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        
-        # Add checkbox in first column
-        checkbox_item = QTableWidgetItem()
-        checkbox_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-        checkbox_item.setCheckState(Qt.CheckState.Unchecked)
-        self.table.setItem(row, 0, checkbox_item)
-        
-        # Add file data
-        self.table.setItem(row, 1, QTableWidgetItem(name))
-        self.table.setItem(row, 2, QTableWidgetItem(time))
-        self.table.setItem(row, 3, QTableWidgetItem(ext))
-        
-        # Add actions widget
-        actions_widget = self.create_actions_widget(name)
-        self.table.setCellWidget(row, 4, actions_widget)
-
-    def handle_item_clicked(self, item):
+    def handle_item_clicked(self, index):
         # Skip checkbox column (0) and actions column (4)
-        if item.column() != 0 and item.column() != 4:
-            filename = self.table.item(item.row(), 1).text()
+        if index.column() != 0 and index.column() != 4:
+            filename = index.data(FileRole).get('filename')
             print(f"File row clicked: {filename}")
     
-    def handle_item_double_clicked(self, item):
-        """Handle table item double-click - show file details dialog"""
+    def handle_item_double_clicked(self, index):
+        """Handle table cell double-click - show file details dialog"""
         # Skip checkbox column (0) and actions column (4)
-        if item.column() != 0 and item.column() != 4:
-            filename = self.table.item(item.row(), 1).text()
-            self.show_file_details(filename)
+        if index.column() != 0 and index.column() != 4:
+            self.show_file_details(index.data(FileRole).get('filename'))
     
     def show_file_details(self, filename):
         """Show file details dialog using custom widget"""
-        # Get file details from collection
-        collection_data = get_collection_by_name(self.collection_name)
-        file_data = None
-        
-        if collection_data:
-            files_data = collection_data.get('files', [])
-            for f in files_data:
-                if f['filename'] == filename:
-                    file_data = f
-                    break
+        # Get file details from the loaded rows
+        record = self.files_model.find_file_by_name(filename)
+        file_data = dict(record) if record else None
         
         if file_data:
             from ..Dialogs.file_details_dialog import FileDetailsDialog
@@ -292,8 +286,8 @@ class CollectionView(QWidget):
     def on_file_updated_from_dialog(self, file_data):
         """Handle file updated signal from details dialog"""
         print(f"File updated in collection: {file_data}")
-        # Refresh collection files
-        self.refresh_collection_files()
+        # Show the updated row
+        self.apply_document_changes()
         # Forward signal to parent (AdminDash)
         self.file_updated.emit(file_data)
     
@@ -301,17 +295,8 @@ class CollectionView(QWidget):
         """Handle file deleted signal from details dialog"""
         print(f"File deleted from collection dialog: {file_data}")
         
-        # Immediate UI update - remove file from table
-        filename = file_data.get('filename')
-        if filename and filename in self.file_data_cache:
-            row_idx = self.file_data_cache[filename]['row_index']
-            self.table.removeRow(row_idx)
-            del self.file_data_cache[filename]
-            self._rebuild_file_indices()
-            print(f"Immediately removed file from collection UI: {filename}")
-        
-        # Then refresh to ensure consistency with data source
-        self.refresh_collection_files()
+        # Drop the deleted row from the change feed instead of reloading
+        self.apply_document_changes()
         
         # Add collection name to file_data before forwarding
         file_data['collection_name'] = self.collection_name
@@ -343,6 +328,26 @@ class CollectionView(QWidget):
         else:
             print(f"Error: Collection '{self.collection_name}' not found")
     
+    def handle_export_collection(self):
+        """Export this collection's files and metadata to an archive"""
+        if self.collection_id is None:
+            return
+        archive_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Collection",
+            f"{self.collection_name}.zip",
+            "Zip Archive (*.zip);;Tar Archive (*.tar);;Compressed Tar Archive (*.tar.gz)"
+        )
+        if not archive_path:
+            return
+        
+        collection_id = self.collection_id
+        execute_streaming_operation(
+            lambda **kwargs: self.controller.export_collection(collection_id, archive_path, **kwargs),
+            operation_name="Export",
+            parent=self
+        )
+    
     def handle_bulk_delete(self):
         """Handle bulk deletion of selected files from collection"""
         # Get checked files from table
@@ -357,40 +362,31 @@ class CollectionView(QWidget):
             )
             return
         
-        # Define the delete operation for a single file
-        def delete_file_operation(file_data):
-            """Delete a single file using the controller"""
-            filename = file_data.get('filename')
-            file_id = file_data.get('file_id')
-            timestamp = file_data.get('timestamp')
+        # Define the delete operation for a batch of files (one metadata commit)
+        def delete_files_operation(files):
+            """Soft delete a batch of files using the controller"""
+            file_ids = [file_data.get('file_id') for file_data in files if file_data.get('file_id')]
+            results = self.controller.delete_files(file_ids)
+            print(f"Deleting {len(file_ids)} file(s) by file_id")
             
-            try:
-                # Use controller to delete file (soft delete) - prefer file_id
-                if file_id:
-                    success, message = self.controller.delete_file(file_id=file_id)
-                    print(f"Deleting file by file_id: {file_id} ({filename})")
-                else:
-                    success, message = self.controller.delete_file(
-                        filename=filename,
-                        timestamp=timestamp
-                    )
-                    print(f"Deleting file by filename: {filename}")
-                
+            outcomes = []
+            for file_data in files:
+                file_id = file_data.get('file_id')
+                if not file_id:
+                    outcomes.append((False, f"Missing file ID for '{file_data.get('filename')}'"))
+                    continue
+                success, message = results.get(file_id, (False, f"File with ID {file_id} not found"))
                 if success:
                     # Emit signal for each deleted file
                     file_data['collection_name'] = self.collection_name
                     self.file_deleted.emit(file_data)
-                
-                return success, message
-            
-            except Exception as e:
-                print(f"Error deleting file: {e}")
-                return False, str(e)
+                outcomes.append((success, message))
+            return outcomes
         
         # Execute bulk operation with confirmation dialog
         successful, failed, failed_items = execute_bulk_operation(
             items=selected_files,
-            operation_func=delete_file_operation,
+            batch_func=delete_files_operation,
             operation_name="Delete",
             parent=self,
             item_display_func=lambda item: f"{item['filename']} ({item['extension']})",
@@ -398,97 +394,113 @@ class CollectionView(QWidget):
                                "The files will be moved to the Recycle Bin and can be restored later."
         )
         
-        # Refresh the collection view after bulk deletion
+        # Drop the deleted rows from the view
         if successful > 0:
-            self.refresh_collection_files()
+            self.apply_document_changes()
             print(f"Bulk delete completed: {successful} succeeded, {failed} failed")
     
     def _get_checked_files(self):
-        """Get list of checked files from table with full metadata"""
-        checked_files = []
-        
-        for row in range(self.table.rowCount()):
-            checkbox_item = self.table.item(row, 0)
-            if checkbox_item and checkbox_item.checkState() == Qt.CheckState.Checked:
-                # Get filename from column 1
-                filename_item = self.table.item(row, 1)
-                if filename_item:
-                    filename = filename_item.text()
-                    
-                    # Get complete file data from cache
-                    if filename in self.file_data_cache:
-                        file_data = self.file_data_cache[filename].copy()
-                        file_data['filename'] = filename
-                        checked_files.append(file_data)
-                        print(f"Checked file: {filename} (file_id: {file_data.get('file_id')})")
-        
+        """Get list of checked files with full metadata"""
+        checked_files = [dict(file_data) for file_data in self.files_model.checked_files()]
+        print(f"Checked files: {[f.get('file_id') for f in checked_files]}")
         return checked_files
     
     def on_file_uploaded(self, file_data):
         """Handle file uploaded event - incremental update"""
         print(f"File uploaded to collection: {file_data}")
         
-        filename = file_data.get('filename')
-        if not filename:
-            # Fallback to full refresh if filename not provided
-            self.refresh_collection_files()
-            self.file_uploaded.emit(file_data)
-            return
-        
-        # CRITICAL FIX: Handle empty state transition
-        # If table is hidden (empty state showing), we need to show it
-        if not self.table.isVisible():
-            print("Transitioning from empty state to populated table")
-            if hasattr(self, 'empty_state') and self.empty_state:
-                self.empty_state.setVisible(False)
-            self.table.setVisible(True)
-        
-        # Check if file already exists
-        if filename in self.file_data_cache:
-            # Update existing file data (accounting for checkbox column)
-            row_idx = self.file_data_cache[filename]['row_index']
-            self.table.item(row_idx, 1).setText(file_data.get('filename', filename))
-            self.table.item(row_idx, 2).setText(file_data.get('time', ''))
-            self.table.item(row_idx, 3).setText(file_data.get('extension', ''))
-            
-            # Update cache
-            self.file_data_cache[filename]['time'] = file_data.get('time', '')
-            self.file_data_cache[filename]['extension'] = file_data.get('extension', '')
-            self.file_data_cache[filename]['file_id'] = file_data.get('file_id')
-            self.file_data_cache[filename]['timestamp'] = file_data.get('timestamp')
-            print(f"Updated existing file in collection UI: {filename}")
-        else:
-            # Add new file incrementally
-            self.add_file_to_table(
-                file_data.get('filename', ''),
-                file_data.get('time', ''),
-                file_data.get('extension', '')
-            )
-            
-            # Add to cache
-            self.file_data_cache[filename] = {
-                'time': file_data.get('time', ''),
-                'extension': file_data.get('extension', ''),
-                'row_index': self.table.rowCount() - 1,
-                'file_id': file_data.get('file_id'),
-                'timestamp': file_data.get('timestamp')
-            }
-            print(f"Added new file to collection UI: {filename}")
+        # The new membership arrives through the change feed (also leaves the empty state)
+        self.apply_document_changes()
+        print(f"Updated collection UI for file: {file_data.get('filename')}")
         
         self.file_uploaded.emit(file_data)
     
     def refresh_collection_files(self):
         """Efficiently refresh collection files with incremental updates"""
-        # Get fresh data from JSON
-        collection_data = get_collection_by_name(self.collection_name)
-        if not collection_data:
+        # Remember the revision first: changes committed while loading are re-applied
+        self._feed_revision = self.controller.get_revision()
+        collection_id = self.controller.get_collection_id(self.collection_name)
+        if collection_id is None:
             print(f"Warning: Collection '{self.collection_name}' not found when refreshing")
             return
+        self.collection_id = collection_id
         
-        files_data = collection_data.get('files', [])
+        # Re-query the rows loaded so far: only changed rows are touched
+        self.files_model.set_query(self._query_files)
+        self._update_empty_state()
         
-        # Handle empty state
-        if len(files_data) == 0:
+        print(f"Refreshed collection '{self.collection_name}' with incremental updates")
+    
+    def _query_files(self, sort, descending, cursor, limit):
+        """Page query behind the table (see FileTableModel.set_query)"""
+        return self.controller.query_files(sort=sort, descending=descending, cursor=cursor,
+                                           limit=limit, collection_id=self.collection_id)
+    
+    def _search_collection(self, query):
+        """Search function for the pipeline (runs on a worker thread)"""
+        if self.collection_id is None:
+            return []
+        return self.controller.search_file_ids(query, collection_id=self.collection_id)
+    
+    def on_search_cleared(self):
+        """Show the full list again once the search box is emptied"""
+        self.files_model.clear()
+        self.refresh_collection_files()
+    
+    def _file_thumbnail(self, file_data):
+        """Decoration for the filename column (None until the preview is ready)"""
+        return self.thumbnail_loader.pixmap(file_data, TABLE_THUMBNAIL_SIZE)
+    
+    def on_thumbnail_ready(self, sha256, size):
+        """Repaint the rows showing content whose preview just arrived"""
+        if size == TABLE_THUMBNAIL_SIZE:
+            self.files_model.refresh_rows(
+                lambda record: record.get('sha256') == sha256,
+                [Qt.ItemDataRole.DecorationRole])
+    
+    def apply_document_changes(self, revision=None):
+        """Apply file and membership changes committed since the last load or update"""
+        if self.collection_id is None:
+            return
+        changes = self.controller.get_changes_since(self._feed_revision)
+        if changes['revision'] == self._feed_revision:
+            return
+        if self.search_pipeline.is_active():
+            # Matches may have changed; re-run the query instead of applying raw deltas
+            self._feed_revision = changes['revision']
+            self.search_pipeline.refresh()
+            return
+        if changes['reset'] or self.collection_id in changes['collections_deleted']:
+            self.refresh_collection_files()
+            return
+        self._feed_revision = changes['revision']
+        
+        added_ids = {file_id for collection_id, file_id in changes['memberships_added']
+                     if collection_id == self.collection_id}
+        removed_ids = [file_id for collection_id, file_id in changes['memberships_removed']
+                       if collection_id == self.collection_id]
+        
+        # Changed records of rows shown here, plus records of newly added members
+        upserts = []
+        for record in changes['inserted'] + changes['updated']:
+            file_id = record.get('file_id')
+            if file_id in added_ids or self.files_model.row_of(file_id) is not None:
+                upserts.append(record)
+                added_ids.discard(file_id)
+        for file_id in added_ids:
+            record = self.controller.get_file_details(file_id)
+            if record:
+                upserts.append(record)
+        
+        self.files_model.apply_changes(
+            {'updated': upserts, 'deleted': changes['deleted'] + removed_ids},
+            accept=lambda f: not f.get('is_deleted', False)
+        )
+        self._update_empty_state()
+    
+    def _update_empty_state(self):
+        """Show the empty state when the collection has no files, the table otherwise"""
+        if self.files_model.file_count() == 0:
             self.table.setVisible(False)
             if not hasattr(self, 'empty_state'):
                 self.empty_state = EmptyStateWidget(
@@ -501,86 +513,8 @@ class CollectionView(QWidget):
                 self.table_container_layout.insertWidget(0, self.empty_state)
             else:
                 self.empty_state.setVisible(True)
-            
-            # Clear cache when empty
-            self.file_data_cache.clear()
-            return
         else:
             # Hide empty state and show table
             if hasattr(self, 'empty_state'):
                 self.empty_state.setVisible(False)
             self.table.setVisible(True)
-        
-        fresh_files = {f['filename']: f for f in files_data}
-        
-        current_filenames = set(self.file_data_cache.keys())
-        fresh_filenames = set(fresh_files.keys())
-        
-        # Identify changes
-        removed_files = current_filenames - fresh_filenames
-        new_files = fresh_filenames - current_filenames
-        existing_files = current_filenames & fresh_filenames
-        
-        # Check for modified files
-        modified_files = set()
-        for filename in existing_files:
-            cached = self.file_data_cache[filename]
-            fresh = fresh_files[filename]
-            if cached['time'] != fresh['time'] or cached['extension'] != fresh['extension']:
-                modified_files.add(filename)
-        
-        # Remove deleted files (sort by row index descending)
-        for filename in sorted(removed_files, 
-                              key=lambda f: self.file_data_cache[f]['row_index'], 
-                              reverse=True):
-            row_idx = self.file_data_cache[filename]['row_index']
-            self.table.removeRow(row_idx)
-            del self.file_data_cache[filename]
-            print(f"Removed file from collection: {filename}")
-        
-        # Update modified files (accounting for checkbox column)
-        for filename in modified_files:
-            row_idx = self.file_data_cache[filename]['row_index']
-            fresh = fresh_files[filename]
-            
-            self.table.item(row_idx, 1).setText(fresh['filename'])
-            self.table.item(row_idx, 2).setText(fresh['time'])
-            self.table.item(row_idx, 3).setText(fresh['extension'])
-            
-            # Update cache
-            self.file_data_cache[filename]['time'] = fresh['time']
-            self.file_data_cache[filename]['extension'] = fresh['extension']
-            self.file_data_cache[filename]['file_id'] = fresh.get('file_id')
-            self.file_data_cache[filename]['timestamp'] = fresh.get('timestamp')
-            print(f"Updated file in collection: {filename}")
-        
-        # Add new files
-        for filename in new_files:
-            fresh = fresh_files[filename]
-            self.add_file_to_table(fresh['filename'], fresh['time'], fresh['extension'])
-            
-            # Add to cache with file_id and timestamp
-            self.file_data_cache[filename] = {
-                'time': fresh['time'],
-                'extension': fresh['extension'],
-                'row_index': self.table.rowCount() - 1,
-                'file_id': fresh.get('file_id'),
-                'timestamp': fresh.get('timestamp')
-            }
-            print(f"Added file to collection: {filename}")
-        
-        # Rebuild row indices after removals
-        if removed_files:
-            self._rebuild_file_indices()
-        
-        print(f"Refreshed collection '{self.collection_name}' with incremental updates")
-    
-    def _rebuild_file_indices(self):
-        """Rebuild row indices in file_data_cache after removals"""
-        for row_idx in range(self.table.rowCount()):
-            # Column 1 now contains filename (column 0 is checkbox)
-            filename_item = self.table.item(row_idx, 1)
-            if filename_item:
-                filename = filename_item.text()
-                if filename in self.file_data_cache:
-                    self.file_data_cache[filename]['row_index'] = row_idx
\ No newline at end of file
@@ -1,12 +1,15 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, 
-                             QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QHBoxLayout, QTableView,
                              QHeaderView, QLineEdit, QStackedWidget, QMessageBox)
-from PyQt6.QtGui import QFont, QStandardItemModel, QStandardItem
+from PyQt6.QtGui import QFont, QColor
 from PyQt6.QtCore import Qt, pyqtSignal
 from ...controller.document_controller import DocumentController
 from ...utils.icon_utils import create_back_button, create_search_button
 from ...utils.bulk_operations import execute_bulk_operation
+from ...utils.change_notifier import get_document_change_notifier
+from ...utils.search_pipeline import SearchPipeline
 from ...widgets.empty_state import EmptyStateWidget
+from ...widgets.file_table_model import FileTableModel, FileActionsDelegate, FileRole, enable_header_sorting
 
 class DeletedFileView(QWidget):
     file_restored = pyqtSignal(dict)  # Signal to notify parent of file restoration
@@ -25,9 +28,6 @@ class DeletedFileView(QWidget):
         self.stack: QStackedWidget = stack
         self.setWindowTitle("Deleted Files")
         
-        # Track file data for efficient incremental updates
-        self.file_data_cache = {}  # {'filename': {'time': ..., 'extension': ..., 'deleted_at': ..., 'days_remaining': ..., 'row_index': ...}}
-        
         main_layout = QVBoxLayout()
 
         # Header with back button
@@ -38,7 +38,7 @@ class DeletedFileView(QWidget):
         header.setFont(QFont("Arial", 16))
         
         search_bar = QLineEdit()
-        search_button = create_search_button(callback=lambda: print("Search button clicked"))
+        search_button = create_search_button(callback=lambda: self.search_pipeline.search_now())
         search_bar.setPlaceholderText("Search Deleted Files...")
         search_bar.setMinimumWidth(200)
         
@@ -127,17 +127,38 @@ class DeletedFileView(QWidget):
         actions_layout.addStretch()
         main_layout.addLayout(actions_layout)
 
-        # Table logic with Days Remaining column and checkboxes
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)  # Added checkbox column
-        self.table.setHorizontalHeaderLabels(["", "Filename", "Time", "Extension", "Days Remaining", "Actions"])
-        
-        # Create "Select All" checkbox in header
-        self.select_all_checkbox = QTableWidgetItem()
-        self.select_all_checkbox.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-        self.select_all_checkbox.setCheckState(Qt.CheckState.Unchecked)
-        self.select_all_checkbox.setText("☑")
-        self.table.setHorizontalHeaderItem(0, self.select_all_checkbox)
+        # Table with checkboxes for bulk selection (rows served lazily by the model;
+        # days remaining is only computed for rows that are actually shown)
+        self.files_model = FileTableModel([
+            {'title': '', 'checkbox': True},
+            {'title': 'Filename', 'key': 'filename', 'sort': 'filename'},
+            {'title': 'Time', 'key': 'time', 'default': 'N/A', 'sort': 'timestamp'},
+            {'title': 'Extension', 'key': 'extension', 'sort': 'extension'},
+            {'title': 'Days Remaining', 'value': self._format_days_remaining,
+             'foreground': self._days_remaining_color, 'sort': 'deleted_at'},
+            {'title': 'Actions', 'actions': True}
+        ])
+        self.table = QTableView()
+        self.table.setModel(self.files_model)
+        # Header clicks re-run the page query sorted by the store
+        enable_header_sorting(self.table)
+        
+        # Search ranks on a worker once typing pauses; the model pages in the results
+        self.search_pipeline = SearchPipeline(
+            self.files_model,
+            lambda query: self.controller.search_file_ids(query, deleted_only=True),
+            self._query_search_results,
+            parent=self
+        )
+        self.search_pipeline.search_cleared.connect(self.on_search_cleared)
+        self.search_pipeline.search_finished.connect(lambda query, count: self._update_empty_state())
+        search_bar.textChanged.connect(self.search_pipeline.set_query)
+        search_bar.returnPressed.connect(self.search_pipeline.search_now)
+        
+        # Action buttons are painted by a delegate instead of per-row widgets
+        self.actions_delegate = FileActionsDelegate([('erase', 'Erase'), ('restore', 'Restore')], self.table)
+        self.actions_delegate.action_triggered.connect(self.handle_file_action)
+        self.table.setItemDelegateForColumn(5, self.actions_delegate)
         
         # Connect header click to toggle all checkboxes
         self.table.horizontalHeader().sectionClicked.connect(self.handle_header_checkbox_clicked)
@@ -147,20 +168,25 @@ class DeletedFileView(QWidget):
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)  # Single selection only (use checkboxes for bulk)
-        self.table.itemClicked.connect(self.handle_item_clicked)
-        self.table.itemDoubleClicked.connect(self.handle_item_double_clicked)
-
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)  # Single selection only (use checkboxes for bulk)
+        self.table.clicked.connect(self.handle_item_clicked)
+        self.table.doubleClicked.connect(self.handle_item_double_clicked)
+        
         # Create container for table and empty state
         self.table_container = QWidget()
         self.table_container_layout = QVBoxLayout(self.table_container)
         self.table_container_layout.setContentsMargins(0, 0, 0, 0)
 
         # Load deleted files data using controller
+        self._feed_revision = 0
         self.load_deleted_files()
         
+        # Later changes arrive as file_id deltas instead of full reloads
+        get_document_change_notifier(self.controller).changed.connect(
+            self.apply_document_changes, Qt.ConnectionType.QueuedConnection)
+        
         self.table_container_layout.addWidget(self.table)
         main_layout.addWidget(self.table_container)
 
@@ -169,103 +195,98 @@ class DeletedFileView(QWidget):
     def handle_header_checkbox_clicked(self, logical_index):
         """Handle click on header checkbox to select/deselect all"""
         if logical_index == 0:  # Checkbox column
-            # Toggle the select all state
-            current_state = self.select_all_checkbox.checkState()
-            new_state = Qt.CheckState.Unchecked if current_state == Qt.CheckState.Checked else Qt.CheckState.Checked
-            
-            # Update header checkbox
-            self.select_all_checkbox.setCheckState(new_state)
-            
-            # Update all row checkboxes
-            for row in range(self.table.rowCount()):
-                checkbox_item = self.table.item(row, 0)
-                if checkbox_item:
-                    checkbox_item.setCheckState(new_state)
-            
-            print(f"Select All: {'Checked' if new_state == Qt.CheckState.Checked else 'Unchecked'}")
+            # Toggle the select all state (covers rows not fetched yet)
+            select_all = not self.files_model.all_checked()
+            self.files_model.set_all_checked(select_all)
+            print(f"Select All: {'Checked' if select_all else 'Unchecked'}")
 
-    def create_actions_widget(self, filename, deleted_at=None):
-        widget = QWidget()
-        layout = QHBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        erase_btn = QPushButton("Erase")
-        restore_btn = QPushButton("Restore")
-        erase_btn.clicked.connect(lambda: self.handle_permanent_delete(filename, deleted_at))
-        restore_btn.clicked.connect(lambda: self.handle_restore(filename, deleted_at))
-        layout.addWidget(erase_btn)
-        layout.addWidget(restore_btn)
-        widget.setLayout(layout)
-        return widget
+    def handle_file_action(self, action, file_data):
+        """Handle an action button painted in a file row"""
+        if action == 'erase':
+            self.handle_permanent_delete(file_data.get('filename'), file_data.get('deleted_at'))
+        elif action == 'restore':
+            self.handle_restore(file_data.get('filename'), file_data.get('deleted_at'))
+    
+    def _format_days_remaining(self, file_data):
+        """Days remaining column text (query pages arrive with it worked out)"""
+        days_remaining = self.controller.get_recycle_bin_days_remaining(file_data)
+        return "N/A" if days_remaining is None else f"{days_remaining} days"
     
-    def create_days_remaining_item(self, days_remaining):
-        """Create a colored item based on days remaining"""
+    def _days_remaining_color(self, file_data):
+        """Color code the days remaining column based on urgency"""
+        days_remaining = self.controller.get_recycle_bin_days_remaining(file_data)
         if days_remaining is None:
-            item = QTableWidgetItem("N/A")
-        else:
-            item = QTableWidgetItem(f"{days_remaining} days")
-            # Color code based on urgency
-            if days_remaining <= 3:
-                item.setForeground(Qt.GlobalColor.red)
-            elif days_remaining <= 7:
-                item.setForeground(Qt.GlobalColor.darkYellow)
-        return item
+            return None
+        if days_remaining <= 3:
+            return QColor(Qt.GlobalColor.red)
+        if days_remaining <= 7:
+            return QColor(Qt.GlobalColor.darkYellow)
+        return None
 
     def go_back(self):
         print("Back button clicked")
         if self.stack:
             self.stack.setCurrentIndex(0)  # Assuming dashboard is at index 0
 
-    def add_file_to_table(self, name, time, ext, deleted_at=None, days_remaining=None):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        
-        # Add checkbox in first column
-        checkbox_item = QTableWidgetItem()
-        checkbox_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-        checkbox_item.setCheckState(Qt.CheckState.Unchecked)
-        self.table.setItem(row, 0, checkbox_item)
-        
-        # Add file data (shifted by 1 column)
-        self.table.setItem(row, 1, QTableWidgetItem(name))
-        self.table.setItem(row, 2, QTableWidgetItem(time))
-        self.table.setItem(row, 3, QTableWidgetItem(ext))
-        self.table.setItem(row, 4, self.create_days_remaining_item(days_remaining))
-        
-        # Add actions widget
-        actions_widget = self.create_actions_widget(name, deleted_at)
-        self.table.setCellWidget(row, 5, actions_widget)
-
-    def handle_item_clicked(self, item):
+    def handle_item_clicked(self, index):
         # Skip checkbox column (0) and actions column (5)
-        if item.column() != 0 and item.column() != 5:
-            filename = self.table.item(item.row(), 1).text()
+        if index.column() != 0 and index.column() != 5:
+            filename = index.data(FileRole).get('filename')
             print(f"Deleted file row clicked: {filename}")
     
-    def handle_item_double_clicked(self, item):
-        """Handle table item double-click - show file details dialog"""
+    def handle_item_double_clicked(self, index):
+        """Handle table cell double-click - show file details dialog"""
         # Skip checkbox column (0) and actions column (5)
-        if item.column() != 0 and item.column() != 5:
-            filename = self.table.item(item.row(), 1).text()
-            # Need to find the deleted_at timestamp for this file
-            files_data = self.controller.get_deleted_files()
-            deleted_at = None
-            for f in files_data:
-                if f['filename'] == filename:
-                    deleted_at = f.get('deleted_at')
-                    break
-            self.show_file_details(filename, deleted_at)
+        if index.column() != 0 and index.column() != 5:
+            file_data = index.data(FileRole)
+            self.show_file_details(file_data.get('filename'), file_data.get('deleted_at'))
     
     def load_deleted_files(self):
-        """Load and populate deleted files table with days remaining (initial load)"""
-        # Clear existing rows and cache
-        self.table.setRowCount(0)
-        self.file_data_cache.clear()
-        
-        # Get deleted files from controller
-        files_data = self.controller.get_deleted_files()
-        
-        # Handle empty state
-        if len(files_data) == 0:
+        """Load deleted files into the table (diffed by file_id)"""
+        # Remember the revision first: changes committed while loading are re-applied
+        self._feed_revision = self.controller.get_revision()
+        # Only the first page is loaded; later pages are queried as the table scrolls
+        self.files_model.set_query(self._query_files)
+        self._update_empty_state()
+    
+    def _query_files(self, sort, descending, cursor, limit):
+        """Page query behind the table (see FileTableModel.set_query)"""
+        return self.controller.query_files(sort=sort, descending=descending, cursor=cursor,
+                                           limit=limit, deleted_only=True)
+    
+    def _query_search_results(self, file_ids, sort, descending, cursor, limit):
+        """Page query behind the table while a search is shown"""
+        return self.controller.query_search_results(file_ids, sort, descending, cursor, limit,
+                                                    deleted_only=True)
+    
+    def on_search_cleared(self):
+        """Show the full list again once the search box is emptied"""
+        self.files_model.clear()
+        self.load_deleted_files()
+    
+    def apply_document_changes(self, revision=None):
+        """Apply file changes committed since the last load or update"""
+        changes = self.controller.get_changes_since(self._feed_revision)
+        if changes['revision'] == self._feed_revision:
+            return
+        if self.search_pipeline.is_active():
+            # Matches may have changed; re-run the query instead of applying raw deltas
+            self._feed_revision = changes['revision']
+            self.search_pipeline.refresh()
+            return
+        if changes['reset']:
+            self.load_deleted_files()
+            return
+        self._feed_revision = changes['revision']
+        self.files_model.apply_changes(
+            changes,
+            accept=lambda f: f.get('is_deleted', False) and self.controller.can_view_file(f)
+        )
+        self._update_empty_state()
+    
+    def _update_empty_state(self):
+        """Show the empty state when there are no files, the table otherwise"""
+        if self.files_model.file_count() == 0:
             self.table.setVisible(False)
             if not hasattr(self, 'empty_state'):
                 self.empty_state = EmptyStateWidget(
@@ -277,43 +298,11 @@ class DeletedFileView(QWidget):
                 self.table_container_layout.addWidget(self.empty_state)
             else:
                 self.empty_state.setVisible(True)
-            return
         else:
             # Hide empty state and show table
             if hasattr(self, 'empty_state'):
                 self.empty_state.setVisible(False)
             self.table.setVisible(True)
-        
-        for idx, file_data in enumerate(files_data):
-            # Get file info with age calculation
-            file_info = self.controller.get_recycle_bin_file_info(
-                file_data['filename'], 
-                file_data.get('deleted_at')
-            )
-            
-            days_remaining = None
-            if file_info:
-                days_remaining = file_info.get('days_remaining')
-            
-            self.add_file_to_table(
-                file_data['filename'], 
-                file_data.get('time', 'N/A'), 
-                file_data['extension'],
-                file_data.get('deleted_at'),
-                days_remaining
-            )
-            
-            # Track file data in cache with file_id for bulk operations
-            cache_key = self._get_cache_key(file_data['filename'], file_data.get('deleted_at'))
-            self.file_data_cache[cache_key] = {
-                'filename': file_data['filename'],
-                'time': file_data.get('time', 'N/A'),
-                'extension': file_data['extension'],
-                'deleted_at': file_data.get('deleted_at'),
-                'days_remaining': days_remaining,
-                'file_id': file_data.get('file_id'),  # Store file_id for bulk operations
-                'row_index': idx
-            }
     
     def handle_restore(self, filename, deleted_at=None):
         """Restore a deleted file"""
@@ -328,12 +317,7 @@ class DeletedFileView(QWidget):
         
         if reply == QMessageBox.StandardButton.Yes:
             # Get full file data before restoring (to capture _original_collections)
-            deleted_files = self.controller.get_deleted_files()
-            file_data = None
-            for f in deleted_files:
-                if f['filename'] == filename and (deleted_at is None or f.get('deleted_at') == deleted_at):
-                    file_data = f.copy()  # Make a copy to preserve original data
-                    break
+            file_data = self.controller.get_recycle_bin_file_info(filename, deleted_at)
             
             if not file_data or not file_data.get('file_id'):
                 QMessageBox.warning(self, "Error", "Cannot restore file: Missing file ID")
@@ -345,8 +329,8 @@ class DeletedFileView(QWidget):
                 QMessageBox.information(self, "Success", message)
                 # Emit signal to notify parent with full file data (includes _original_collections)
                 self.file_restored.emit(file_data)
-                # Remove file incrementally instead of full reload
-                self._remove_file_from_table(filename, deleted_at)
+                # Drop the row from the change feed instead of reloading
+                self.apply_document_changes()
             else:
                 QMessageBox.warning(self, "Error", message)
     
@@ -362,13 +346,9 @@ class DeletedFileView(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            # Get file_id from deleted files
-            deleted_files = self.controller.get_deleted_files()
-            file_id = None
-            for f in deleted_files:
-                if f['filename'] == filename and (deleted_at is None or f.get('deleted_at') == deleted_at):
-                    file_id = f.get('file_id')
-                    break
+            # Get file_id from the recycle bin entry
+            file_data = self.controller.get_recycle_bin_file_info(filename, deleted_at)
+            file_id = file_data.get('file_id') if file_data else None
             
             if not file_id:
                 QMessageBox.warning(self, "Error", "Cannot delete file: Missing file ID")
@@ -378,8 +358,8 @@ class DeletedFileView(QWidget):
             
             if success:
                 QMessageBox.information(self, "Success", message)
-                # Remove file incrementally instead of full reload
-                self._remove_file_from_table(filename, deleted_at)
+                # Drop the row from the change feed instead of reloading
+                self.apply_document_changes()
             else:
                 QMessageBox.warning(self, "Error", message)
     
@@ -440,8 +420,8 @@ class DeletedFileView(QWidget):
                     result_msg += f"\n... and {len(error_messages) - 5} more"
                 QMessageBox.warning(self, "Partial Success", result_msg)
             
-            # Refresh the table
-            self.load_deleted_files()
+            # Drop the restored rows
+            self.apply_document_changes()
     
     def handle_erase_all(self):
         """Permanently delete all files"""
@@ -509,29 +489,15 @@ class DeletedFileView(QWidget):
                         result_msg += f"\n... and {len(error_messages) - 5} more"
                     QMessageBox.warning(self, "Partial Success", result_msg)
                 
-                # Refresh with incremental update
-                self.refresh_deleted_files()
+                # Drop the erased rows
+                self.apply_document_changes()
     
     def show_file_details(self, filename, deleted_at=None):
         """Show file details dialog using custom widget"""
-        # Get file details from deleted files
-        files_data = self.controller.get_deleted_files()
-        file_data = None
-        
-        for f in files_data:
-            if f['filename'] == filename:
-                if deleted_at is None or f.get('deleted_at') == deleted_at:
-                    file_data = f
-                    break
+        # One lookup gives the record together with age_days and days_remaining
+        file_data = self.controller.get_recycle_bin_file_info(filename, deleted_at)
         
         if file_data:
-            # Get extended info with days remaining
-            file_info = self.controller.get_recycle_bin_file_info(filename, deleted_at)
-            
-            if file_info:
-                file_data['days_remaining'] = file_info.get('days_remaining')
-                file_data['age_days'] = file_info.get('age_days')
-            
             from ..Dialogs.file_details_dialog import FileDetailsDialog
             dialog = FileDetailsDialog(
                 self, 
@@ -559,137 +525,11 @@ class DeletedFileView(QWidget):
         # Refresh deleted files table
         self.refresh_deleted_files()
     
-    def _get_cache_key(self, filename, deleted_at):
-        """Generate unique cache key from filename and deleted_at timestamp"""
-        return f"{filename}|{deleted_at}"
-    
-    def _remove_file_from_table(self, filename, deleted_at=None):
-        """Remove a single file from table incrementally"""
-        cache_key = self._get_cache_key(filename, deleted_at)
-        
-        if cache_key in self.file_data_cache:
-            row_idx = self.file_data_cache[cache_key]['row_index']
-            self.table.removeRow(row_idx)
-            del self.file_data_cache[cache_key]
-            
-            # Rebuild indices after removal
-            self._rebuild_file_indices()
-            print(f"Removed deleted file from UI: {filename}")
-        else:
-            # Fallback to full refresh if not found in cache
-            print(f"File '{filename}' not found in cache, doing full refresh")
-            self.refresh_deleted_files()
-    
     def refresh_deleted_files(self):
         """Efficiently refresh deleted files with incremental updates"""
-        # Get fresh data from controller
-        files_data = self.controller.get_deleted_files()
-        
-        # Build fresh data dict with cache keys
-        fresh_files = {}
-        for file_data in files_data:
-            # Get file info with age calculation
-            file_info = self.controller.get_recycle_bin_file_info(
-                file_data['filename'], 
-                file_data.get('deleted_at')
-            )
-            
-            days_remaining = None
-            if file_info:
-                days_remaining = file_info.get('days_remaining')
-            
-            cache_key = self._get_cache_key(file_data['filename'], file_data.get('deleted_at'))
-            fresh_files[cache_key] = {
-                'filename': file_data['filename'],
-                'time': file_data.get('time', 'N/A'),
-                'extension': file_data['extension'],
-                'deleted_at': file_data.get('deleted_at'),
-                'days_remaining': days_remaining
-            }
-        
-        current_keys = set(self.file_data_cache.keys())
-        fresh_keys = set(fresh_files.keys())
-        
-        # Identify changes
-        removed_files = current_keys - fresh_keys
-        new_files = fresh_keys - current_keys
-        existing_files = current_keys & fresh_keys
-        
-        # Check for modified files (days remaining may change)
-        modified_files = set()
-        for cache_key in existing_files:
-            cached = self.file_data_cache[cache_key]
-            fresh = fresh_files[cache_key]
-            if (cached['time'] != fresh['time'] or 
-                cached['extension'] != fresh['extension'] or
-                cached['days_remaining'] != fresh['days_remaining']):
-                modified_files.add(cache_key)
-        
-        # Remove deleted files (sort by row index descending)
-        for cache_key in sorted(removed_files, 
-                               key=lambda k: self.file_data_cache[k]['row_index'], 
-                               reverse=True):
-            row_idx = self.file_data_cache[cache_key]['row_index']
-            self.table.removeRow(row_idx)
-            del self.file_data_cache[cache_key]
-            print(f"Removed deleted file: {cache_key}")
-        
-        # Update modified files
-        for cache_key in modified_files:
-            row_idx = self.file_data_cache[cache_key]['row_index']
-            fresh = fresh_files[cache_key]
-            
-            self.table.item(row_idx, 0).setText(fresh['filename'])
-            self.table.item(row_idx, 1).setText(fresh['time'])
-            self.table.item(row_idx, 2).setText(fresh['extension'])
-            self.table.setItem(row_idx, 3, self.create_days_remaining_item(fresh['days_remaining']))
-            
-            # Update cache
-            self.file_data_cache[cache_key]['time'] = fresh['time']
-            self.file_data_cache[cache_key]['extension'] = fresh['extension']
-            self.file_data_cache[cache_key]['days_remaining'] = fresh['days_remaining']
-            print(f"Updated deleted file: {cache_key}")
-        
-        # Add new files
-        for cache_key in new_files:
-            fresh = fresh_files[cache_key]
-            self.add_file_to_table(
-                fresh['filename'], 
-                fresh['time'], 
-                fresh['extension'],
-                fresh['deleted_at'],
-                fresh['days_remaining']
-            )
-            
-            # Add to cache
-            self.file_data_cache[cache_key] = {
-                'time': fresh['time'],
-                'extension': fresh['extension'],
-                'deleted_at': fresh['deleted_at'],
-                'days_remaining': fresh['days_remaining'],
-                'row_index': self.table.rowCount() - 1
-            }
-            print(f"Added deleted file: {cache_key}")
-        
-        # Rebuild row indices after removals
-        if removed_files:
-            self._rebuild_file_indices()
-        
+        self.apply_document_changes()
         print(f"Refreshed deleted files with incremental updates")
     
-    def _rebuild_file_indices(self):
-        """Rebuild row indices in file_data_cache after removals"""
-        for row_idx in range(self.table.rowCount()):
-            # Column 1 now contains filename (column 0 is checkbox)
-            filename_item = self.table.item(row_idx, 1)
-            if filename_item:
-                filename = filename_item.text()
-                # Need to find the cache key for this row
-                for cache_key, cached_data in self.file_data_cache.items():
-                    if cache_key.startswith(filename + "|"):
-                        cached_data['row_index'] = row_idx
-                        break
-    
     def handle_bulk_delete(self):
         """Handle bulk permanent deletion of selected files"""
         # Get checked files from table
@@ -704,29 +544,26 @@ class DeletedFileView(QWidget):
             )
             return
         
-        # Define the delete operation for a single file
-        def delete_file_operation(file_data):
-            """Permanently delete a single file using the controller"""
-            filename = file_data.get('filename')
-            file_id = file_data.get('file_id')
+        # Define the permanent delete operation for a batch of files (one metadata commit)
+        def delete_files_operation(files):
+            """Permanently delete a batch of files using the controller"""
+            file_ids = [file_data.get('file_id') for file_data in files if file_data.get('file_id')]
+            results = self.controller.permanent_delete_files(file_ids)
+            print(f"Permanently deleting {len(file_ids)} file(s) by file_id")
             
-            if not file_id:
-                return False, f"Missing file ID for '{filename}'"
-            
-            try:
-                # Use controller to permanently delete file by file_id
-                success, message = self.controller.permanent_delete_file(file_id)
-                print(f"Permanently deleting file by file_id: {file_id} ({filename})")
-                return success, message
-            
-            except Exception as e:
-                print(f"Error permanently deleting file: {e}")
-                return False, str(e)
+            outcomes = []
+            for file_data in files:
+                file_id = file_data.get('file_id')
+                if not file_id:
+                    outcomes.append((False, f"Missing file ID for '{file_data.get('filename')}'"))
+                    continue
+                outcomes.append(results.get(file_id, (False, f"File with ID {file_id} not found in deleted files")))
+            return outcomes
         
         # Execute bulk operation with confirmation dialog
         successful, failed, failed_items = execute_bulk_operation(
             items=selected_files,
-            operation_func=delete_file_operation,
+            batch_func=delete_files_operation,
             operation_name="Permanently Delete",
             parent=self,
             item_display_func=lambda item: f"{item['filename']} ({item['extension']})",
@@ -734,9 +571,9 @@ class DeletedFileView(QWidget):
                                "This action CANNOT be undone!\n\nThe files will be removed from the Recycle Bin forever."
         )
         
-        # Refresh the view after bulk deletion
+        # Drop the deleted rows from the view
         if successful > 0:
-            self.load_deleted_files()
+            self.apply_document_changes()
             print(f"Bulk permanent delete completed: {successful} succeeded, {failed} failed")
     
     def handle_bulk_restore(self):
@@ -753,34 +590,30 @@ class DeletedFileView(QWidget):
             )
             return
         
-        # Define the restore operation for a single file
-        def restore_file_operation(file_data):
-            """Restore a single file using the controller"""
-            filename = file_data.get('filename')
-            file_id = file_data.get('file_id')
+        # Define the restore operation for a batch of files (one metadata commit)
+        def restore_files_operation(files):
+            """Restore a batch of files using the controller"""
+            file_ids = [file_data.get('file_id') for file_data in files if file_data.get('file_id')]
+            results = self.controller.restore_files(file_ids)
+            print(f"Restoring {len(file_ids)} file(s) by file_id")
             
-            if not file_id:
-                return False, f"Missing file ID for '{filename}'"
-            
-            try:
-                # Use controller to restore file by file_id
-                success, message = self.controller.restore_file(file_id)
-                print(f"Restoring file by file_id: {file_id} ({filename})")
-                
+            outcomes = []
+            for file_data in files:
+                file_id = file_data.get('file_id')
+                if not file_id:
+                    outcomes.append((False, f"Missing file ID for '{file_data.get('filename')}'"))
+                    continue
+                success, message = results.get(file_id, (False, f"File with ID {file_id} not found in deleted files"))
                 if success:
                     # Emit signal for each restored file
                     self.file_restored.emit(file_data)
-                
-                return success, message
-            
-            except Exception as e:
-                print(f"Error restoring file: {e}")
-                return False, str(e)
+                outcomes.append((success, message))
+            return outcomes
         
         # Execute bulk operation with confirmation dialog
         successful, failed, failed_items = execute_bulk_operation(
             items=selected_files,
-            operation_func=restore_file_operation,
+            batch_func=restore_files_operation,
             operation_name="Restore",
             parent=self,
             item_display_func=lambda item: f"{item['filename']} ({item['extension']})",
@@ -788,30 +621,13 @@ class DeletedFileView(QWidget):
                                "The files will be moved back to the uploaded files list."
         )
         
-        # Refresh the view after bulk restoration
+        # Drop the restored rows from the view
         if successful > 0:
-            self.load_deleted_files()
+            self.apply_document_changes()
             print(f"Bulk restore completed: {successful} succeeded, {failed} failed")
     
     def _get_checked_files(self):
-        """Get list of checked files from table with full metadata"""
-        checked_files = []
-        
-        for row in range(self.table.rowCount()):
-            checkbox_item = self.table.item(row, 0)
-            if checkbox_item and checkbox_item.checkState() == Qt.CheckState.Checked:
-                # Get filename from column 1
-                filename_item = self.table.item(row, 1)
-                if filename_item:
-                    filename = filename_item.text()
-                    
-                    # Get complete file data from cache
-                    # Need to find the cache key
-                    for cache_key, cached_data in self.file_data_cache.items():
-                        if cached_data.get('filename') == filename:
-                            file_data = cached_data.copy()
-                            checked_files.append(file_data)
-                            print(f"Checked file: {filename} (file_id: {file_data.get('file_id')})")
-                            break
-        
+        """Get list of checked files with full metadata"""
+        checked_files = [dict(file_data) for file_data in self.files_model.checked_files()]
+        print(f"Checked files: {[f.get('file_id') for f in checked_files]}")
         return checked_files
@@ -1,12 +1,16 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, 
-                             QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QHBoxLayout, QTableView,
                              QHeaderView, QLineEdit, QStackedWidget, QMessageBox)
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QSize, pyqtSignal
 from ...controller.document_controller import DocumentController
 from ...utils.icon_utils import create_back_button, create_search_button, create_floating_add_button
 from ...utils.bulk_operations import execute_bulk_operation
+from ...utils.change_notifier import get_document_change_notifier
+from ...utils.search_pipeline import SearchPipeline
+from ...utils.thumbnail_loader import TABLE_THUMBNAIL_SIZE, get_thumbnail_loader
 from ...widgets.empty_state import EmptyStateWidget
+from ...widgets.file_table_model import FileTableModel, FileActionsDelegate, FileRole, enable_header_sorting
 
 class UploadedFilesView(QWidget):
     """
@@ -30,9 +34,6 @@ class UploadedFilesView(QWidget):
         self.stack: QStackedWidget = stack
         self.setWindowTitle("Uploaded Files")
         
-        # Track file data for efficient operations
-        self.file_data_cache = {}  # {'filename': {'file_id': ..., 'timestamp': ..., 'row_index': ...}}
-        
         main_layout = QVBoxLayout()
 
         # Header with back button
@@ -43,7 +44,7 @@ class UploadedFilesView(QWidget):
         header.setFont(QFont("Arial", 16))
         
         search_bar = QLineEdit()
-        search_button = create_search_button(callback=lambda: print("Search button clicked"))
+        search_button = create_search_button(callback=lambda: self.search_pipeline.search_now())
         search_bar.setPlaceholderText("Search Uploaded Files...")
         search_bar.setMinimumWidth(200)
         
@@ -96,17 +97,39 @@ class UploadedFilesView(QWidget):
         actions_layout.addStretch()
         main_layout.addLayout(actions_layout)
 
-        # Table for uploaded files with checkboxes
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)  # Added checkbox column
-        self.table.setHorizontalHeaderLabels(["", "Filename", "Time", "Actions"])
+        # Table for uploaded files with checkboxes (rows served lazily by the model)
+        # Image/PDF previews are generated off the GUI thread and repainted when ready
+        self.thumbnail_loader = get_thumbnail_loader(self.controller)
+        self.thumbnail_loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+        
+        self.files_model = FileTableModel([
+            {'title': '', 'checkbox': True},
+            {'title': 'Filename', 'key': 'filename', 'decoration': self._file_thumbnail, 'sort': 'filename'},
+            {'title': 'Time', 'key': 'time', 'default': 'N/A', 'sort': 'timestamp'},
+            {'title': 'Actions', 'actions': True}
+        ])
+        self.table = QTableView()
+        self.table.setModel(self.files_model)
+        self.table.setIconSize(QSize(TABLE_THUMBNAIL_SIZE, TABLE_THUMBNAIL_SIZE))
+        # Header clicks re-run the page query sorted by the store
+        enable_header_sorting(self.table)
+        
+        # Search ranks on a worker once typing pauses; the model pages in the results
+        self.search_pipeline = SearchPipeline(
+            self.files_model,
+            lambda query: self.controller.search_file_ids(query),
+            self.controller.query_search_results,
+            parent=self
+        )
+        self.search_pipeline.search_cleared.connect(self.on_search_cleared)
+        self.search_pipeline.search_finished.connect(lambda query, count: self._update_empty_state())
+        search_bar.textChanged.connect(self.search_pipeline.set_query)
+        search_bar.returnPressed.connect(self.search_pipeline.search_now)
         
-        # Create "Select All" checkbox in header
-        self.select_all_checkbox = QTableWidgetItem()
-        self.select_all_checkbox.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-        self.select_all_checkbox.setCheckState(Qt.CheckState.Unchecked)
-        self.select_all_checkbox.setText("☑")
-        self.table.setHorizontalHeaderItem(0, self.select_all_checkbox)
+        # Action buttons are painted by a delegate instead of per-row widgets
+        self.actions_delegate = FileActionsDelegate([('download', 'Download'), ('delete', 'Delete')], self.table)
+        self.actions_delegate.action_triggered.connect(self.handle_file_action)
+        self.table.setItemDelegateForColumn(3, self.actions_delegate)
         
         # Connect header click to toggle all checkboxes
         self.table.horizontalHeader().sectionClicked.connect(self.handle_header_checkbox_clicked)
@@ -116,11 +139,11 @@ class UploadedFilesView(QWidget):
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)  # Single selection only (use checkboxes for bulk)
-        self.table.itemClicked.connect(self.handle_item_clicked)
-        self.table.itemDoubleClicked.connect(self.handle_item_double_clicked)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)  # Single selection only (use checkboxes for bulk)
+        self.table.clicked.connect(self.handle_item_clicked)
+        self.table.doubleClicked.connect(self.handle_item_double_clicked)
 
         # Create container for table and empty state
         self.table_container = QWidget()
@@ -128,8 +151,13 @@ class UploadedFilesView(QWidget):
         self.table_container_layout.setContentsMargins(0, 0, 0, 0)
 
         # Load uploaded files data using controller
+        self._feed_revision = 0
         self.load_uploaded_files()
         
+        # Later changes arrive as file_id deltas instead of full reloads
+        get_document_change_notifier(self.controller).changed.connect(
+            self.apply_document_changes, Qt.ConnectionType.QueuedConnection)
+        
         self.table_container_layout.addWidget(self.table)
         main_layout.addWidget(self.table_container)
 
@@ -157,37 +185,18 @@ class UploadedFilesView(QWidget):
     def handle_header_checkbox_clicked(self, logical_index):
         """Handle click on header checkbox to select/deselect all"""
         if logical_index == 0:  # Checkbox column
-            # Toggle the select all state
-            current_state = self.select_all_checkbox.checkState()
-            new_state = Qt.CheckState.Unchecked if current_state == Qt.CheckState.Checked else Qt.CheckState.Checked
-            
-            # Update header checkbox
-            self.select_all_checkbox.setCheckState(new_state)
-            
-            # Update all row checkboxes
-            for row in range(self.table.rowCount()):
-                checkbox_item = self.table.item(row, 0)
-                if checkbox_item:
-                    checkbox_item.setCheckState(new_state)
-            
-            print(f"Select All: {'Checked' if new_state == Qt.CheckState.Checked else 'Unchecked'}")
+            # Toggle the select all state (covers rows not fetched yet)
+            select_all = not self.files_model.all_checked()
+            self.files_model.set_all_checked(select_all)
+            print(f"Select All: {'Checked' if select_all else 'Unchecked'}")
 
-    def create_actions_widget(self, filename):
-        """Create action buttons for each file row"""
-        widget = QWidget()
-        layout = QHBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        download_btn = QPushButton("Download")
-        delete_btn = QPushButton("Delete")
-        
-        download_btn.clicked.connect(lambda: self.handle_download(filename))
-        delete_btn.clicked.connect(lambda: self.handle_delete(filename))
-        
-        layout.addWidget(download_btn)
-        layout.addWidget(delete_btn)
-        widget.setLayout(layout)
-        return widget
+    def handle_file_action(self, action, file_data):
+        """Handle an action button painted in a file row"""
+        filename = file_data.get('filename')
+        if action == 'download':
+            self.handle_download(filename)
+        elif action == 'delete':
+            self.handle_delete(filename)
 
     def go_back(self):
         """Navigate back to dashboard"""
@@ -195,50 +204,70 @@ class UploadedFilesView(QWidget):
         if self.stack:
             self.stack.setCurrentIndex(0)  # Assuming dashboard is at index 0
 
-    def add_file_to_table(self, name, time, ext):
-        """Add a file row to the table with checkbox"""
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        
-        # Add checkbox in first column
-        checkbox_item = QTableWidgetItem()
-        checkbox_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-        checkbox_item.setCheckState(Qt.CheckState.Unchecked)
-        self.table.setItem(row, 0, checkbox_item)
-        
-        # Add file data
-        self.table.setItem(row, 1, QTableWidgetItem(name))
-        self.table.setItem(row, 2, QTableWidgetItem(time))
-        
-        # Add actions widget
-        actions_widget = self.create_actions_widget(name)
-        self.table.setCellWidget(row, 3, actions_widget)
-
-    def handle_item_clicked(self, item):
-        """Handle table item click (not action buttons or checkbox)"""
+    def handle_item_clicked(self, index):
+        """Handle table cell click (not action buttons or checkbox)"""
         # Skip checkbox column (0) and actions column (3)
-        if item.column() != 0 and item.column() != 3:
-            filename = self.table.item(item.row(), 1).text()
+        if index.column() != 0 and index.column() != 3:
+            filename = index.data(FileRole).get('filename')
             print(f"Uploaded file row clicked: {filename}")
     
-    def handle_item_double_clicked(self, item):
-        """Handle table item double-click - show file details dialog"""
+    def handle_item_double_clicked(self, index):
+        """Handle table cell double-click - show file details dialog"""
         # Skip checkbox column (0) and actions column (3)
-        if item.column() != 0 and item.column() != 3:
-            filename = self.table.item(item.row(), 1).text()
-            self.show_file_details(filename)
+        if index.column() != 0 and index.column() != 3:
+            self.show_file_details(index.data(FileRole).get('filename'))
     
     def load_uploaded_files(self):
-        """Load and populate uploaded files table"""
-        # Clear existing rows and cache
-        self.table.setRowCount(0)
-        self.file_data_cache.clear()
-        
-        # Get uploaded files from controller
-        files_data = self.controller.get_files()
-        
-        # Handle empty state
-        if len(files_data) == 0:
+        """Load uploaded files into the table (diffed by file_id)"""
+        # Remember the revision first: changes committed while loading are re-applied
+        self._feed_revision = self.controller.get_revision()
+        # Only the first page is loaded; later pages are queried as the table scrolls
+        self.files_model.set_query(self._query_files)
+        self._update_empty_state()
+    
+    def _query_files(self, sort, descending, cursor, limit):
+        """Page query behind the table (see FileTableModel.set_query)"""
+        return self.controller.query_files(sort=sort, descending=descending, cursor=cursor, limit=limit)
+    
+    def on_search_cleared(self):
+        """Show the full list again once the search box is emptied"""
+        self.files_model.clear()
+        self.load_uploaded_files()
+    
+    def _file_thumbnail(self, file_data):
+        """Decoration for the filename column (None until the preview is ready)"""
+        return self.thumbnail_loader.pixmap(file_data, TABLE_THUMBNAIL_SIZE)
+    
+    def on_thumbnail_ready(self, sha256, size):
+        """Repaint the rows showing content whose preview just arrived"""
+        if size == TABLE_THUMBNAIL_SIZE:
+            self.files_model.refresh_rows(
+                lambda record: record.get('sha256') == sha256,
+                [Qt.ItemDataRole.DecorationRole])
+    
+    def apply_document_changes(self, revision=None):
+        """Apply file changes committed since the last load or update"""
+        changes = self.controller.get_changes_since(self._feed_revision)
+        if changes['revision'] == self._feed_revision:
+            return
+        if self.search_pipeline.is_active():
+            # Matches may have changed; re-run the query instead of applying raw deltas
+            self._feed_revision = changes['revision']
+            self.search_pipeline.refresh()
+            return
+        if changes['reset']:
+            self.load_uploaded_files()
+            return
+        self._feed_revision = changes['revision']
+        self.files_model.apply_changes(
+            changes,
+            accept=lambda f: not f.get('is_deleted', False) and self.controller.can_view_file(f)
+        )
+        self._update_empty_state()
+    
+    def _update_empty_state(self):
+        """Show the empty state when there are no files, the table otherwise"""
+        if self.files_model.file_count() == 0:
             self.table.setVisible(False)
             if not hasattr(self, 'empty_state'):
                 self.empty_state = EmptyStateWidget(
@@ -251,28 +280,11 @@ class UploadedFilesView(QWidget):
                 self.table_container_layout.addWidget(self.empty_state)
             else:
                 self.empty_state.setVisible(True)
-            return
         else:
             # Hide empty state and show table
             if hasattr(self, 'empty_state'):
                 self.empty_state.setVisible(False)
             self.table.setVisible(True)
-        
-        for idx, file_data in enumerate(files_data):
-            self.add_file_to_table(
-                file_data['filename'], 
-                file_data.get('time', 'N/A'), 
-                file_data['extension']
-            )
-            
-            # Cache file data with file_id and timestamp for bulk operations
-            self.file_data_cache[file_data['filename']] = {
-                'file_id': file_data.get('file_id'),
-                'timestamp': file_data.get('timestamp'),
-                'extension': file_data.get('extension'),
-                'time': file_data.get('time', 'N/A'),
-                'row_index': idx
-            }
     
     def handle_add_file(self):
         """Open the file upload dialog"""
@@ -296,39 +308,30 @@ class UploadedFilesView(QWidget):
             )
             return
         
-        # Define the delete operation for a single file
-        def delete_file_operation(file_data):
-            """Delete a single file using the controller"""
-            filename = file_data.get('filename')
-            file_id = file_data.get('file_id')
-            timestamp = file_data.get('timestamp')
+        # Define the delete operation for a batch of files (one metadata commit)
+        def delete_files_operation(files):
+            """Soft delete a batch of files using the controller"""
+            file_ids = [file_data.get('file_id') for file_data in files if file_data.get('file_id')]
+            results = self.controller.delete_files(file_ids)
+            print(f"Deleting {len(file_ids)} file(s) by file_id")
             
-            try:
-                # Use controller to delete file (soft delete) - prefer file_id
-                if file_id:
-                    success, message = self.controller.delete_file(file_id=file_id)
-                    print(f"Deleting file by file_id: {file_id} ({filename})")
-                else:
-                    success, message = self.controller.delete_file(
-                        filename=filename,
-                        timestamp=timestamp
-                    )
-                    print(f"Deleting file by filename: {filename}")
-                
+            outcomes = []
+            for file_data in files:
+                file_id = file_data.get('file_id')
+                if not file_id:
+                    outcomes.append((False, f"Missing file ID for '{file_data.get('filename')}'"))
+                    continue
+                success, message = results.get(file_id, (False, f"File with ID {file_id} not found"))
                 if success:
                     # Emit signal for each deleted file
                     self.file_deleted.emit(file_data)
-                
-                return success, message
-            
-            except Exception as e:
-                print(f"Error deleting file: {e}")
-                return False, str(e)
+                outcomes.append((success, message))
+            return outcomes
         
         # Execute bulk operation with confirmation dialog
         successful, failed, failed_items = execute_bulk_operation(
             items=selected_files,
-            operation_func=delete_file_operation,
+            batch_func=delete_files_operation,
             operation_name="Delete",
             parent=self,
             item_display_func=lambda item: f"{item['filename']} ({item['extension']})",
@@ -336,30 +339,15 @@ class UploadedFilesView(QWidget):
                                "The files will be moved to the Recycle Bin and can be restored later."
         )
         
-        # Refresh the view after bulk deletion
+        # Drop the deleted rows from the view
         if successful > 0:
-            self.load_uploaded_files()
+            self.apply_document_changes()
             print(f"Bulk delete completed: {successful} succeeded, {failed} failed")
     
     def _get_checked_files(self):
-        """Get list of checked files from table with full metadata"""
-        checked_files = []
-        
-        for row in range(self.table.rowCount()):
-            checkbox_item = self.table.item(row, 0)
-            if checkbox_item and checkbox_item.checkState() == Qt.CheckState.Checked:
-                # Get filename from column 1
-                filename_item = self.table.item(row, 1)
-                if filename_item:
-                    filename = filename_item.text()
-                    
-                    # Get complete file data from cache
-                    if filename in self.file_data_cache:
-                        file_data = self.file_data_cache[filename].copy()
-                        file_data['filename'] = filename
-                        checked_files.append(file_data)
-                        print(f"Checked file: {filename} (file_id: {file_data.get('file_id')})")
-        
+        """Get list of checked files with full metadata"""
+        checked_files = [dict(file_data) for file_data in self.files_model.checked_files()]
+        print(f"Checked files: {[f.get('file_id') for f in checked_files]}")
         return checked_files
     
     def on_file_uploaded(self, file_data):
@@ -376,8 +364,8 @@ class UploadedFilesView(QWidget):
         
         # Emit signal to notify parent (AdminDash)
         self.file_uploaded.emit(file_data)
-        # Refresh the table
-        self.load_uploaded_files()
+        # Add the new row
+        self.apply_document_changes()
     
     def handle_download(self, filename):
         """Handle file download"""
@@ -397,13 +385,9 @@ class UploadedFilesView(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            # Get full file data before deletion (need file_id)
-            files_data = self.controller.get_files()
-            file_data = None
-            for f in files_data:
-                if f['filename'] == filename:
-                    file_data = f
-                    break
+            # Get full file data before deletion (need file_id); the row is already loaded
+            record = self.files_model.find_file_by_name(filename)
+            file_data = dict(record) if record else None
             
             if not file_data or not file_data.get('file_id'):
                 QMessageBox.warning(self, "Error", "Cannot delete file: Missing file ID")
@@ -415,21 +399,16 @@ class UploadedFilesView(QWidget):
                 QMessageBox.information(self, "Success", message)
                 # Emit signal to notify parent with full file data
                 self.file_deleted.emit(file_data)
-                # Refresh the table
-                self.load_uploaded_files()
+                # Drop the deleted row
+                self.apply_document_changes()
             else:
                 QMessageBox.warning(self, "Error", message)
     
     def show_file_details(self, filename):
         """Show file details dialog using custom widget"""
-        # Get file details from uploaded files
-        files_data = self.controller.get_files()
-        file_data = None
-        
-        for f in files_data:
-            if f['filename'] == filename:
-                file_data = f
-                break
+        # Get file details from the loaded rows
+        record = self.files_model.find_file_by_name(filename)
+        file_data = dict(record) if record else None
         
         if file_data:
             from ..Dialogs.file_details_dialog import FileDetailsDialog
@@ -448,13 +427,13 @@ class UploadedFilesView(QWidget):
     def on_file_updated(self, file_data):
         """Handle file updated signal from details dialog"""
         print(f"File updated: {file_data}")
-        # Refresh the table to show updated data
-        self.load_uploaded_files()
+        # Show the updated row
+        self.apply_document_changes()
     
     def on_file_deleted_from_dialog(self, file_data):
         """Handle file deleted signal from details dialog"""
         print(f"File deleted from dialog: {file_data}")
         # Emit signal to notify parent
         self.file_deleted.emit(file_data)
-        # Refresh the table
-        self.load_uploaded_files()
+        # Drop the deleted row
+        self.apply_document_changes()
@@ -1,18 +1,28 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, 
                              QHBoxLayout, QFrame, QLineEdit, QScrollArea,
                              QTableView, QHeaderView,
-                             QSizePolicy, QStackedWidget, QMessageBox)
-from PyQt6.QtGui import QFont, QStandardItemModel, QStandardItem, QPainter, QColor, QPen
-from PyQt6.QtCore import Qt, QRect
+                             QSizePolicy, QStackedWidget, QMessageBox, QFileDialog)
+from PyQt6.QtGui import QFont, QPainter, QColor, QPen
+from PyQt6.QtCore import Qt, QRect, QTimer
 from ...controller.document_controller import DocumentController
 from ...utils.icon_utils import create_menu_button, create_search_button, IconLoader
+from ...utils.workers import run_in_background
+from ...utils.bulk_operations import execute_streaming_operation
+from ...utils.recycle_bin_scheduler import get_recycle_bin_purge_scheduler
+from ...utils.change_notifier import get_document_change_notifier
+from ...utils.search_pipeline import SearchPipeline
 from PyQt6.QtWidgets import QGraphicsDropShadowEffect
 from PyQt6.QtGui import QColor
 from ...widgets.empty_state import EmptyStateWidget
+from ...widgets.file_table_model import FileTableModel, FileRole, enable_header_sorting
 
 from ...widgets.DonutWidget import DonutChartWidget
 
 
+# How often the storage totals are reconciled against FileStorage on disk
+STORAGE_RECONCILE_INTERVAL_MS = 10 * 60 * 1000
+
+
 class AdminDash(QWidget):
     """
     Main Admin Dashboard Widget
@@ -45,8 +55,7 @@ class AdminDash(QWidget):
         self.collections_layout = None  # Reference to the layout
         self.selected_collection = None  # Track currently selected collection
         
-        # Track file data for efficient updates
-        self.file_data_cache = {}  # {'filename': {'time': ..., 'extension': ..., 'row_index': ...}}
+        # File rows live in self.files_model (FileTableModel, keyed by file_id)
 
         self.stack = QStackedWidget()
 
@@ -58,12 +67,23 @@ class AdminDash(QWidget):
         self.init_ui()
 
         self.stack.addWidget(self.dashboard_widget)
+        
+        # File and membership changes arrive as file_id deltas instead of full reloads
+        get_document_change_notifier(self.controller).changed.connect(
+            self.apply_document_changes, Qt.ConnectionType.QueuedConnection)
 
         main_layout = QVBoxLayout()
         main_layout.addWidget(self.stack)
         self.setLayout(main_layout)
         
         # self.refresh_storage_chart() #for testing only
+        
+        # Periodically check the storage totals against the disk (off the GUI thread)
+        self.storage_reconcile_job = None
+        self.storage_reconcile_timer = QTimer(self)
+        self.storage_reconcile_timer.setInterval(STORAGE_RECONCILE_INTERVAL_MS)
+        self.storage_reconcile_timer.timeout.connect(self.reconcile_storage)
+        self.storage_reconcile_timer.start()
 
         
 
@@ -82,8 +102,9 @@ class AdminDash(QWidget):
         title.setStyleSheet("font-size: 24px; color: #084924; font-family: Poppins; font-weight:bold")
             
         # Changed from QLabel to QLineEdit for text input
-        search_bar = QLineEdit()
-        search_button = create_search_button(callback=lambda: print("Search button clicked"))
+        self.search_bar = QLineEdit()
+        search_bar = self.search_bar
+        search_button = create_search_button(callback=lambda: self.search_pipeline.search_now())
         search_bar.setPlaceholderText("Search collections or files...")
         search_bar.setMinimumWidth(300)
         search_bar.setStyleSheet("border-radius: 10px; padding: 5px; border: 2px solid #084924;")
@@ -173,6 +194,22 @@ class AdminDash(QWidget):
     }
 """)
         
+        import_collection_btn = QPushButton("Import Collection")
+        import_collection_btn.clicked.connect(self.handle_import_collection)
+        import_collection_btn.setStyleSheet("""
+    QPushButton {
+        border: none;
+        font-family: Poppins;
+        padding: 5px;
+        font-weight: bold;
+        text-decoration: underline;
+        color: #000000;
+    }
+    QPushButton:hover {
+        color: #555555; /* lighter text (and underline) when hovered */
+    }
+""")
+        
         upload_link = QPushButton("File Upload Requests")
         upload_link.clicked.connect(lambda: print("File Upload Requests clicked"))
         upload_link.setStyleSheet("""
@@ -193,6 +230,7 @@ class AdminDash(QWidget):
         header_layout.addStretch()
         header_layout.addWidget(add_collection_btn)
         header_layout.addWidget(delete_collection_btn)
+        header_layout.addWidget(import_collection_btn)
         header_layout.addWidget(upload_link)
         header_widget.setLayout(header_layout)
         
@@ -204,12 +242,12 @@ class AdminDash(QWidget):
         self.collections_layout.setSpacing(25)
         self.collections_layout.setContentsMargins(0, 0, 0, 0)  # Remove margins from the collections layout
         
-        # Load collections using controller and track them
-        collections_data = self.controller.get_collections()
+        # Load collections using controller and track them (counts only, no file records)
+        collections_data = self.controller.query_collections(sort='id')['collections']
         for collection_data in collections_data:
             collection_id = collection_data.get('id')
             collection_name = collection_data['name']
-            file_count = len(collection_data.get('files', []))  # Count files in collection
+            file_count = collection_data['file_count']  # Count files in collection
             collection = self.create_collection_card(
                 collection_name, 
                 collection_data.get('icon', 'folder1.png'),
@@ -323,9 +361,30 @@ class AdminDash(QWidget):
 
         # Create a table view and model for files
         self.files_table = QTableView()
-        self.files_model = QStandardItemModel(0, 5)
-        self.files_model.setHorizontalHeaderLabels(["Filename", "Upload Date", "Type", "Status", "Approval"])
+        self.files_model = FileTableModel([
+            {'title': 'Filename', 'key': 'filename', 'sort': 'filename'},
+            {'title': 'Upload Date', 'value': lambda f: f.get('uploaded_date', f.get('time', 'N/A')),
+             'sort': 'timestamp'},
+            {'title': 'Type', 'key': 'extension', 'sort': 'extension'},
+            {'title': 'Status', 'value': lambda f: self._get_status_emoji(f.get('status', 'available'))},
+            {'title': 'Approval', 'value': lambda f: self._get_approval_emoji(f.get('approval_status', 'pending'))}
+        ])
         self.files_table.setModel(self.files_model)
+        # Header clicks re-run the page query sorted by the store
+        enable_header_sorting(self.files_table)
+        
+        # Search ranks on a worker once typing pauses; the model pages in the results
+        self.search_pipeline = SearchPipeline(
+            self.files_model,
+            lambda query: self.controller.search_file_ids(query),
+            self.controller.query_search_results,
+            parent=self
+        )
+        self.search_pipeline.search_cleared.connect(self.on_search_cleared)
+        self.search_pipeline.search_finished.connect(lambda query, count: self._update_files_empty_state())
+        self.search_bar.textChanged.connect(self.search_pipeline.set_query)
+        self.search_bar.textChanged.connect(self.filter_collection_cards)
+        self.search_bar.returnPressed.connect(self.search_pipeline.search_now)
         self.files_table.horizontalHeader().setStretchLastSection(True)
         self.files_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.files_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
@@ -365,20 +424,18 @@ class AdminDash(QWidget):
     }
 """)
 
-        # Connect model signals for automatic cache consistency
-        self.files_model.rowsRemoved.connect(self._on_rows_removed)
-        self.files_model.dataChanged.connect(self._on_data_changed)
-
         # Create container for table and empty state
         self.files_container = QWidget()
         self.files_container_layout = QVBoxLayout(self.files_container)
         self.files_container_layout.setContentsMargins(0, 0, 0, 0)
         
-        # Load file data using controller
-        files_data = self.controller.get_files()
+        # Load the first page of files (deltas after this revision are applied later);
+        # later pages are queried as the table scrolls
+        self._feed_revision = self.controller.get_revision()
+        self.files_model.set_query(self._query_files)
 
         # Show empty state or populate table
-        if len(files_data) == 0:
+        if self.files_model.file_count() == 0:
             # Show empty state
             self.files_empty_state = EmptyStateWidget(
                 icon_name="folder1.png",
@@ -390,50 +447,11 @@ class AdminDash(QWidget):
             self.files_container_layout.addWidget(self.files_empty_state)
             self.files_table.setVisible(False)
         else:
-            # Populate and track files
-            for idx, file_data in enumerate(files_data):
-                status = file_data.get('status', 'available')
-                approval = file_data.get('approval_status', 'pending')
-                self.add_file_to_table(
-                    file_data['filename'], 
-                    file_data.get('uploaded_date', file_data.get('time', 'N/A')), 
-                    file_data['extension'],
-                    status,
-                    approval
-                )
-                # Track file data in cache
-                self.file_data_cache[file_data['filename']] = {
-                    'uploaded_date': file_data.get('uploaded_date', file_data.get('time', 'N/A')),
-                    'extension': file_data['extension'],
-                    'status': status,
-                    'approval_status': approval,
-                    'row_index': idx
-                }
             self.files_table.setVisible(True)
         
         self.files_container_layout.addWidget(self.files_table)
         files_layout.addWidget(self.files_container)
 
-        # Populate and track files
-        for idx, file_data in enumerate(files_data):
-            status = file_data.get('status', 'available')
-            approval = file_data.get('approval_status', 'pending')
-            self.add_file_to_table(
-                file_data['filename'], 
-                file_data.get('uploaded_date', file_data.get('time', 'N/A')), 
-                file_data['extension'],
-                status,
-                approval
-            )
-            # Track file data in cache
-            self.file_data_cache[file_data['filename']] = {
-                'uploaded_date': file_data.get('uploaded_date', file_data.get('time', 'N/A')),
-                'extension': file_data['extension'],
-                'status': status,
-                'approval_status': approval,
-                'row_index': idx
-            }
-        files_layout.addWidget(self.files_table)
         
         # New button at bottom right
         new_btn = QPushButton("+  New")
@@ -485,6 +503,7 @@ class AdminDash(QWidget):
         used_label.setStyleSheet("font-family: Poppins; font-size: 14px;")
 
         used_size = QLabel(f"Actual Size: {storage_data['used_size_gb']} GB")
+        self.used_size_label = used_size
         used_size.setStyleSheet("font-family: Poppins; font-size: 14px;")
 
         used_row.addWidget(used_color)
@@ -503,6 +522,7 @@ class AdminDash(QWidget):
         free_label.setStyleSheet("font-family: Poppins; font-size: 14px;")
 
         free_size = QLabel(f"Unused Size: {storage_data['free_size_gb']} GB")
+        self.free_size_label = free_size
         free_size.setStyleSheet("font-family: Poppins; font-size: 14px;")
 
         free_row.addWidget(free_color)
@@ -609,56 +629,21 @@ class AdminDash(QWidget):
         
         return card
 
-    def add_file_to_table(self, name, date, ext, status, approval):
-        """
-        Adds a file row to the files table (QTableView/QStandardItemModel)
-        Args:
-            name (str): Filename
-            date (str): Upload date
-            ext (str): File extension
-            status (str): File status (available, soft_deleted, permanently_deleted)
-            approval (str): Approval status (pending, accepted, rejected)
-        """
-        # CRITICAL: Check if file already exists in the model to prevent duplicates
-        for row_idx in range(self.files_model.rowCount()):
-            existing_name = self.files_model.item(row_idx, 0).text()
-            if existing_name == name:
-                print(f"WARNING: File '{name}' already exists in table at row {row_idx}, skipping duplicate add")
-                return
-        
-        # Get emoji indicators
-        status_emoji = self._get_status_emoji(status)
-        approval_emoji = self._get_approval_emoji(approval)
-        
-        row = [
-            QStandardItem(name), 
-            QStandardItem(date), 
-            QStandardItem(ext),
-            QStandardItem(status_emoji),
-            QStandardItem(approval_emoji)
-        ]
-        self.files_model.appendRow(row)
-
     def handle_file_row_clicked(self, index):
             # Get filename from the model
-            filename = self.files_model.item(index.row(), 0).text()
+            filename = index.data(FileRole).get('filename')
             print(f"File row clicked: {filename}")
     
     def handle_file_row_double_clicked(self, index):
         """Handle file row double-click - show file details dialog"""
-        filename = self.files_model.item(index.row(), 0).text()
+        filename = index.data(FileRole).get('filename')
         self.show_file_details(filename)
     
     def show_file_details(self, filename):
         """Show file details dialog using custom widget"""
-        # Get file details from uploaded files
-        files_data = self.controller.get_files()
-        file_data = None
-        
-        for f in files_data:
-            if f['filename'] == filename:
-                file_data = f
-                break
+        # Get file details from the loaded rows
+        record = self.files_model.find_file_by_name(filename)
+        file_data = dict(record) if record else None
         
         if file_data:
             from ...Shared.Dialogs.file_details_dialog import FileDetailsDialog
@@ -677,25 +662,14 @@ class AdminDash(QWidget):
     def on_file_updated_from_dialog(self, file_data):
         """Handle file updated signal from details dialog"""
         print(f"File updated from dialog: {file_data}")
-        # Refresh files table to show updated data
-        self.refresh_files_table()
+        # Show the updated row
+        self.apply_document_changes()
     
     def on_file_deleted_from_dialog(self, file_data):
         """Handle file deleted signal from details dialog"""
         print(f"File deleted from dialog: {file_data}")
-        # Refresh files table
-        self.refresh_files_table()
-        
-        # Update collection file counts
-        print(f"DEBUG: file_data keys from dialog delete: {file_data.keys()}")
-        collection_name = file_data.get('collection_name') or file_data.get('category')
-        if collection_name:
-            print(f"DEBUG: Updating specific collection: {collection_name}")
-            self.update_collection_file_count(collection_name)
-        else:
-            print(f"DEBUG: No collection info, refreshing all collection counts")
-            # If we can't determine which collection, refresh all
-            self.refresh_all_collection_counts()
+        # Drops the row and updates the counts of the collections it left
+        self.apply_document_changes()
 
     def deleted_click_handler(self, event):
         def handler(event):
@@ -780,6 +754,25 @@ class AdminDash(QWidget):
         dialog.collection_created.connect(self.on_collection_created)
         dialog.exec()  # Show modal dialog
     
+    def handle_import_collection(self):
+        """Import a collection archive (files already stored are not copied again)"""
+        archive_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Collection",
+            "",
+            "Collection Archives (*.zip *.tar *.tar.gz *.tgz)"
+        )
+        if not archive_path:
+            return
+        
+        result = execute_streaming_operation(
+            lambda **kwargs: self.controller.import_collection(archive_path, **kwargs),
+            operation_name="Import",
+            parent=self
+        )
+        if result[0]:
+            self.refresh_collections()
+    
     def handle_delete_collection(self):
         """Delete the currently selected collection"""
         if not self.selected_collection:
@@ -892,80 +885,19 @@ class AdminDash(QWidget):
         """Handle file uploaded event - incremental update"""
         print(f"File uploaded: {file_data}")
         
-        filename = file_data.get('filename')
-        if not filename:
-            # Fallback to full refresh if filename not provided
-            self.refresh_files_table()
-            return
-        
-        # CRITICAL FIX: Handle empty state transition
-        # If table is hidden (empty state showing), we need to show it
-        if not self.files_table.isVisible():
-            print("Transitioning from empty state to populated files table")
-            if hasattr(self, 'files_empty_state') and self.files_empty_state:
-                self.files_empty_state.setVisible(False)
-            self.files_table.setVisible(True)
+        # Adds the row and updates the count of the collection it joined
+        self.apply_document_changes()
+        print(f"Updated files table for: {file_data.get('filename')}")
         
-        # Check if file already exists
-        if filename in self.file_data_cache:
-            # Update existing file data
-            row_idx = self.file_data_cache[filename]['row_index']
-            status = file_data.get('status', 'available')
-            approval = file_data.get('approval_status', 'pending')
-            
-            self.files_model.item(row_idx, 0).setText(file_data.get('filename', filename))
-            self.files_model.item(row_idx, 1).setText(file_data.get('uploaded_date', file_data.get('time', '')))
-            self.files_model.item(row_idx, 2).setText(file_data.get('extension', ''))
-            self.files_model.item(row_idx, 3).setText(self._get_status_emoji(status))
-            self.files_model.item(row_idx, 4).setText(self._get_approval_emoji(approval))
-            
-            # Update cache
-            self.file_data_cache[filename]['uploaded_date'] = file_data.get('uploaded_date', file_data.get('time', ''))
-            self.file_data_cache[filename]['extension'] = file_data.get('extension', '')
-            self.file_data_cache[filename]['status'] = status
-            self.file_data_cache[filename]['approval_status'] = approval
-            print(f"Updated existing file in UI: {filename}")
-        else:
-            # Add new file
-            status = file_data.get('status', 'available')
-            approval = file_data.get('approval_status', 'pending')
-            
-            self.add_file_to_table(
-                file_data.get('filename', ''),
-                file_data.get('uploaded_date', file_data.get('time', '')),
-                file_data.get('extension', ''),
-                status,
-                approval
-            )
-            
-            # Add to cache
-            self.file_data_cache[filename] = {
-                'uploaded_date': file_data.get('uploaded_date', file_data.get('time', '')),
-                'extension': file_data.get('extension', ''),
-                'status': status,
-                'approval_status': approval,
-                'row_index': self.files_model.rowCount() - 1
-            }
-            print(f"Added new file to UI: {filename}")
-        
-        # Update collection file count if file was added to a collection
-        print(f"DEBUG: file_data keys: {file_data.keys()}")
-        print(f"DEBUG: collection_id = {file_data.get('collection_id')}")
-
-        collection_id = file_data.get('collection_id')
-        if collection_id is not None:
-            print(f"DEBUG: Updating count for collection ID: {collection_id}")
-            self.update_collection_file_count(collection_id)
-        else:
-            print(f"DEBUG: No collection_id found in file_data")
+        self.refresh_storage_chart()
     
     def refresh_collections(self):
         """Efficiently refresh the collections grid with incremental updates"""
         if not self.collections_layout:
             return
         
-        # Get fresh data from controller
-        collections_data = self.controller.get_collections()
+        # Get fresh data from controller (counts only, no file records)
+        collections_data = self.controller.query_collections(sort='id')['collections']
         fresh_collection_ids = {col['id'] for col in collections_data}
         current_collection_ids = set(self.collection_cards.keys())
         
@@ -985,7 +917,7 @@ class AdminDash(QWidget):
         for new_collection_data in new_collections:
             collection_id = new_collection_data['id']
             collection_name = new_collection_data['name']
-            file_count = len(new_collection_data.get('files', []))
+            file_count = new_collection_data['file_count']
             
             card = self.create_collection_card(
                 collection_name, 
@@ -1004,12 +936,63 @@ class AdminDash(QWidget):
     
     def refresh_files_table(self):
         """Efficiently refresh the uploaded files table with incremental updates"""
-        # Get fresh data from controller
-        files_data = self.controller.get_files()
-        fresh_files = {f['filename']: f for f in files_data}
+        # Remember the revision first: changes committed while loading are re-applied
+        self._feed_revision = self.controller.get_revision()
+        # Re-query the rows loaded so far: only changed rows are touched
+        self.files_model.set_query(self._query_files)
+        self._update_files_empty_state()
+    
+    def _query_files(self, sort, descending, cursor, limit):
+        """Page query behind the files table (see FileTableModel.set_query)"""
+        return self.controller.query_files(sort=sort, descending=descending, cursor=cursor, limit=limit)
+    
+    def on_search_cleared(self):
+        """Show every file again once the search box is emptied"""
+        self.files_model.clear()
+        self.refresh_files_table()
+    
+    def filter_collection_cards(self, text):
+        """Hide collection cards whose name does not contain the search text"""
+        text = text.strip().lower()
+        for card in self.collection_cards.values():
+            name = (card.property("collection_name") or "").lower()
+            card.setVisible(not text or text in name)
+    
+    def apply_document_changes(self, revision=None):
+        """Apply file and membership changes committed since the last load or update"""
+        changes = self.controller.get_changes_since(self._feed_revision)
+        if changes['revision'] == self._feed_revision:
+            return
+        if changes['reset']:
+            if self.search_pipeline.is_active():
+                self._feed_revision = changes['revision']
+                self.search_pipeline.refresh()
+            else:
+                self.refresh_files_table()
+            self.refresh_collections()
+            self.refresh_all_collection_counts()
+            return
+        self._feed_revision = changes['revision']
         
-        # Handle empty state
-        if len(files_data) == 0:
+        if self.search_pipeline.is_active():
+            # Matches may have changed; re-run the query instead of applying raw deltas
+            self.search_pipeline.refresh()
+        else:
+            self.files_model.apply_changes(
+                changes,
+                accept=lambda f: not f.get('is_deleted', False) and self.controller.can_view_file(f)
+            )
+            self._update_files_empty_state()
+        
+        # Only the collections whose membership changed need a new count
+        changed_collections = {collection_id for collection_id, _ in
+                               changes['memberships_added'] + changes['memberships_removed']}
+        for collection_id in changed_collections:
+            self.update_collection_file_count(collection_id)
+    
+    def _update_files_empty_state(self):
+        """Show the empty state when there are no files, the table otherwise"""
+        if self.files_model.file_count() == 0:
             self.files_table.setVisible(False)
             if not hasattr(self, 'files_empty_state') or not self.files_empty_state:
                 self.files_empty_state = EmptyStateWidget(
@@ -1022,88 +1005,11 @@ class AdminDash(QWidget):
                 self.files_container_layout.addWidget(self.files_empty_state)
             else:
                 self.files_empty_state.setVisible(True)
-            return
         else:
             # Hide empty state and show table
             if hasattr(self, 'files_empty_state') and self.files_empty_state:
                 self.files_empty_state.setVisible(False)
             self.files_table.setVisible(True)
-        
-        current_filenames = set(self.file_data_cache.keys())
-        fresh_filenames = set(fresh_files.keys())
-        
-        # Identify changes
-        removed_files = current_filenames - fresh_filenames
-        new_files = fresh_filenames - current_filenames
-        existing_files = current_filenames & fresh_filenames
-        
-        # Check for modified files (data changed but file still exists)
-        modified_files = set()
-        for filename in existing_files:
-            cached = self.file_data_cache[filename]
-            fresh = fresh_files[filename]
-            if (cached.get('uploaded_date') != fresh.get('uploaded_date', fresh.get('time', '')) or 
-                cached.get('extension') != fresh.get('extension') or
-                cached.get('status') != fresh.get('status', 'available') or
-                cached.get('approval_status') != fresh.get('approval_status', 'pending')):
-                modified_files.add(filename)
-        
-        # Remove deleted files (sort by row index descending to avoid index shifting issues)
-        for filename in sorted(removed_files, 
-                              key=lambda f: self.file_data_cache[f]['row_index'], 
-                              reverse=True):
-            row_idx = self.file_data_cache[filename]['row_index']
-            self.files_model.removeRow(row_idx)
-            del self.file_data_cache[filename]
-            print(f"Removed file: {filename}")
-        
-        # Update modified files
-        for filename in modified_files:
-            row_idx = self.file_data_cache[filename]['row_index']
-            fresh = fresh_files[filename]
-            status = fresh.get('status', 'available')
-            approval = fresh.get('approval_status', 'pending')
-            
-            self.files_model.item(row_idx, 0).setText(fresh['filename'])
-            self.files_model.item(row_idx, 1).setText(fresh.get('uploaded_date', fresh.get('time', '')))
-            self.files_model.item(row_idx, 2).setText(fresh['extension'])
-            self.files_model.item(row_idx, 3).setText(self._get_status_emoji(status))
-            self.files_model.item(row_idx, 4).setText(self._get_approval_emoji(approval))
-            
-            # Update cache
-            self.file_data_cache[filename]['uploaded_date'] = fresh.get('uploaded_date', fresh.get('time', ''))
-            self.file_data_cache[filename]['extension'] = fresh['extension']
-            self.file_data_cache[filename]['status'] = status
-            self.file_data_cache[filename]['approval_status'] = approval
-            print(f"Updated file: {filename}")
-        
-        # Add new files
-        for filename in new_files:
-            fresh = fresh_files[filename]
-            status = fresh.get('status', 'available')
-            approval = fresh.get('approval_status', 'pending')
-            
-            self.add_file_to_table(
-                fresh['filename'], 
-                fresh.get('uploaded_date', fresh.get('time', '')), 
-                fresh['extension'],
-                status,
-                approval
-            )
-            
-            # Add to cache with current row index
-            self.file_data_cache[filename] = {
-                'uploaded_date': fresh.get('uploaded_date', fresh.get('time', '')),
-                'extension': fresh['extension'],
-                'status': status,
-                'approval_status': approval,
-                'row_index': self.files_model.rowCount() - 1
-            }
-            print(f"Added file: {filename}")
-        
-        # Rebuild row indices after all changes (removals shift indices)
-        if removed_files:
-            self._rebuild_file_indices()
     
     def handle_manage_deleted_files(self):
         print("Manage Deleted Files clicked")
@@ -1124,91 +1030,31 @@ class AdminDash(QWidget):
         self.stack.setCurrentWidget(uploaded_view)
     
     def on_file_deleted(self, file_data):
-        """Handle file deleted event - refresh the files table and update collection count"""
+        """Handle file deleted event - apply the change and update collection counts"""
         print(f"File deleted: {file_data}")
-        self.refresh_files_table()
-        
-        # Update collection file count if file was deleted from a collection
-        print(f"DEBUG: file_data keys on delete: {file_data.keys()}")
-        print(f"DEBUG: collection_id = {file_data.get('collection_id')}")
-        
-        # The file's original collections are stored in _original_collections (array of IDs)
-        original_collections = file_data.get('_original_collections', [])
-        if original_collections:
-            print(f"DEBUG: Updating counts for collections (IDs): {original_collections}")
-            for collection_id in original_collections:
-                print(f"DEBUG: Updating count for collection ID after deletion: {collection_id}")
-                self.update_collection_file_count(collection_id)
-        else:
-            print(f"DEBUG: No original_collections found in deleted file_data, updating all collections")
-            # If we can't determine which collections, refresh all collection counts
-            self.refresh_all_collection_counts()
+        # Bulk deletes emit once per file; only the first call has deltas to apply
+        self.apply_document_changes()
+        self.refresh_storage_chart()
     
     def on_file_restored(self, file_data):
-        """Handle file restored event - refresh the files table and update collection counts"""
+        """Handle file restored event - apply the change and update collection counts"""
         print(f"File restored: {file_data}")
-        self.refresh_files_table()
-        
-        # Update collection file counts - file was restored back to its original collections
-        print(f"DEBUG: file_data keys on restore: {file_data.keys()}")
-        print(f"DEBUG: _original_collections = {file_data.get('_original_collections')}")
-        
-        # Check for original collections (stored during deletion as collection IDs)
-        original_collections = file_data.get('_original_collections', [])
-        if original_collections:
-            print(f"DEBUG: Updating counts for restored collections (IDs): {original_collections}")
-            # _original_collections stores collection IDs (integers)
-            # Now that update_collection_file_count uses IDs, we can pass them directly
-            for collection_id in original_collections:
-                print(f"DEBUG: Updating count for collection ID: {collection_id}")
-                self.update_collection_file_count(collection_id)
-        else:
-            print(f"DEBUG: No original collections found, refreshing all collection counts")
-            self.refresh_all_collection_counts()
+        # The file is back in its original collections; membership deltas update their counts
+        self.apply_document_changes()
+        self.refresh_storage_chart()
     
     def auto_cleanup_recycle_bin(self):
-        """Automatically cleanup old files from recycle bin on startup"""
-        try:
-            print("DEBUG: Starting auto-cleanup on startup...")
-            success, message, count = self.controller.cleanup_old_recycle_bin_files(days=15)
-            if success and count > 0:
-                print(f"Auto-cleanup: {message}")
-                print(f"WARNING: {count} files were auto-deleted on startup!")
-            elif not success:
-                print(f"Auto-cleanup failed: {message}")
-            else:
-                print("DEBUG: Auto-cleanup completed, no files deleted")
-        except Exception as e:
-            print(f"Error during auto-cleanup: {str(e)}")
+        """Start the background purge of expired recycle bin files"""
+        # Purges run on a worker when the expiry index says entries are due,
+        # instead of walking the whole RecycleBin on every dashboard load
+        self.recycle_bin_scheduler = get_recycle_bin_purge_scheduler(self.controller)
+        self.recycle_bin_scheduler.purged.connect(self.on_recycle_bin_purged)
+        self.recycle_bin_scheduler.start()
     
-    def _rebuild_file_indices(self):
-        """
-        Rebuild row indices in file_data_cache after removals.
-        This ensures cache indices match actual model row positions.
-        """
-        # Iterate through model rows and update cache with correct indices
-        for row_idx in range(self.files_model.rowCount()):
-            filename = self.files_model.item(row_idx, 0).text()
-            if filename in self.file_data_cache:
-                self.file_data_cache[filename]['row_index'] = row_idx
-    
-    def _on_rows_removed(self, parent, first, last):
-        """
-        Auto-update cache when rows are removed from model.
-        Connected to files_model.rowsRemoved signal.
-        """
-        self._rebuild_file_indices()
-    
-    def _on_data_changed(self, topLeft, bottomRight):
-        """
-        Auto-sync cache when data changes in model.
-        Connected to files_model.dataChanged signal.
-        """
-        for row in range(topLeft.row(), bottomRight.row() + 1):
-            filename = self.files_model.item(row, 0).text()
-            if filename in self.file_data_cache:
-                self.file_data_cache[filename]['uploaded_date'] = self.files_model.item(row, 1).text()
-                self.file_data_cache[filename]['extension'] = self.files_model.item(row, 2).text()
+    def on_recycle_bin_purged(self, count):
+        """Handle expired files being purged from the recycle bin"""
+        print(f"Recycle bin purge removed {count} expired file(s)")
+        self.refresh_storage_chart()
     
     def _get_status_emoji(self, status):
         """
@@ -1255,21 +1101,20 @@ class AdminDash(QWidget):
             print(f"Collection ID {collection_id} not found in cache")
             return
         
-        # Get collection data using ID
-        collection_data = self.controller._get_collection_by_id(collection_id)
+        # Get the file count from the membership index using ID
+        file_count = self.controller.get_collection_file_count(collection_id)
         
-        if not collection_data:
+        if file_count < 0:
             print(f"Collection ID {collection_id} not found in data")
             return
         
-        collection_name = collection_data.get('name', f'ID:{collection_id}')
+        collection_name = self.controller._get_collection_name_by_id(collection_id) or f'ID:{collection_id}'
         
         # Find the count label in the card widget
         card = self.collection_cards[collection_id]
         count_label = card.findChild(QLabel, "file_count_label")
         
         if count_label:
-            file_count = len(collection_data.get('files', []))
             count_label.setText(f"Files: {file_count}")
             print(f"Updated file count for '{collection_name}' (ID: {collection_id}): {file_count}")
         else:
@@ -1283,22 +1128,18 @@ class AdminDash(QWidget):
         """
         print("Refreshing all collection file counts...")
         
-        # Get fresh data from controller
-        collections_data = self.controller.get_collections()
+        # Get fresh counts from the controller's membership index
+        file_counts = self.controller.get_collection_file_counts()
         
         # Update each collection card using collection ID
-        for collection_data in collections_data:
-            collection_id = collection_data.get('id')
-            collection_name = collection_data.get('name')
-            
-            if collection_id is not None and collection_id in self.collection_cards:
+        for collection_id, file_count in file_counts.items():
+            if collection_id in self.collection_cards:
                 card = self.collection_cards[collection_id]
                 count_label = card.findChild(QLabel, "file_count_label")
                 
                 if count_label:
-                    file_count = len(collection_data.get('files', []))
                     count_label.setText(f"Files: {file_count}")
-                    print(f"  - Updated '{collection_name}' (ID: {collection_id}): {file_count} files")
+                    print(f"  - Updated collection ID {collection_id}: {file_count} files")
         
         print("All collection counts refreshed.")
         
@@ -1321,3 +1162,21 @@ class AdminDash(QWidget):
                 used_gb=storage_data['used_size_gb'],
                 total_gb=storage_data['total_size_gb']
             )
+        if hasattr(self, 'used_size_label'):
+            self.used_size_label.setText(f"Actual Size: {storage_data['used_size_gb']} GB")
+            self.free_size_label.setText(f"Unused Size: {storage_data['free_size_gb']} GB")
+    
+    def reconcile_storage(self):
+        """Reconcile storage totals with the disk on a worker, then redraw the chart"""
+        if self.storage_reconcile_job is not None:
+            return  # Previous walk still running
+        
+        def on_finished():
+            self.storage_reconcile_job = None
+        
+        self.storage_reconcile_job = run_in_background(
+            self.controller.reconcile_storage,
+            on_result=lambda result: self.refresh_storage_chart(),
+            on_error=lambda message: print(f"⚠ Storage reconcile failed: {message}"),
+            on_finished=on_finished
+        )
@@ -4,20 +4,41 @@ Document Controller
 Handles all business logic for document management operations.
 """
 
-import json
 import os
+import tarfile
+import time
+import zipfile
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
-from ..Mock.data_loader import (
-    get_uploaded_files, 
-    get_collections, 
-    get_storage_data,
-    get_deleted_files,
-    get_collection_by_name,
-    get_mock_data_path,
-    load_json_data
-)
+from ..Mock.data_loader import get_storage_data
 from ..services.file_storage_service import FileStorageService
+from ..services.copy_engine import move_file
+from ..services.document_store import get_document_store
+from ..services.change_feed import get_change_feed
+from ..services.search_index import SEARCH_RANK, get_search_index
+from ..services.collection_archive import IMPORTED_FIELDS, CollectionArchive
+from ..services.copy_engine import CopyCancelled
+from ..services.upload_pipeline import NameAllocator, UploadPipeline
+from ..services.thumbnail_cache import DEFAULT_THUMBNAIL_SIZE, can_preview, get_thumbnail_cache
+from ..services.storage_accounting import get_storage_accounting
+from ..services.recycle_bin_expiry import (RECYCLE_BIN_RETENTION_DAYS, SECONDS_PER_DAY,
+                                          get_recycle_bin_expiry_index)
+from ..services.permission_index import get_permission_index
+from ..utils.role_utils import (RoleRouter, PERMISSION_VIEW, PERMISSION_EDIT,
+                                PERMISSION_DELETE, PERMISSION_APPROVE)
+
+
+# Expired recycle-bin entries removed per metadata commit, by storage backend.
+# A JSON commit rewrites the whole files_data.json, so it gets few large batches;
+# SQLite commits touch only the removed rows.
+PURGE_BATCH_SIZES = {'json': 5000, 'sqlite': 100}
+PURGE_BATCH_SIZE = 100
+
+# Seconds the purge waits between batches, so readers blocked on the store lock get in
+PURGE_BATCH_PAUSE = 0.001
+
+# Default page size of query_files()
+QUERY_PAGE_SIZE = 100
 
 
 class DocumentController:
@@ -44,6 +65,21 @@ class DocumentController:
         self.primary_role = primary_role
         self.token = token
         self.file_storage = FileStorageService()
+        self.store = get_document_store()
+        self.storage_accounting = get_storage_accounting(
+            self.file_storage.storage_directory,
+            self.file_storage.recycle_bin_directory
+        )
+        self.expiry_index = get_recycle_bin_expiry_index(self.file_storage.recycle_bin_directory)
+        self.change_feed = get_change_feed()
+        self.search_index = get_search_index(
+            self.file_storage.storage_directory,
+            self.file_storage.recycle_bin_directory
+        )
+        self.thumbnail_cache = get_thumbnail_cache(self.file_storage.storage_directory)
+        # Per-file permission bits from the role and sub-role rules
+        self.permissions = get_permission_index(
+            username, *RoleRouter.get_file_permissions(primary_role, roles))
         
     # ==================== FILE OPERATIONS ====================
     
@@ -58,24 +94,248 @@ class DocumentController:
         Returns:
             list: List of file dictionaries
         """
-        files = get_uploaded_files()
+        criteria = {}
         
-        # Filter based on role
-        if self.primary_role.lower() != 'admin':
-            # Non-admins only see their own files
-            files = [f for f in files if f.get('uploader') == self.username]
-        
-        # Apply additional filters
+        # Exact-match filters are answered straight from the store indexes
         if filters:
             if 'category' in filters and filters['category']:
-                files = [f for f in files if f.get('category') == filters['category']]
+                criteria['category'] = filters['category']
             if 'extension' in filters and filters['extension']:
-                files = [f for f in files if f.get('extension') == filters['extension']]
-            if 'search' in filters and filters['search']:
-                search_term = filters['search'].lower()
-                files = [f for f in files if search_term in f.get('filename', '').lower()]
+                criteria['extension'] = filters['extension']
         
-        return files
+        # Files the role may see (None: every file, e.g. for admins)
+        viewable = self.permissions.file_ids(PERMISSION_VIEW)
+        
+        if filters and 'search' in filters and filters['search']:
+            # Ranked matches from the search index, narrowed by the exact filters
+            file_ids = self.search_index.search(
+                filters['search'], is_deleted=None if include_deleted else False)
+            if viewable is not None:
+                file_ids = [file_id for file_id in file_ids if file_id in viewable]
+            files = self.store.get_files(file_ids)
+            return [f for f in files
+                    if all(f.get(field) == value for field, value in criteria.items())]
+        
+        if viewable is None:
+            return self.store.find_files(is_deleted=None if include_deleted else False, **criteria)
+        # Only the user's own rows are touched
+        return self.store.query_files(is_deleted=None if include_deleted else False,
+                                      file_ids=viewable, **criteria)['files']
+    
+    def query_files(self, filters: Optional[Dict] = None, sort: str = 'file_id',
+                    descending: bool = False, cursor=None, limit: Optional[int] = QUERY_PAGE_SIZE,
+                    include_deleted: bool = False, deleted_only: bool = False,
+                    collection_id: Optional[int] = None) -> Dict:
+        """
+        Get one page of the files the user can see, sorted by the store.
+        
+        Views call this again with the returned next_cursor as the user
+        scrolls, so only the rows on screen are ever copied out of the store.
+        
+        Args:
+            filters (dict, optional): Exact filters (uploader, category, extension)
+                                      and/or 'search' text
+            sort (str): Field to order by (see document_store.SORTABLE_FIELDS)
+            descending (bool): Largest values first
+            cursor (optional): next_cursor of the previous page (None for the first page)
+            limit (int, optional): Page size (None for every match)
+            include_deleted (bool): Whether to include deleted files
+            deleted_only (bool): Only list the recycle bin
+            collection_id (int, optional): Only list files in this collection
+                                           (every member, whoever uploaded it)
+            
+        Returns:
+            dict: 'files' (the page), 'next_cursor' (None on the last page)
+                  and 'total_estimate' (matches across all pages); with
+                  deleted_only the files carry age_days and days_remaining
+        """
+        if deleted_only:
+            is_deleted = True
+        else:
+            is_deleted = None if include_deleted else False
+        
+        criteria = {}
+        if filters:
+            for field in ('uploader', 'category', 'extension'):
+                if filters.get(field):
+                    criteria[field] = filters[field]
+        
+        if collection_id is not None:
+            # Collections are shared: every member is listed
+            file_ids = self.store.get_collection_file_ids(collection_id)
+        else:
+            # Files the role may see (None: every file, e.g. for admins)
+            file_ids = self.permissions.file_ids(PERMISSION_VIEW)
+        if filters and filters.get('search'):
+            matches = self.search_index.search(filters['search'], is_deleted=is_deleted)
+            file_ids = matches if file_ids is None else set(file_ids).intersection(matches)
+        
+        page = self.store.query_files(
+            is_deleted=is_deleted, sort_key=sort, descending=descending,
+            cursor=cursor, limit=limit, file_ids=file_ids, **criteria
+        )
+        if deleted_only:
+            self._annotate_recycle_bin_ages(page['files'])
+        return {'files': page['files'], 'next_cursor': page['next_cursor'],
+                'total_estimate': page['total']}
+    
+    def search_files(self, query: str, include_deleted: bool = False,
+                     limit: Optional[int] = None, deleted_only: bool = False,
+                     collection_id: Optional[int] = None) -> List[Dict]:
+        """
+        Search filenames, descriptions, uploaders, categories and file text.
+        
+        Matches prefixes and misspellings as well as whole words; results
+        are ranked best first and limited to files the user can see.
+        
+        Args:
+            query (str): Free-text query
+            include_deleted (bool): Whether to include deleted files
+            limit (int, optional): Maximum number of results
+            deleted_only (bool): Only search the recycle bin
+            collection_id (int, optional): Only search files in this collection
+            
+        Returns:
+            list: Matching file dictionaries, best match first
+        """
+        file_ids = self.search_file_ids(query, include_deleted=include_deleted, limit=limit,
+                                        deleted_only=deleted_only, collection_id=collection_id)
+        return self.store.get_files(file_ids)
+    
+    def search_file_ids(self, query: str, include_deleted: bool = False,
+                        limit: Optional[int] = None, deleted_only: bool = False,
+                        collection_id: Optional[int] = None) -> List[int]:
+        """
+        Rank the files matching a query without copying their records.
+        
+        Same arguments as search_files(); views pass the IDs to
+        query_search_results() to load the rows page by page.
+        
+        Returns:
+            list: IDs of the matching files the user can see, best match first
+        """
+        if deleted_only:
+            is_deleted = True
+        else:
+            is_deleted = None if include_deleted else False
+        
+        viewable = self.permissions.file_ids(PERMISSION_VIEW)
+        if viewable is None and collection_id is None:
+            return self.search_index.search(query, is_deleted=is_deleted, limit=limit)
+        
+        # Rank everything, then keep the files in scope up to the limit
+        file_ids = self.search_index.search(query, is_deleted=is_deleted)
+        if collection_id is not None:
+            members = set(self.store.get_collection_file_ids(collection_id))
+            file_ids = [file_id for file_id in file_ids if file_id in members]
+        if viewable is not None:
+            file_ids = [file_id for file_id in file_ids if file_id in viewable]
+        if limit is not None:
+            file_ids = file_ids[:limit]
+        return file_ids
+    
+    def query_search_results(self, file_ids: List[int], sort: str = SEARCH_RANK,
+                             descending: bool = False, cursor=None,
+                             limit: Optional[int] = QUERY_PAGE_SIZE,
+                             include_deleted: bool = False, deleted_only: bool = False) -> Dict:
+        """
+        Get one page of search results (see search_file_ids).
+        
+        Same page format as query_files(), so a FileTableModel can show the
+        results with set_query() and copy out only the rows on screen.
+        
+        Args:
+            file_ids (list): Ranked IDs from search_file_ids()
+            sort (str): SEARCH_RANK for best match first, else a field to
+                        order by (see document_store.SORTABLE_FIELDS)
+            descending (bool): Reverse the order
+            cursor (optional): next_cursor of the previous page (None for the first page)
+            limit (int, optional): Page size (None for every match)
+            include_deleted (bool): Whether to include deleted files
+            deleted_only (bool): Only list the recycle bin
+            
+        Returns:
+            dict: 'files' (the page), 'next_cursor' (None on the last page)
+                  and 'total_estimate' (matches across all pages)
+        """
+        if deleted_only:
+            is_deleted = True
+        else:
+            is_deleted = None if include_deleted else False
+        
+        if sort != SEARCH_RANK:
+            page = self.store.query_files(
+                is_deleted=is_deleted, sort_key=sort, descending=descending,
+                cursor=cursor, limit=limit, file_ids=file_ids
+            )
+            files, next_cursor, total = page['files'], page['next_cursor'], page['total']
+        else:
+            # Rank order is the order of file_ids; the cursor is an offset into it
+            ranked = file_ids[::-1] if descending else file_ids
+            start = cursor[2] if cursor is not None else 0
+            end = len(ranked) if limit is None else start + limit
+            files = self.store.get_files(ranked[start:end], is_deleted=is_deleted)
+            next_cursor = (SEARCH_RANK, descending, end) if end < len(ranked) else None
+            total = len(ranked)
+        
+        if deleted_only:
+            self._annotate_recycle_bin_ages(files)
+        return {'files': files, 'next_cursor': next_cursor, 'total_estimate': total}
+    
+    def get_revision(self) -> int:
+        """
+        Get the current document revision.
+        
+        Views remember this after a full load and pass it to
+        get_changes_since() to apply only what changed afterwards.
+        
+        Returns:
+            int: Current revision
+        """
+        return self.change_feed.revision
+    
+    def get_changes_since(self, revision: int) -> Dict:
+        """
+        Get the file and collection changes committed after a revision.
+        
+        Records are returned unfiltered; use can_view_file() to decide which
+        ones belong in the current user's lists.
+        
+        Args:
+            revision (int): Revision the caller last applied
+            
+        Returns:
+            dict: Coalesced deltas keyed by file_id (see DocumentChangeFeed.changes_since);
+                  'reset' is True when the caller must reload instead
+        """
+        return self.change_feed.changes_since(revision)
+    
+    def subscribe_changes(self, callback) -> None:
+        """
+        Call a function with the new revision after every committed change.
+        
+        Args:
+            callback (callable): Function taking the new revision
+        """
+        self.change_feed.subscribe(callback)
+    
+    def unsubscribe_changes(self, callback) -> None:
+        """Stop calling a function registered with subscribe_changes()"""
+        self.change_feed.unsubscribe(callback)
+    
+    def can_view_file(self, file_data: Dict) -> bool:
+        """
+        Check if a file belongs in the current user's file lists.
+        
+        Matches the role filter of get_files() and get_deleted_files().
+        
+        Args:
+            file_data (dict): File data to check
+            
+        Returns:
+            bool: True if user can see the file
+        """
+        return self.permissions.allows(file_data, PERMISSION_VIEW)
     
     def get_deleted_files(self) -> List[Dict]:
         """
@@ -84,13 +344,12 @@ class DocumentController:
         Returns:
             list: List of deleted file dictionaries
         """
-        deleted = get_deleted_files()
-        
         # Filter based on role
-        if self.primary_role.lower() != 'admin':
-            deleted = [f for f in deleted if f.get('uploader') == self.username]
+        viewable = self.permissions.file_ids(PERMISSION_VIEW)
+        if viewable is not None:
+            return self.store.query_files(is_deleted=True, file_ids=viewable)['files']
         
-        return deleted
+        return self.store.find_files(is_deleted=True)
     
     def delete_file(self, file_id: int) -> Tuple[bool, str]:
         """
@@ -103,32 +362,16 @@ class DocumentController:
             tuple: (success: bool, message: str)
         """
         try:
-            files_path = get_mock_data_path('files_data.json')
-            with open(files_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            all_files = data.get('files', [])
-            
-            # Find the file to delete by file_id
-            file_to_delete = None
-            file_index = None
-            for i, file_data in enumerate(all_files):
-                # Skip already deleted files
-                if file_data.get('is_deleted', False):
-                    continue
-                    
-                if file_data.get('file_id') == file_id:
-                    file_to_delete = file_data
-                    file_index = i
-                    break
+            # Find the file to delete by file_id (skips already deleted files)
+            file_to_delete = self.store.get_file(file_id, deleted=False)
             
-            if file_to_delete and file_index is not None:
+            if file_to_delete:
                 # Get file_id for tracking
                 deleted_file_id = file_to_delete.get('file_id')
                 deleted_filename = file_to_delete.get('filename')
                 
                 # CRITICAL: Store which collections this file belongs to BEFORE removing
-                collections_containing_file = self._get_collections_containing_file_by_id(deleted_file_id) if deleted_file_id else self._get_collections_containing_file(deleted_filename)
+                collections_containing_file = self._get_collections_containing_file_by_id(deleted_file_id)
                 if collections_containing_file:
                     file_to_delete['_original_collections'] = collections_containing_file
                     print(f"📋 Storing collection membership for file_id {deleted_file_id} ('{deleted_filename}'): {collections_containing_file}")
@@ -138,7 +381,9 @@ class DocumentController:
                 if file_path:
                     result = self.file_storage.move_to_recycle_bin(file_path)
                     if result['success']:
-                        file_to_delete['recycle_bin_path'] = result['recycle_bin_path']
+                        # Content-addressed files stay in place (no recycle_bin_path)
+                        if result.get('recycle_bin_path'):
+                            file_to_delete['recycle_bin_path'] = result['recycle_bin_path']
                         file_to_delete['deleted_at'] = result['deleted_at']
                     else:
                         return False, f"Failed to move file to recycle bin: {result.get('error')}"
@@ -149,23 +394,19 @@ class DocumentController:
                 file_to_delete['is_deleted'] = True
                 file_to_delete['deleted_by'] = self.username
                 
-                # Update the file in place
-                all_files[file_index] = file_to_delete
-                data['files'] = all_files
-                
-                print(f"DEBUG delete_file: Saving to JSON. Total files in array: {len(all_files)}")
                 print(f"DEBUG delete_file: File being saved - file_id={file_to_delete.get('file_id')}, is_deleted={file_to_delete.get('is_deleted')}, filename={file_to_delete.get('filename')}")
                 
-                with open(files_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                # File entry and collection memberships are flushed together
+                with self.store.batch() as batch:
+                    # Update the file in place
+                    self.store.put_file(file_to_delete)
+                    self.store.save_files()
                     
-                print(f"DEBUG delete_file: Successfully saved to {files_path}")
-                
-                # CRITICAL FIX: Remove file from all collections (using file_id if available)
-                if deleted_file_id:
+                    # CRITICAL FIX: Remove file from all collections by file_id
                     success, msg, count = self.remove_file_from_all_collections_by_id(deleted_file_id)
-                else:
-                    success, msg, count = self.remove_file_from_all_collections(deleted_filename)
+                
+                if not batch.success:
+                    return False, "Error deleting file: could not save files data"
                     
                 if success and count > 0:
                     print(f"✓ Removed file_id {deleted_file_id} ('{deleted_filename}') from {count} collection(s) during deletion")
@@ -190,26 +431,10 @@ class DocumentController:
             tuple: (success: bool, message: str)
         """
         try:
-            files_path = get_mock_data_path('files_data.json')
-            with open(files_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            all_files = data.get('files', [])
-            
-            # Find the file to restore by file_id
-            file_to_restore = None
-            file_index = None
-            for i, file_data in enumerate(all_files):
-                # Only look at deleted files
-                if not file_data.get('is_deleted', False):
-                    continue
-                    
-                if file_data.get('file_id') == file_id:
-                    file_to_restore = file_data
-                    file_index = i
-                    break
+            # Find the file to restore by file_id (only deleted files)
+            file_to_restore = self.store.get_file(file_id, deleted=True)
             
-            if file_to_restore and file_index is not None:
+            if file_to_restore:
                 # Get filename for logging
                 restored_filename = file_to_restore.get('filename', 'Unknown')
                 restored_file_id = file_to_restore.get('file_id')
@@ -233,16 +458,14 @@ class DocumentController:
                 file_to_restore.pop('recycle_bin_path', None)
                 file_to_restore.pop('_original_collections', None)  # Remove the tracking field
                 
-                # Update the file in place
-                all_files[file_index] = file_to_restore
-                data['files'] = all_files
-                
-                with open(files_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                
-                # CRITICAL FIX: Restore file back to its original collections
-                if original_collections:
-                    restored_count = 0
+                # File entry and collection memberships are flushed together
+                restored_count = 0
+                with self.store.batch() as batch:
+                    # Update the file in place
+                    self.store.put_file(file_to_restore)
+                    self.store.save_files()
+                    
+                    # CRITICAL FIX: Restore file back to its original collections
                     for collection_id in original_collections:
                         collection_name = self._get_collection_name_by_id(collection_id)
                         success, msg = self.add_file_to_collection(collection_id, file_to_restore)
@@ -251,9 +474,12 @@ class DocumentController:
                             print(f"✓ Restored '{restored_filename}' (ID: {restored_file_id}) to collection '{collection_name}' (ID: {collection_id})")
                         else:
                             print(f"⚠ Warning: Could not restore to collection ID {collection_id}: {msg}")
-                    
-                    if restored_count > 0:
-                        return True, f"File '{restored_filename}' (ID: {restored_file_id}) restored to {restored_count} collection(s)"
+                
+                if not batch.success:
+                    return False, "Error restoring file: could not save files data"
+                
+                if restored_count > 0:
+                    return True, f"File '{restored_filename}' (ID: {restored_file_id}) restored to {restored_count} collection(s)"
                 
                 return True, f"File '{restored_filename}' (ID: {restored_file_id}) restored successfully"
             else:
@@ -273,26 +499,10 @@ class DocumentController:
             tuple: (success: bool, message: str)
         """
         try:
-            files_path = get_mock_data_path('files_data.json')
-            with open(files_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            all_files = data.get('files', [])
-            
-            # Find the file to permanently delete by file_id
-            file_to_delete = None
-            file_index = None
-            for i, file_data in enumerate(all_files):
-                # Only look at deleted files
-                if not file_data.get('is_deleted', False):
-                    continue
-                    
-                if file_data.get('file_id') == file_id:
-                    file_to_delete = file_data
-                    file_index = i
-                    break
+            # Find the file to permanently delete by file_id (only deleted files)
+            file_to_delete = self.store.get_file(file_id, deleted=True)
             
-            if file_to_delete and file_index is not None:
+            if file_to_delete:
                 # Get file info for logging
                 deleted_file_id = file_to_delete.get('file_id')
                 deleted_filename = file_to_delete.get('filename', 'Unknown')
@@ -304,15 +514,19 @@ class DocumentController:
                     if not result['success']:
                         print(f"Warning: Failed to delete from recycle bin: {result.get('error')}")
                 
-                # Remove from files array
-                all_files.pop(file_index)
-                data['files'] = all_files
+                with self.store.batch() as batch:
+                    # Remove from files array
+                    self.store.remove_file(deleted_file_id)
+                    self.store.save_files()
+                    
+                    # CRITICAL FIX: Also remove from collections by file_id
+                    success, msg, count = self.remove_file_from_all_collections_by_id(deleted_file_id)
                 
-                with open(files_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                if not batch.success:
+                    return False, "Error permanently deleting file: could not save files data"
                 
-                # CRITICAL FIX: Also remove from collections by file_id
-                success, msg, count = self.remove_file_from_all_collections_by_id(deleted_file_id)
+                # Drop the blob reference only once the record is gone from disk
+                self._release_stored_files([file_to_delete])
                     
                 if success and count > 0:
                     print(f"✓ Removed file_id {deleted_file_id} ('{deleted_filename}') from {count} collection(s) during permanent deletion")
@@ -326,9 +540,221 @@ class DocumentController:
         except Exception as e:
             return False, f"Error permanently deleting file: {str(e)}"
     
+    def delete_files(self, file_ids: List[int]) -> Dict[int, Tuple[bool, str]]:
+        """
+        Soft delete several files with a single metadata commit.
+        
+        Args:
+            file_ids (list): Unique file IDs
+            
+        Returns:
+            dict: {file_id: (success: bool, message: str)} in input order
+        """
+        results = {}
+        moved = []  # (recycle_bin_path, file_path) of legacy files moved to RecycleBin
+        try:
+            with self.store.batch() as batch:
+                collections_changed = False
+                for file_id in file_ids:
+                    if file_id in results:
+                        continue
+                    file_to_delete = self.store.get_file(file_id, deleted=False)
+                    if file_to_delete is None:
+                        results[file_id] = (False, f"File with ID {file_id} not found")
+                        continue
+                    deleted_filename = file_to_delete.get('filename')
+                    
+                    # Store which collections this file belongs to BEFORE removing
+                    collections_containing_file = self.store.get_file_collection_ids(file_id)
+                    if collections_containing_file:
+                        file_to_delete['_original_collections'] = collections_containing_file
+                    
+                    file_path = file_to_delete.get('file_path')
+                    if file_path:
+                        result = self.file_storage.move_to_recycle_bin(file_path)
+                        if not result['success']:
+                            results[file_id] = (False, f"Failed to move file to recycle bin: {result.get('error')}")
+                            continue
+                        # Content-addressed files stay in place (no recycle_bin_path)
+                        if result.get('recycle_bin_path'):
+                            file_to_delete['recycle_bin_path'] = result['recycle_bin_path']
+                            moved.append((result['recycle_bin_path'], file_path))
+                        file_to_delete['deleted_at'] = result['deleted_at']
+                    else:
+                        file_to_delete['deleted_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    
+                    file_to_delete['is_deleted'] = True
+                    file_to_delete['deleted_by'] = self.username
+                    self.store.put_file(file_to_delete)
+                    if self.store.remove_file_from_all_collections(file_id):
+                        collections_changed = True
+                    results[file_id] = (True, f"File '{deleted_filename}' (ID: {file_id}) moved to recycle bin")
+                
+                self.store.save_files()
+                if collections_changed:
+                    self.store.save_collections()
+            
+            if not batch.success:
+                raise IOError("could not save files data")
+        except Exception as e:
+            # Nothing was committed: put legacy files back where the records expect them
+            for recycle_bin_path, file_path in moved:
+                self.file_storage.restore_from_recycle_bin(recycle_bin_path, file_path)
+            return self._fail_bulk_results(file_ids, results, f"Error deleting file: {str(e)}")
+        
+        succeeded = sum(1 for success, _ in results.values() if success)
+        print(f"✓ Moved {succeeded} of {len(results)} file(s) to recycle bin in one commit")
+        return results
+    
+    def restore_files(self, file_ids: List[int]) -> Dict[int, Tuple[bool, str]]:
+        """
+        Restore several soft-deleted files with a single metadata commit.
+        
+        Each file is re-added to the original collections that still exist.
+        
+        Args:
+            file_ids (list): Unique file IDs
+            
+        Returns:
+            dict: {file_id: (success: bool, message: str)} in input order
+        """
+        results = {}
+        restored = []  # (recycle_bin_path, file_path) of legacy files moved out of RecycleBin
+        try:
+            with self.store.batch() as batch:
+                collections_changed = False
+                for file_id in file_ids:
+                    if file_id in results:
+                        continue
+                    file_to_restore = self.store.get_file(file_id, deleted=True)
+                    if file_to_restore is None:
+                        results[file_id] = (False, f"File with ID {file_id} not found in deleted files")
+                        continue
+                    restored_filename = file_to_restore.get('filename', 'Unknown')
+                    
+                    recycle_bin_path = file_to_restore.get('recycle_bin_path')
+                    original_path = file_to_restore.get('file_path')
+                    if recycle_bin_path and original_path:
+                        result = self.file_storage.restore_from_recycle_bin(recycle_bin_path, original_path)
+                        if not result['success']:
+                            results[file_id] = (False, f"Failed to restore file from recycle bin: {result.get('error')}")
+                            continue
+                        restored.append((recycle_bin_path, original_path))
+                    
+                    original_collections = file_to_restore.pop('_original_collections', None) or []
+                    file_to_restore['is_deleted'] = False
+                    file_to_restore.pop('deleted_at', None)
+                    file_to_restore.pop('deleted_by', None)
+                    file_to_restore.pop('recycle_bin_path', None)
+                    self.store.put_file(file_to_restore)
+                    
+                    # Collections deleted in the meantime are skipped
+                    restored_count = 0
+                    for collection_id in original_collections:
+                        if self.store.add_file_to_collection(collection_id, file_id):
+                            restored_count += 1
+                    if restored_count:
+                        collections_changed = True
+                        results[file_id] = (True, f"File '{restored_filename}' (ID: {file_id}) restored to {restored_count} collection(s)")
+                    else:
+                        results[file_id] = (True, f"File '{restored_filename}' (ID: {file_id}) restored successfully")
+                
+                self.store.save_files()
+                if collections_changed:
+                    self.store.save_collections()
+            
+            if not batch.success:
+                raise IOError("could not save files data")
+        except Exception as e:
+            # Nothing was committed: move legacy files back into the RecycleBin
+            for recycle_bin_path, file_path in restored:
+                try:
+                    move_file(self.file_storage.get_file_path(file_path),
+                              os.path.join(self.file_storage.recycle_bin_directory, recycle_bin_path))
+                except OSError as move_error:
+                    print(f"⚠ Warning: could not return '{file_path}' to recycle bin: {move_error}")
+            return self._fail_bulk_results(file_ids, results, f"Error restoring file: {str(e)}")
+        
+        succeeded = sum(1 for success, _ in results.values() if success)
+        print(f"✓ Restored {succeeded} of {len(results)} file(s) in one commit")
+        return results
+    
+    def permanent_delete_files(self, file_ids: List[int]) -> Dict[int, Tuple[bool, str]]:
+        """
+        Permanently delete several recycle-bin files with a single metadata commit.
+        
+        Physical files and blob references are released only after the
+        commit succeeds.
+        
+        Args:
+            file_ids (list): Unique file IDs
+            
+        Returns:
+            dict: {file_id: (success: bool, message: str)} in input order
+        """
+        results = {}
+        removed = []
+        try:
+            with self.store.batch() as batch:
+                collections_changed = False
+                for file_id in file_ids:
+                    if file_id in results:
+                        continue
+                    file_to_delete = self.store.get_file(file_id, deleted=True)
+                    if file_to_delete is None:
+                        results[file_id] = (False, f"File with ID {file_id} not found in deleted files")
+                        continue
+                    self.store.remove_file(file_id)
+                    if self.store.remove_file_from_all_collections(file_id):
+                        collections_changed = True
+                    removed.append(file_to_delete)
+                    results[file_id] = (True, f"File '{file_to_delete.get('filename', 'Unknown')}' (ID: {file_id}) permanently deleted")
+                
+                self.store.save_files()
+                if collections_changed:
+                    self.store.save_collections()
+            
+            if not batch.success:
+                raise IOError("could not save files data")
+        except Exception as e:
+            return self._fail_bulk_results(file_ids, results, f"Error permanently deleting file: {str(e)}")
+        
+        # Physical cleanup only after the metadata no longer references the files
+        for file_data in removed:
+            recycle_bin_path = file_data.get('recycle_bin_path')
+            if recycle_bin_path:
+                result = self.file_storage.permanent_delete_from_recycle_bin(recycle_bin_path)
+                if not result['success']:
+                    print(f"⚠ Warning: {result.get('error')}")
+        self._release_stored_files(removed)
+        
+        print(f"✓ Permanently deleted {len(removed)} of {len(results)} file(s) in one commit")
+        return results
+    
+    def _fail_bulk_results(self, file_ids: List[int], results: Dict[int, Tuple[bool, str]],
+                           message: str) -> Dict[int, Tuple[bool, str]]:
+        """
+        Mark every file of a bulk operation whose commit failed as failed.
+        
+        Args:
+            file_ids (list): File IDs passed to the bulk operation
+            results (dict): Per-file results collected before the failure
+            message (str): Error message for files that had not failed already
+            
+        Returns:
+            dict: {file_id: (False, message)} in input order
+        """
+        print(f"⚠ Bulk operation rolled back: {message}")
+        failed = {}
+        for file_id in file_ids:
+            previous = results.get(file_id)
+            failed[file_id] = previous if previous and not previous[0] else (False, message)
+        return failed
+    
     def upload_file(self, source_path: str, custom_name: str = None, 
                    category: str = None, collection: str = None, description: str = None, 
-                   force_override: bool = False) -> Tuple[bool, str, Optional[Dict]]:
+                   force_override: bool = False, progress_callback=None,
+                   cancel_token=None) -> Tuple[bool, str, Optional[Dict]]:
         """
         Upload a new file with duplicate handling.
         
@@ -339,6 +765,9 @@ class DocumentController:
             collection (str, optional): Collection name the file belongs to
             description (str, optional): File description
             force_override (bool): If True, override existing file with same name
+            progress_callback (callable, optional): Per-chunk copy progress
+                as (bytes_copied, total_bytes, "")
+            cancel_token (optional): Object with is_cancelled(); stops the copy
             
         Returns:
             tuple: (success: bool, message: str, file_data: dict or None)
@@ -366,20 +795,19 @@ class DocumentController:
                 final_name = base_name
             
             # Save file using storage service
-            result = self.file_storage.save_file(source_path, final_name, category)
+            result = self.file_storage.save_file(
+                source_path,
+                final_name,
+                category,
+                progress_callback=progress_callback,
+                cancel_token=cancel_token
+            )
             
             if not result['success']:
                 return False, result.get('error', 'Upload failed'), None
             
-            # Add to JSON data first to get next_file_id
-            files_path = get_mock_data_path('files_data.json')
-            with open(files_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
             # Generate unique file_id
-            next_file_id = data.get('next_file_id', 1)
-            file_id = next_file_id
-            data['next_file_id'] = next_file_id + 1
+            file_id = self.store.allocate_file_id()
             
             # Create file metadata with file_id
             file_data = {
@@ -394,32 +822,26 @@ class DocumentController:
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 'uploader': self.username,
                 'role': self.primary_role,
-                'is_deleted': False  # Track deletion status
+                'is_deleted': False,  # Track deletion status
+                'sha256': result.get('sha256'),  # Content hash computed during the copy
+                'size': result.get('size')
             }
             
             if description:
                 file_data['description'] = description
             
             # Add to files array (with duplicate prevention)
-            all_files = data.get('files', [])
-            
-            # Check for duplicate file_id before appending
-            existing_ids = [f.get('file_id') for f in all_files]
-            if file_id not in existing_ids:
-                all_files.append(file_data)
-                data['files'] = all_files
-            else:
+            if self.store.get_file(file_id) is not None:
                 print(f"WARNING: Prevented duplicate file_id={file_id} from being added to files array")
                 # Even if duplicate, we still return success since the file exists
                 return True, "File already exists in the system", file_data
             
+            self.store.put_file(file_data)
+            
             print(f"DEBUG upload_file: Uploading file. file_id={file_id}, filename={file_data['filename']}, is_deleted={file_data['is_deleted']}")
-            print(f"DEBUG upload_file: Total files in array after upload: {len(all_files)}")
             
-            with open(files_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-                
-            print(f"DEBUG upload_file: Successfully saved to {files_path}")
+            if not self.store.save_files():
+                return False, "Error uploading file: could not save files data", None
             
             success_msg = "File uploaded successfully"
             if is_duplicate and not force_override:
@@ -432,6 +854,105 @@ class DocumentController:
         except Exception as e:
             return False, f"Error uploading file: {str(e)}", None
     
+    def upload_files(self, source_paths: List[str], category: str = None,
+                     collection_id: Optional[int] = None, collection: str = None,
+                     description: str = None, file_progress=None, file_finished=None,
+                     cancel_token=None) -> Dict:
+        """
+        Upload many files: concurrent copies, then a single metadata commit.
+        
+        Files are copied and hashed on a bounded pool (see
+        services/upload_pipeline.py). Duplicate names are renamed with (#)
+        suffixes. Files whose copy finished are committed even if the upload
+        was cancelled.
+        
+        Args:
+            source_paths (list): Files to upload
+            category (str, optional): Category for every file
+            collection_id (int, optional): Collection the files are added to
+            collection (str, optional): Collection name stored on the records
+            description (str, optional): Description for every file
+            file_progress (callable, optional): (index, bytes_copied, total_bytes),
+                called from the copy threads
+            file_finished (callable, optional): Receives each copy result dict,
+                called from the copy threads
+            cancel_token (optional): Object with is_cancelled(); stops pending copies
+            
+        Returns:
+            dict: Result with keys:
+                - uploaded (list): New file records, in selection order
+                - failed (list): (filename, error) tuples
+                - cancelled (bool): True if some files were skipped by cancellation
+        """
+        if collection_id is not None and not self.store.has_collection(collection_id):
+            return {
+                'uploaded': [],
+                'failed': [(os.path.basename(path), "Collection not found") for path in source_paths],
+                'cancelled': False
+            }
+        
+        results = UploadPipeline(self.file_storage).run(
+            source_paths,
+            file_progress=file_progress,
+            file_finished=file_finished,
+            cancel_token=cancel_token
+        )
+        stored = [item for item in results if item['stored'] is not None]
+        failed = [(os.path.basename(item['source_path']), item['error'])
+                  for item in results if item['error']]
+        cancelled = any(item['cancelled'] for item in results)
+        
+        uploaded = []
+        if stored:
+            with self.store.batch() as batch:
+                # Names are allocated under the store lock, in selection order
+                allocator = NameAllocator(self.store)
+                now = datetime.now()
+                for item in stored:
+                    result = item['stored']
+                    file_data = {
+                        'file_id': self.store.allocate_file_id(),
+                        'filename': allocator.allocate(item['name']),
+                        'time': now.strftime("%I:%M %p").lower(),
+                        'extension': result['extension'],
+                        'file_path': result['file_path'],
+                        'category': category or 'None',
+                        'collection': collection or category or 'None',
+                        'uploaded_date': now.strftime("%m/%d/%Y"),
+                        'timestamp': now.strftime("%Y-%m-%d %H:%M:%S"),
+                        'uploader': self.username,
+                        'role': self.primary_role,
+                        'is_deleted': False,
+                        'sha256': result.get('sha256'),
+                        'size': result.get('size')
+                    }
+                    if description:
+                        file_data['description'] = description
+                    if collection_id is not None:
+                        file_data['approval_status'] = 'pending'
+                    self.store.put_file(file_data)
+                    if collection_id is not None:
+                        self.store.add_file_to_collection(collection_id, file_data['file_id'])
+                    uploaded.append(file_data)
+                self.store.save_files()
+                if collection_id is not None:
+                    self.store.save_collections()
+            
+            if not batch.success:
+                # Nothing was committed; drop the references taken by the copies
+                for item in stored:
+                    self.file_storage.release_file(item['stored']['file_path'])
+                failed.extend((os.path.basename(item['source_path']), "Could not save files data")
+                              for item in stored)
+                uploaded = []
+        
+        print(f"✓ Uploaded {len(uploaded)} of {len(source_paths)} file(s) in one commit")
+        return {
+            'uploaded': [dict(record) for record in uploaded],
+            'failed': failed,
+            'cancelled': cancelled
+        }
+    
     def update_file(self, file_id: int, new_filename: str = None, 
                    category: str = None, description: str = None) -> Tuple[bool, str, Optional[Dict]]:
         """
@@ -447,22 +968,8 @@ class DocumentController:
             tuple: (success: bool, message: str, updated_file_data: dict or None)
         """
         try:
-            files_path = get_mock_data_path('files_data.json')
-            with open(files_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            all_files = data.get('files', [])
-            
             # Find the file to update by file_id (only non-deleted files)
-            file_to_update = None
-            file_index = -1
-            for i, file_data in enumerate(all_files):
-                if file_data.get('is_deleted', False):
-                    continue
-                if file_data.get('file_id') == file_id:
-                    file_to_update = file_data
-                    file_index = i
-                    break
+            file_to_update = self.store.get_file(file_id, deleted=False)
             
             if file_to_update:
                 old_filename = file_to_update.get('filename')
@@ -482,15 +989,11 @@ class DocumentController:
                     file_to_update['description'] = description
                 
                 # Save updated data
-                all_files[file_index] = file_to_update
-                data['files'] = all_files
-                
-                with open(files_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                self.store.put_file(file_to_update)
+                if not self.store.save_files():
+                    return False, "Error updating file: could not save files data", None
                 
-                # Also update in collections by file_id
-                if new_filename and new_filename != old_filename:
-                    self._update_file_in_collections_by_id(file_id, file_to_update)
+                # Collections reference the file by file_id, so they see the change as-is
                 
                 return True, f"File '{new_filename or old_filename}' (ID: {file_id}) updated successfully", file_to_update
             else:
@@ -499,37 +1002,6 @@ class DocumentController:
         except Exception as e:
             return False, f"Error updating file: {str(e)}", None
     
-    def _update_file_in_collections_by_id(self, file_id: int, updated_file_data: Dict) -> None:
-        """
-        Update file data in all collections that contain it (by file_id).
-        
-        Args:
-            file_id (int): File ID to find
-            updated_file_data (dict): New file data to replace with
-        """
-        try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            collections = data.get('collections', [])
-            updated = False
-            
-            for collection in collections:
-                files = collection.get('files', [])
-                for i, file_data in enumerate(files):
-                    if file_data.get('file_id') == file_id:
-                        # Update the file data in this collection
-                        collection['files'][i] = updated_file_data.copy()
-                        updated = True
-                        print(f"Updated file_id {file_id} in collection '{collection.get('name')}'")
-            
-            if updated:
-                with open(collections_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error updating file in collections: {str(e)}")
-    
     def _remove_file_entry(self, filename: str) -> bool:
         """
         Remove a file entry from JSON (used for override).
@@ -541,22 +1013,32 @@ class DocumentController:
             bool: True if removed, False otherwise
         """
         try:
-            files_path = get_mock_data_path('files_data.json')
-            with open(files_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            all_files = data.get('files', [])
             # Remove file with matching filename (permanently)
-            data['files'] = [f for f in all_files if f.get('filename') != filename]
+            removed = self.store.find_files(is_deleted=None, filename=filename)
+            for file_data in removed:
+                self.store.remove_file(file_data['file_id'])
             
-            with open(files_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            if not self.store.save_files():
+                return False
             
+            self._release_stored_files(removed)
             return True
         except Exception as e:
             print(f"Error removing file entry: {e}")
             return False
     
+    def _release_stored_files(self, removed_files: List[Dict]) -> None:
+        """
+        Release blob references held by permanently removed file records.
+        
+        Args:
+            removed_files (list): File records already removed from the store
+        """
+        for file_data in removed_files:
+            result = self.file_storage.release_file(file_data.get('file_path'))
+            if not result['success']:
+                print(f"⚠ Warning: {result.get('error')}")
+    
     # ==================== COLLECTION OPERATIONS ====================
     
     def get_collections(self) -> List[Dict]:
@@ -566,12 +1048,32 @@ class DocumentController:
         Returns:
             list: List of collection dictionaries
         """
-        collections = get_collections()
+        collections = self.store.get_collections()
         
         # For now, all users see all collections
         # Can add role-based filtering later
         return collections
     
+    def query_collections(self, sort: str = 'name', descending: bool = False,
+                          cursor=None, limit: Optional[int] = None) -> Dict:
+        """
+        Get one page of collections, without their file records.
+        
+        Args:
+            sort (str): Collection field to order by (e.g. 'name', 'id')
+            descending (bool): Largest values first
+            cursor (optional): next_cursor of the previous page (None for the first page)
+            limit (int, optional): Page size (None for every collection)
+            
+        Returns:
+            dict: 'collections' (each with 'file_count' instead of 'files'),
+                  'next_cursor' (None on the last page) and 'total_estimate'
+        """
+        page = self.store.query_collections(sort_key=sort, descending=descending,
+                                            cursor=cursor, limit=limit)
+        return {'collections': page['collections'], 'next_cursor': page['next_cursor'],
+                'total_estimate': page['total']}
+    
     def create_collection(self, name: str, icon: str = 'folder.png') -> Tuple[bool, str, Optional[Dict]]:
         """
         Create a new collection.
@@ -584,20 +1086,12 @@ class DocumentController:
             tuple: (success: bool, message: str, collection_data: dict or None)
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            collections = data.get('collections', [])
-            
             # Check if collection already exists
-            if any(c['name'].lower() == name.lower() for c in collections):
+            if any(existing.lower() == name.lower() for existing in self.store.get_collection_names()):
                 return False, f"Collection '{name}' already exists", None
             
             # Get next collection ID from counter (similar to file_id pattern)
-            next_collection_id = data.get('next_collection_id', 1)
-            collection_id = next_collection_id
-            data['next_collection_id'] = next_collection_id + 1
+            collection_id = self.store.allocate_collection_id()
             
             # Create new collection with unique collection_id
             collection_data = {
@@ -609,11 +1103,9 @@ class DocumentController:
                 'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            collections.append(collection_data)
-            data['collections'] = collections
-            
-            with open(collections_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            self.store.put_collection(collection_data)
+            if not self.store.save_collections():
+                return False, "Error creating collection: could not save collections data", None
             
             return True, f"Collection '{name}' created successfully (ID: {collection_id})", collection_data
             
@@ -631,42 +1123,25 @@ class DocumentController:
             tuple: (success: bool, message: str)
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            collections = data.get('collections', [])
-            
             # Find the collection by ID and check if it's empty
-            collection_found = False
-            collection_index = -1
-            collection_name = None
-            file_count = 0
-            
-            for i, collection in enumerate(collections):
-                if collection.get('id') == collection_id:
-                    collection_found = True
-                    collection_index = i
-                    collection_name = collection.get('name')
-                    file_count = len(collection.get('files', []))
-                    break
+            collection_name = self._get_collection_name_by_id(collection_id)
             
-            if not collection_found:
+            if collection_name is None:
                 return False, f"Collection with ID {collection_id} not found"
             
+            file_count = self.store.count_collection_files(collection_id)
+            
             # Check if collection is empty
             if file_count > 0:
                 return False, (f"Cannot delete collection '{collection_name}' (ID: {collection_id}) because it contains {file_count} file(s). "
                              f"Please remove all files from this collection before deleting it.")
             
             # Collection is empty, proceed with deletion
-            collections.pop(collection_index)
+            self.store.remove_collection(collection_id)
             
             # Save the updated collections data
-            data['collections'] = collections
-            
-            with open(collections_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            if not self.store.save_collections():
+                return False, "Error deleting collection: could not save collections data"
             
             return True, f"Collection '{collection_name}' (ID: {collection_id}) deleted successfully"
                 
@@ -685,54 +1160,77 @@ class DocumentController:
                    Returns (False, -1) if collection not found
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            collections = data.get('collections', [])
+            file_count = self.get_collection_file_count(collection_id)
             
-            for collection in collections:
-                if collection.get('id') == collection_id:
-                    file_count = len(collection.get('files', []))
-                    return (file_count == 0, file_count)
+            if file_count < 0:
+                # Collection not found
+                return False, -1
             
-            # Collection not found
-            return False, -1
+            return (file_count == 0, file_count)
             
         except Exception as e:
             print(f"Error checking if collection is empty: {e}")
             return False, -1
     
+    def get_collection_file_count(self, collection_id: int) -> int:
+        """
+        Get the number of files in a collection from the membership index.
+        
+        Args:
+            collection_id (int): Unique collection ID (REQUIRED)
+            
+        Returns:
+            int: Number of files, or -1 if the collection was not found
+        """
+        if not self.store.has_collection(collection_id):
+            return -1
+        return self.store.count_collection_files(collection_id)
+    
+    def get_collection_file_counts(self) -> Dict[int, int]:
+        """
+        Get file counts for every collection from the membership index.
+        
+        Returns:
+            dict: {collection_id: file_count}
+        """
+        return self.store.get_collection_counts()
+    
     def add_file_to_collection(self, collection_id: int, file_data: Dict) -> Tuple[bool, str]:
         """
         Add a file to a collection.
         
         Args:
             collection_id (int): Unique collection ID (REQUIRED)
-            file_data (dict): File data to add
+            file_data (dict): File data to add (must have a file_id)
             
         Returns:
             tuple: (success: bool, message: str)
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Find the collection by ID
+            collection_name = self._get_collection_name_by_id(collection_id)
             
-            collections = data.get('collections', [])
+            if collection_name is None:
+                return False, f"Collection with ID {collection_id} not found"
             
-            # Find the collection by ID
-            for collection in collections:
-                if collection.get('id') == collection_id:
-                    collection_name = collection.get('name')
-                    collection['files'].append(file_data)
-                    
-                    with open(collections_path, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, indent=2)
-                    
-                    return True, f"File added to collection '{collection_name}' (ID: {collection_id})"
+            file_id = file_data.get('file_id')
+            if file_id is None:
+                return False, "Error adding file to collection: file has no file_id"
             
-            return False, f"Collection with ID {collection_id} not found"
+            with self.store.batch() as batch:
+                # File metadata is stored once in the files data
+                if self.store.get_file(file_id) is None:
+                    self.store.put_file(file_data)
+                    self.store.save_files()
+                
+                if not self.store.add_file_to_collection(collection_id, file_id):
+                    return False, f"File with ID {file_id} is already in collection '{collection_name}'"
+                self.store.save_collections()
+            
+            if not batch.success:
+                return False, "Error adding file to collection: could not save collections data"
+            
+            return True, f"File added to collection '{collection_name}' (ID: {collection_id})"
             
         except Exception as e:
             return False, f"Error adding file to collection: {str(e)}"
@@ -749,32 +1247,22 @@ class DocumentController:
             tuple: (success: bool, message: str)
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Find the collection by ID
+            collection_name = self._get_collection_name_by_id(collection_id)
             
-            collections = data.get('collections', [])
+            if collection_name is None:
+                return False, f"Collection with ID {collection_id} not found"
             
-            # Find the collection by ID
-            for collection in collections:
-                if collection.get('id') == collection_id:
-                    collection_name = collection.get('name')
-                    files = collection.get('files', [])
-                    
-                    # Remove the file by file_id
-                    for i, file_data in enumerate(files):
-                        if file_data.get('file_id') == file_id:
-                            filename = file_data.get('filename')
-                            files.pop(i)
-                            
-                            with open(collections_path, 'w', encoding='utf-8') as f:
-                                json.dump(data, f, indent=2)
-                            
-                            return True, f"File '{filename}' (ID: {file_id}) removed from collection '{collection_name}' (ID: {collection_id})"
-                    
-                    return False, f"File with ID {file_id} not found in collection '{collection_name}'"
+            # Remove the membership row by file_id
+            if not self.store.remove_file_from_collection(collection_id, file_id):
+                return False, f"File with ID {file_id} not found in collection '{collection_name}'"
             
-            return False, f"Collection with ID {collection_id} not found"
+            if not self.store.save_collections():
+                return False, "Error removing file from collection: could not save collections data"
+            
+            file_data = self.store.get_file(file_id)
+            filename = file_data.get('filename') if file_data else None
+            return True, f"File '{filename}' (ID: {file_id}) removed from collection '{collection_name}' (ID: {collection_id})"
             
         except Exception as e:
             return False, f"Error removing file from collection: {str(e)}"
@@ -790,21 +1278,13 @@ class DocumentController:
             list: List of collection names containing this file
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            collections = data.get('collections', [])
-            collection_names = []
-            
-            for collection in collections:
-                files = collection.get('files', [])
-                for file_data in files:
-                    if file_data.get('filename') == filename:
-                        collection_names.append(collection.get('name'))
-                        break
+            collection_ids = []
+            for file_data in self.store.find_files(is_deleted=None, filename=filename):
+                for collection_id in self.store.get_file_collection_ids(file_data['file_id']):
+                    if collection_id not in collection_ids:
+                        collection_ids.append(collection_id)
             
-            return collection_names
+            return [self._get_collection_name_by_id(cid) for cid in collection_ids]
         except Exception as e:
             print(f"Error getting collections containing file: {str(e)}")
             return []
@@ -820,30 +1300,20 @@ class DocumentController:
             tuple: (success: bool, message: str, count: int) - count is number of collections affected
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            affected_ids = set()
             
-            collections = data.get('collections', [])
-            collections_affected = 0
+            # Remove every file with this filename through the reverse index
+            for file_data in self.store.find_files(is_deleted=None, filename=filename):
+                affected_ids.update(self.store.remove_file_from_all_collections(file_data['file_id']))
             
-            # Search through all collections and remove the file
-            for collection in collections:
-                files = collection.get('files', [])
-                original_count = len(files)
-                
-                # Remove all instances of this filename from the collection
-                collection['files'] = [f for f in files if f.get('filename') != filename]
-                
-                # Track if this collection was affected
-                if len(collection['files']) < original_count:
-                    collections_affected += 1
-                    print(f"Removed '{filename}' from collection '{collection.get('name')}'")
+            collections_affected = len(affected_ids)
+            for collection_id in affected_ids:
+                print(f"Removed '{filename}' from collection '{self._get_collection_name_by_id(collection_id)}'")
             
             # Save updated collections data
             if collections_affected > 0:
-                with open(collections_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                if not self.store.save_collections():
+                    return False, "Error removing file from collections: could not save collections data", 0
                 
                 return True, f"File removed from {collections_affected} collection(s)", collections_affected
             else:
@@ -863,21 +1333,7 @@ class DocumentController:
             list: List of collection IDs containing this file
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            collections = data.get('collections', [])
-            collection_ids = []
-            
-            for collection in collections:
-                files = collection.get('files', [])
-                for file_data in files:
-                    if file_data.get('file_id') == file_id:
-                        collection_ids.append(collection.get('id'))
-                        break
-            
-            return collection_ids
+            return self.store.get_file_collection_ids(file_id)
         except Exception as e:
             print(f"Error getting collections containing file_id {file_id}: {str(e)}")
             return []
@@ -893,30 +1349,17 @@ class DocumentController:
             tuple: (success: bool, message: str, count: int) - count is number of collections affected
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Reverse index lookup instead of scanning every collection
+            affected_ids = self.store.remove_file_from_all_collections(file_id)
+            collections_affected = len(affected_ids)
             
-            collections = data.get('collections', [])
-            collections_affected = 0
-            
-            # Search through all collections and remove the file
-            for collection in collections:
-                files = collection.get('files', [])
-                original_count = len(files)
-                
-                # Remove all instances of this file_id from the collection
-                collection['files'] = [f for f in files if f.get('file_id') != file_id]
-                
-                # Track if this collection was affected
-                if len(collection['files']) < original_count:
-                    collections_affected += 1
-                    print(f"Removed file_id {file_id} from collection '{collection.get('name')}'")
+            for collection_id in affected_ids:
+                print(f"Removed file_id {file_id} from collection '{self._get_collection_name_by_id(collection_id)}'")
             
             # Save updated collections data
             if collections_affected > 0:
-                with open(collections_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                if not self.store.save_collections():
+                    return False, "Error removing file from collections: could not save collections data", 0
                 
                 return True, f"File removed from {collections_affected} collection(s)", collections_affected
             else:
@@ -925,6 +1368,120 @@ class DocumentController:
         except Exception as e:
             return False, f"Error removing file from collections: {str(e)}", 0
     
+    def export_collection(self, collection_id: int, archive_path: str,
+                          progress_callback=None, cancel_token=None) -> Tuple[bool, str]:
+        """
+        Export a collection (files and metadata) to a .zip, .tar or .tar.gz archive.
+        
+        Content is streamed in chunks, so collections of any size can be
+        exported. Only files the user can view are included.
+        
+        Args:
+            collection_id (int): Unique collection ID
+            archive_path (str): Destination archive path
+            progress_callback (callable, optional): (bytes_written, total_bytes, status_text)
+            cancel_token (optional): Object with is_cancelled()
+            
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        collection = self.store.get_collection(collection_id)
+        if collection is None:
+            return False, f"Collection with ID {collection_id} not found"
+        
+        records = [f for f in self.store.get_files(self.store.get_collection_file_ids(collection_id),
+                                                   is_deleted=False)
+                   if self.can_view_file(f)]
+        try:
+            result = CollectionArchive(self.file_storage).export(
+                collection, records, archive_path,
+                progress_callback=progress_callback, cancel_token=cancel_token)
+        except CopyCancelled:
+            return False, "Export cancelled"
+        except (OSError, ValueError) as e:
+            return False, f"Error exporting collection: {str(e)}"
+        
+        return True, (f"Exported {result['files']} file(s) from '{collection.get('name')}' "
+                      f"to {os.path.basename(archive_path)}")
+    
+    def import_collection(self, archive_path: str, collection_name: Optional[str] = None,
+                          progress_callback=None, cancel_token=None) -> Tuple[bool, str, Optional[Dict]]:
+        """
+        Import a collection archive written by export_collection.
+        
+        Content already in storage (same hash) is not copied again. The new
+        collection, its files and memberships are committed together; the
+        files are owned by the importing user and renamed with (#) suffixes
+        on name clashes.
+        
+        Args:
+            archive_path (str): Archive to import
+            collection_name (str, optional): Name for the new collection
+                (default: the archived name, with a (#) suffix if taken)
+            progress_callback (callable, optional): (bytes_read, total_bytes, status_text)
+            cancel_token (optional): Object with is_cancelled()
+            
+        Returns:
+            tuple: (success: bool, message: str, collection_data: dict or None)
+        """
+        archive = CollectionArchive(self.file_storage)
+        try:
+            imported = archive.ingest(archive_path, progress_callback=progress_callback,
+                                      cancel_token=cancel_token)
+        except CopyCancelled:
+            return False, "Import cancelled", None
+        except (OSError, ValueError, KeyError, tarfile.TarError, zipfile.BadZipFile) as e:
+            return False, f"Error importing collection: {str(e)}", None
+        
+        archived = imported['manifest'].get('collection', {})
+        with self.store.batch() as batch:
+            existing = {existing_name.lower() for existing_name in self.store.get_collection_names()}
+            base_name = collection_name or archived.get('name') or 'Imported Collection'
+            name = base_name
+            counter = 1
+            while name.lower() in existing:
+                name = f"{base_name} ({counter})"
+                counter += 1
+            
+            collection_data = {
+                'id': self.store.allocate_collection_id(),
+                'name': name,
+                'icon': archived.get('icon', 'folder.png'),
+                'files': [],
+                'created_by': self.username,
+                'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self.store.put_collection(collection_data)
+            
+            allocator = NameAllocator(self.store)
+            for entry in imported['files']:
+                file_data = {field: entry[field] for field in IMPORTED_FIELDS if field in entry}
+                file_data.update({
+                    'file_id': self.store.allocate_file_id(),
+                    'filename': allocator.allocate(entry.get('filename') or 'Untitled'),
+                    'file_path': entry['file_path'],
+                    'collection': name,
+                    'uploader': self.username,
+                    'role': self.primary_role,
+                    'is_deleted': False,
+                    'sha256': entry['sha256'],
+                    'size': entry['size']
+                })
+                self.store.put_file(file_data)
+                self.store.add_file_to_collection(collection_data['id'], file_data['file_id'])
+            self.store.save_files()
+            self.store.save_collections()
+        
+        if not batch.success:
+            archive.release_imported(imported['files'])
+            return False, "Error importing collection: could not save data", None
+        
+        message = (f"Imported {len(imported['files'])} file(s) into '{name}' "
+                   f"({imported['deduplicated']} already stored)")
+        if imported['errors']:
+            message += f"; {len(imported['errors'])} file(s) missing from the archive"
+        return True, message, collection_data
+    
     # ==================== COLLECTION HELPER METHODS ====================
     
     def _get_collection_by_id(self, collection_id: int) -> Optional[Dict]:
@@ -938,19 +1495,39 @@ class DocumentController:
             dict: Collection data or None if not found
         """
         try:
-            collections_path = get_mock_data_path('collections_data.json')
-            with open(collections_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            collections = data.get('collections', [])
-            for collection in collections:
-                if collection.get('id') == collection_id:
-                    return collection
-            return None
+            return self.store.get_collection(collection_id)
         except Exception as e:
             print(f"Error getting collection by ID {collection_id}: {str(e)}")
             return None
     
+    def get_collection_id(self, name: str) -> Optional[int]:
+        """
+        Get a collection's ID by name without copying its file records.
+        
+        Args:
+            name (str): Collection name
+            
+        Returns:
+            int or None: Collection ID, or None if not found
+        """
+        return self.store.get_collection_id(name)
+    
+    def get_collection_by_name(self, name: str) -> Optional[Dict]:
+        """
+        Get full collection data by name.
+        
+        Args:
+            name (str): Collection name
+            
+        Returns:
+            dict: Collection data or None if not found
+        """
+        try:
+            return self.store.get_collection_by_name(name)
+        except Exception as e:
+            print(f"Error getting collection '{name}': {str(e)}")
+            return None
+    
     def _get_collection_name_by_id(self, collection_id: int) -> Optional[str]:
         """
         Get collection name from ID.
@@ -961,8 +1538,12 @@ class DocumentController:
         Returns:
             str: Collection name or None if not found
         """
-        collection = self._get_collection_by_id(collection_id)
-        return collection.get('name') if collection else None
+        try:
+            # Reads the name only; the member records are never copied
+            return self.store.get_collection_name(collection_id)
+        except Exception as e:
+            print(f"Error getting collection by ID {collection_id}: {str(e)}")
+            return None
     
     # ==================== UTILITY METHODS ====================
     
@@ -976,27 +1557,85 @@ class DocumentController:
         Returns:
             dict or None: File details if found
         """
-        files = get_uploaded_files()
+        return self.store.get_file(file_id, deleted=False)
+    
+    def can_preview(self, file_data: Dict) -> bool:
+        """
+        Check if a content thumbnail can be shown for a file.
         
-        for file_data in files:
-            if file_data.get('file_id') == file_id:
-                return file_data
+        Args:
+            file_data (dict): File record
+            
+        Returns:
+            bool: True for stored images (and PDFs when a renderer is installed)
+        """
+        return (bool(file_data.get('sha256'))
+                and not file_data.get('is_deleted', False)
+                and can_preview(file_data.get('extension')))
+    
+    def get_cached_thumbnail(self, file_data: Dict, size: int = DEFAULT_THUMBNAIL_SIZE) -> Optional[str]:
+        """
+        Get the path of an already generated thumbnail (never decodes the original).
         
-        return None
+        Args:
+            file_data (dict): File record
+            size (int): Longest edge in pixels
+            
+        Returns:
+            str or None: Thumbnail path, or None if not cached
+        """
+        if not self.can_preview(file_data):
+            return None
+        return self.thumbnail_cache.get_cached(file_data['sha256'], size)
+    
+    def get_thumbnail(self, file_data: Dict, size: int = DEFAULT_THUMBNAIL_SIZE) -> Optional[str]:
+        """
+        Get a thumbnail of a file, generating it if needed.
+        
+        Blocking - call from a worker (see utils/thumbnail_loader.py).
+        
+        Args:
+            file_data (dict): File record
+            size (int): Longest edge in pixels
+            
+        Returns:
+            str or None: Thumbnail path, or None if no preview can be made
+        """
+        if not self.can_preview(file_data):
+            return None
+        source_path = self.file_storage.get_file_path(file_data.get('file_path', ''))
+        return self.thumbnail_cache.get_thumbnail(
+            source_path, file_data['sha256'], file_data.get('extension'), size)
     
     def get_storage_info(self) -> Dict:
         """
         Get storage usage information.
         
+        Totals come from the incremental storage accounting; storage_data.json
+        only supplies the vault quota (total_size_gb).
+        
         Returns:
-            dict: Storage information
+            dict: Storage information with total_size_gb (the quota, capped
+                  by the disk), used_size_gb, free_size_gb, usage_percentage,
+                  quota_size_gb, logical_size_gb, recycle_bin_size_gb,
+                  by_category and by_uploader
         """
-        return get_storage_data()
+        quota_gb = get_storage_data().get('total_size_gb')
+        return self.storage_accounting.get_storage_info(quota_gb)
     
-    def cleanup_old_recycle_bin_files(self, days: int = 15) -> Tuple[bool, str, int]:
+    def reconcile_storage(self) -> Dict:
+        """
+        Check the storage totals against the files on disk (walks FileStorage).
+        
+        Returns:
+            dict: Reconcile result (disk_bytes, accounted_bytes, drift_bytes, rebuilt)
+        """
+        return self.storage_accounting.reconcile()
+    
+    def cleanup_old_recycle_bin_files(self, days: int = RECYCLE_BIN_RETENTION_DAYS) -> Tuple[bool, str, int]:
         """
         Automatically cleanup files from RecycleBin older than specified days.
-        Also removes them from deleted_files in JSON.
+        Also removes them from the files data.
         
         Args:
             days (int): Number of days after which files should be deleted (default: 15)
@@ -1004,42 +1643,97 @@ class DocumentController:
         Returns:
             tuple: (success: bool, message: str, count: int)
         """
-        try:
-            # Cleanup physical files from RecycleBin
-            result = self.file_storage.cleanup_old_recycle_bin_files(days)
-            
-            if not result['success']:
-                return False, result.get('error', 'Cleanup failed'), 0
-            
-            deleted_filenames = result.get('deleted_files', [])
-            deleted_count = result.get('deleted_count', 0)
+        return self.purge_expired_recycle_bin(retention_days=days)
+    
+    def purge_expired_recycle_bin(self, retention_days: int = RECYCLE_BIN_RETENTION_DAYS,
+                                  batch_size: Optional[int] = None) -> Tuple[bool, str, int]:
+        """
+        Permanently delete recycle-bin entries whose retention has run out.
+        
+        Due entries come from the expiry index (no directory walk) and are
+        removed in batches of batch_size with one metadata commit per batch.
+        The store lock is released between batches.
+        
+        Args:
+            retention_days (int): Days a file stays in the recycle bin
+            batch_size (int, optional): Entries removed per commit (default:
+                                        PURGE_BATCH_SIZES for the store's backend)
             
-            if deleted_count > 0:
-                # Remove entries from files array in JSON (permanently delete)
-                files_path = get_mock_data_path('files_data.json')
-                with open(files_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                all_files = data.get('files', [])
-                
-                # Filter out files that were auto-deleted
-                updated_files = []
-                for file_data in all_files:
-                    recycle_bin_path = file_data.get('recycle_bin_path')
-                    if recycle_bin_path not in deleted_filenames:
-                        updated_files.append(file_data)
-                
-                data['files'] = updated_files
-                
-                with open(files_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                
-                return True, f"Automatically cleaned up {deleted_count} old file(s) from recycle bin", deleted_count
-            else:
-                return True, "No old files to cleanup", 0
+        Returns:
+            tuple: (success: bool, message: str, count: int)
+        """
+        if batch_size is None:
+            backend_name = getattr(self.store.backend, 'name', None)
+            batch_size = PURGE_BATCH_SIZES.get(backend_name, PURGE_BATCH_SIZE)
+        
+        purged_count = 0
+        try:
+            while True:
+                due_ids = self.expiry_index.due_file_ids(retention_days, limit=batch_size)
+                if not due_ids:
+                    break
+                if purged_count:
+                    time.sleep(PURGE_BATCH_PAUSE)
                 
+                success, purged = self._purge_recycle_bin_batch(due_ids)
+                if not success:
+                    return False, f"Error during cleanup after {purged_count} file(s): could not save files data", purged_count
+                purged_count += purged
+            
+            if purged_count > 0:
+                return True, f"Automatically cleaned up {purged_count} old file(s) from recycle bin", purged_count
+            return True, "No old files to cleanup", 0
+        
         except Exception as e:
-            return False, f"Error during cleanup: {str(e)}", 0
+            return False, f"Error during cleanup: {str(e)}", purged_count
+    
+    def _purge_recycle_bin_batch(self, file_ids: List[int]) -> Tuple[bool, int]:
+        """
+        Permanently delete one batch of recycle-bin entries in a single commit.
+        
+        Args:
+            file_ids (list): IDs of expired, soft-deleted files
+            
+        Returns:
+            tuple: (success: bool, purged_count: int)
+        """
+        removed = []
+        with self.store.batch() as batch:
+            for file_id in file_ids:
+                file_data = self.store.get_file(file_id, deleted=True)
+                if file_data is None:
+                    # Gone or restored since it was indexed
+                    self.expiry_index.discard(file_id)
+                    continue
+                self.store.remove_file(file_id)
+                self.store.remove_file_from_all_collections(file_id)
+                removed.append(file_data)
+            self.store.save_files()
+            self.store.save_collections()
+        
+        if not batch.success:
+            return False, 0
+        
+        # Physical cleanup only after the metadata no longer references the files
+        for file_data in removed:
+            recycle_bin_path = file_data.get('recycle_bin_path')
+            if recycle_bin_path:
+                result = self.file_storage.permanent_delete_from_recycle_bin(recycle_bin_path)
+                if not result['success']:
+                    print(f"⚠ Warning: {result.get('error')}")
+        self._release_stored_files(removed)
+        
+        print(f"✓ Purged {len(removed)} expired file(s) from recycle bin")
+        return True, len(removed)
+    
+    def next_recycle_bin_expiry(self, retention_days: int = RECYCLE_BIN_RETENTION_DAYS) -> Optional[float]:
+        """
+        Get when the next recycle-bin entry expires.
+        
+        Returns:
+            float or None: Epoch seconds, or None if the recycle bin is empty
+        """
+        return self.expiry_index.next_expiry(retention_days)
     
     def get_recycle_bin_file_info(self, filename: str, deleted_at: str = None) -> Optional[Dict]:
         """
@@ -1053,24 +1747,106 @@ class DocumentController:
             dict or None: File info with age_days, days_remaining
         """
         try:
-            deleted_files = self.get_deleted_files()
-            
-            for file_data in deleted_files:
-                if file_data['filename'] == filename:
-                    if deleted_at is None or file_data.get('deleted_at') == deleted_at:
-                        recycle_bin_path = file_data.get('recycle_bin_path')
-                        if recycle_bin_path:
-                            age_days = self.file_storage.get_recycle_bin_file_age(recycle_bin_path)
-                            if age_days is not None:
-                                file_data['age_days'] = age_days
-                                file_data['days_remaining'] = max(0, 15 - age_days)
-                        return file_data
+            for file_data in self.store.find_files(is_deleted=True, filename=filename):
+                if not self.can_view_file(file_data):
+                    continue
+                if deleted_at is None or file_data.get('deleted_at') == deleted_at:
+                    self._annotate_recycle_bin_ages([file_data])
+                    return file_data
             
             return None
         except Exception as e:
             print(f"Error getting recycle bin file info: {str(e)}")
             return None
     
+    def list_recycle_bin(self, verify_files: bool = False) -> List[Dict]:
+        """
+        Get every recycle-bin entry the user can see, with its age.
+        
+        Ages come from the deletion times kept by the expiry index, so the
+        whole listing is computed in one pass without touching the disk.
+        
+        Args:
+            verify_files (bool): Also check that each entry's content is still
+                                 on disk (one directory listing per folder)
+            
+        Returns:
+            list: Deleted file records with age_days and days_remaining (None
+                  if the deletion time is unknown), plus file_exists when
+                  verify_files is set
+        """
+        files = self.get_deleted_files()
+        self._annotate_recycle_bin_ages(files)
+        
+        if verify_files:
+            paths = {f['file_id']: self._recycle_bin_content_path(f) for f in files}
+            existing = self.file_storage.find_existing_files(p for p in paths.values() if p)
+            for file_data in files:
+                file_data['file_exists'] = paths[file_data['file_id']] in existing
+        
+        return files
+    
+    def _annotate_recycle_bin_ages(self, files: List[Dict]) -> None:
+        """
+        Set age_days and days_remaining on deleted file records (in place).
+        
+        Args:
+            files (list): Deleted file records
+        """
+        now = datetime.now().timestamp()
+        for file_data in files:
+            age_days = self._get_deleted_age_days(file_data, now)
+            file_data['age_days'] = age_days
+            file_data['days_remaining'] = (None if age_days is None
+                                           else max(0, RECYCLE_BIN_RETENTION_DAYS - age_days))
+    
+    def _recycle_bin_content_path(self, file_data: Dict) -> Optional[str]:
+        """Full path holding a deleted file's content, or None if it has none"""
+        recycle_bin_path = file_data.get('recycle_bin_path')
+        if recycle_bin_path:
+            return os.path.join(self.file_storage.recycle_bin_directory, recycle_bin_path)
+        # Content-addressed files stay where they are while deleted
+        if file_data.get('file_path'):
+            return self.file_storage.get_file_path(file_data['file_path'])
+        return None
+    
+    def get_recycle_bin_days_remaining(self, file_data: Dict) -> Optional[int]:
+        """
+        Get how many days a recycle-bin entry has left before it is purged.
+        
+        Args:
+            file_data (dict): Deleted file record
+            
+        Returns:
+            int or None: Days remaining, or None if the deletion time is unknown
+        """
+        if 'days_remaining' in file_data:
+            # Already worked out by list_recycle_bin() or query_files()
+            return file_data['days_remaining']
+        age_days = self._get_deleted_age_days(file_data)
+        if age_days is None:
+            return None
+        return max(0, RECYCLE_BIN_RETENTION_DAYS - age_days)
+    
+    def _get_deleted_age_days(self, file_data: Dict, now: Optional[float] = None) -> Optional[int]:
+        """
+        Get how many days ago a file was moved to the recycle bin.
+        
+        Args:
+            file_data (dict): Deleted file record
+            now (float, optional): Current epoch seconds
+            
+        Returns:
+            int or None: Age in days, or None if unknown
+        """
+        # deleted_at, or the RecycleBin file's mtime for legacy entries
+        deleted_ts = self.expiry_index.deleted_timestamp(file_data.get('file_id'))
+        if deleted_ts is None:
+            return None
+        if now is None:
+            now = datetime.now().timestamp()
+        return int((now - deleted_ts) // SECONDS_PER_DAY)
+    
     def can_edit_file(self, file_data: Dict) -> bool:
         """
         Check if current user can edit a file.
@@ -1081,10 +1857,7 @@ class DocumentController:
         Returns:
             bool: True if user can edit
         """
-        if self.primary_role.lower() == 'admin':
-            return True
-        
-        return file_data.get('uploader') == self.username
+        return self.permissions.allows(file_data, PERMISSION_EDIT)
     
     def can_delete_file(self, file_data: Dict) -> bool:
         """
@@ -1096,47 +1869,44 @@ class DocumentController:
         Returns:
             bool: True if user can delete
         """
-        if self.primary_role.lower() == 'admin':
-            return True
+        return self.permissions.allows(file_data, PERMISSION_DELETE)
+    
+    def can_approve_file(self, file_data: Dict) -> bool:
+        """
+        Check if current user can accept or reject a file.
         
-        return file_data.get('uploader') == self.username
+        Args:
+            file_data (dict): File data to check
+            
+        Returns:
+            bool: True if user can approve
+        """
+        return self.permissions.allows(file_data, PERMISSION_APPROVE)
     
-    def update_file_collection(self, filename: str, collection_name: str = None, timestamp: str = None) -> Tuple[bool, str]:
+    def update_file_collection(self, file_id: int, collection_name: str = None) -> Tuple[bool, str]:
         """
         Update the collection field for a specific file.
         
         Args:
-            filename (str): Name of the file
+            file_id (int): Unique file ID (REQUIRED)
             collection_name (str, optional): New collection name (None to remove from collection)
-            timestamp (str, optional): File timestamp for identification
             
         Returns:
             tuple: (success: bool, message: str)
         """
         try:
-            files_path = get_mock_data_path('files_data.json')
-            with open(files_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            uploaded_files = data.get('uploaded_files', [])
-            file_found = False
-            
-            for file_data in uploaded_files:
-                if file_data['filename'] == filename:
-                    if timestamp is None or file_data.get('timestamp') == timestamp:
-                        file_data['collection'] = collection_name or 'None'
-                        file_found = True
-                        break
-            
-            if file_found:
-                data['uploaded_files'] = uploaded_files
+            file_data = self.store.get_file(file_id, deleted=False)
+            
+            if file_data:
+                file_data['collection'] = collection_name or 'None'
+                self.store.put_file(file_data)
                 
-                with open(files_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
+                if not self.store.save_files():
+                    return False, "Error updating file collection: could not save files data"
                 
                 return True, f"File collection updated successfully"
             else:
-                return False, f"File '{filename}' not found"
+                return False, f"File with ID {file_id} not found"
                 
         except Exception as e:
             return False, f"Error updating file collection: {str(e)}"
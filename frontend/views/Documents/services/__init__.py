@@ -4,5 +4,17 @@ Services package for document management system
 
 from .file_storage_service import FileStorageService
 from .document_crud_service import DocumentCRUDService
+from .document_store import DocumentStore, get_document_store
+from .blob_store import BlobStore, get_blob_store
+from .change_feed import DocumentChangeFeed, get_change_feed
+from .search_index import DocumentSearchIndex, get_search_index
+from .thumbnail_cache import ThumbnailCache, get_thumbnail_cache
+from .upload_pipeline import NameAllocator, UploadPipeline
+from .collection_archive import CollectionArchive
+from .permission_index import PermissionIndex, get_permission_index
 
-__all__ = ['FileStorageService', 'DocumentCRUDService']
+__all__ = ['FileStorageService', 'DocumentCRUDService', 'DocumentStore', 'get_document_store',
+           'BlobStore', 'get_blob_store', 'DocumentChangeFeed', 'get_change_feed',
+           'DocumentSearchIndex', 'get_search_index', 'ThumbnailCache', 'get_thumbnail_cache',
+           'NameAllocator', 'UploadPipeline', 'CollectionArchive',
+           'PermissionIndex', 'get_permission_index']
@@ -0,0 +1,293 @@
+"""
+Blob Store
+
+Content-addressed storage for uploaded documents. Each distinct payload is
+stored once under FileStorage/blobs/<aa>/<bb>/<sha256>, and file records
+reference it by path. Reference counts are kept per blob so soft deletes and
+restores never touch the disk; the blob is only unlinked when the last record
+referencing it is permanently deleted.
+
+Reference counts are derived from the document store on first use (every
+record whose file_path points into blobs/, deleted or not, holds one
+reference) and then maintained incrementally.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+
+BLOB_DIRNAME = "blobs"
+
+
+def is_blob_path(relative_path):
+    """
+    Check whether a stored relative path points into the blob store.
+
+    Args:
+        relative_path (str): file_path from a file record
+
+    Returns:
+        bool: True for content-addressed files
+    """
+    if not relative_path:
+        return False
+    return relative_path.replace("\\", "/").startswith(BLOB_DIRNAME + "/")
+
+
+def blob_relative_path(sha256):
+    """
+    Relative path of a blob inside the storage directory.
+
+    Args:
+        sha256 (str): Hex digest of the content
+
+    Returns:
+        str: Path like "blobs/ab/cd/abcd..."
+    """
+    return "/".join((BLOB_DIRNAME, sha256[:2], sha256[2:4], sha256))
+
+
+def sha256_from_path(relative_path):
+    """Extract the digest from a blob relative path"""
+    return relative_path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+class BlobStore:
+    """
+    Content-addressed, reference-counted blob storage.
+
+    Args:
+        storage_directory (str): FileStorage root; blobs live in its blobs/ folder
+    """
+
+    def __init__(self, storage_directory):
+        self.storage_directory = storage_directory
+        self.blob_directory = os.path.join(storage_directory, BLOB_DIRNAME)
+        self._lock = threading.RLock()
+        self._refs: Dict[str, int] = {}
+        self._sizes: Dict[str, int] = {}
+        self._loaded = False
+
+    # ==================== REFERENCE COUNTS ====================
+
+    def _ensure_loaded(self):
+        """Derive reference counts from the document store (once)"""
+        if self._loaded:
+            return
+        from .document_store import get_document_store
+
+        refs = {}
+        sizes = {}
+        for record in get_document_store().find_files(is_deleted=None):
+            file_path = record.get('file_path')
+            if not is_blob_path(file_path):
+                continue
+            sha256 = sha256_from_path(file_path)
+            refs[sha256] = refs.get(sha256, 0) + 1
+            if record.get('size') is not None:
+                sizes[sha256] = record['size']
+
+        self._refs = refs
+        self._sizes = sizes
+        self._loaded = True
+
+    def reload(self):
+        """Drop cached reference counts; they are rebuilt on next use"""
+        with self._lock:
+            self._loaded = False
+
+    def ref_count(self, sha256):
+        """
+        Get the number of records referencing a blob.
+
+        Args:
+            sha256 (str): Hex digest of the content
+
+        Returns:
+            int: Reference count (0 if unknown)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._refs.get(sha256, 0)
+
+    # ==================== BLOB OPERATIONS ====================
+
+    def get_blob_path(self, sha256):
+        """Absolute path of a blob"""
+        return os.path.join(self.storage_directory, *blob_relative_path(sha256).split("/"))
+
+    def ingest(self, staged_path, sha256, size):
+        """
+        Move a fully copied, hashed file into the store and add a reference.
+
+        If a blob with the same digest already exists, the staged copy is
+        discarded and only the reference count grows.
+
+        Args:
+            staged_path (str): Completed copy on the same filesystem as the store
+            sha256 (str): Hex digest of the staged file
+            size (int): Size of the staged file in bytes
+
+        Returns:
+            dict: Result with keys:
+                - file_path (str): Relative blob path for the file record
+                - deduplicated (bool): True if the content was already stored
+        """
+        with self._lock:
+            self._ensure_loaded()
+            blob_path = self.get_blob_path(sha256)
+
+            if os.path.exists(blob_path):
+                os.remove(staged_path)
+                deduplicated = True
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(staged_path, blob_path)
+                deduplicated = False
+
+            self._refs[sha256] = self._refs.get(sha256, 0) + 1
+            self._sizes[sha256] = size
+
+            if deduplicated:
+                print(f"✓ Deduplicated upload: blob {sha256[:12]} now has {self._refs[sha256]} reference(s)")
+
+            return {
+                "file_path": blob_relative_path(sha256),
+                "deduplicated": deduplicated
+            }
+
+    def add_ref(self, sha256):
+        """
+        Add a reference to an existing blob.
+
+        Returns:
+            int: New reference count
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._refs[sha256] = self._refs.get(sha256, 0) + 1
+            return self._refs[sha256]
+
+    def release(self, sha256):
+        """
+        Drop a reference; unlink the blob once nothing references it.
+
+        Call this only after the record that held the reference is gone
+        from the saved metadata.
+
+        Args:
+            sha256 (str): Hex digest of the content
+
+        Returns:
+            bool: True if the blob was physically removed
+        """
+        with self._lock:
+            self._ensure_loaded()
+            count = self._refs.get(sha256, 0) - 1
+            if count > 0:
+                self._refs[sha256] = count
+                return False
+
+            self._refs.pop(sha256, None)
+            self._sizes.pop(sha256, None)
+            blob_path = self.get_blob_path(sha256)
+            try:
+                os.remove(blob_path)
+            except FileNotFoundError:
+                return False
+            print(f"✓ Removed blob {sha256[:12]} (no references left)")
+            return True
+
+    def collect_garbage(self):
+        """
+        Remove blobs that no record references (e.g. after a crash between
+        copying a file and saving its record).
+
+        Returns:
+            dict: Result with removed_count and freed_bytes
+        """
+        with self._lock:
+            # In-flight uploads already hold a reference, so they are kept
+            self._ensure_loaded()
+
+            removed_count = 0
+            freed_bytes = 0
+            for dirpath, _dirnames, filenames in os.walk(self.blob_directory):
+                for name in filenames:
+                    if self._refs.get(name):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        size = os.path.getsize(path)
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    removed_count += 1
+                    freed_bytes += size
+
+            return {"removed_count": removed_count, "freed_bytes": freed_bytes}
+
+    # ==================== REPORTING ====================
+
+    def get_usage(self):
+        """
+        Report logical vs physical bytes held by the blob store.
+
+        Logical bytes count every referencing record; physical bytes count
+        each stored blob once.
+
+        Returns:
+            dict: Usage with keys logical_bytes, physical_bytes, saved_bytes,
+                  blob_count, reference_count, dedup_ratio
+        """
+        with self._lock:
+            self._ensure_loaded()
+
+            logical_bytes = 0
+            physical_bytes = 0
+            for sha256, count in self._refs.items():
+                size = self._sizes.get(sha256)
+                if size is None:
+                    try:
+                        size = os.path.getsize(self.get_blob_path(sha256))
+                    except OSError:
+                        size = 0
+                    self._sizes[sha256] = size
+                logical_bytes += size * count
+                physical_bytes += size
+
+            return {
+                "logical_bytes": logical_bytes,
+                "physical_bytes": physical_bytes,
+                "saved_bytes": logical_bytes - physical_bytes,
+                "blob_count": len(self._refs),
+                "reference_count": sum(self._refs.values()),
+                "dedup_ratio": round(logical_bytes / physical_bytes, 2) if physical_bytes else 1.0
+            }
+
+
+_blob_stores: Dict[str, BlobStore] = {}
+_blob_stores_lock = threading.Lock()
+
+
+def get_blob_store(storage_directory) -> BlobStore:
+    """
+    Get the process-wide blob store for a storage directory.
+
+    Reference counts must be shared by every FileStorageService instance,
+    so stores are cached per directory.
+
+    Args:
+        storage_directory (str): FileStorage root
+
+    Returns:
+        BlobStore: Shared instance
+    """
+    key = os.path.abspath(storage_directory)
+    with _blob_stores_lock:
+        store: Optional[BlobStore] = _blob_stores.get(key)
+        if store is None:
+            store = BlobStore(key)
+            _blob_stores[key] = store
+        return store
@@ -0,0 +1,238 @@
+"""
+Document Change Feed
+
+Revisioned log of committed file and collection changes, keyed by file_id.
+
+Every commit of the document store (see DocumentStore.add_listener) becomes
+one revision holding insert/update/delete deltas. Views remember the
+revision they last applied and ask for changes_since(revision) instead of
+re-reading every file after an upload, delete or restore. Deltas for the
+same file are coalesced, so a file inserted and then deleted between two
+reads does not show up at all.
+
+If the store is reloaded from the backend, or a reader falls further
+behind than the log keeps, the result is flagged 'reset' and the reader
+reloads its list.
+"""
+
+import copy
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from .document_store import get_document_store
+
+
+# Revisions kept for changes_since(); older readers get a reset
+CHANGE_LOG_SIZE = 1000
+
+
+class DocumentChangeFeed:
+    """
+    Revisioned change feed over the document store.
+
+    Args:
+        store (DocumentStore, optional): Defaults to the shared store
+        max_revisions (int): Revisions kept in the log
+    """
+
+    def __init__(self, store=None, max_revisions=CHANGE_LOG_SIZE):
+        self._store = store
+        self._lock = threading.RLock()
+        self._revision = 0
+        self._log = deque(maxlen=max_revisions)   # [(revision, change)]
+        self._reset_revision = 0                  # Last revision that was a reload
+        self._known_ids = set()                   # File IDs committed so far
+        self._subscribers = []
+        self._files_seen = False
+        self._collections_seen = False
+
+        self.store.add_listener(self._on_store_event)
+        # Load both halves of the store now so later reloads count as resets
+        known_ids = self.store.get_file_ids()
+        self.store.get_collection_counts()
+        with self._lock:
+            self._known_ids = known_ids
+            self._files_seen = True
+            self._collections_seen = True
+
+    @property
+    def store(self):
+        """Document store the feed follows"""
+        return self._store or get_document_store()
+
+    @property
+    def revision(self) -> int:
+        """Current revision (increases with every committed change)"""
+        with self._lock:
+            return self._revision
+
+    # ==================== RECORDING ====================
+
+    def _on_store_event(self, event, payload):
+        """Document store listener: turn commits into revisions"""
+        with self._lock:
+            if event == 'files_committed':
+                inserted = []
+                updated = []
+                for record in payload.get('upserts', ()):
+                    file_id = record.get('file_id')
+                    if file_id in self._known_ids:
+                        updated.append(copy.deepcopy(record))
+                    else:
+                        self._known_ids.add(file_id)
+                        inserted.append(copy.deepcopy(record))
+                deleted = list(payload.get('deletes', ()))
+                self._known_ids.difference_update(deleted)
+                self._record({'inserted': inserted, 'updated': updated, 'deleted': deleted})
+            elif event == 'collections_committed':
+                self._record({
+                    'collections_changed': list(payload.get('upserts', ())),
+                    'collections_deleted': list(payload.get('deletes', ())),
+                    'memberships_added': list(payload.get('membership_adds', ())),
+                    'memberships_removed': list(payload.get('membership_deletes', ()))
+                })
+            elif event == 'files_reloaded':
+                self._known_ids = set(self.store.get_file_ids())
+                if self._files_seen:
+                    self._record_reset()
+                self._files_seen = True
+            elif event == 'collections_reloaded':
+                if self._collections_seen:
+                    self._record_reset()
+                self._collections_seen = True
+
+    def _record(self, change):
+        self._revision += 1
+        self._log.append((self._revision, change))
+        self._publish()
+
+    def _record_reset(self):
+        self._revision += 1
+        self._reset_revision = self._revision
+        self._log.clear()
+        self._publish()
+
+    def _publish(self):
+        for callback in list(self._subscribers):
+            try:
+                callback(self._revision)
+            except Exception as e:
+                print(f"⚠ Warning: change feed subscriber failed: {e}")
+
+    # ==================== READING ====================
+
+    def subscribe(self, callback) -> None:
+        """
+        Register a callback called with the new revision after each change.
+
+        The callback runs on the committing thread with the store lock held;
+        it should only schedule work (e.g. emit a queued Qt signal).
+
+        Args:
+            callback (callable): Function taking the new revision
+        """
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        """Unregister a callback added with subscribe()"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def changes_since(self, revision: int) -> Dict:
+        """
+        Get the coalesced changes committed after a revision.
+
+        Args:
+            revision (int): Revision the reader last applied
+
+        Returns:
+            dict: Changes with keys:
+                - revision (int): Revision to pass next time
+                - reset (bool): True if the reader must reload everything
+                - inserted (list): Records of new files
+                - updated (list): Latest records of changed files
+                - deleted (list): IDs of removed files
+                - memberships_added / memberships_removed (list): (collection_id, file_id)
+                - collections_changed / collections_deleted (list): Collection IDs
+        """
+        with self._lock:
+            changes = {
+                'revision': self._revision,
+                'reset': False,
+                'inserted': [],
+                'updated': [],
+                'deleted': [],
+                'memberships_added': [],
+                'memberships_removed': [],
+                'collections_changed': [],
+                'collections_deleted': []
+            }
+            if revision >= self._revision:
+                return changes
+            oldest = self._log[0][0] if self._log else self._revision + 1
+            if revision < self._reset_revision or revision < oldest - 1:
+                changes['reset'] = True
+                return changes
+
+            files = {}          # {file_id: (first op was insert, record or None)}
+            memberships = {}    # {(collection_id, file_id): added?}
+            collections = {}    # {collection_id: deleted?}
+            for entry_revision, change in self._log:
+                if entry_revision <= revision:
+                    continue
+                for record in change.get('inserted', ()):
+                    file_id = record.get('file_id')
+                    was_inserted = files[file_id][0] if file_id in files else True
+                    files[file_id] = (was_inserted, record)
+                for record in change.get('updated', ()):
+                    file_id = record.get('file_id')
+                    was_inserted = files[file_id][0] if file_id in files else False
+                    files[file_id] = (was_inserted, record)
+                for file_id in change.get('deleted', ()):
+                    was_inserted = files[file_id][0] if file_id in files else False
+                    files[file_id] = (was_inserted, None)
+                for row in change.get('memberships_added', ()):
+                    memberships[tuple(row)] = True
+                for row in change.get('memberships_removed', ()):
+                    memberships[tuple(row)] = False
+                for collection_id in change.get('collections_changed', ()):
+                    collections.setdefault(collection_id, False)
+                for collection_id in change.get('collections_deleted', ()):
+                    collections[collection_id] = True
+
+            for file_id, (was_inserted, record) in files.items():
+                if record is None:
+                    if not was_inserted:
+                        changes['deleted'].append(file_id)
+                elif was_inserted:
+                    changes['inserted'].append(record)
+                else:
+                    changes['updated'].append(record)
+            for row, added in memberships.items():
+                changes['memberships_added' if added else 'memberships_removed'].append(row)
+            for collection_id, deleted in collections.items():
+                changes['collections_deleted' if deleted else 'collections_changed'].append(collection_id)
+            return changes
+
+
+_change_feed: Optional[DocumentChangeFeed] = None
+_change_feed_lock = threading.Lock()
+
+
+def get_change_feed() -> DocumentChangeFeed:
+    """
+    Get the process-wide change feed, creating it on first use.
+
+    Returns:
+        DocumentChangeFeed: Shared change feed
+    """
+    global _change_feed
+    if _change_feed is None:
+        with _change_feed_lock:
+            if _change_feed is None:
+                _change_feed = DocumentChangeFeed()
+    return _change_feed
@@ -0,0 +1,399 @@
+"""
+Collection Archive
+
+Moves a whole collection in or out of the vault as one archive.
+
+Layout (zip, tar or tar.gz):
+    manifest.json           collection metadata and one entry per file
+    content/<sha256>        file content, once per distinct hash
+    content/file-<file_id>  content of legacy records that have no hash
+
+The manifest is written first so an import can read a tar sequentially.
+File content is moved through chunk generators, so memory use stays
+constant regardless of the collection size. On import, content whose hash
+is already in the blob store is not copied again.
+"""
+
+import hashlib
+import json
+import os
+import tarfile
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .blob_store import blob_relative_path, get_blob_store
+from .copy_engine import DEFAULT_BUFFER_SIZE, CopyCancelled
+
+
+ARCHIVE_FORMAT_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+CONTENT_PREFIX = "content/"
+
+# Record fields carried over on import (uploader, IDs and paths are reassigned)
+IMPORTED_FIELDS = ('filename', 'extension', 'category', 'description',
+                   'uploaded_date', 'time', 'timestamp', 'approval_status')
+
+
+def archive_format(archive_path: str) -> str:
+    """
+    Pick the archive format from a file name.
+
+    Returns:
+        str: "zip", "tar" or "tar.gz"
+
+    Raises:
+        ValueError: For unsupported extensions
+    """
+    lower = archive_path.lower()
+    if lower.endswith('.zip'):
+        return 'zip'
+    if lower.endswith('.tar.gz') or lower.endswith('.tgz'):
+        return 'tar.gz'
+    if lower.endswith('.tar'):
+        return 'tar'
+    raise ValueError("Archive must be a .zip, .tar or .tar.gz file")
+
+
+def iter_chunks(fileobj, buffer_size=DEFAULT_BUFFER_SIZE, cancel_token=None) -> Iterator[bytes]:
+    """
+    Yield a file object's data in fixed-size chunks.
+
+    Raises:
+        CopyCancelled: If cancel_token was triggered
+    """
+    while True:
+        if cancel_token is not None and cancel_token.is_cancelled():
+            raise CopyCancelled()
+        chunk = fileobj.read(buffer_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def counted(chunks: Iterator[bytes], on_bytes: Callable) -> Iterator[bytes]:
+    """Pass chunks through, reporting each chunk's length to on_bytes"""
+    for chunk in chunks:
+        on_bytes(len(chunk))
+        yield chunk
+
+
+class _ChunkReader:
+    """File-like object over a chunk generator (feeds tarfile.addfile)"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._chunk = b''
+        self._offset = 0
+
+    def read(self, size=-1):
+        parts = []
+        while size != 0:
+            if self._offset >= len(self._chunk):
+                self._chunk = next(self._chunks, None)
+                self._offset = 0
+                if self._chunk is None:
+                    self._chunk = b''
+                    break
+            end = len(self._chunk) if size < 0 else min(len(self._chunk), self._offset + size)
+            parts.append(self._chunk[self._offset:end])
+            if size > 0:
+                size -= end - self._offset
+            self._offset = end
+        return b''.join(parts)
+
+
+class CollectionArchive:
+    """
+    Streaming export and import of collection archives.
+
+    Args:
+        file_storage (FileStorageService): Storage holding the file content
+        buffer_size (int): Chunk size in bytes
+    """
+
+    def __init__(self, file_storage, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.file_storage = file_storage
+        self.blob_store = get_blob_store(file_storage.storage_directory)
+        self.buffer_size = buffer_size
+
+    # ==================== EXPORT ====================
+
+    def build_manifest(self, collection: Dict, records: List[Dict]) -> Dict:
+        """
+        Describe a collection and its files, assigning each file a content entry.
+
+        Args:
+            collection (dict): Collection metadata
+            records (list): File records in the collection
+
+        Returns:
+            dict: Manifest (see module docstring); every file entry has a
+                  'content' archive name and a 'source' path for the export
+        """
+        files = []
+        for record in records:
+            sha256 = record.get('sha256')
+            content = CONTENT_PREFIX + (sha256 if sha256 else f"file-{record['file_id']}")
+            entry = {field: record.get(field) for field in IMPORTED_FIELDS if record.get(field) is not None}
+            entry.update({
+                'file_id': record['file_id'],
+                'uploader': record.get('uploader'),
+                'sha256': sha256,
+                'size': record.get('size'),
+                'content': content,
+                'source': self.file_storage.get_file_path(record.get('file_path', ''))
+            })
+            files.append(entry)
+
+        return {
+            'format_version': ARCHIVE_FORMAT_VERSION,
+            'exported_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'collection': {key: value for key, value in collection.items() if key != 'files'},
+            'files': files
+        }
+
+    def export(self, collection: Dict, records: List[Dict], archive_path: str,
+               progress_callback: Optional[Callable] = None, cancel_token=None) -> Dict:
+        """
+        Write a collection archive.
+
+        The archive is written next to archive_path and renamed into place
+        when complete, so a cancelled export leaves no partial archive.
+
+        Args:
+            collection (dict): Collection metadata
+            records (list): File records to include
+            archive_path (str): Destination (.zip, .tar or .tar.gz)
+            progress_callback (callable, optional): (bytes_written, total_bytes, status_text)
+            cancel_token (optional): Object with is_cancelled()
+
+        Returns:
+            dict: files (entries written), contents (distinct contents), bytes
+
+        Raises:
+            CopyCancelled: If cancelled
+            OSError: If a source file is missing or unreadable
+        """
+        fmt = archive_format(archive_path)
+        manifest = self.build_manifest(collection, records)
+
+        # One content entry per distinct hash (or per legacy file)
+        contents = {}
+        for entry in manifest['files']:
+            if entry['content'] not in contents:
+                contents[entry['content']] = (entry['source'], entry.get('filename'))
+        total = 0
+        for source, _name in contents.values():
+            total += os.path.getsize(source)
+
+        manifest_bytes = json.dumps(
+            {**manifest, 'files': [{k: v for k, v in entry.items() if k != 'source'}
+                                   for entry in manifest['files']]},
+            indent=2
+        ).encode('utf-8')
+
+        written = [0]
+
+        def on_bytes(count):
+            written[0] += count
+            if progress_callback:
+                progress_callback(written[0], total, "")
+
+        directory = os.path.dirname(os.path.abspath(archive_path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.export.', suffix='.tmp', dir=directory)
+        os.close(fd)
+        try:
+            if fmt == 'zip':
+                with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                    archive.writestr(MANIFEST_NAME, manifest_bytes)
+                    for name, (source, filename) in contents.items():
+                        if progress_callback:
+                            progress_callback(written[0], total, f"Exporting {filename}...")
+                        with open(source, 'rb') as src, archive.open(name, 'w', force_zip64=True) as dst:
+                            for chunk in counted(iter_chunks(src, self.buffer_size, cancel_token), on_bytes):
+                                dst.write(chunk)
+            else:
+                with tarfile.open(tmp_path, 'w:gz' if fmt == 'tar.gz' else 'w') as archive:
+                    info = tarfile.TarInfo(MANIFEST_NAME)
+                    info.size = len(manifest_bytes)
+                    info.mtime = int(datetime.now().timestamp())
+                    archive.addfile(info, _ChunkReader(iter([manifest_bytes])))
+                    for name, (source, filename) in contents.items():
+                        if progress_callback:
+                            progress_callback(written[0], total, f"Exporting {filename}...")
+                        stat = os.stat(source)
+                        info = tarfile.TarInfo(name)
+                        info.size = stat.st_size
+                        info.mtime = int(stat.st_mtime)
+                        with open(source, 'rb') as src:
+                            archive.addfile(info, _ChunkReader(
+                                counted(iter_chunks(src, self.buffer_size, cancel_token), on_bytes)))
+            os.replace(tmp_path, archive_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        print(f"✓ Exported {len(manifest['files'])} file(s) to {os.path.basename(archive_path)}")
+        return {'files': len(manifest['files']), 'contents': len(contents), 'bytes': written[0]}
+
+    # ==================== IMPORT ====================
+
+    def iter_entries(self, archive_path: str) -> Iterator:
+        """
+        Read an archive in order, yielding (name, fileobj) per entry.
+
+        The manifest comes first; tar archives are read as a stream.
+        """
+        fmt = archive_format(archive_path)
+        if fmt == 'zip':
+            with zipfile.ZipFile(archive_path) as archive:
+                names = archive.namelist()
+                if MANIFEST_NAME in names:
+                    names.remove(MANIFEST_NAME)
+                    names.insert(0, MANIFEST_NAME)
+                for name in names:
+                    with archive.open(name) as fileobj:
+                        yield name, fileobj
+        else:
+            with tarfile.open(archive_path, 'r|gz' if fmt == 'tar.gz' else 'r|') as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    fileobj = archive.extractfile(member)
+                    yield member.name, fileobj
+
+    def ingest(self, archive_path: str, progress_callback: Optional[Callable] = None,
+               cancel_token=None) -> Dict:
+        """
+        Store the content of an archive, skipping content that is already stored.
+
+        Each content entry is streamed into staging and hashed in the same
+        pass, checked against the manifest and moved into the blob store.
+        Every imported file takes one blob reference; call
+        release_imported() with the result if its metadata cannot be committed.
+
+        Args:
+            archive_path (str): Archive written by export()
+            progress_callback (callable, optional): (bytes_read, total_bytes, status_text)
+            cancel_token (optional): Object with is_cancelled()
+
+        Returns:
+            dict: manifest, files (manifest entries with 'file_path' set for
+                  stored content), copied (contents written), deduplicated
+                  (contents already stored) and errors ([(filename, message)])
+
+        Raises:
+            ValueError: If the archive has no valid manifest
+            CopyCancelled: If cancelled (references taken so far are released)
+        """
+        entries = self.iter_entries(archive_path)
+        first = next(entries, None)
+        if first is None or first[0] != MANIFEST_NAME:
+            raise ValueError("Not a collection archive (manifest.json must come first)")
+        manifest = json.loads(first[1].read().decode('utf-8'))
+        if manifest.get('format_version') != ARCHIVE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported archive version: {manifest.get('format_version')}")
+
+        files_by_content = {}
+        for entry in manifest.get('files', []):
+            files_by_content.setdefault(entry['content'], []).append(entry)
+        total = sum(entries_[0].get('size') or 0 for entries_ in files_by_content.values())
+
+        stored = {}          # {content name: (sha256, size)}
+        copied = deduplicated = 0
+        done = [0]
+        taken_refs = []      # sha256 per reference taken, to undo on failure
+
+        def on_bytes(count):
+            done[0] += count
+            if progress_callback:
+                progress_callback(done[0], total, "")
+
+        try:
+            for name, fileobj in entries:
+                content_files = files_by_content.get(name)
+                if not content_files or name in stored:
+                    continue
+                expected = content_files[0].get('sha256')
+                if progress_callback:
+                    progress_callback(done[0], total, f"Importing {content_files[0].get('filename')}...")
+
+                # Known content is never copied twice
+                if expected and os.path.exists(self.blob_store.get_blob_path(expected)):
+                    stored[name] = (expected, content_files[0].get('size'))
+                    deduplicated += 1
+                    on_bytes(content_files[0].get('size') or 0)
+                    continue
+
+                sha256, size = self._stage_and_store(fileobj, expected, on_bytes, cancel_token)
+                taken_refs.append(sha256)
+                stored[name] = (sha256, size)
+                copied += 1
+
+            # One reference per imported file; ingest already took one per copy
+            prepaid = {}
+            for sha256 in taken_refs:
+                prepaid[sha256] = prepaid.get(sha256, 0) + 1
+            errors = []
+            files = []
+            for name, content_files in files_by_content.items():
+                if name not in stored:
+                    errors.extend((entry.get('filename'), "Content missing from archive")
+                                  for entry in content_files)
+                    continue
+                sha256, size = stored[name]
+                for entry in content_files:
+                    if prepaid.get(sha256):
+                        prepaid[sha256] -= 1
+                    else:
+                        self.blob_store.add_ref(sha256)
+                        taken_refs.append(sha256)
+                    files.append({**entry, 'sha256': sha256, 'size': size,
+                                  'file_path': blob_relative_path(sha256)})
+        except BaseException:
+            for sha256 in taken_refs:
+                self.blob_store.release(sha256)
+            raise
+
+        # Keep the manifest order for the records
+        order = {entry['file_id']: index for index, entry in enumerate(manifest.get('files', []))}
+        files.sort(key=lambda entry: order.get(entry['file_id'], 0))
+        return {
+            'manifest': manifest,
+            'files': files,
+            'copied': copied,
+            'deduplicated': deduplicated,
+            'errors': errors
+        }
+
+    def release_imported(self, files: List[Dict]) -> None:
+        """Drop the blob references taken by ingest() for files that were not committed"""
+        for entry in files:
+            self.blob_store.release(entry['sha256'])
+
+    def _stage_and_store(self, fileobj, expected_sha256, on_bytes, cancel_token):
+        """Stream one entry into staging while hashing it, then move it into the blob store"""
+        os.makedirs(self.file_storage.partial_directory, exist_ok=True)
+        fd, staged_path = tempfile.mkstemp(prefix='import.', suffix='.staged',
+                                           dir=self.file_storage.partial_directory)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as staged:
+                for chunk in counted(iter_chunks(fileobj, self.buffer_size, cancel_token), on_bytes):
+                    digest.update(chunk)
+                    staged.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            if expected_sha256 and sha256 != expected_sha256:
+                raise ValueError(f"Content of {expected_sha256[:12]} is corrupt (hash mismatch)")
+            self.blob_store.ingest(staged_path, sha256, size)
+            return sha256, size
+        except BaseException:
+            if os.path.exists(staged_path):
+                os.remove(staged_path)
+            raise
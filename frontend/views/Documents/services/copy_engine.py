@@ -0,0 +1,297 @@
+"""
+Copy Engine
+
+Streaming file copy used by FileStorageService. Copies in fixed-size chunks,
+reports progress per chunk, hashes the data (SHA-256) in the same pass and can
+resume an interrupted copy from its last checkpoint.
+
+When no hash is needed (e.g. moving a file whose hash is already recorded)
+the kernel zero-copy paths are used instead: os.copy_file_range, then
+os.sendfile, then a plain read/write loop.
+"""
+
+import errno
+import hashlib
+import json
+import os
+
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024  # 1 MiB per chunk
+
+# Flush data and rewrite the resume marker every this many bytes
+RESUME_CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+PARTIAL_SUFFIX = ".part"
+MARKER_SUFFIX = ".json"  # Resume marker sits next to the partial file
+
+
+class CopyCancelled(Exception):
+    """Raised when a copy is cancelled; the partial file is kept for resuming"""
+    pass
+
+
+def _check_cancelled(cancel_token):
+    """Raise CopyCancelled if the (duck-typed) cancel token was triggered"""
+    if cancel_token is not None and cancel_token.is_cancelled():
+        raise CopyCancelled("Copy cancelled")
+
+
+def _source_identity(source_path):
+    """Identify a source file so stale resume markers are ignored"""
+    st = os.stat(source_path)
+    return {
+        "source": os.path.abspath(source_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns
+    }
+
+
+def _read_marker(marker_path):
+    """Load a resume marker, returning None if missing or unreadable"""
+    try:
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_marker(marker_path, identity, offset):
+    """Atomically record how many bytes of the partial file are durable"""
+    data = dict(identity, offset=offset)
+    tmp_path = marker_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, marker_path)
+
+
+def _remove_quietly(path):
+    """Remove a file if it exists"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _resume_offset(partial_path, marker_path, identity):
+    """
+    Work out where an interrupted copy can continue from.
+
+    Returns:
+        int: Byte offset to resume from (0 starts over)
+    """
+    marker = _read_marker(marker_path)
+    if not marker or not os.path.exists(partial_path):
+        return 0
+    if any(marker.get(key) != identity[key] for key in ("source", "size", "mtime_ns")):
+        # Source changed since the interrupted copy; its bytes are useless
+        return 0
+    offset = int(marker.get("offset", 0))
+    return max(0, min(offset, os.path.getsize(partial_path), identity["size"]))
+
+
+def _hash_prefix(path, length, buffer_size):
+    """SHA-256 state for the first length bytes of path (used when resuming)"""
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(buffer_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest
+
+
+def _zero_copy(src, dst, offset, total, buffer_size, progress_callback, cancel_token):
+    """
+    Copy src to dst from offset using kernel zero-copy when available.
+
+    Returns:
+        str: Method used ("copy_file_range", "sendfile" or "" if unsupported)
+    """
+    in_fd = src.fileno()
+    out_fd = dst.fileno()
+
+    for method in ("copy_file_range", "sendfile"):
+        func = getattr(os, method, None)
+        if func is None:
+            continue
+        position = offset
+        try:
+            while position < total:
+                _check_cancelled(cancel_token)
+                count = min(buffer_size, total - position)
+                if method == "copy_file_range":
+                    sent = func(in_fd, out_fd, count, position, position)
+                else:
+                    os.lseek(out_fd, position, os.SEEK_SET)
+                    sent = func(out_fd, in_fd, position, count)
+                if sent == 0:
+                    break
+                position += sent
+                if progress_callback:
+                    progress_callback(position, total, "")
+            return method
+        except OSError as e:
+            # Unsupported across these filesystems: fall back, unless we already wrote data
+            if position == offset and e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                                  errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF):
+                continue
+            raise
+    return ""
+
+
+def copy_file(source_path, dest_path, buffer_size=None, progress_callback=None,
+              cancel_token=None, compute_hash=True, resume=True, partial_path=None):
+    """
+    Stream a file to dest_path.
+
+    Data is written to a partial file and renamed into place once complete,
+    so dest_path never contains a half-written file. If the copy is cancelled
+    or interrupted, the partial file and a resume marker stay on disk and the
+    next call with the same source and partial path continues from the last
+    checkpoint.
+
+    Args:
+        source_path (str): File to copy
+        dest_path (str): Final destination path
+        buffer_size (int, optional): Chunk size in bytes (default 1 MiB)
+        progress_callback (callable, optional): Called as (bytes_done, total_bytes, "")
+        cancel_token (optional): Object with is_cancelled(); checked per chunk
+        compute_hash (bool): Compute SHA-256 during the copy. Disables zero-copy.
+        resume (bool): Continue from an existing partial file when possible
+        partial_path (str, optional): Where to stage the copy (default dest_path + ".part")
+
+    Returns:
+        dict: Copy result with keys:
+            - size (int): Bytes in the destination file
+            - sha256 (str or None): Hex digest when compute_hash is True
+            - resumed_from (int): Offset the copy resumed from (0 if fresh)
+            - method (str): "copy_file_range", "sendfile" or "read_write"
+
+    Raises:
+        CopyCancelled: If cancel_token was triggered (partial file is kept)
+        OSError: On I/O errors
+    """
+    buffer_size = buffer_size or DEFAULT_BUFFER_SIZE
+    partial_path = partial_path or dest_path + PARTIAL_SUFFIX
+    marker_path = partial_path + MARKER_SUFFIX
+
+    identity = _source_identity(source_path)
+    total = identity["size"]
+
+    offset = _resume_offset(partial_path, marker_path, identity) if resume else 0
+    if offset:
+        print(f"✓ Resuming copy of {os.path.basename(source_path)} at byte {offset}/{total}")
+
+    digest = None
+    if compute_hash:
+        digest = _hash_prefix(partial_path, offset, buffer_size) if offset else hashlib.sha256()
+
+    os.makedirs(os.path.dirname(os.path.abspath(partial_path)), exist_ok=True)
+    mode = 'r+b' if offset else 'wb'
+
+    with open(source_path, 'rb') as src, open(partial_path, mode) as dst:
+        dst.truncate(offset)
+        method = ""
+
+        if not compute_hash:
+            method = _zero_copy(src, dst, offset, total, buffer_size,
+                                progress_callback, cancel_token)
+
+        if not method:
+            method = "read_write"
+            src.seek(offset)
+            dst.seek(offset)
+            position = offset
+            checkpoint = offset
+            view = memoryview(bytearray(buffer_size))
+
+            while True:
+                _check_cancelled(cancel_token)
+                read = src.readinto(view)
+                if not read:
+                    break
+                chunk = view[:read]
+                dst.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+                position += read
+
+                if resume and position - checkpoint >= RESUME_CHECKPOINT_BYTES:
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                    _write_marker(marker_path, identity, position)
+                    checkpoint = position
+
+                if progress_callback:
+                    progress_callback(position, total, "")
+
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    # Keep the original timestamps like shutil.copy2 did
+    os.utime(partial_path, ns=(os.stat(source_path).st_atime_ns, identity["mtime_ns"]))
+    os.replace(partial_path, dest_path)
+    _remove_quietly(marker_path)
+
+    return {
+        "size": total,
+        "sha256": digest.hexdigest() if digest is not None else None,
+        "resumed_from": offset,
+        "method": method
+    }
+
+
+def move_file(source_path, dest_path, buffer_size=None, progress_callback=None,
+              cancel_token=None):
+    """
+    Move a file, renaming when possible and streaming across filesystems.
+
+    Unlike shutil.move, a cross-filesystem move uses zero-copy and only
+    removes the source after the destination is durable.
+
+    Args:
+        source_path (str): File to move
+        dest_path (str): Destination path
+        buffer_size (int, optional): Chunk size for cross-filesystem copies
+        progress_callback (callable, optional): Called as (bytes_done, total_bytes, "")
+        cancel_token (optional): Object with is_cancelled()
+
+    Returns:
+        dict: {"method": "rename"} or the copy_file result
+    """
+    try:
+        os.replace(source_path, dest_path)
+        return {"method": "rename"}
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    result = copy_file(
+        source_path,
+        dest_path,
+        buffer_size=buffer_size,
+        progress_callback=progress_callback,
+        cancel_token=cancel_token,
+        compute_hash=False
+    )
+    os.remove(source_path)
+    return result
+
+
+def hash_file(path, buffer_size=None):
+    """
+    Compute the SHA-256 of a file.
+
+    Args:
+        path (str): File to hash
+        buffer_size (int, optional): Read size in bytes
+
+    Returns:
+        str: Hex digest
+    """
+    return _hash_prefix(path, os.path.getsize(path), buffer_size or DEFAULT_BUFFER_SIZE).hexdigest()
@@ -2,69 +2,20 @@
 Document CRUD Service
 
 Handles Create, Read, Update, Delete operations for documents and collections.
-Manages data persistence to JSON files.
+Persists data through the shared DocumentStore (JSON or SQLite backend).
 """
 
-import json
-import os
 from datetime import datetime
 
+from .document_store import get_document_store
 
 
 class DocumentCRUDService:
     """Service for managing document and collection data"""
     
     def __init__(self):
-        """Initialize the CRUD service with paths to data files"""
-        self.mock_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "Mock"
-        )
-        self.collections_file = os.path.join(self.mock_dir, "collections_data.json")
-        self.files_file = os.path.join(self.mock_dir, "files_data.json")
-    
-    def _load_json(self, filepath):
-        """Load JSON data from file with error handling"""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                # Handle empty file
-                if not content:
-                    print(f"Warning: Empty file '{filepath}', returning default structure")
-                    return self._get_default_structure(filepath)
-                data = json.loads(content)
-                # Handle completely empty JSON objects
-                if not data:
-                    return self._get_default_structure(filepath)
-                return data
-        except FileNotFoundError:
-            print(f"Warning: File not found '{filepath}', creating default structure")
-            return self._get_default_structure(filepath)
-        except json.JSONDecodeError as e:
-            print(f"Warning: Invalid JSON in '{filepath}': {e}, returning default structure")
-            return self._get_default_structure(filepath)
-    
-    def _get_default_structure(self, filepath):
-        """Get default structure based on file type"""
-        if 'collections' in filepath:
-            return {"collections": []}
-        elif 'files' in filepath:
-            return {"files": [], "next_file_id": 1}
-        else:
-            return {}
-    
-    def _save_json(self, filepath, data):
-        """Save data to JSON file with error handling"""
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            print(f"Error saving JSON to '{filepath}': {e}")
-            return False
+        """Initialize the CRUD service with the shared document store"""
+        self.store = get_document_store()
     
     # ========== FILE ID MANAGEMENT ==========
     
@@ -75,26 +26,7 @@ class DocumentCRUDService:
         Returns:
             int: Next available file ID
         """
-        data = self._load_json(self.files_file)
-        
-        # Check if next_file_id exists in data
-        if 'next_file_id' in data:
-            next_id = data['next_file_id']
-        else:
-            # Initialize based on existing files
-            all_files = data.get('files', [])
-            
-            # Find max existing file_id
-            max_id = 0
-            for file_data in all_files:
-                if 'file_id' in file_data:
-                    max_id = max(max_id, file_data['file_id'])
-            
-            next_id = max_id + 1
-        
-        # Increment and save
-        data['next_file_id'] = next_id + 1
-        self._save_json(self.files_file, data)
+        next_id = self.store.allocate_file_id()
         
         print(f"Generated file_id: {next_id}")
         return next_id
@@ -112,11 +44,8 @@ class DocumentCRUDService:
         Returns:
             dict: Result with success status and collection data
         """
-        data = self._load_json(self.collections_file)
-        collections = data.get("collections", [])
-        
-        # Generate new ID
-        new_id = max([c.get("id", 0) for c in collections], default=0) + 1
+        # Generate new ID from the collection counter
+        new_id = self.store.allocate_collection_id()
         
         # Create new collection
         new_collection = {
@@ -129,10 +58,9 @@ class DocumentCRUDService:
             "created_by": created_by
         }
         
-        collections.append(new_collection)
-        data["collections"] = collections
+        self.store.put_collection(new_collection)
         
-        if self._save_json(self.collections_file, data):
+        if self.store.save_collections():
             return {
                 "success": True,
                 "collection": new_collection
@@ -145,33 +73,20 @@ class DocumentCRUDService:
     
     def get_all_collections(self):
         """Get all collections with safe fallback"""
-        data = self._load_json(self.collections_file)
-        collections = data.get("collections", [])
-        # Ensure it's a list
-        if not isinstance(collections, list):
-            print(f"Warning: collections is not a list, returning empty list")
-            return []
-        return collections
+        return self.store.get_collections()
     
     def get_collection_by_id(self, collection_id):
         """Get a collection by ID"""
-        collections = self.get_all_collections()
-        for collection in collections:
-            if collection.get("id") == collection_id:
-                return collection
-        return None
+        return self.store.get_collection(collection_id)
     
     def get_collection_by_name(self, name):
         """Get a collection by name"""
-        collections = self.get_all_collections()
-        for collection in collections:
-            if collection.get("name") == name:
-                return collection
-        return None
+        return self.store.get_collection_by_name(name)
     
     # ========== FILE OPERATIONS ==========
     
-    def add_file_to_collection(self, collection_id, filename, file_path, category, extension, uploader, role):
+    def add_file_to_collection(self, collection_id, filename, file_path, category, extension, uploader, role,
+                               sha256=None, size=None):
         """
         Add a file to a specific collection.
         
@@ -183,54 +98,36 @@ class DocumentCRUDService:
             extension (str): File extension
             uploader (str): Username of the uploader
             role (str): Role of the uploader (can include subroles with '-')
+            sha256 (str, optional): Content hash from FileStorageService.save_file
+            size (int, optional): File size in bytes
             
         Returns:
             dict: Result with success status
         """
-        data = self._load_json(self.collections_file)
-        collections = data.get("collections", [])
-        
-        # Generate unique file ID
-        file_id = self._get_next_file_id()
-        
-        # Find the collection
-        collection_found = False
-        for collection in collections:
-            if collection.get("id") == collection_id:
-                collection_found = True
-                
-                # Add file to collection
-                now = datetime.now()
-                new_file = {
-                    "file_id": file_id,  # NEW: Unique file identifier
-                    "filename": filename,
-                    "time": now.strftime("%I:%M %p").lower(),
-                    "extension": extension,
-                    "file_path": file_path,
-                    "category": category,
-                    "uploaded_date": now.strftime("%m/%d/%Y"),
-                    "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
-                    "uploader": uploader,
-                    "role": role,
-                    "is_deleted": False,  # NEW: Track deletion status
-                    "approval_status": "pending"  # NEW: pending, accepted, rejected
+        # Membership row, file entry and ID counter are flushed together
+        with self.store.batch() as batch:
+            # Find the collection
+            collection = self.store.get_collection(collection_id)
+            
+            if collection is None:
+                return {
+                    "success": False,
+                    "error": "Collection not found"
                 }
-                
-                collection["files"].append(new_file)
-                break
-        
-        if not collection_found:
-            return {
-                "success": False,
-                "error": "Collection not found"
-            }
-        
-        # Save updated collections
-        data["collections"] = collections
-        if self._save_json(self.collections_file, data):
-            # Also add to files list (using the SAME file_id)
-            self._add_to_files_list(filename, file_path, category, extension, uploader, role, file_id)
             
+            # Generate unique file ID
+            file_id = self._get_next_file_id()
+            
+            # File metadata is stored once in the files list...
+            self._add_to_files_list(filename, file_path, category, extension, uploader, role, file_id,
+                                    sha256=sha256, size=size)
+            new_file = self.store.get_file(file_id)
+            
+            # ...and the collection only references it by file_id
+            self.store.add_file_to_collection(collection_id, file_id)
+            self.store.save_collections()
+        
+        if batch.success:
             # Add collection info to the file data
             new_file['collection_name'] = collection.get('name')
             new_file['collection_id'] = collection_id
@@ -287,18 +184,15 @@ class DocumentCRUDService:
                 "error": "Failed to save file"
             }
     
-    def _add_to_files_list(self, filename, file_path, category, extension, uploader, role, file_id=None):
+    def _add_to_files_list(self, filename, file_path, category, extension, uploader, role, file_id=None,
+                           sha256=None, size=None):
         """Add a file to the files list with duplicate prevention"""
-        data = self._load_json(self.files_file)
-        all_files = data.get("files", [])
-        
         # Generate file_id if not provided
         if file_id is None:
             file_id = self._get_next_file_id()
         
         # CRITICAL FIX: Check if file_id already exists (prevent duplicates)
-        existing_file = next((f for f in all_files if f.get('file_id') == file_id), None)
-        if existing_file:
+        if self.store.get_file(file_id) is not None:
             print(f"WARNING: File with file_id {file_id} already exists in files array. Skipping duplicate insertion.")
             return True  # Return success but don't add duplicate
         
@@ -315,30 +209,22 @@ class DocumentCRUDService:
             "uploader": uploader,
             "role": role,
             "is_deleted": False,  # Track deletion status
-            "approval_status": "pending"  # pending, accepted, rejected
+            "approval_status": "pending",  # pending, accepted, rejected
+            "sha256": sha256,  # Content hash computed during the copy
+            "size": size
         }
         
-        all_files.append(new_file)
-        data["files"] = all_files
+        self.store.put_file(new_file)
         
         print(f"Added file to files array: file_id={file_id}, filename={filename}")
-        return self._save_json(self.files_file, data)
+        return self.store.save_files()
     
     def get_all_uploaded_files(self):
         """Get all uploaded (non-deleted) files with safe fallback"""
-        data = self._load_json(self.files_file)
-        all_files = data.get("files", [])
-        # Ensure it's a list
-        if not isinstance(all_files, list):
-            print(f"Warning: files is not a list, returning empty list")
-            return []
-        # Filter for non-deleted files
-        uploaded_files = [f for f in all_files if not f.get('is_deleted', False)]
-        return uploaded_files
+        return self.store.find_files(is_deleted=False)
     
     def get_files_by_collection(self, collection_id):
         """Get all files in a specific collection"""
-        collection = self.get_collection_by_id(collection_id)
-        if collection:
-            return collection.get("files", [])
-        return []
+        file_ids = self.store.get_collection_file_ids(collection_id)
+        files = [self.store.get_file(file_id) for file_id in file_ids]
+        return [f for f in files if f is not None]
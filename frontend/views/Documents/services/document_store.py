@@ -0,0 +1,1001 @@
+"""
+Document Store
+
+Process-wide, indexed, in-memory copy of the Documents vault metadata.
+
+The store loads the file records and collections once from a storage
+backend (Mock JSON files or SQLite, see storage_backends.py), keeps
+primary indexes over the file records and only reloads when the backend
+reports a change. Controllers and services use it for O(1) lookups
+instead of re-parsing the JSON on every call. Saves hand only the
+changed records to the backend, and batch() coalesces several saves
+into one flush. Listeners (see add_listener) are told about committed
+file changes and reloads so derived data such as storage totals can be
+kept up to date incrementally.
+"""
+
+import copy
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+
+from .storage_backends import create_storage_backend
+
+
+# Fields that get a secondary index (field -> {value: {file_id, ...}})
+INDEXED_FIELDS = ('filename', 'uploader', 'category', 'extension')
+
+# Fields query_files() can order by (each gets a sort index on first use)
+SORTABLE_FIELDS = ('file_id', 'filename', 'timestamp', 'deleted_at', 'size',
+                   'uploader', 'category', 'extension')
+
+# query_files() sorts the matching IDs directly, instead of walking a sort
+# index, when they are fewer than 1/SPARSE_QUERY_RATIO of all files
+SPARSE_QUERY_RATIO = 8
+
+
+def sort_value(record, field):
+    """Comparable sort key of a record field: numbers, then text (case-insensitive), then blanks"""
+    value = record.get(field)
+    if value is None or value == '':
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    return (1, str(value).casefold())
+
+
+class DocumentStore:
+    """
+    Indexed, in-memory document store on top of a storage backend.
+
+    Indexes kept for file records:
+    - file_id (primary key)
+    - filename, uploader, category, extension (secondary, value -> ids)
+    - is_deleted (active ids / deleted ids)
+    - sort indexes for query_files(): per SORTABLE_FIELDS entry, a sorted
+      list of (sort value, file_id), built on first use and kept sorted
+      on every write
+
+    Collections are indexed by id and by name. Collection membership is a
+    table of (collection_id, file_id) rows with a reverse index per file,
+    so file metadata is stored once and collection counts are O(1).
+
+    All public read methods return copies so callers can freely annotate
+    the returned dictionaries without corrupting the cached state.
+
+    Args:
+        backend: Storage backend (defaults to create_storage_backend())
+    """
+
+    def __init__(self, backend=None):
+        self._lock = threading.RLock()
+        self.backend = backend if backend is not None else create_storage_backend()
+
+        # File state
+        self._files_signature = None
+        self._files_loaded = False
+        self._files_meta = {}            # Top-level keys other than "files" (e.g. next_file_id)
+        self._records = {}               # {file_id: record} (insertion ordered)
+        self._unindexed = []             # Legacy records without a file_id, preserved on save
+        self._active_ids = set()
+        self._deleted_ids = set()
+        self._indexes = {field: {} for field in INDEXED_FIELDS}
+        self._sort_indexes = {}          # {field: [(sort value, file_id), ...]} ascending
+        self._dirty_files = set()        # IDs changed since the last save
+        self._removed_files = set()      # IDs removed since the last save
+
+        # Collection state
+        self._collections_signature = None
+        self._collections_loaded = False
+        self._collections_meta = {}
+        self._collections = {}           # {collection_id: collection}
+        self._collection_names = {}      # {name: collection_id}
+        self._dirty_collections = set()
+        self._removed_collections = set()
+
+        # Collection membership: (collection_id, file_id) rows with reverse index
+        self._members = {}               # {collection_id: {file_id: None}} (insertion ordered)
+        self._file_collections = {}      # {file_id: {collection_id, ...}}
+        self._added_members = set()      # (collection_id, file_id) added since the last save
+        self._removed_members = set()    # (collection_id, file_id) removed since the last save
+
+        # Write buffering
+        self._batch_depth = 0
+        self._pending_files = False
+        self._pending_collections = False
+
+        # Change listeners: callback(event, payload)
+        self._listeners = []
+
+    # ==================== FRESHNESS ====================
+
+    def _ensure_files_loaded(self):
+        """Reload file records if the backend reports a change."""
+        if self._files_loaded and (self._pending_files or self._batch_depth):
+            return  # Never drop buffered writes by reloading underneath them
+        signature = self.backend.files_signature()
+        if self._files_loaded and signature == self._files_signature:
+            return
+
+        all_files, self._files_meta = self.backend.load_files()
+        self._rebuild_file_indexes(all_files)
+        self._dirty_files.clear()
+        self._removed_files.clear()
+        self._files_signature = signature
+        self._files_loaded = True
+        self._notify('files_reloaded', {})
+
+    def _ensure_collections_loaded(self):
+        """Reload collections if the backend reports a change."""
+        if self._collections_loaded and (self._pending_collections or self._batch_depth):
+            return  # Never drop buffered writes by reloading underneath them
+        signature = self.backend.collections_signature()
+        if self._collections_loaded and signature == self._collections_signature:
+            return
+
+        self._ensure_files_loaded()
+        collections, self._collections_meta, memberships = self.backend.load_collections()
+        self._collections = {}
+        self._collection_names = {}
+        self._members = {}
+        self._file_collections = {}
+        self._dirty_collections.clear()
+        self._removed_collections.clear()
+        self._added_members.clear()
+        self._removed_members.clear()
+
+        for collection in collections:
+            self._index_collection(collection)
+        for collection_id, file_id in memberships:
+            self._link(collection_id, file_id)
+        for collection in collections:
+            self._absorb_embedded_files(collection)
+
+        self._collections_signature = signature
+        self._collections_loaded = True
+        self._notify('collections_reloaded', {})
+
+    def _absorb_embedded_files(self, collection):
+        """
+        Convert a legacy collection that embeds full file records.
+
+        Each embedded record becomes a membership row; records missing from
+        the files data are added there so the metadata is stored once. The
+        changes are written out with the next save.
+        """
+        embedded = collection.pop('files', None)
+        if not embedded:
+            return
+        collection_id = collection.get('id')
+        self._dirty_collections.add(collection_id)
+        for file_data in embedded:
+            file_id = file_data.get('file_id') if isinstance(file_data, dict) else None
+            if file_id is None:
+                continue
+            if file_id not in self._records:
+                self._index_file(copy.deepcopy(file_data))
+                self._dirty_files.add(file_id)
+            if self._link(collection_id, file_id):
+                self._added_members.add((collection_id, file_id))
+
+    # ==================== LISTENERS ====================
+
+    def add_listener(self, callback) -> None:
+        """
+        Register a callback for committed changes.
+
+        The callback is called as callback(event, payload) while the store
+        lock is held, so it must be quick and must not mutate records.
+        Events:
+        - 'files_committed': payload {'upserts': [record, ...], 'deletes': [file_id, ...]}
+        - 'files_reloaded': payload {} (file records were reloaded from the backend)
+        - 'collections_committed': payload {'upserts': [collection_id, ...],
+          'deletes': [collection_id, ...], 'membership_adds': [(collection_id, file_id), ...],
+          'membership_deletes': [(collection_id, file_id), ...]}
+        - 'collections_reloaded': payload {} (collections were reloaded from the backend)
+
+        Args:
+            callback (callable): Listener function
+        """
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback) -> None:
+        """Unregister a callback added with add_listener."""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event, payload):
+        for callback in list(self._listeners):
+            try:
+                callback(event, payload)
+            except Exception as e:
+                print(f"⚠ Warning: document store listener failed on '{event}': {e}")
+
+    def invalidate(self):
+        """Drop cached state so the next access reloads from the backend."""
+        with self._lock:
+            self._files_loaded = False
+            self._collections_loaded = False
+
+    # ==================== INDEX MAINTENANCE ====================
+
+    def _rebuild_file_indexes(self, all_files):
+        self._records = {}
+        self._unindexed = []
+        self._active_ids = set()
+        self._deleted_ids = set()
+        self._indexes = {field: {} for field in INDEXED_FIELDS}
+        self._sort_indexes = {}
+
+        for record in all_files:
+            file_id = record.get('file_id')
+            if file_id is None:
+                self._unindexed.append(record)
+                continue
+            if file_id in self._records:
+                print(f"WARNING: Duplicate file_id={file_id} in files data, keeping first entry")
+                continue
+            self._index_file(record)
+
+    def _index_file(self, record):
+        file_id = record['file_id']
+        self._records[file_id] = record
+        for field in INDEXED_FIELDS:
+            self._indexes[field].setdefault(record.get(field), set()).add(file_id)
+        for field, order in self._sort_indexes.items():
+            insort(order, (sort_value(record, field), file_id))
+        if record.get('is_deleted', False):
+            self._deleted_ids.add(file_id)
+        else:
+            self._active_ids.add(file_id)
+
+    def _unindex_file(self, file_id):
+        record = self._records.pop(file_id, None)
+        if record is None:
+            return None
+        self._drop_from_indexes(file_id, record)
+        return record
+
+    def _drop_from_indexes(self, file_id, record):
+        for field in INDEXED_FIELDS:
+            bucket = self._indexes[field].get(record.get(field))
+            if bucket is not None:
+                bucket.discard(file_id)
+                if not bucket:
+                    del self._indexes[field][record.get(field)]
+        for field, order in self._sort_indexes.items():
+            entry = (sort_value(record, field), file_id)
+            position = bisect_left(order, entry)
+            if position < len(order) and order[position] == entry:
+                del order[position]
+        self._active_ids.discard(file_id)
+        self._deleted_ids.discard(file_id)
+
+    def _index_collection(self, collection):
+        collection_id = collection.get('id')
+        self._collections[collection_id] = collection
+        if collection.get('name') is not None:
+            self._collection_names[collection['name']] = collection_id
+
+    def _unindex_collection(self, collection_id):
+        collection = self._collections.pop(collection_id, None)
+        if collection is not None and self._collection_names.get(collection.get('name')) == collection_id:
+            del self._collection_names[collection['name']]
+        return collection
+
+    def _link(self, collection_id, file_id):
+        """Add a membership row; returns False if it already existed."""
+        members = self._members.setdefault(collection_id, {})
+        if file_id in members:
+            return False
+        members[file_id] = None
+        self._file_collections.setdefault(file_id, set()).add(collection_id)
+        return True
+
+    def _unlink(self, collection_id, file_id):
+        """Remove a membership row; returns False if it did not exist."""
+        members = self._members.get(collection_id)
+        if not members or file_id not in members:
+            return False
+        del members[file_id]
+        owners = self._file_collections.get(file_id)
+        if owners is not None:
+            owners.discard(collection_id)
+            if not owners:
+                del self._file_collections[file_id]
+        return True
+
+    def _hydrate(self, collection):
+        """Return a copy of a collection with its member file records under 'files'."""
+        hydrated = copy.deepcopy(collection)
+        hydrated['files'] = [copy.deepcopy(self._records[fid])
+                             for fid in self._members.get(collection.get('id'), {})
+                             if fid in self._records]
+        return hydrated
+
+    # ==================== FILE QUERIES ====================
+
+    def get_file(self, file_id: int, deleted: Optional[bool] = None) -> Optional[Dict]:
+        """
+        Get a file record by its ID.
+
+        Args:
+            file_id (int): Unique file ID
+            deleted (bool, optional): True to only match deleted files,
+                                      False to only match active files,
+                                      None to match either
+
+        Returns:
+            dict or None: Copy of the file record
+        """
+        with self._lock:
+            self._ensure_files_loaded()
+            if deleted is True and file_id not in self._deleted_ids:
+                return None
+            if deleted is False and file_id not in self._active_ids:
+                return None
+            record = self._records.get(file_id)
+            return copy.deepcopy(record) if record is not None else None
+
+    def get_files(self, file_ids, is_deleted: Optional[bool] = None) -> List[Dict]:
+        """Get copies of file records by ID, in the order given (unknown IDs are skipped)."""
+        with self._lock:
+            self._ensure_files_loaded()
+            ids = self._match_ids(is_deleted, {})
+            return [copy.deepcopy(self._records[fid]) for fid in file_ids
+                    if fid in self._records and (ids is None or fid in ids)]
+
+    def find_files(self, is_deleted: Optional[bool] = False, **criteria) -> List[Dict]:
+        """
+        Find files by indexed fields.
+
+        Args:
+            is_deleted (bool, optional): Deletion state to match (None for both)
+            **criteria: Exact matches on indexed fields
+                        (filename, uploader, category, extension)
+
+        Returns:
+            list: Copies of the matching file records, ordered by file_id
+        """
+        with self._lock:
+            self._ensure_files_loaded()
+            ids = self._match_ids(is_deleted, criteria)
+            if ids is None:
+                records = self._records.values()
+            else:
+                records = (self._records[fid] for fid in sorted(ids))
+            return [copy.deepcopy(r) for r in records]
+
+    def _match_ids(self, is_deleted, criteria) -> Optional[Set[int]]:
+        """Intersect index buckets; returns None when no filter applies."""
+        candidate_sets = []
+        if is_deleted is True:
+            candidate_sets.append(self._deleted_ids)
+        elif is_deleted is False:
+            candidate_sets.append(self._active_ids)
+
+        for field, value in criteria.items():
+            if field not in self._indexes:
+                raise ValueError(f"Field '{field}' is not indexed")
+            candidate_sets.append(self._indexes[field].get(value, set()))
+
+        if not candidate_sets:
+            return None
+        candidate_sets.sort(key=len)
+        result = set(candidate_sets[0])
+        for other in candidate_sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def filename_exists(self, filename: str, include_deleted: bool = False) -> bool:
+        """
+        Check if a filename is already used.
+
+        Args:
+            filename (str): Filename to check (without extension)
+            include_deleted (bool): Also consider files in the recycle bin
+
+        Returns:
+            bool: True if a matching file exists
+        """
+        with self._lock:
+            self._ensure_files_loaded()
+            ids = self._indexes['filename'].get(filename)
+            if not ids:
+                return False
+            if include_deleted:
+                return True
+            return not ids.isdisjoint(self._active_ids)
+
+    def active_filenames(self) -> Set[str]:
+        """
+        Get the set of filenames used by active (non-deleted) files.
+
+        Returns:
+            set: Filenames currently in use
+        """
+        with self._lock:
+            self._ensure_files_loaded()
+            return {name for name, ids in self._indexes['filename'].items()
+                    if not ids.isdisjoint(self._active_ids)}
+
+    def find_file_ids(self, is_deleted: Optional[bool] = False, **criteria) -> Set[int]:
+        """Get the IDs of files matching indexed criteria, without copying records."""
+        with self._lock:
+            self._ensure_files_loaded()
+            ids = self._match_ids(is_deleted, criteria)
+            return set(self._records) if ids is None else ids
+
+    def get_file_ids(self, is_deleted: Optional[bool] = None) -> Set[int]:
+        """Get the IDs of files in a deletion state (None for every file)."""
+        with self._lock:
+            self._ensure_files_loaded()
+            if is_deleted is None:
+                return set(self._records)
+            return set(self._deleted_ids if is_deleted else self._active_ids)
+
+    def count_files(self, is_deleted: Optional[bool] = False, **criteria) -> int:
+        """Count files matching the given indexed criteria."""
+        with self._lock:
+            self._ensure_files_loaded()
+            ids = self._match_ids(is_deleted, criteria)
+            return len(self._records) if ids is None else len(ids)
+
+    def query_files(self, is_deleted: Optional[bool] = False, sort_key: str = 'file_id',
+                    descending: bool = False, cursor=None, limit: Optional[int] = None,
+                    file_ids=None, **criteria) -> Dict:
+        """
+        Get one page of files in sort order.
+
+        Matches are found through the secondary indexes and ordered through
+        the sort index of sort_key, so a page costs about limit steps rather
+        than sorting every match. Paging is keyset based: the cursor is the
+        position after the last row of the previous page, so rows written
+        between pages neither repeat nor shift the following pages.
+
+        Args:
+            is_deleted (bool, optional): Deletion state to match (None for both)
+            sort_key (str): Field to order by (see SORTABLE_FIELDS); ties
+                            are ordered by file_id
+            descending (bool): Largest values first
+            cursor (optional): next_cursor of the previous page (None for the first page)
+            limit (int, optional): Maximum number of rows (None for all)
+            file_ids (iterable, optional): Only consider these file IDs
+                                           (e.g. a collection's members)
+            **criteria: Exact matches on indexed fields
+
+        Returns:
+            dict: 'files' (copies of the page's records), 'next_cursor'
+                  (None on the last page) and 'total' (number of matches)
+        """
+        if sort_key not in SORTABLE_FIELDS:
+            raise ValueError(f"Field '{sort_key}' is not sortable")
+        if cursor is not None and cursor[:2] != (sort_key, descending):
+            raise ValueError("Cursor belongs to a different sort order")
+
+        with self._lock:
+            self._ensure_files_loaded()
+            ids = self._match_ids(is_deleted, criteria)
+            if file_ids is not None:
+                restriction = {fid for fid in file_ids if fid in self._records}
+                ids = restriction if ids is None else restriction & ids
+            total = len(self._records) if ids is None else len(ids)
+            after = cursor[2] if cursor is not None else None
+
+            if ids is not None and len(ids) * SPARSE_QUERY_RATIO < len(self._records):
+                keys = self._sorted_keys(ids, sort_key, descending, after)
+            else:
+                keys = self._walk_sort_index(ids, sort_key, descending, after)
+
+            page = []
+            next_cursor = None
+            page_last = after
+            for key in keys:
+                if limit is not None and len(page) == limit:
+                    # One more match exists, so the caller can fetch another page
+                    next_cursor = (sort_key, descending, page_last)
+                    break
+                page.append(copy.deepcopy(self._records[key[1]]))
+                page_last = key
+            return {'files': page, 'next_cursor': next_cursor, 'total': total}
+
+    def _sort_index(self, field):
+        order = self._sort_indexes.get(field)
+        if order is None:
+            order = sorted((sort_value(record, field), file_id)
+                           for file_id, record in self._records.items())
+            self._sort_indexes[field] = order
+        return order
+
+    def _walk_sort_index(self, ids, field, descending, after):
+        """Yield (sort value, file_id) of matching IDs from the sort index, past after"""
+        order = self._sort_index(field)
+        if descending:
+            position = len(order) if after is None else bisect_left(order, after)
+            entries = (order[i] for i in range(position - 1, -1, -1))
+        else:
+            position = 0 if after is None else bisect_right(order, after)
+            entries = (order[i] for i in range(position, len(order)))
+        for entry in entries:
+            if ids is None or entry[1] in ids:
+                yield entry
+
+    def _sorted_keys(self, ids, field, descending, after):
+        """Sort a few matching IDs directly (cheaper than walking a sparse index)"""
+        keys = sorted(((sort_value(self._records[fid], field), fid) for fid in ids),
+                      reverse=descending)
+        if after is not None:
+            keys = [key for key in keys if (key < after if descending else key > after)]
+        return keys
+
+    # ==================== FILE MUTATIONS ====================
+
+    def allocate_file_id(self) -> int:
+        """
+        Reserve the next file ID (persisted with the next save_files call).
+
+        Returns:
+            int: Newly allocated file ID
+        """
+        with self._lock:
+            self._ensure_files_loaded()
+            next_id = self._files_meta.get('next_file_id')
+            if next_id is None:
+                next_id = max(self._records, default=0) + 1
+            self._files_meta['next_file_id'] = next_id + 1
+            return next_id
+
+    def put_file(self, record: Dict) -> None:
+        """
+        Insert or replace a file record (keeps its position when replacing).
+
+        Args:
+            record (dict): File record with a 'file_id'
+        """
+        file_id = record.get('file_id')
+        if file_id is None:
+            raise ValueError("File record must have a file_id")
+        with self._lock:
+            self._ensure_files_loaded()
+            record = copy.deepcopy(record)
+            if file_id in self._records:
+                # Dict assignment keeps the original position
+                self._drop_from_indexes(file_id, self._records[file_id])
+            self._index_file(record)
+            self._dirty_files.add(file_id)
+            self._removed_files.discard(file_id)
+
+            # Keep the counter ahead of every known ID
+            if self._files_meta.get('next_file_id', 1) <= file_id:
+                self._files_meta['next_file_id'] = file_id + 1
+
+    def remove_file(self, file_id: int) -> Optional[Dict]:
+        """
+        Remove a file record.
+
+        Args:
+            file_id (int): Unique file ID
+
+        Returns:
+            dict or None: The removed record
+        """
+        with self._lock:
+            self._ensure_files_loaded()
+            record = self._unindex_file(file_id)
+            if record is not None:
+                self._dirty_files.discard(file_id)
+                self._removed_files.add(file_id)
+            return record
+
+    def save_files(self) -> bool:
+        """
+        Persist changed file records through the storage backend.
+
+        Inside a batch() the write is buffered and flushed when the
+        outermost batch exits.
+
+        Returns:
+            bool: True if saved (or buffered) successfully
+        """
+        with self._lock:
+            self._pending_files = True
+            if self._batch_depth:
+                return True
+            return self.flush()
+
+    # ==================== COLLECTIONS ====================
+
+    def get_collections(self) -> List[Dict]:
+        """
+        Get copies of all collections in storage order.
+
+        Each copy carries its member file records under 'files', resolved
+        from the membership table.
+        """
+        with self._lock:
+            self._ensure_collections_loaded()
+            return [self._hydrate(c) for c in self._collections.values()]
+
+    def query_collections(self, sort_key: str = 'name', descending: bool = False,
+                          cursor=None, limit: Optional[int] = None) -> Dict:
+        """
+        Get one page of collections in sort order, without their file records.
+
+        Each copy carries 'file_count' (from the membership table) instead of
+        'files', so listing collections never copies member records.
+
+        Args:
+            sort_key (str): Collection field to order by (ties by id)
+            descending (bool): Largest values first
+            cursor (optional): next_cursor of the previous page (None for the first page)
+            limit (int, optional): Maximum number of collections (None for all)
+
+        Returns:
+            dict: 'collections', 'next_cursor' (None on the last page) and 'total'
+        """
+        if cursor is not None and cursor[:2] != (sort_key, descending):
+            raise ValueError("Cursor belongs to a different sort order")
+        with self._lock:
+            self._ensure_collections_loaded()
+            keys = sorted(((sort_value(collection, sort_key), collection_id)
+                           for collection_id, collection in self._collections.items()),
+                          reverse=descending)
+            if cursor is not None:
+                after = cursor[2]
+                keys = [key for key in keys if (key < after if descending else key > after)]
+            next_cursor = None
+            if limit is not None and len(keys) > limit:
+                keys = keys[:limit]
+                next_cursor = (sort_key, descending, keys[-1]) if keys else cursor
+            page = []
+            for _value, collection_id in keys:
+                collection = copy.deepcopy(self._collections[collection_id])
+                collection['file_count'] = len(self._members.get(collection_id, {}))
+                page.append(collection)
+            return {'collections': page, 'next_cursor': next_cursor, 'total': len(self._collections)}
+
+    def get_collection(self, collection_id: int) -> Optional[Dict]:
+        """Get a copy of a collection (with 'files') by ID, or None if not found."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            collection = self._collections.get(collection_id)
+            return self._hydrate(collection) if collection is not None else None
+
+    def get_collection_by_name(self, name: str) -> Optional[Dict]:
+        """Get a copy of a collection (with 'files') by name, or None if not found."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            collection_id = self._collection_names.get(name)
+            if collection_id is None:
+                return None
+            return self._hydrate(self._collections[collection_id])
+
+    def get_collection_name(self, collection_id: int) -> Optional[str]:
+        """Get the name of a collection by ID (no copy), or None if not found."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            collection = self._collections.get(collection_id)
+            return collection.get('name') if collection is not None else None
+
+    def get_collection_names(self) -> List[str]:
+        """Get the name of every collection (no copy)."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            return list(self._collection_names)
+
+    def has_collection(self, collection_id: int) -> bool:
+        """Check if a collection exists (no copy)."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            return collection_id in self._collections
+
+    def get_collection_id(self, name: str) -> Optional[int]:
+        """Get the ID of a collection by name (no copy), or None if not found."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            return self._collection_names.get(name)
+
+    def allocate_collection_id(self) -> int:
+        """Reserve the next collection ID (persisted with save_collections)."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            next_id = self._collections_meta.get('next_collection_id')
+            if next_id is None:
+                next_id = max((cid for cid in self._collections if isinstance(cid, int)), default=0) + 1
+            self._collections_meta['next_collection_id'] = next_id + 1
+            return next_id
+
+    def put_collection(self, collection: Dict) -> None:
+        """
+        Insert or replace a collection (keeps its position when replacing).
+
+        A 'files' key is ignored; membership is managed with
+        add_file_to_collection / remove_file_from_collection.
+        """
+        with self._lock:
+            self._ensure_collections_loaded()
+            collection = copy.deepcopy(collection)
+            collection.pop('files', None)
+            collection_id = collection.get('id')
+            old = self._collections.get(collection_id)
+            if old is not None and self._collection_names.get(old.get('name')) == collection_id:
+                del self._collection_names[old['name']]
+            self._index_collection(collection)
+            self._dirty_collections.add(collection_id)
+            self._removed_collections.discard(collection_id)
+
+    def remove_collection(self, collection_id: int) -> Optional[Dict]:
+        """Remove a collection and its membership rows; returns it, or None if not found."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            collection = self._unindex_collection(collection_id)
+            if collection is not None:
+                for file_id in list(self._members.get(collection_id, {})):
+                    self._unlink(collection_id, file_id)
+                    self._added_members.discard((collection_id, file_id))
+                    self._removed_members.add((collection_id, file_id))
+                self._members.pop(collection_id, None)
+                self._dirty_collections.discard(collection_id)
+                self._removed_collections.add(collection_id)
+            return collection
+
+    # ==================== MEMBERSHIP ====================
+
+    def add_file_to_collection(self, collection_id: int, file_id: int) -> bool:
+        """
+        Add a (collection_id, file_id) membership row.
+
+        Args:
+            collection_id (int): Unique collection ID
+            file_id (int): Unique file ID
+
+        Returns:
+            bool: True if added, False if the collection does not exist
+                  or already contains the file
+        """
+        with self._lock:
+            self._ensure_collections_loaded()
+            if collection_id not in self._collections:
+                return False
+            if not self._link(collection_id, file_id):
+                return False
+            self._removed_members.discard((collection_id, file_id))
+            self._added_members.add((collection_id, file_id))
+            return True
+
+    def remove_file_from_collection(self, collection_id: int, file_id: int) -> bool:
+        """
+        Remove a (collection_id, file_id) membership row.
+
+        Returns:
+            bool: True if removed, False if it did not exist
+        """
+        with self._lock:
+            self._ensure_collections_loaded()
+            if not self._unlink(collection_id, file_id):
+                return False
+            self._added_members.discard((collection_id, file_id))
+            self._removed_members.add((collection_id, file_id))
+            return True
+
+    def remove_file_from_all_collections(self, file_id: int) -> List[int]:
+        """
+        Remove a file from every collection that contains it.
+
+        Returns:
+            list: IDs of the collections the file was removed from
+        """
+        with self._lock:
+            collection_ids = self.get_file_collection_ids(file_id)
+            for collection_id in collection_ids:
+                self.remove_file_from_collection(collection_id, file_id)
+            return collection_ids
+
+    def get_file_collection_ids(self, file_id: int) -> List[int]:
+        """
+        Get the IDs of the collections containing a file (reverse index).
+
+        Returns:
+            list: Collection IDs in collection storage order
+        """
+        with self._lock:
+            self._ensure_collections_loaded()
+            owners = self._file_collections.get(file_id)
+            if not owners:
+                return []
+            return [cid for cid in self._collections if cid in owners]
+
+    def get_collection_file_ids(self, collection_id: int) -> List[int]:
+        """Get the file IDs in a collection, in the order they were added."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            return list(self._members.get(collection_id, {}))
+
+    def count_collection_files(self, collection_id: int) -> int:
+        """Get the number of files in a collection (O(1))."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            return len(self._members.get(collection_id, {}))
+
+    def get_collection_counts(self) -> Dict[int, int]:
+        """Get {collection_id: file_count} for every collection."""
+        with self._lock:
+            self._ensure_collections_loaded()
+            return {cid: len(self._members.get(cid, {})) for cid in self._collections}
+
+    def _membership_rows(self):
+        return [{'collection_id': cid, 'file_id': fid}
+                for cid, members in self._members.items() if cid in self._collections
+                for fid in members]
+
+    def save_collections(self) -> bool:
+        """
+        Persist changed collections through the storage backend.
+
+        Inside a batch() the write is buffered and flushed when the
+        outermost batch exits.
+
+        Returns:
+            bool: True if saved (or buffered) successfully
+        """
+        with self._lock:
+            self._pending_collections = True
+            if self._batch_depth:
+                return True
+            return self.flush()
+
+    # ==================== WRITE BUFFERING ====================
+
+    @contextmanager
+    def batch(self):
+        """
+        Coalesce every save made inside the block into a single flush.
+
+        Mutations stay in the in-memory write buffer until the outermost
+        batch exits; the backend then receives one commit covering both
+        files and collections. If the block raises, the buffered changes
+        are discarded and the store reloads from the backend.
+
+        Yields:
+            WriteBatch: Its 'success' attribute holds the flush result
+        """
+        write_batch = WriteBatch()
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield write_batch
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._discard_pending()
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                write_batch.success = self.flush()
+
+    def flush(self) -> bool:
+        """
+        Write every buffered change to the backend in one commit.
+
+        Returns:
+            bool: True if saved successfully (or nothing was pending)
+        """
+        with self._lock:
+            if not (self._pending_files or self._pending_collections):
+                return True
+
+            files_changes = None
+            if self._pending_files:
+                files_changes = {
+                    'upserts': [self._records[fid] for fid in self._dirty_files if fid in self._records],
+                    'deletes': list(self._removed_files),
+                    'meta': self._files_meta,
+                    'snapshot': lambda: list(self._records.values()) + list(self._unindexed),
+                }
+            collections_changes = None
+            if self._pending_collections:
+                collections_changes = {
+                    'upserts': [self._collections[cid] for cid in self._dirty_collections if cid in self._collections],
+                    'deletes': list(self._removed_collections),
+                    'meta': self._collections_meta,
+                    'snapshot': lambda: list(self._collections.values()),
+                    'membership_adds': list(self._added_members),
+                    'membership_deletes': list(self._removed_members),
+                    'membership_snapshot': self._membership_rows,
+                }
+
+            success = self.backend.commit_changes(files=files_changes, collections=collections_changes)
+            if not success:
+                # Force a reload so memory matches whatever was persisted
+                self._discard_pending()
+                return False
+
+            if files_changes is not None:
+                self._dirty_files.clear()
+                self._removed_files.clear()
+                self._files_signature = self.backend.files_signature()
+                self._notify('files_committed', {
+                    'upserts': files_changes['upserts'],
+                    'deletes': files_changes['deletes'],
+                })
+            if collections_changes is not None:
+                self._dirty_collections.clear()
+                self._removed_collections.clear()
+                self._added_members.clear()
+                self._removed_members.clear()
+                self._collections_signature = self.backend.collections_signature()
+                self._notify('collections_committed', {
+                    'upserts': [collection['id'] for collection in collections_changes['upserts']],
+                    'deletes': collections_changes['deletes'],
+                    'membership_adds': collections_changes['membership_adds'],
+                    'membership_deletes': collections_changes['membership_deletes'],
+                })
+            self._pending_files = False
+            self._pending_collections = False
+            return True
+
+    def _discard_pending(self):
+        self._pending_files = False
+        self._pending_collections = False
+        self.invalidate()
+
+
+class WriteBatch:
+    """Result holder for DocumentStore.batch()."""
+
+    def __init__(self):
+        self.success = True
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_document_store() -> DocumentStore:
+    """
+    Get the process-wide DocumentStore instance.
+
+    Returns:
+        DocumentStore: Shared document store
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DocumentStore()
+    return _store
+
+
+def configure_document_store(backend=None, **kwargs) -> DocumentStore:
+    """
+    Replace the process-wide DocumentStore with one on a different backend.
+
+    Args:
+        backend (str or object, optional): Backend name ('json', 'sqlite')
+                                           or a backend instance
+        **kwargs: Options passed to create_storage_backend (data_dir, db_path)
+
+    Returns:
+        DocumentStore: The new shared document store
+    """
+    global _store
+    if backend is None or isinstance(backend, str):
+        backend = create_storage_backend(backend, **kwargs)
+
+    with _store_lock:
+        old_store = _store
+        _store = DocumentStore(backend)
+        if old_store is not None:
+            # Listeners follow the shared store across backend switches
+            for callback in old_store._listeners:
+                _store.add_listener(callback)
+
+    if old_store is not None and old_store.backend is not backend:
+        old_store.backend.close()
+    return _store
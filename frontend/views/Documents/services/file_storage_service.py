@@ -5,22 +5,42 @@ Handles physical file operations for the document management system.
 Copies uploaded files to the FileStorage directory and manages file paths.
 """
 
+import hashlib
 import os
-import shutil
+import time
+import uuid
 from datetime import datetime
 from pathlib import Path
 
+from .blob_store import get_blob_store, is_blob_path, sha256_from_path
+from .copy_engine import (
+    DEFAULT_BUFFER_SIZE,
+    PARTIAL_SUFFIX,
+    CopyCancelled,
+    copy_file,
+    hash_file,
+    move_file
+)
+
+
+# Held (O_EXCL) by the upload currently using a source's resumable staging file
+LOCK_SUFFIX = ".lock"
+
+# Seconds after which a lock file without an owner PID is considered abandoned
+EMPTY_LOCK_GRACE_SECONDS = 60
+
 
 class FileStorageService:
     """Service for managing file storage operations"""
     
-    def __init__(self, storage_directory=None):
+    def __init__(self, storage_directory=None, buffer_size=DEFAULT_BUFFER_SIZE):
         """
         Initialize the file storage service.
         
         Args:
             storage_directory (str): Path to storage directory. 
                                     Defaults to FileStorage in Documents folder.
+            buffer_size (int): Chunk size in bytes used when copying files
         """
         if storage_directory is None:
             # Get the Documents folder path
@@ -29,6 +49,11 @@ class FileStorageService:
         
         self.storage_directory = storage_directory
         self.recycle_bin_directory = os.path.join(storage_directory, "RecycleBin")
+        # Interrupted uploads are staged here so a retry can resume them
+        self.partial_directory = os.path.join(storage_directory, ".partial")
+        self.buffer_size = buffer_size
+        # New uploads are stored once per distinct content (see blob_store.py)
+        self.blob_store = get_blob_store(storage_directory)
         self._ensure_storage_directory_exists()
         self._ensure_recycle_bin_exists()
     
@@ -40,14 +65,101 @@ class FileStorageService:
         """Create RecycleBin directory if it doesn't exist"""
         os.makedirs(self.recycle_bin_directory, exist_ok=True)
     
-    def save_file(self, source_path, custom_name=None, category=None):
+    def _partial_key(self, source_path):
+        return hashlib.sha1(os.path.abspath(source_path).encode('utf-8')).hexdigest()
+    
+    def _partial_path_for(self, source_path):
+        """
+        Resumable staging path for an upload, stable across retries of the same source.
+        
+        Args:
+            source_path (str): Path to the source file
+            
+        Returns:
+            str: Path of the partial file in the .partial directory
+        """
+        return os.path.join(self.partial_directory, self._partial_key(source_path) + PARTIAL_SUFFIX)
+    
+    def _claim_partial(self, source_path):
+        """
+        Reserve the resumable staging file of a source for one upload.
+        
+        The claim is a lock file created with O_EXCL next to the partial
+        file. If another upload of the same source holds it, this upload
+        stages into a file of its own and does not resume.
+        
+        Args:
+            source_path (str): Path to the source file
+            
+        Returns:
+            tuple: (partial_path, lock_path); lock_path is None for a private,
+                   non-resumable staging file
+        """
+        key = self._partial_key(source_path)
+        lock_path = os.path.join(self.partial_directory, key + LOCK_SUFFIX)
+        os.makedirs(self.partial_directory, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._is_abandoned_lock(lock_path):
+                    break
+                self._remove_quietly(lock_path)
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            return self._partial_path_for(source_path), lock_path
+        
+        print(f"⚠ {os.path.basename(source_path)} is already being uploaded; staging this copy separately")
+        private_path = os.path.join(self.partial_directory, f"{key}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}")
+        return private_path, None
+    
+    @staticmethod
+    def _is_abandoned_lock(lock_path):
+        """True if the upload that created a lock file no longer runs"""
+        try:
+            with open(lock_path, 'r') as f:
+                owner = f.read().strip()
+            if not owner:
+                # Created but not written yet, unless it has been like that for a while
+                return time.time() - os.path.getmtime(lock_path) > EMPTY_LOCK_GRACE_SECONDS
+            pid = int(owner)
+        except (OSError, ValueError):
+            return False
+        if pid == os.getpid() or os.name != 'posix':
+            return False  # Without a liveness check the lock is trusted
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass
+        return False
+    
+    @staticmethod
+    def _remove_quietly(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def save_file(self, source_path, custom_name=None, category=None,
+                  progress_callback=None, cancel_token=None):
         """
-        Copy a file to the storage directory with a unique name.
+        Copy a file into the content-addressed blob store.
+        
+        The file is streamed in chunks and hashed in the same pass. If a
+        previous copy of the same source was interrupted, it resumes from the
+        last checkpoint. Identical content is stored only once; the returned
+        file_path points at the shared blob.
         
         Args:
             source_path (str): Path to the source file
             custom_name (str, optional): Custom name for the file
             category (str, optional): Category for organizing files
+            progress_callback (callable, optional): Called per chunk as
+                (bytes_copied, total_bytes, "")
+            cancel_token (optional): Object with is_cancelled(); stops the copy
             
         Returns:
             dict: File information with keys:
@@ -55,7 +167,11 @@ class FileStorageService:
                 - file_path (str): Relative path in storage
                 - filename (str): Name of the stored file
                 - extension (str): File extension
+                - sha256 (str): SHA-256 of the stored content
+                - size (int): Size of the stored file in bytes
+                - deduplicated (bool): True if the content was already stored
                 - error (str, optional): Error message if failed
+                - cancelled (bool, optional): True if the copy was cancelled
         """
         try:
             # Validate source file exists
@@ -77,31 +193,48 @@ class FileStorageService:
             else:
                 base_name = name_without_ext
             
-            # Generate unique filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            unique_name = f"{base_name}_{timestamp}{extension}"
-            
-            # Create category subdirectory if specified
-            if category and category.lower() != "none":
-                dest_directory = os.path.join(self.storage_directory, category)
-                os.makedirs(dest_directory, exist_ok=True)
-                dest_path = os.path.join(dest_directory, unique_name)
-                relative_path = os.path.join(category, unique_name)
-            else:
-                dest_path = os.path.join(self.storage_directory, unique_name)
-                relative_path = unique_name
-            
-            # Copy the file
-            shutil.copy2(source_path, dest_path)
+            # Stream the file into staging, hashing it in the same pass.
+            # Concurrent uploads of one source never share staging files.
+            partial_path, lock_path = self._claim_partial(source_path)
+            staged_path = os.path.join(self.partial_directory,
+                                       f"{self._partial_key(source_path)}.{uuid.uuid4().hex}.staged")
+            try:
+                copy_result = copy_file(
+                    source_path,
+                    staged_path,
+                    buffer_size=self.buffer_size,
+                    progress_callback=progress_callback,
+                    cancel_token=cancel_token,
+                    resume=lock_path is not None,
+                    partial_path=partial_path
+                )
+                
+                # Move into the blob store (or drop the copy if the content exists)
+                blob = self.blob_store.ingest(staged_path, copy_result['sha256'], copy_result['size'])
+            finally:
+                if lock_path is None:
+                    self._remove_quietly(partial_path)  # Private staging is never resumed
+                else:
+                    self._remove_quietly(lock_path)
+                self._remove_quietly(staged_path)
             
             return {
                 "success": True,
-                "file_path": relative_path,
+                "file_path": blob['file_path'],
                 "filename": base_name,
                 "extension": extension.lstrip('.'),
-                "full_path": dest_path
+                "full_path": self.get_file_path(blob['file_path']),
+                "sha256": copy_result['sha256'],
+                "size": copy_result['size'],
+                "deduplicated": blob['deduplicated']
             }
             
+        except CopyCancelled:
+            return {
+                "success": False,
+                "cancelled": True,
+                "error": "Upload cancelled"
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -138,6 +271,14 @@ class FileStorageService:
                     "error": "File not found"
                 }
             
+            # Blobs stay in place: the record's is_deleted flag is the recycle bin
+            if is_blob_path(relative_path):
+                return {
+                    "success": True,
+                    "recycle_bin_path": None,
+                    "deleted_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+            
             # Generate unique name in recycle bin with deletion timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = os.path.basename(relative_path)
@@ -145,8 +286,8 @@ class FileStorageService:
             recycle_filename = f"{name_without_ext}_deleted_{timestamp}{extension}"
             recycle_bin_path = os.path.join(self.recycle_bin_directory, recycle_filename)
             
-            # Move file to recycle bin
-            shutil.move(full_path, recycle_bin_path)
+            # Move file to recycle bin (rename, or zero-copy across filesystems)
+            move_file(full_path, recycle_bin_path, buffer_size=self.buffer_size)
             
             # CRITICAL FIX: Update the file's modification time to NOW
             # This ensures auto-cleanup calculates age from deletion time, not original file creation time
@@ -191,7 +332,7 @@ class FileStorageService:
             os.makedirs(os.path.dirname(restore_path), exist_ok=True)
             
             # Move file back from recycle bin
-            shutil.move(recycle_path, restore_path)
+            move_file(recycle_path, restore_path, buffer_size=self.buffer_size)
             
             return {"success": True}
         except Exception as e:
@@ -200,6 +341,56 @@ class FileStorageService:
                 "error": f"Failed to restore file: {str(e)}"
             }
     
+    def release_file(self, relative_path):
+        """
+        Drop a record's reference to a stored blob after it was permanently deleted.
+        
+        The blob is unlinked once no other record references it.
+        
+        Args:
+            relative_path (str): file_path of the removed record
+            
+        Returns:
+            dict: Result with success status and whether the blob was removed
+        """
+        if not is_blob_path(relative_path):
+            return {"success": True, "removed": False}
+        
+        try:
+            removed = self.blob_store.release(sha256_from_path(relative_path))
+            return {"success": True, "removed": removed}
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to release stored file: {str(e)}"
+            }
+    
+    def get_storage_usage(self):
+        """
+        Get logical vs physical bytes of content-addressed uploads.
+        
+        Returns:
+            dict: Usage with keys logical_bytes, physical_bytes, saved_bytes,
+                  blob_count, reference_count, dedup_ratio
+        """
+        return self.blob_store.get_usage()
+    
+    def verify_file(self, relative_path, expected_sha256):
+        """
+        Check a stored file against its recorded SHA-256.
+        
+        Args:
+            relative_path (str): Relative path in storage
+            expected_sha256 (str): Hex digest stored in the file record
+            
+        Returns:
+            bool: True if the file exists and its content matches
+        """
+        full_path = self.get_file_path(relative_path)
+        if not expected_sha256 or not os.path.exists(full_path):
+            return False
+        return hash_file(full_path, self.buffer_size) == expected_sha256
+    
     def permanent_delete_from_recycle_bin(self, recycle_filename):
         """
         Permanently delete a file from the RecycleBin directory.
@@ -228,7 +419,9 @@ class FileStorageService:
     
     def cleanup_old_recycle_bin_files(self, days=15):
         """
-        Automatically delete files from RecycleBin older than specified days.
+        Automatically delete files from RecycleBin older than specified days
+        (deprecated - walks the whole directory; DocumentController.purge_expired_recycle_bin
+        uses the expiry index instead).
         
         Args:
             days (int): Number of days after which files should be deleted (default: 15)
@@ -338,7 +531,35 @@ class FileStorageService:
         """
         full_path = self.get_file_path(relative_path)
         return os.path.exists(full_path)
-    
+
+    def find_existing_files(self, full_paths):
+        """
+        Check many files at once, listing each parent directory a single time.
+
+        Args:
+            full_paths (iterable): Full paths to check
+
+        Returns:
+            set: The paths that exist as files
+        """
+        by_directory = {}
+        for full_path in full_paths:
+            directory, name = os.path.split(os.path.normpath(full_path))
+            by_directory.setdefault(directory, {})[name] = full_path
+
+        existing = set()
+        for directory, names in by_directory.items():
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        full_path = names.get(entry.name)
+                        if full_path is not None and entry.is_file():
+                            existing.add(full_path)
+            except OSError:
+                # A missing directory means none of its files exist
+                continue
+        return existing
+
     def check_duplicate_filename(self, filename):
         """
         Check if a filename already exists in the uploaded files.
@@ -349,13 +570,9 @@ class FileStorageService:
         Returns:
             bool: True if duplicate exists, False otherwise
         """
-        from ..Mock.data_loader import get_uploaded_files
+        from .document_store import get_document_store
         
-        uploaded_files = get_uploaded_files()
-        for file_data in uploaded_files:
-            if file_data.get('filename') == filename:
-                return True
-        return False
+        return get_document_store().filename_exists(filename)
     
     def generate_unique_filename(self, base_name):
         """
@@ -367,19 +584,18 @@ class FileStorageService:
         Returns:
             str: Unique filename with (#) suffix if needed
         """
-        from ..Mock.data_loader import get_uploaded_files
+        from .document_store import get_document_store
         
-        uploaded_files = get_uploaded_files()
-        existing_names = {file_data.get('filename') for file_data in uploaded_files}
+        store = get_document_store()
         
         # If no duplicate, return original
-        if base_name not in existing_names:
+        if not store.filename_exists(base_name):
             return base_name
         
         # Find the next available number
         counter = 1
         while True:
             new_name = f"{base_name} ({counter})"
-            if new_name not in existing_names:
+            if not store.filename_exists(new_name):
                 return new_name
             counter += 1
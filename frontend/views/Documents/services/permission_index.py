@@ -0,0 +1,157 @@
+"""
+Permission Index
+
+File permissions of one user, kept in step with the document store.
+
+A role grants one permission mask on the files the user uploaded and another
+on everybody else's files (RoleRouter.get_file_permissions). The index holds
+a bitmap for every file whose mask differs from the "other users" mask.
+For a non-admin that is exactly their own uploads. Listing a student's files
+therefore touches only that student's rows, and a permission check is one
+dictionary lookup.
+
+The index is built once from the store's uploader index. After that it is
+updated from the store's commit notifications (see
+DocumentStore.add_listener), like storage_accounting.py.
+"""
+
+import threading
+from typing import Dict, Optional, Set
+
+from .document_store import get_document_store
+
+
+class PermissionIndex:
+    """
+    Per-file permission bitmaps for one user.
+
+    Args:
+        username (str): User the permissions belong to
+        owner_mask (int): Permission bits on files the user uploaded
+        other_mask (int): Permission bits on other users' files
+        store (DocumentStore, optional): Defaults to the shared store
+    """
+
+    def __init__(self, username, owner_mask, other_mask, store=None):
+        self.username = username
+        self.owner_mask = owner_mask
+        self.other_mask = other_mask
+        self._store = store
+        self._lock = threading.RLock()
+        self._bits = {}             # {file_id: mask} for files whose mask is not other_mask
+        self._stale = owner_mask != other_mask
+        self._generation = 0
+
+        if owner_mask != other_mask:
+            self.store.add_listener(self._on_store_event)
+
+    @property
+    def store(self):
+        """Document store the ownership is derived from"""
+        return self._store or get_document_store()
+
+    # ==================== MAINTENANCE ====================
+
+    def _on_store_event(self, event, payload):
+        """Document store listener: apply committed ownership changes"""
+        with self._lock:
+            self._generation += 1
+            if event == 'files_reloaded':
+                self._stale = True
+                return
+            if event != 'files_committed' or self._stale:
+                return  # A pending rebuild will pick the change up
+
+            for file_id in payload.get('deletes', ()):
+                self._bits.pop(file_id, None)
+            for record in payload.get('upserts', ()):
+                if record.get('uploader') == self.username:
+                    self._bits[record.get('file_id')] = self.owner_mask
+                else:
+                    self._bits.pop(record.get('file_id'), None)
+
+    def _ensure_current(self):
+        """Rebuild the bitmaps from the store's uploader index if they are stale"""
+        while True:
+            with self._lock:
+                if not self._stale:
+                    return
+                generation = self._generation
+
+            # Read the store outside our lock (see StorageAccounting._ensure_current)
+            owned = self.store.find_file_ids(is_deleted=None, uploader=self.username)
+
+            with self._lock:
+                if generation != self._generation:
+                    continue  # The store changed while we read it; try again
+                self._bits = dict.fromkeys(owned, self.owner_mask)
+                self._stale = False
+                return
+
+    def invalidate(self):
+        """Force a rebuild from the document store on the next query"""
+        with self._lock:
+            self._stale = self.owner_mask != self.other_mask
+            self._generation += 1
+
+    # ==================== QUERIES ====================
+
+    def mask_for(self, record: Dict) -> int:
+        """Permission bits on a file record (uses the record's own uploader)"""
+        return self.owner_mask if record.get('uploader') == self.username else self.other_mask
+
+    def permissions(self, file_id: int) -> int:
+        """Permission bits on a stored file, by ID"""
+        if self.owner_mask == self.other_mask:
+            return self.other_mask
+        self._ensure_current()
+        with self._lock:
+            return self._bits.get(file_id, self.other_mask)
+
+    def allows(self, record: Dict, permission: int) -> bool:
+        """Check if every bit of permission is granted on a file record"""
+        return self.mask_for(record) & permission == permission
+
+    def file_ids(self, permission: int) -> Optional[Set[int]]:
+        """
+        Get the IDs of the stored files that grant a permission.
+
+        Args:
+            permission (int): PERMISSION_* bits that must all be granted
+
+        Returns:
+            set or None: Matching file IDs, or None when every file grants it
+                         (callers then skip the filter altogether)
+        """
+        if self.other_mask & permission == permission:
+            return None
+        if self.owner_mask & permission != permission:
+            return set()
+        self._ensure_current()
+        with self._lock:
+            return {file_id for file_id, mask in self._bits.items() if mask & permission == permission}
+
+
+_permission_indexes: Dict[tuple, PermissionIndex] = {}
+_permission_lock = threading.Lock()
+
+
+def get_permission_index(username, owner_mask, other_mask) -> PermissionIndex:
+    """
+    Get the process-wide permission index of a user and role.
+
+    Args:
+        username (str): User the permissions belong to
+        owner_mask (int): Permission bits on files the user uploaded
+        other_mask (int): Permission bits on other users' files
+
+    Returns:
+        PermissionIndex: Shared instance
+    """
+    key = (username, owner_mask, other_mask)
+    with _permission_lock:
+        index = _permission_indexes.get(key)
+        if index is None:
+            index = PermissionIndex(username, owner_mask, other_mask)
+            _permission_indexes[key] = index
+        return index
@@ -0,0 +1,240 @@
+"""
+Recycle Bin Expiry Index
+
+Min-heap of soft-deleted files keyed on when they were deleted, so the
+auto-cleanup can pop exactly the entries that are due instead of listing
+and stat-ing the whole RecycleBin directory.
+
+The index is built once from the document store and kept current through
+its commit notifications (see DocumentStore.add_listener). Heap entries
+are invalidated lazily: a popped entry only counts if it still matches the
+file's current deletion time.
+"""
+
+import heapq
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .document_store import get_document_store
+
+
+# Days a file stays in the recycle bin before it is purged
+RECYCLE_BIN_RETENTION_DAYS = 15
+
+DELETED_AT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class RecycleBinExpiryIndex:
+    """
+    Expiry index over soft-deleted file records.
+
+    Args:
+        recycle_bin_directory (str): RecycleBin folder (used to date legacy
+                                     entries that have no deleted_at)
+        store (DocumentStore, optional): Defaults to the shared store
+    """
+
+    def __init__(self, recycle_bin_directory, store=None):
+        self.recycle_bin_directory = recycle_bin_directory
+        self._store = store
+        self._lock = threading.RLock()
+        self._heap = []              # [(deleted_ts, file_id)]
+        self._deleted_ts = {}        # {file_id: deleted_ts} (authoritative)
+        self._stale = True
+        self._generation = 0
+
+        self.store.add_listener(self._on_store_event)
+
+    @property
+    def store(self):
+        """Document store the index is derived from"""
+        return self._store or get_document_store()
+
+    # ==================== INDEX MAINTENANCE ====================
+
+    def _deleted_timestamp(self, record):
+        """When a record was deleted (epoch seconds), or None if unknown"""
+        deleted_at = record.get('deleted_at')
+        if deleted_at:
+            try:
+                return datetime.strptime(deleted_at, DELETED_AT_FORMAT).timestamp()
+            except ValueError:
+                pass
+        # Legacy entries: the RecycleBin file's mtime is set on deletion
+        recycle_bin_path = record.get('recycle_bin_path')
+        if recycle_bin_path:
+            try:
+                return os.path.getmtime(os.path.join(self.recycle_bin_directory, recycle_bin_path))
+            except OSError:
+                pass
+        return None
+
+    def _set(self, file_id, deleted_ts):
+        if deleted_ts is None:
+            self._deleted_ts.pop(file_id, None)
+            return
+        if self._deleted_ts.get(file_id) == deleted_ts:
+            return
+        self._deleted_ts[file_id] = deleted_ts
+        heapq.heappush(self._heap, (deleted_ts, file_id))
+
+    def _on_store_event(self, event, payload):
+        """Document store listener: track files entering/leaving the recycle bin"""
+        with self._lock:
+            self._generation += 1
+            if event == 'files_reloaded':
+                self._stale = True
+                return
+            if event != 'files_committed' or self._stale:
+                return
+
+            for file_id in payload.get('deletes', ()):
+                self._deleted_ts.pop(file_id, None)
+            for record in payload.get('upserts', ()):
+                file_id = record.get('file_id')
+                if record.get('is_deleted', False):
+                    self._set(file_id, self._deleted_timestamp(record))
+                else:
+                    self._deleted_ts.pop(file_id, None)
+
+            # Drop dead heap entries once they dominate
+            if len(self._heap) > 2 * len(self._deleted_ts) + 64:
+                self._heap = [(ts, fid) for fid, ts in self._deleted_ts.items()]
+                heapq.heapify(self._heap)
+
+    def _ensure_current(self):
+        """Rebuild from the document store if the index is stale"""
+        while True:
+            with self._lock:
+                if not self._stale:
+                    return
+                generation = self._generation
+
+            # Read outside our lock (store listeners take it under the store lock)
+            records = self.store.find_files(is_deleted=True)
+            deleted_ts = {}
+            for record in records:
+                ts = self._deleted_timestamp(record)
+                if ts is not None:
+                    deleted_ts[record['file_id']] = ts
+
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                self._deleted_ts = deleted_ts
+                self._heap = [(ts, fid) for fid, ts in deleted_ts.items()]
+                heapq.heapify(self._heap)
+                self._stale = False
+                return
+
+    def invalidate(self):
+        """Force a rebuild from the document store on the next query"""
+        with self._lock:
+            self._stale = True
+            self._generation += 1
+
+    def _peek(self):
+        """Earliest live heap entry (drops invalidated ones)"""
+        while self._heap:
+            deleted_ts, file_id = self._heap[0]
+            if self._deleted_ts.get(file_id) == deleted_ts:
+                return deleted_ts, file_id
+            heapq.heappop(self._heap)
+        return None
+
+    # ==================== QUERIES ====================
+
+    def next_expiry(self, retention_days=RECYCLE_BIN_RETENTION_DAYS) -> Optional[float]:
+        """
+        Get when the next recycle-bin entry expires.
+
+        Args:
+            retention_days (int): Days a file stays in the recycle bin
+
+        Returns:
+            float or None: Epoch seconds, or None if the recycle bin is empty
+        """
+        self._ensure_current()
+        with self._lock:
+            head = self._peek()
+            if head is None:
+                return None
+            return head[0] + retention_days * SECONDS_PER_DAY
+
+    def due_file_ids(self, retention_days=RECYCLE_BIN_RETENTION_DAYS, limit=None,
+                     now=None) -> List[int]:
+        """
+        Get the IDs of files whose retention has run out, oldest first.
+
+        Entries are not removed here; they leave the index when the purge
+        commits their removal.
+
+        Args:
+            retention_days (int): Days a file stays in the recycle bin
+            limit (int, optional): Maximum number of IDs to return
+            now (float, optional): Current epoch seconds (for testing)
+
+        Returns:
+            list: Due file IDs
+        """
+        self._ensure_current()
+        cutoff = (now if now is not None else time.time()) - retention_days * SECONDS_PER_DAY
+
+        with self._lock:
+            due = []
+            popped = []
+            while limit is None or len(due) < limit:
+                head = self._peek()
+                if head is None or head[0] > cutoff:
+                    break
+                popped.append(heapq.heappop(self._heap))
+                due.append(head[1])
+            # Put them back: they stay indexed until the purge commits
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+            return due
+
+    def discard(self, file_id) -> None:
+        """Forget an entry that no longer exists in the store"""
+        with self._lock:
+            self._deleted_ts.pop(file_id, None)
+
+    def deleted_timestamp(self, file_id) -> Optional[float]:
+        """Get when a recycle-bin entry was deleted (epoch seconds), or None if unknown"""
+        self._ensure_current()
+        with self._lock:
+            return self._deleted_ts.get(file_id)
+
+    def get_deleted_timestamps(self) -> Dict[int, float]:
+        """Get {file_id: deleted epoch seconds} for every recycle-bin entry"""
+        self._ensure_current()
+        with self._lock:
+            return dict(self._deleted_ts)
+
+
+_expiry_indexes: Dict[str, RecycleBinExpiryIndex] = {}
+_expiry_lock = threading.Lock()
+
+
+def get_recycle_bin_expiry_index(recycle_bin_directory) -> RecycleBinExpiryIndex:
+    """
+    Get the process-wide expiry index for a RecycleBin directory.
+
+    Args:
+        recycle_bin_directory (str): RecycleBin folder
+
+    Returns:
+        RecycleBinExpiryIndex: Shared instance
+    """
+    key = os.path.abspath(recycle_bin_directory)
+    with _expiry_lock:
+        index = _expiry_indexes.get(key)
+        if index is None:
+            index = RecycleBinExpiryIndex(key)
+            _expiry_indexes[key] = index
+        return index
@@ -0,0 +1,665 @@
+"""
+Document Search Index
+
+Inverted index over the Documents vault for ranked, typo-tolerant search.
+
+- Tokens come from the filename, description, uploader, category,
+  collection and extension of every file record, plus text extracted from
+  TXT, DOCX and (when pypdf is installed) PDF uploads.
+- Each query term matches exact tokens, token prefixes (search as you
+  type), substrings and, through a trigram index over the vocabulary,
+  misspelled tokens. Documents must match every term and are ranked by
+  field weight and term rarity.
+- The index is built once from the document store and then kept current
+  through its commit notifications (see DocumentStore.add_listener), so
+  uploads, renames and deletes only re-index the records they touch.
+  Text is extracted on a background thread, so neither commits nor
+  queries wait on file I/O.
+- Content tokens are indexed once per distinct content (not per record)
+  in compact integer arrays, and persisted by content hash under
+  FileStorage/.search (see ContentTokenCache), so a restart loads them
+  instead of parsing every document again.
+"""
+
+import heapq
+import html
+import math
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+import zipfile
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from .document_store import get_document_store
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+
+# Weight of a token by the record field it came from
+FIELD_WEIGHTS = {
+    'filename': 3.0,
+    'description': 1.5,
+    'category': 1.0,
+    'collection': 1.0,
+    'uploader': 1.0,
+    'extension': 1.0,
+}
+
+# Weight of tokens from extracted file text
+CONTENT_WEIGHT = 0.5
+
+# Match quality by kind of match
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+SUBSTRING_MATCH = 0.6
+FUZZY_MATCH = 0.5
+
+# Misspellings tolerated per query term, as a Damerau-Levenshtein distance
+# (substitution, insertion, deletion or swap of adjacent letters): one edit,
+# two from FUZZY_LONG_TERM letters on. Fuzzy tokens tried per term are capped.
+FUZZY_MIN_LENGTH = 3
+FUZZY_LONG_TERM = 8
+MAX_FUZZY_EXPANSIONS = 20
+
+# Limits on text extraction per file (MAX_CONTENT_TOKENS counts distinct tokens)
+MAX_CONTENT_BYTES = 2 * 1024 * 1024
+MAX_CONTENT_TOKENS = 1000
+MAX_PDF_PAGES = 20
+
+# Folder under FileStorage holding the persisted content tokens
+SEARCH_DIRECTORY = ".search"
+CONTENT_CACHE_FILENAME = "content_tokens.sqlite3"
+
+# Bump when tokenize() or MAX_CONTENT_TOKENS change: older cached tokens are dropped
+CONTENT_CACHE_VERSION = 2
+
+# Cached content entries read per query when the index loads
+CONTENT_LOAD_BATCH = 500
+
+TEXT_EXTENSIONS = ('txt', 'md', 'csv')
+EXTRACTABLE_EXTENSIONS = TEXT_EXTENSIONS + ('docx', 'pdf')
+
+# Sort key meaning "best match first" for paged search results
+# (see DocumentController.query_search_results)
+SEARCH_RANK = 'rank'
+
+# Letters and digits of any script
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+# Han and kana are written without spaces: runs are indexed as overlapping character pairs
+CJK_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+XML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def _cjk_pairs(match):
+    run = match.group()
+    if len(run) == 1:
+        return f" {run} "
+    return ' ' + ' '.join(run[i:i + 2] for i in range(len(run) - 1)) + ' '
+
+
+def tokenize(text) -> List[str]:
+    """Split text into casefolded letter/digit tokens (any script; Han and kana as character pairs)"""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFC', str(text)).casefold()
+    return TOKEN_PATTERN.findall(CJK_PATTERN.sub(_cjk_pairs, text))
+
+
+def content_tokens(text) -> List[str]:
+    """Distinct tokens of extracted text, in order of appearance, capped at MAX_CONTENT_TOKENS"""
+    return list(dict.fromkeys(tokenize(text)))[:MAX_CONTENT_TOKENS]
+
+
+def trigrams(token) -> set:
+    """Trigrams of a token, padded so short tokens and word edges count"""
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, max_distance) -> int:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance of two tokens.
+
+    Stops early once the distance must exceed max_distance.
+
+    Returns:
+        int: The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def extract_text(path, extension) -> str:
+    """
+    Extract searchable text from a stored file.
+
+    Args:
+        path (str): Full path to the file
+        extension (str): File extension (with or without the dot)
+
+    Returns:
+        str: Extracted text ('' if the type is not supported or unreadable)
+    """
+    extension = (extension or '').lower().lstrip('.')
+    try:
+        if extension in TEXT_EXTENSIONS:
+            with open(path, 'rb') as f:
+                return f.read(MAX_CONTENT_BYTES).decode('utf-8', errors='ignore')
+        if extension == 'docx':
+            with zipfile.ZipFile(path) as archive:
+                with archive.open('word/document.xml') as f:
+                    xml = f.read(MAX_CONTENT_BYTES).decode('utf-8', errors='ignore')
+            return html.unescape(XML_TAG_PATTERN.sub(' ', xml))
+        if extension == 'pdf' and PdfReader is not None:
+            reader = PdfReader(path)
+            pages = reader.pages[:MAX_PDF_PAGES]
+            return ' '.join(page.extract_text() or '' for page in pages)
+    except Exception as e:
+        print(f"⚠ Warning: could not extract text from {os.path.basename(path)}: {e}")
+    return ''
+
+
+class ContentTokenCache:
+    """
+    Extracted content tokens persisted in SQLite, keyed by content hash.
+
+    Text is extracted once per distinct content; later launches (and
+    re-uploads of the same bytes) read the tokens back instead of parsing
+    the file again.
+
+    Args:
+        db_path (str): SQLite database file (created on first use)
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != CONTENT_CACHE_VERSION:
+                conn.execute("DROP TABLE IF EXISTS content_tokens")
+                conn.execute(f"PRAGMA user_version={CONTENT_CACHE_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS content_tokens ("
+                "content_key TEXT PRIMARY KEY, tokens TEXT NOT NULL)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self, keys) -> Dict[str, List[str]]:
+        """Get {content key: tokens} for the given keys that are cached"""
+        keys = list(keys)
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                for i in range(0, len(keys), CONTENT_LOAD_BATCH):
+                    chunk = keys[i:i + CONTENT_LOAD_BATCH]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT content_key, tokens FROM content_tokens "
+                        f"WHERE content_key IN ({placeholders})", chunk)
+                    for key, tokens in rows:
+                        found[key] = tokens.split() if tokens else []
+        except sqlite3.Error as e:
+            print(f"⚠ Warning: could not read cached content tokens: {e}")
+        return found
+
+    def save(self, entries: Dict[str, List[str]]) -> None:
+        """Persist {content key: tokens}"""
+        if not entries:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO content_tokens (content_key, tokens) VALUES (?, ?)",
+                        [(key, ' '.join(tokens)) for key, tokens in entries.items()])
+        except sqlite3.Error as e:
+            print(f"⚠ Warning: could not cache content tokens: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class DocumentSearchIndex:
+    """
+    Search index over the file records of one storage directory.
+
+    Args:
+        storage_directory (str): FileStorage root (file_path is relative to it)
+        recycle_bin_directory (str): RecycleBin folder for legacy deleted files
+        store (DocumentStore, optional): Defaults to the shared store
+        content_cache (ContentTokenCache, optional): Defaults to one under
+                                                     storage_directory/.search
+    """
+
+    def __init__(self, storage_directory, recycle_bin_directory, store=None, content_cache=None):
+        self.storage_directory = storage_directory
+        self.recycle_bin_directory = recycle_bin_directory
+        self._store = store
+        self.content_cache = content_cache or ContentTokenCache(
+            os.path.join(storage_directory, SEARCH_DIRECTORY, CONTENT_CACHE_FILENAME))
+        self._lock = threading.RLock()
+
+        # Metadata
+        self._postings = {}                 # {token: {file_id: weight}}
+        self._meta_tokens = {}              # {file_id: {token: weight}}
+        self._deleted = set()               # IDs of soft-deleted files
+        # Content, indexed once per distinct content key (sha256, else path)
+        self._content_ids = {}              # {content key: content number}
+        self._content_slots = []            # [content key] by content number
+        self._content_postings = {}         # {token: array of content numbers}
+        self._content_keys = {}             # {file_id: content key}
+        self._content_users = {}            # {content key: {file_id}}
+        self._pending_content = {}          # {content key: (path, extension)}
+        # Vocabulary (metadata and content tokens)
+        self._trigrams = defaultdict(set)   # {trigram: {token}}
+        self._content_thread = None
+        self._stale = True
+        self._generation = 0
+
+        self.store.add_listener(self._on_store_event)
+
+    @property
+    def store(self):
+        """Document store the index is derived from"""
+        return self._store or get_document_store()
+
+    # ==================== INDEX MAINTENANCE ====================
+
+    def _metadata_tokens(self, record):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(record.get(field)):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+        return weights
+
+    def _content_source(self, record):
+        """(content key, full path) of a record's extractable file, or (None, None)"""
+        extension = (record.get('extension') or '').lower().lstrip('.')
+        if extension not in EXTRACTABLE_EXTENSIONS:
+            return None, None
+        file_path = record.get('file_path')
+        recycle_bin_path = record.get('recycle_bin_path')
+        if record.get('is_deleted', False) and recycle_bin_path:
+            path = os.path.join(self.recycle_bin_directory, recycle_bin_path)
+        elif file_path:
+            path = os.path.join(self.storage_directory, file_path)
+        else:
+            return None, None
+        return record.get('sha256') or path, path
+
+    def _is_token(self, token):
+        return token in self._postings or token in self._content_postings
+
+    def _add_vocabulary(self, token):
+        for gram in trigrams(token):
+            self._trigrams[gram].add(token)
+
+    def _remove_vocabulary(self, token):
+        for gram in trigrams(token):
+            tokens = self._trigrams.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._trigrams[gram]
+
+    def _add_posting(self, token, file_id, weight):
+        postings = self._postings.get(token)
+        if postings is None:
+            if token not in self._content_postings:
+                self._add_vocabulary(token)
+            postings = self._postings[token] = {}
+        postings[file_id] = weight
+
+    def _remove_posting(self, token, file_id):
+        postings = self._postings.get(token)
+        if postings is None:
+            return
+        postings.pop(file_id, None)
+        if not postings:
+            del self._postings[token]
+            if token not in self._content_postings:
+                self._remove_vocabulary(token)
+
+    def _add_content(self, key, tokens):
+        """Index the tokens of one content key (once; later records reuse them)"""
+        if key in self._content_ids:
+            return
+        number = len(self._content_slots)
+        self._content_ids[key] = number
+        self._content_slots.append(key)
+        for token in tokens:
+            postings = self._content_postings.get(token)
+            if postings is None:
+                if token not in self._postings:
+                    self._add_vocabulary(token)
+                postings = self._content_postings[token] = array('I')
+            postings.append(number)
+
+    def _set_content_key(self, file_id, key):
+        old_key = self._content_keys.get(file_id)
+        if old_key == key:
+            return
+        if old_key is not None:
+            users = self._content_users.get(old_key, set())
+            users.discard(file_id)
+            if not users:
+                # Its postings stay (skipped at query time) in case the content returns
+                self._content_users.pop(old_key, None)
+                self._pending_content.pop(old_key, None)
+        if key is None:
+            self._content_keys.pop(file_id, None)
+        else:
+            self._content_keys[file_id] = key
+            self._content_users.setdefault(key, set()).add(file_id)
+
+    def _index_record(self, record):
+        file_id = record.get('file_id')
+        if file_id is None:
+            return
+        weights = self._metadata_tokens(record)
+        old = self._meta_tokens.get(file_id, {})
+        for token in old.keys() - weights.keys():
+            self._remove_posting(token, file_id)
+        for token, weight in weights.items():
+            if old.get(token) != weight:
+                self._add_posting(token, file_id, weight)
+        self._meta_tokens[file_id] = weights
+        if record.get('is_deleted', False):
+            self._deleted.add(file_id)
+        else:
+            self._deleted.discard(file_id)
+
+        key, path = self._content_source(record)
+        self._set_content_key(file_id, key)
+        if key is not None and key not in self._content_ids:
+            self._pending_content[key] = (path, record.get('extension'))
+
+    def _unindex_record(self, file_id):
+        for token in self._meta_tokens.pop(file_id, {}):
+            self._remove_posting(token, file_id)
+        self._deleted.discard(file_id)
+        self._set_content_key(file_id, None)
+
+    def _on_store_event(self, event, payload):
+        """Document store listener: re-index committed records"""
+        with self._lock:
+            self._generation += 1
+            if event == 'files_reloaded':
+                self._stale = True
+                return
+            if event != 'files_committed' or self._stale:
+                return
+
+            for file_id in payload.get('deletes', ()):
+                self._unindex_record(file_id)
+            for record in payload.get('upserts', ()):
+                self._index_record(record)
+            self._start_content_thread()
+
+    def _ensure_current(self):
+        """Rebuild from the document store if the index is stale"""
+        while True:
+            with self._lock:
+                if not self._stale:
+                    return
+                generation = self._generation
+
+            # Read outside our lock (store listeners take it under the store lock)
+            records = self.store.find_files(is_deleted=None)
+
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                # Content postings are kept: they are keyed by content, not by record
+                for token in self._postings:
+                    if token not in self._content_postings:
+                        self._remove_vocabulary(token)
+                self._postings = {}
+                self._meta_tokens = {}
+                self._deleted = set()
+                self._content_keys = {}
+                self._content_users = {}
+                self._pending_content = {}
+                for record in records:
+                    self._index_record(record)
+                self._stale = False
+                self._start_content_thread()
+                return
+
+    def invalidate(self):
+        """Force a rebuild from the document store on the next query"""
+        with self._lock:
+            self._stale = True
+            self._generation += 1
+
+    # ==================== TEXT EXTRACTION ====================
+
+    def _start_content_thread(self):
+        if not self._pending_content:
+            return
+        if self._content_thread is not None and self._content_thread.is_alive():
+            return
+        self._content_thread = threading.Thread(
+            target=self.index_pending_content, name='DocumentSearchContent', daemon=True)
+        self._content_thread.start()
+
+    def index_pending_content(self, limit: Optional[int] = None) -> int:
+        """
+        Index the text of files waiting for it.
+
+        Tokens cached by content hash are loaded in batches; only content
+        seen for the first time is read and parsed. Runs on a background
+        thread after commits and at startup; can also be called directly
+        (e.g. from a worker) to finish indexing before a search.
+
+        Args:
+            limit (int, optional): Maximum number of files to index
+
+        Returns:
+            int: Number of files whose text was indexed
+        """
+        indexed = 0
+        while limit is None or indexed < limit:
+            with self._lock:
+                if not self._pending_content:
+                    break
+                count = CONTENT_LOAD_BATCH if limit is None else min(CONTENT_LOAD_BATCH, limit - indexed)
+                batch = [self._pending_content.popitem()
+                         for _ in range(min(count, len(self._pending_content)))]
+
+            # Read the cache and the files without holding the lock
+            cached = self.content_cache.load(key for key, (path, _) in batch if key != path)
+            extracted = {}
+            for key, (path, extension) in batch:
+                tokens = cached.get(key)
+                if tokens is None:
+                    tokens = content_tokens(extract_text(path, extension))
+                    if key != path:
+                        extracted[key] = tokens  # Keyed by content hash: safe to keep
+                indexed += 1
+                with self._lock:
+                    if self._content_users.get(key):
+                        self._add_content(key, tokens)
+            self.content_cache.save(extracted)
+        return indexed
+
+    def pending_content_count(self) -> int:
+        """Number of files whose text has not been indexed yet"""
+        with self._lock:
+            return len(self._pending_content)
+
+    # ==================== QUERIES ====================
+
+    def _expand(self, term):
+        """Vocabulary tokens matching a query term, as [(token, match quality)]"""
+        matches = {}
+        if self._is_token(term):
+            matches[term] = EXACT_MATCH
+        if len(term) < 2:
+            return list(matches.items())
+
+        # Trigram overlap only picks candidates; edit distance decides.
+        # One edit changes at most 3 padded trigrams, a swap at most 4.
+        max_distance = 2 if len(term) >= FUZZY_LONG_TERM else 1
+        term_grams = trigrams(term)
+        min_shared = max(1, len(term_grams) - 4 * max_distance)
+        shared = defaultdict(int)
+        for gram in term_grams:
+            for token in self._trigrams.get(gram, ()):
+                shared[token] += 1
+
+        fuzzy = []
+        for token, count in shared.items():
+            if token == term:
+                continue
+            if token.startswith(term):
+                matches[token] = PREFIX_MATCH
+            elif len(term) >= 3 and term in token:
+                matches[token] = SUBSTRING_MATCH
+            elif len(term) >= FUZZY_MIN_LENGTH and count >= min_shared:
+                distance = edit_distance(term, token, max_distance)
+                if distance <= max_distance:
+                    fuzzy.append((-distance, count, token))
+
+        # Closest first, then most shared trigrams
+        for negative_distance, _, token in heapq.nlargest(MAX_FUZZY_EXPANSIONS, fuzzy):
+            matches[token] = FUZZY_MATCH * (1 + negative_distance / (len(term) + 1))
+        return list(matches.items())
+
+    def _token_weights(self, token):
+        """{file_id: weight} of a token: its metadata weight plus CONTENT_WEIGHT if in the file text"""
+        weights = dict(self._postings.get(token, ()))
+        for number in self._content_postings.get(token, ()):
+            for file_id in self._content_users.get(self._content_slots[number], ()):
+                weights[file_id] = weights.get(file_id, 0) + CONTENT_WEIGHT
+        return weights
+
+    def search(self, query: str, is_deleted: Optional[bool] = False,
+               limit: Optional[int] = None) -> List[int]:
+        """
+        Find files matching every term of a query, best first.
+
+        Args:
+            query (str): Free-text query
+            is_deleted (bool, optional): Deletion state to match (None for both)
+            limit (int, optional): Maximum number of results
+
+        Returns:
+            list: Matching file IDs ranked by relevance
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        self._ensure_current()
+
+        with self._lock:
+            document_count = max(len(self._meta_tokens), 1)
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token, quality in self._expand(term):
+                    weights = self._token_weights(token)
+                    if not weights:
+                        continue
+                    idf = math.log(1 + document_count / len(weights))
+                    for file_id, weight in weights.items():
+                        # A term counts once per file: its best matching token
+                        score = weight * quality * idf
+                        if score > term_scores.get(file_id, 0):
+                            term_scores[file_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {file_id: scores[file_id] + score
+                              for file_id, score in term_scores.items() if file_id in scores}
+                if not scores:
+                    return []
+
+            if is_deleted is True:
+                scores = {fid: s for fid, s in scores.items() if fid in self._deleted}
+            elif is_deleted is False:
+                scores = {fid: s for fid, s in scores.items() if fid not in self._deleted}
+
+            # Ties go to the newer file
+            rank = lambda item: (item[1], item[0])
+            if limit is not None:
+                ranked = heapq.nlargest(limit, scores.items(), key=rank)
+            else:
+                ranked = sorted(scores.items(), key=rank, reverse=True)
+            return [file_id for file_id, _ in ranked]
+
+    def get_stats(self) -> Dict:
+        """
+        Get index size counters.
+
+        Returns:
+            dict: documents, tokens, contents (distinct texts indexed),
+                  trigrams and files pending text extraction
+        """
+        self._ensure_current()
+        with self._lock:
+            return {
+                'documents': len(self._meta_tokens),
+                'tokens': len(self._postings.keys() | self._content_postings.keys()),
+                'contents': len(self._content_ids),
+                'trigrams': len(self._trigrams),
+                'pending_content': len(self._pending_content)
+            }
+
+
+_search_indexes: Dict[str, DocumentSearchIndex] = {}
+_search_lock = threading.Lock()
+
+
+def get_search_index(storage_directory, recycle_bin_directory) -> DocumentSearchIndex:
+    """
+    Get the process-wide search index for a storage directory.
+
+    Args:
+        storage_directory (str): FileStorage root
+        recycle_bin_directory (str): RecycleBin folder
+
+    Returns:
+        DocumentSearchIndex: Shared instance
+    """
+    key = os.path.abspath(storage_directory)
+    with _search_lock:
+        index = _search_indexes.get(key)
+        if index is None:
+            index = DocumentSearchIndex(key, os.path.abspath(recycle_bin_directory))
+            _search_indexes[key] = index
+        return index
@@ -0,0 +1,381 @@
+"""
+Storage Accounting
+
+Keeps running byte totals for the Documents vault so dashboards can show
+real storage usage without walking the disk:
+
+- live bytes per category and per uploader
+- recycle-bin bytes
+- logical bytes (every record) vs physical bytes (shared blobs counted once)
+
+Totals are built once from the document store and then updated from its
+commit notifications (see DocumentStore.add_listener), so every save, move
+or delete adjusts them incrementally. reconcile() walks the storage
+directory with os.scandir to check the totals against the disk.
+"""
+
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Optional
+
+from .blob_store import is_blob_path, sha256_from_path
+from .document_store import get_document_store
+
+
+BYTES_PER_GB = 1024 ** 3
+
+# Directories under FileStorage that hold no committed file content
+SKIPPED_DIRECTORIES = ('.partial', '.thumbnails', '.search')
+
+
+def _to_gb(num_bytes):
+    """Convert bytes to GB rounded for display"""
+    return round(num_bytes / BYTES_PER_GB, 2)
+
+
+class StorageAccounting:
+    """
+    Incremental storage totals for one storage directory.
+
+    Args:
+        storage_directory (str): FileStorage root
+        recycle_bin_directory (str): RecycleBin folder for legacy files
+        store (DocumentStore, optional): Defaults to the shared store (followed
+                                         across configure_document_store calls)
+    """
+
+    def __init__(self, storage_directory, recycle_bin_directory, store=None):
+        self.storage_directory = storage_directory
+        self.recycle_bin_directory = recycle_bin_directory
+        self._store = store
+        self._lock = threading.RLock()
+
+        self._entries = {}          # {file_id: (category, uploader, is_deleted, size, sha256)}
+        self._by_category = {}      # {category: live bytes}
+        self._by_uploader = {}      # {uploader: live bytes}
+        self._live_bytes = 0
+        self._live_count = 0
+        self._recycle_bytes = 0
+        self._recycle_count = 0
+        self._legacy_bytes = 0      # Files outside the blob store (stored per record)
+        self._blob_refs = {}        # {sha256: reference count}
+        self._blob_sizes = {}       # {sha256: size}
+        self._blob_bytes = 0        # Each referenced blob counted once
+
+        self._stale = True
+        self._generation = 0
+        self._last_reconcile = None
+
+        self.store.add_listener(self._on_store_event)
+
+    @property
+    def store(self):
+        """Document store the totals are derived from"""
+        return self._store or get_document_store()
+
+    # ==================== ENTRY MAINTENANCE ====================
+
+    def _entry_for(self, record):
+        """Build the accounting entry for a file record (may stat legacy files)"""
+        file_path = record.get('file_path')
+        sha256 = sha256_from_path(file_path) if is_blob_path(file_path) else None
+
+        size = record.get('size')
+        if size is None:
+            # Records from before sizes were stored: measure the file once
+            if record.get('recycle_bin_path'):
+                path = os.path.join(self.recycle_bin_directory, record['recycle_bin_path'])
+            elif file_path:
+                path = os.path.join(self.storage_directory, file_path)
+            else:
+                path = None
+            try:
+                size = os.path.getsize(path) if path else 0
+            except OSError:
+                size = 0
+
+        return (
+            record.get('category') or 'None',
+            record.get('uploader') or 'Unknown',
+            bool(record.get('is_deleted', False)),
+            size,
+            sha256
+        )
+
+    def _apply(self, entry, sign):
+        """Add (sign=1) or subtract (sign=-1) an entry from the totals"""
+        category, uploader, is_deleted, size, sha256 = entry
+        delta = sign * size
+
+        if is_deleted:
+            self._recycle_bytes += delta
+            self._recycle_count += sign
+        else:
+            self._live_bytes += delta
+            self._live_count += sign
+            self._by_category[category] = self._by_category.get(category, 0) + delta
+            self._by_uploader[uploader] = self._by_uploader.get(uploader, 0) + delta
+            if self._by_category[category] == 0:
+                del self._by_category[category]
+            if self._by_uploader[uploader] == 0:
+                del self._by_uploader[uploader]
+
+        if sha256 is None:
+            self._legacy_bytes += delta
+            return
+
+        count = self._blob_refs.get(sha256, 0) + sign
+        if count > 0:
+            if sign > 0 and count == 1:
+                self._blob_sizes[sha256] = size
+                self._blob_bytes += size
+            self._blob_refs[sha256] = count
+        else:
+            self._blob_refs.pop(sha256, None)
+            self._blob_bytes -= self._blob_sizes.pop(sha256, size)
+
+    def _reset_totals(self):
+        self._entries = {}
+        self._by_category = {}
+        self._by_uploader = {}
+        self._live_bytes = 0
+        self._live_count = 0
+        self._recycle_bytes = 0
+        self._recycle_count = 0
+        self._legacy_bytes = 0
+        self._blob_refs = {}
+        self._blob_sizes = {}
+        self._blob_bytes = 0
+
+    def _on_store_event(self, event, payload):
+        """Document store listener: apply committed changes to the totals"""
+        with self._lock:
+            self._generation += 1
+            if event == 'files_reloaded':
+                self._stale = True
+                return
+            if event != 'files_committed' or self._stale:
+                return  # A pending rebuild will pick the change up
+
+            for file_id in payload.get('deletes', ()):
+                old = self._entries.pop(file_id, None)
+                if old is not None:
+                    self._apply(old, -1)
+            for record in payload.get('upserts', ()):
+                file_id = record.get('file_id')
+                old = self._entries.pop(file_id, None)
+                if old is not None:
+                    self._apply(old, -1)
+                entry = self._entry_for(record)
+                self._entries[file_id] = entry
+                self._apply(entry, 1)
+
+    def _ensure_current(self):
+        """Rebuild the totals from the document store if they are stale"""
+        while True:
+            with self._lock:
+                if not self._stale:
+                    return
+                generation = self._generation
+
+            # Read the store outside our lock: its listeners take our lock
+            # while holding theirs, so nesting the other way could deadlock
+            records = self.store.find_files(is_deleted=None)
+            entries = {record['file_id']: self._entry_for(record) for record in records}
+
+            with self._lock:
+                if generation != self._generation:
+                    continue  # The store changed while we read it; try again
+                self._reset_totals()
+                for file_id, entry in entries.items():
+                    self._entries[file_id] = entry
+                    self._apply(entry, 1)
+                self._stale = False
+                return
+
+    def invalidate(self):
+        """Force a rebuild from the document store on the next query"""
+        with self._lock:
+            self._stale = True
+            self._generation += 1
+
+    # ==================== QUERIES ====================
+
+    def get_totals(self) -> Dict:
+        """
+        Get the current byte totals.
+
+        Returns:
+            dict: Totals with keys live_bytes, live_count, recycle_bin_bytes,
+                  recycle_bin_count, logical_bytes, physical_bytes,
+                  by_category, by_uploader
+        """
+        self._ensure_current()
+        with self._lock:
+            return {
+                'live_bytes': self._live_bytes,
+                'live_count': self._live_count,
+                'recycle_bin_bytes': self._recycle_bytes,
+                'recycle_bin_count': self._recycle_count,
+                'logical_bytes': self._live_bytes + self._recycle_bytes,
+                'physical_bytes': self._legacy_bytes + self._blob_bytes,
+                'by_category': dict(self._by_category),
+                'by_uploader': dict(self._by_uploader)
+            }
+
+    def get_category_bytes(self, category) -> int:
+        """Get live bytes stored under a category"""
+        self._ensure_current()
+        with self._lock:
+            return self._by_category.get(category or 'None', 0)
+
+    def get_uploader_bytes(self, uploader) -> int:
+        """Get live bytes uploaded by a user"""
+        self._ensure_current()
+        with self._lock:
+            return self._by_uploader.get(uploader, 0)
+
+    def get_storage_info(self, quota_gb: Optional[float] = None) -> Dict:
+        """
+        Get storage usage in the shape used by the dashboard donut chart.
+
+        Used space is the physical bytes on disk (shared blobs once,
+        recycle bin included). The capacity is the configured quota,
+        capped by what the disk can actually hold (used + disk free), so
+        total = used + free and the percentage agree with each other.
+
+        Args:
+            quota_gb (float, optional): Vault quota; defaults to the disk size
+
+        Returns:
+            dict: Storage info with keys total_size_gb, used_size_gb,
+                  free_size_gb, usage_percentage, quota_size_gb (the
+                  uncapped quota), logical_size_gb, recycle_bin_size_gb,
+                  by_category, by_uploader
+        """
+        totals = self.get_totals()
+        used_bytes = totals['physical_bytes']
+
+        try:
+            disk_total, _disk_used, disk_free = shutil.disk_usage(self.storage_directory)
+        except OSError:
+            disk_total = disk_free = None
+
+        if quota_gb:
+            quota_bytes = int(quota_gb * BYTES_PER_GB)
+        else:
+            quota_bytes = disk_total or used_bytes
+
+        total_bytes = quota_bytes
+        if disk_free is not None:
+            total_bytes = min(total_bytes, used_bytes + disk_free)
+        free_bytes = max(0, total_bytes - used_bytes)
+
+        usage_percentage = int(round(used_bytes * 100 / total_bytes)) if total_bytes else 0
+
+        return {
+            'total_size_gb': _to_gb(total_bytes),
+            'used_size_gb': _to_gb(used_bytes),
+            'free_size_gb': _to_gb(free_bytes),
+            'usage_percentage': min(100, usage_percentage),
+            'quota_size_gb': _to_gb(quota_bytes),
+            'logical_size_gb': _to_gb(totals['logical_bytes']),
+            'recycle_bin_size_gb': _to_gb(totals['recycle_bin_bytes']),
+            'by_category': totals['by_category'],
+            'by_uploader': totals['by_uploader']
+        }
+
+    # ==================== RECONCILIATION ====================
+
+    def _scan_directory(self, path):
+        """Sum file sizes under path with os.scandir (recursive)"""
+        total = 0
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in SKIPPED_DIRECTORIES:
+                            continue
+                        total += self._scan_directory(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if entry.name.startswith('.'):
+                            continue  # .gitkeep and other markers
+                        total += entry.stat(follow_symlinks=False).st_size
+        except FileNotFoundError:
+            pass
+        return total
+
+    def reconcile(self) -> Dict:
+        """
+        Compare the accounted physical bytes with what is on disk.
+
+        Walks the storage directory with os.scandir. On a mismatch the
+        totals are rebuilt from the document store (re-measuring files that
+        have no recorded size). Safe to run on a worker thread.
+
+        Returns:
+            dict: Result with keys disk_bytes, accounted_bytes, drift_bytes,
+                  rebuilt (bool) and checked_at (timestamp)
+        """
+        accounted_bytes = self.get_totals()['physical_bytes']
+        disk_bytes = self._scan_directory(self.storage_directory)
+        drift_bytes = disk_bytes - accounted_bytes
+
+        rebuilt = False
+        if drift_bytes:
+            print(f"⚠ Storage accounting drift of {drift_bytes} byte(s); rebuilding totals")
+            self.invalidate()
+            accounted_bytes = self.get_totals()['physical_bytes']
+            drift_bytes = disk_bytes - accounted_bytes
+            rebuilt = True
+            if drift_bytes:
+                # Whatever is left is on disk but not referenced by any record
+                print(f"⚠ {drift_bytes} byte(s) on disk are not referenced by any file record "
+                      f"(see BlobStore.collect_garbage)")
+        else:
+            print(f"✓ Storage accounting matches disk ({disk_bytes} bytes)")
+
+        result = {
+            'disk_bytes': disk_bytes,
+            'accounted_bytes': accounted_bytes,
+            'drift_bytes': drift_bytes,
+            'rebuilt': rebuilt,
+            'checked_at': time.time()
+        }
+        with self._lock:
+            self._last_reconcile = result
+        return result
+
+    def get_last_reconcile(self) -> Optional[Dict]:
+        """Get the result of the most recent reconcile(), if any"""
+        with self._lock:
+            return dict(self._last_reconcile) if self._last_reconcile else None
+
+
+_accounting: Dict[str, StorageAccounting] = {}
+_accounting_lock = threading.Lock()
+
+
+def get_storage_accounting(storage_directory, recycle_bin_directory=None) -> StorageAccounting:
+    """
+    Get the process-wide accounting for a storage directory.
+
+    Args:
+        storage_directory (str): FileStorage root
+        recycle_bin_directory (str, optional): Defaults to <storage_directory>/RecycleBin
+
+    Returns:
+        StorageAccounting: Shared instance
+    """
+    key = os.path.abspath(storage_directory)
+    with _accounting_lock:
+        accounting = _accounting.get(key)
+        if accounting is None:
+            accounting = StorageAccounting(
+                key,
+                recycle_bin_directory or os.path.join(key, "RecycleBin")
+            )
+            _accounting[key] = accounting
+        return accounting
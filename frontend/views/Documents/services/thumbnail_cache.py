@@ -0,0 +1,321 @@
+"""
+Thumbnail Cache
+
+Downscaled previews of stored documents, kept on disk under
+FileStorage/.thumbnails and keyed by content hash and size, so a preview is
+decoded from the original once per distinct content no matter how many
+records, renames or views share it.
+
+- Images are decoded with Pillow (JPEG draft mode decodes at reduced scale).
+- PDFs are rendered from their first page with PyMuPDF, or with the
+  pdftoppm command line tool, whichever is available.
+- The cache is bounded by a byte budget; the least recently used
+  thumbnails are evicted first. Recency survives restarts through file
+  modification times.
+
+Generation is blocking and meant to run on a worker thread (see
+utils/thumbnail_loader.py).
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+
+# Byte budget of the on-disk thumbnail cache
+THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+
+# Longest edge of a thumbnail, in pixels
+DEFAULT_THUMBNAIL_SIZE = 128
+
+# Folder under FileStorage holding the cache
+THUMBNAIL_DIRECTORY = ".thumbnails"
+
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp', 'tif', 'tiff')
+PDF_EXTENSIONS = ('pdf',)
+
+# Seconds allowed for an external PDF renderer
+PDF_RENDER_TIMEOUT = 15
+
+
+def _pdf_renderer_available():
+    return fitz is not None or shutil.which('pdftoppm') is not None
+
+
+def can_preview(extension) -> bool:
+    """Check if a thumbnail can be generated for a file extension here"""
+    extension = (extension or '').lower().lstrip('.')
+    if Image is None:
+        return False
+    if extension in IMAGE_EXTENSIONS:
+        return True
+    return extension in PDF_EXTENSIONS and _pdf_renderer_available()
+
+
+class ThumbnailCache:
+    """
+    On-disk LRU cache of PNG thumbnails.
+
+    Args:
+        cache_directory (str): Folder holding the thumbnails
+        max_bytes (int): Byte budget (least recently used entries are evicted)
+    """
+
+    def __init__(self, cache_directory, max_bytes=THUMBNAIL_CACHE_BYTES):
+        self.cache_directory = cache_directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # {filename: size in bytes}, oldest first
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(cache_directory, exist_ok=True)
+        self._load_entries()
+
+    def _load_entries(self):
+        """Index the thumbnails already on disk, least recently used first"""
+        found = []
+        with os.scandir(self.cache_directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.png'):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _mtime, name, size in sorted(found):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def _entry_name(sha256, size):
+        return f"{sha256}_{size}.png"
+
+    def _path(self, name):
+        return os.path.join(self.cache_directory, name)
+
+    # ==================== LOOKUP ====================
+
+    def get_cached(self, sha256, size=DEFAULT_THUMBNAIL_SIZE) -> Optional[str]:
+        """
+        Get the path of a cached thumbnail without generating it.
+
+        Args:
+            sha256 (str): Content hash of the original
+            size (int): Longest edge in pixels
+
+        Returns:
+            str or None: Thumbnail path, or None if not cached
+        """
+        name = self._entry_name(sha256, size)
+        with self._lock:
+            if name not in self._entries:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self._hits += 1
+        path = self._path(name)
+        try:
+            os.utime(path)  # Remember recency across restarts
+        except OSError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(name, 0)
+            return None
+        return path
+
+    def get_thumbnail(self, source_path, sha256, extension,
+                      size=DEFAULT_THUMBNAIL_SIZE) -> Optional[str]:
+        """
+        Get a thumbnail, generating and caching it if needed (blocking).
+
+        Args:
+            source_path (str): Full path to the original file
+            sha256 (str): Content hash of the original
+            extension (str): File extension
+            size (int): Longest edge in pixels
+
+        Returns:
+            str or None: Thumbnail path, or None if no preview can be made
+        """
+        if not sha256 or not can_preview(extension):
+            return None
+        cached = self.get_cached(sha256, size)
+        if cached is not None:
+            return cached
+
+        try:
+            image = self._render(source_path, extension, size)
+        except Exception as e:
+            print(f"⚠ Warning: could not create thumbnail for {os.path.basename(source_path)}: {e}")
+            return None
+        if image is None:
+            return None
+        return self._store(self._entry_name(sha256, size), image)
+
+    # ==================== GENERATION ====================
+
+    def _render(self, source_path, extension, size):
+        """Decode the original and return a downscaled PIL image (or None)"""
+        extension = (extension or '').lower().lstrip('.')
+        if extension in IMAGE_EXTENSIONS:
+            with Image.open(source_path) as image:
+                # Let the JPEG decoder skip detail we are about to throw away
+                image.draft('RGB', (size, size))
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((size, size))
+                return image.convert('RGBA') if image.mode not in ('RGB', 'RGBA') else image.copy()
+        if extension in PDF_EXTENSIONS:
+            data = self._render_pdf_page(source_path, size)
+            if data is None:
+                return None
+            with Image.open(io.BytesIO(data)) as image:
+                image.thumbnail((size, size))
+                return image.copy()
+        return None
+
+    def _render_pdf_page(self, source_path, size):
+        """PNG bytes of the first PDF page, roughly size pixels on its long edge"""
+        if fitz is not None:
+            with fitz.open(source_path) as document:
+                if document.page_count == 0:
+                    return None
+                page = document.load_page(0)
+                scale = size / max(page.rect.width, page.rect.height, 1)
+                return page.get_pixmap(matrix=fitz.Matrix(scale, scale)).tobytes('png')
+
+        pdftoppm = shutil.which('pdftoppm')
+        if pdftoppm is None:
+            return None
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_base = os.path.join(tmp_dir, 'page')
+            subprocess.run(
+                [pdftoppm, '-png', '-f', '1', '-l', '1', '-singlefile',
+                 '-scale-to', str(size), source_path, output_base],
+                check=True, capture_output=True, timeout=PDF_RENDER_TIMEOUT
+            )
+            with open(output_base + '.png', 'rb') as f:
+                return f.read()
+
+    def _store(self, name, image):
+        """Write a thumbnail atomically, index it and evict over budget"""
+        path = self._path(name)
+        fd, tmp_path = tempfile.mkstemp(prefix='.thumb.', suffix='.tmp', dir=self.cache_directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                image.save(f, format='PNG', optimize=True)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"⚠ Warning: could not save thumbnail {name}: {e}")
+            return None
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._total_bytes += size
+            evicted = self._evict_locked()
+        for evicted_name in evicted:
+            try:
+                os.remove(self._path(evicted_name))
+            except OSError:
+                pass
+        return path
+
+    def _evict_locked(self):
+        """Pop least recently used entries until within budget (keeps the newest)"""
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(name)
+        return evicted
+
+    # ==================== MAINTENANCE ====================
+
+    def discard(self, sha256) -> int:
+        """
+        Remove every cached size of a content hash (e.g. after a purge).
+
+        Args:
+            sha256 (str): Content hash
+
+        Returns:
+            int: Number of thumbnails removed
+        """
+        prefix = f"{sha256}_"
+        with self._lock:
+            names = [name for name in self._entries if name.startswith(prefix)]
+            for name in names:
+                self._total_bytes -= self._entries.pop(name)
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+        return len(names)
+
+    def clear(self) -> None:
+        """Remove every cached thumbnail"""
+        with self._lock:
+            names = list(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: entries, bytes, max_bytes, hits and misses
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+_thumbnail_caches: Dict[str, ThumbnailCache] = {}
+_thumbnail_lock = threading.Lock()
+
+
+def get_thumbnail_cache(storage_directory) -> ThumbnailCache:
+    """
+    Get the process-wide thumbnail cache of a storage directory.
+
+    Args:
+        storage_directory (str): FileStorage root
+
+    Returns:
+        ThumbnailCache: Shared instance (cache under storage_directory/.thumbnails)
+    """
+    key = os.path.abspath(storage_directory)
+    with _thumbnail_lock:
+        cache = _thumbnail_caches.get(key)
+        if cache is None:
+            cache = ThumbnailCache(os.path.join(key, THUMBNAIL_DIRECTORY))
+            _thumbnail_caches[key] = cache
+        return cache
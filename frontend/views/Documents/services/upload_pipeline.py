@@ -0,0 +1,165 @@
+"""
+Upload Pipeline
+
+Ingests many files at once (e.g. a 200-file drag-and-drop):
+
+1. Stage - check every source and read its size up front.
+2. Copy - stream the files into the blob store on a bounded thread pool;
+   each copy hashes and sizes its file in the same pass
+   (FileStorageService.save_file).
+3. Commit - DocumentController.upload_files allocates unique display names
+   with NameAllocator (the store's filename index plus the names already
+   handed out in this batch) and writes every record in one store
+   transaction.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .document_store import get_document_store
+
+
+# Files copied at the same time
+UPLOAD_WORKERS = 4
+
+
+class NameAllocator:
+    """
+    Hands out unique filenames for a batch of uploads.
+
+    Names are unique against the active files in the store and against each
+    other. Duplicates get a " (n)" suffix like generate_unique_filename.
+
+    Args:
+        store (DocumentStore, optional): Store whose filename index is used
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_document_store()
+        self._reserved = set()
+        self._next_suffix = {}  # {base name: next counter to try}
+
+    def _taken(self, name):
+        return name in self._reserved or self.store.filename_exists(name)
+
+    def allocate(self, base_name: str) -> str:
+        """
+        Reserve a unique filename.
+
+        Args:
+            base_name (str): Wanted filename (without extension)
+
+        Returns:
+            str: base_name, or "base_name (n)" if it is already used
+        """
+        name = base_name
+        if self._taken(name):
+            counter = self._next_suffix.get(base_name, 1)
+            while self._taken(f"{base_name} ({counter})"):
+                counter += 1
+            name = f"{base_name} ({counter})"
+            self._next_suffix[base_name] = counter + 1
+        self._reserved.add(name)
+        return name
+
+
+class UploadPipeline:
+    """
+    Concurrent copy stage of a multi-file upload.
+
+    Args:
+        file_storage (FileStorageService): Storage the files are copied into
+        max_workers (int): Files copied at the same time
+    """
+
+    def __init__(self, file_storage, max_workers=UPLOAD_WORKERS):
+        self.file_storage = file_storage
+        self.max_workers = max_workers
+
+    def stage(self, source_paths: List[str]) -> List[Dict]:
+        """
+        Check the sources and collect what the copy stage needs.
+
+        Args:
+            source_paths (list): Files selected for upload
+
+        Returns:
+            list: One dict per source with index, source_path, name (without
+                  extension), size and error (None if the source is usable)
+        """
+        staged = []
+        for index, source_path in enumerate(source_paths):
+            name = os.path.splitext(os.path.basename(source_path))[0]
+            item = {'index': index, 'source_path': source_path, 'name': name, 'size': 0, 'error': None}
+            try:
+                if not os.path.isfile(source_path):
+                    item['error'] = f"Source file not found: {source_path}"
+                else:
+                    item['size'] = os.path.getsize(source_path)
+            except OSError as e:
+                item['error'] = str(e)
+            staged.append(item)
+        return staged
+
+    def run(self, source_paths: List[str], file_progress: Optional[Callable] = None,
+            file_finished: Optional[Callable] = None, cancel_token=None) -> List[Dict]:
+        """
+        Copy files concurrently.
+
+        Args:
+            source_paths (list): Files selected for upload
+            file_progress (callable, optional): Called from the copy threads as
+                (index, bytes_copied, total_bytes) whenever a file advances
+            file_finished (callable, optional): Called from the copy threads
+                with the result dict (see below) once a file is done
+            cancel_token (optional): Object with is_cancelled(); stops the
+                copies still running (finished copies are kept)
+
+        Returns:
+            list: One dict per source, in input order, with keys:
+                - index, source_path, name (wanted name, not yet unique), size
+                - stored (dict or None): save_file result for copied files
+                - error (str or None): Why the file was not stored
+                - cancelled (bool): True if the copy was stopped by cancel_token
+        """
+        staged = self.stage(source_paths)
+        progress_lock = threading.Lock()
+
+        def report(index, copied, total):
+            if file_progress:
+                # One caller at a time keeps the receiver's bookkeeping simple
+                with progress_lock:
+                    file_progress(index, copied, total)
+
+        def finish(item):
+            if file_finished:
+                with progress_lock:
+                    file_finished(item)
+            return item
+
+        def copy(item):
+            item['stored'] = None
+            item['cancelled'] = False
+            if item['error']:
+                return finish(item)
+            if cancel_token and cancel_token.is_cancelled():
+                item['cancelled'] = True
+                return finish(item)
+            result = self.file_storage.save_file(
+                item['source_path'],
+                progress_callback=lambda copied, total, _text="": report(item['index'], copied, total),
+                cancel_token=cancel_token
+            )
+            if result['success']:
+                item['stored'] = result
+            elif result.get('cancelled'):
+                item['cancelled'] = True
+            else:
+                item['error'] = result.get('error', 'Failed to save file')
+            return finish(item)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='documents-upload') as executor:
+            return list(executor.map(copy, staged))
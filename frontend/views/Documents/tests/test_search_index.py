@@ -0,0 +1,94 @@
+"""
+Tests for the document search index.
+
+Run from the frontend folder:
+    python -m pytest views/Documents/tests
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from views.Documents.services.document_store import DocumentStore
+from views.Documents.services.search_index import (ContentTokenCache, DocumentSearchIndex,
+                                                   edit_distance, tokenize)
+from views.Documents.services.storage_backends import JSONStorageBackend
+
+
+class SearchIndexTestCase(unittest.TestCase):
+    """Index over a throwaway JSON store"""
+
+    filenames = ['Thesis_Guidelines', 'Quarterly_Report', 'Syllabus_2024', 'Budget',
+                 'Señor_Resumé', '中文报告']
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        records = [{'file_id': i, 'filename': name, 'extension': 'pdf', 'is_deleted': False}
+                   for i, name in enumerate(self.filenames, start=1)]
+        self._write('files_data.json', {'files': records, 'next_file_id': len(records) + 1})
+        self._write('collections_data.json', {'collections': [], 'next_collection_id': 1})
+
+        self.store = DocumentStore(JSONStorageBackend(self.directory))
+        cache = ContentTokenCache(os.path.join(self.directory, 'content_tokens.sqlite3'))
+        self.addCleanup(cache.close)
+        self.index = DocumentSearchIndex(self.directory, self.directory,
+                                         store=self.store, content_cache=cache)
+
+    def _write(self, filename, data):
+        with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def names(self, query):
+        return [self.store.get_file(file_id)['filename'] for file_id in self.index.search(query)]
+
+
+class FuzzyMatchTests(SearchIndexTestCase):
+
+    def test_substitution(self):
+        self.assertEqual(self.names('thesys'), ['Thesis_Guidelines'])
+
+    def test_transposition(self):
+        self.assertEqual(self.names('reprot'), ['Quarterly_Report'])
+
+    def test_deletion(self):
+        self.assertEqual(self.names('sylabus'), ['Syllabus_2024'])
+
+    def test_too_many_edits(self):
+        self.assertEqual(self.names('bdgtx'), [])
+
+    def test_exact_match_ranks_first(self):
+        self.store.put_file({'file_id': 5, 'filename': 'thesys_notes', 'extension': 'pdf',
+                             'is_deleted': False})
+        self.store.save_files()
+        self.assertEqual(self.names('thesys'), ['thesys_notes', 'Thesis_Guidelines'])
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance('thesys', 'thesis', 2), 1)
+        self.assertEqual(edit_distance('reprot', 'report', 2), 1)
+        self.assertEqual(edit_distance('enrollmnet', 'enrollment', 2), 1)
+        self.assertEqual(edit_distance('budget', 'gadget', 1), 2)
+
+
+
+class UnicodeTokenTests(SearchIndexTestCase):
+
+    def test_tokenize_keeps_non_ascii_letters(self):
+        self.assertEqual(tokenize('Señor Resumé 中文报告'), ['señor', 'resumé', '中文', '文报', '报告'])
+
+    def test_tokenize_casefolds(self):
+        self.assertEqual(tokenize('STRASSE Straße'), ['strasse', 'strasse'])
+
+    def test_accented_name(self):
+        self.assertEqual(self.names('SEÑOR'), ['Señor_Resumé'])
+        self.assertEqual(self.names('resumé'), ['Señor_Resumé'])
+
+    def test_chinese_substring(self):
+        self.assertEqual(self.names('报告'), ['中文报告'])
+        self.assertEqual(self.names('中文报告'), ['中文报告'])
+
+
+if __name__ == '__main__':
+    unittest.main()
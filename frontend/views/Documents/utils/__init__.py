@@ -11,14 +11,36 @@ from .role_utils import (
     is_faculty,
     is_staff, 
     is_student, 
-    has_sub_role
+    has_sub_role,
+    PERMISSION_VIEW,
+    PERMISSION_EDIT,
+    PERMISSION_DELETE,
+    PERMISSION_APPROVE,
+    PERMISSION_ALL
 )
 from .bulk_operations import (
     BulkOperationDialog,
     BulkProgressDialog,
     execute_bulk_operation,
+    execute_streaming_operation,
     get_selected_files_from_table
 )
+from .workers import (
+    Job,
+    BulkJob,
+    CancelToken,
+    JobCancelled,
+    WorkerSignals,
+    get_thread_pool,
+    get_preview_thread_pool,
+    run_in_background,
+    start_job,
+    wait_for_jobs
+)
+from .recycle_bin_scheduler import RecycleBinPurgeScheduler, get_recycle_bin_purge_scheduler
+from .change_notifier import DocumentChangeNotifier, get_document_change_notifier
+from .search_pipeline import SearchPipeline
+from .thumbnail_loader import ThumbnailLoader, get_thumbnail_loader
 
 __all__ = [
     'IconLoader',
@@ -30,8 +52,31 @@ __all__ = [
     'is_staff',
     'is_student',
     'has_sub_role',
+    'PERMISSION_VIEW',
+    'PERMISSION_EDIT',
+    'PERMISSION_DELETE',
+    'PERMISSION_APPROVE',
+    'PERMISSION_ALL',
     'BulkOperationDialog',
     'BulkProgressDialog',
     'execute_bulk_operation',
-    'get_selected_files_from_table'
+    'execute_streaming_operation',
+    'get_selected_files_from_table',
+    'Job',
+    'BulkJob',
+    'CancelToken',
+    'JobCancelled',
+    'WorkerSignals',
+    'get_thread_pool',
+    'get_preview_thread_pool',
+    'run_in_background',
+    'start_job',
+    'wait_for_jobs',
+    'RecycleBinPurgeScheduler',
+    'get_recycle_bin_purge_scheduler',
+    'DocumentChangeNotifier',
+    'get_document_change_notifier',
+    'SearchPipeline',
+    'ThumbnailLoader',
+    'get_thumbnail_loader'
 ]
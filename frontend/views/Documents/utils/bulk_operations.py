@@ -3,11 +3,17 @@ Bulk Operations Utility
 
 Provides reusable bulk operation functionality for file management.
 Includes bulk deletion, bulk restore, and other batch operations.
+Bulk operations run on a background worker so the GUI stays responsive.
 """
 
 from PyQt6.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QLabel, QListWidget, QPushButton, QHBoxLayout, QProgressBar
 from PyQt6.QtCore import Qt
 from typing import List, Dict, Callable, Tuple
+from .workers import BulkJob, Job, start_job
+
+
+# Progress bar resolution of streaming operations (byte counts overflow Qt ints)
+STREAM_PROGRESS_STEPS = 1000
 
 
 class BulkOperationDialog(QDialog):
@@ -127,16 +133,20 @@ class BulkProgressDialog(QDialog):
     Dialog showing progress of bulk operations.
     
     Displays a progress bar and status messages as items are processed.
+    When attached to a background job (see attach_job), the dialog is driven
+    by the job's progress signals and offers a Cancel button while it runs.
     """
     
     def __init__(self, parent=None, operation_name="Processing", total_items=0):
         super().__init__(parent)
         self.setModal(True)
         self.setWindowTitle(f"Bulk {operation_name}")
-        self.setFixedSize(400, 150)
+        self.setFixedSize(400, 170)
         
         self.operation_name = operation_name
         self.total_items = total_items
+        self.job = None
+        self.running = False
         self.init_ui()
     
     def init_ui(self):
@@ -158,23 +168,84 @@ class BulkProgressDialog(QDialog):
         self.progress_bar.setValue(0)
         main_layout.addWidget(self.progress_bar)
         
-        # Close button (initially disabled)
+        # Buttons: Cancel while running, Close once complete
+        button_layout = QHBoxLayout()
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+        
         self.close_btn = QPushButton("Close")
         self.close_btn.setEnabled(False)
         self.close_btn.clicked.connect(self.accept)
-        main_layout.addWidget(self.close_btn)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.close_btn)
+        main_layout.addLayout(button_layout)
         
         self.setLayout(main_layout)
     
+    def attach_job(self, job):
+        """
+        Drive this dialog from a background job's signals.
+        
+        Args:
+            job (Job): Job whose progress/finished signals update the dialog
+        """
+        self.job = job
+        self.running = True
+        self.cancel_btn.setEnabled(True)
+        job.signals.progress.connect(self._on_job_progress)
+        job.signals.finished.connect(self._on_job_finished)
+    
+    def _on_job_progress(self, current, total, status_text):
+        """Handle a progress signal from the attached job"""
+        if total and total != self.progress_bar.maximum():
+            self.progress_bar.setMaximum(total)
+        self.update_progress(current, status_text)
+    
+    def _on_job_finished(self):
+        """Handle the attached job finishing"""
+        self.running = False
+        self.cancel_btn.setEnabled(False)
+    
+    def cancel(self):
+        """Request cancellation of the attached job"""
+        if self.job and self.running:
+            self.job.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText("Cancelling after the current item...")
+    
+    def reject(self):
+        """Escape/close while running cancels the job instead of hiding the dialog"""
+        if self.running:
+            self.cancel()
+            return
+        super().reject()
+    
+    def closeEvent(self, event):
+        """Prevent closing the dialog while the job is still running"""
+        if self.running:
+            self.cancel()
+            event.ignore()
+            return
+        super().closeEvent(event)
+    
     def update_progress(self, current, status_text=""):
         """Update the progress bar and status text"""
         self.progress_bar.setValue(current)
         if status_text:
             self.status_label.setText(status_text)
     
-    def complete(self, success_count, failed_count):
+    def complete(self, success_count, failed_count, cancelled=False):
         """Mark the operation as complete"""
-        if failed_count == 0:
+        if cancelled:
+            self.status_label.setText(
+                f"⚠ Cancelled: {success_count} succeeded, {failed_count} failed"
+            )
+            self.status_label.setStyleSheet("color: orange; font-weight: bold;")
+        elif failed_count == 0:
             self.status_label.setText(f"✅ Successfully processed {success_count} item(s)")
             self.status_label.setStyleSheet("color: green; font-weight: bold;")
         else:
@@ -183,20 +254,27 @@ class BulkProgressDialog(QDialog):
             )
             self.status_label.setStyleSheet("color: orange; font-weight: bold;")
         
+        self.cancel_btn.setEnabled(False)
         self.close_btn.setEnabled(True)
 
 
 def execute_bulk_operation(
     items: List[Dict],
-    operation_func: Callable[[Dict], Tuple[bool, str]],
+    operation_func: Callable[[Dict], Tuple[bool, str]] = None,
     operation_name: str = "Operation",
     parent=None,
     item_display_func=None,
-    confirmation_message=None
+    confirmation_message=None,
+    batch_func: Callable[[List[Dict]], List[Tuple[bool, str]]] = None
 ) -> Tuple[int, int, List[Tuple[str, str]]]:
     """
     Execute a bulk operation on a list of items with confirmation and progress.
     
+    Items are processed on a background worker (see utils.workers) while the
+    progress dialog stays responsive and can cancel the remaining items.
+    operation_func therefore runs off the GUI thread: it may call controller
+    methods and emit signals, but must not touch widgets directly.
+    
     Args:
         items: List of items to operate on (usually file data dicts)
         operation_func: Function that takes an item and returns (success: bool, message: str)
@@ -204,6 +282,9 @@ def execute_bulk_operation(
         parent: Parent widget for dialogs
         item_display_func: Optional function to format items for display
         confirmation_message: Optional custom confirmation message
+        batch_func: Optional function that takes a list of items and returns
+                    [(success, message), ...] in the same order; used instead of
+                    operation_func so a whole chunk is committed at once
     
     Returns:
         Tuple of (successful_count, failed_count, failed_items_list)
@@ -232,39 +313,39 @@ def execute_bulk_operation(
         operation_name=operation_name,
         total_items=len(items)
     )
-    progress_dialog.show()
     
-    # Process items
-    successful = 0
-    failed = 0
-    failed_items = []
+    # Process items on a worker thread; the dialog's event loop stays live
+    outcome = {
+        'successful': 0,
+        'failed': 0,
+        'failed_items': [],
+        'cancelled': False
+    }
     
-    for idx, item in enumerate(items):
-        item_name = item.get('filename', str(item)) if isinstance(item, dict) else str(item)
-        
-        try:
-            success, message = operation_func(item)
-            
-            if success:
-                successful += 1
-            else:
-                failed += 1
-                failed_items.append((item_name, message))
-        
-        except Exception as e:
-            failed += 1
-            failed_items.append((item_name, str(e)))
-        
-        # Update progress
-        progress_dialog.update_progress(
-            idx + 1,
-            f"Processing: {item_name} ({idx + 1}/{len(items)})"
+    def on_result(result):
+        outcome.update(result)
+    
+    def on_error(message):
+        outcome['failed_items'].append((operation_name, message))
+        outcome['failed'] = len(outcome['failed_items'])
+    
+    def on_finished():
+        progress_dialog.complete(
+            outcome['successful'],
+            outcome['failed'],
+            cancelled=outcome['cancelled']
         )
     
-    # Mark as complete
-    progress_dialog.complete(successful, failed)
+    job = BulkJob(items, operation_func, batch_func=batch_func)
+    progress_dialog.attach_job(job)
+    start_job(job, on_result=on_result, on_error=on_error, on_finished=on_finished)
+    # Returns once the job finished and the user closed the dialog
     progress_dialog.exec()
     
+    successful = outcome['successful']
+    failed = outcome['failed']
+    failed_items = outcome['failed_items']
+    
     # Show summary if there were failures
     if failed > 0:
         error_details = "\n".join([f"• {name}: {error}" for name, error in failed_items[:10]])
@@ -281,6 +362,65 @@ def execute_bulk_operation(
     return successful, failed, failed_items
 
 
+def execute_streaming_operation(
+    operation_func: Callable,
+    operation_name: str = "Operation",
+    parent=None
+) -> Tuple:
+    """
+    Run a long byte-streaming operation (e.g. a collection export) with a progress dialog.
+    
+    operation_func runs on a background worker and receives
+    progress_callback(bytes_done, total_bytes, status_text) and cancel_token
+    keyword arguments; byte counts are scaled to STREAM_PROGRESS_STEPS for
+    the progress bar. It must return a tuple whose first two values are
+    (success: bool, message: str).
+    
+    Args:
+        operation_func: Function doing the work (see above)
+        operation_name: Name of the operation (e.g., "Export", "Import")
+        parent: Parent widget for dialogs
+    
+    Returns:
+        tuple: operation_func's result, or (False, error message)
+    """
+    progress_dialog = BulkProgressDialog(
+        parent=parent,
+        operation_name=operation_name,
+        total_items=STREAM_PROGRESS_STEPS
+    )
+    outcome = {'result': (False, f"{operation_name} did not finish")}
+    
+    def run(progress_callback=None, cancel_token=None):
+        def scaled_progress(done, total, status_text=""):
+            step = int(done * STREAM_PROGRESS_STEPS / total) if total else 0
+            progress_callback(min(step, STREAM_PROGRESS_STEPS), STREAM_PROGRESS_STEPS, status_text)
+        return operation_func(progress_callback=scaled_progress, cancel_token=cancel_token)
+    
+    def on_result(result):
+        outcome['result'] = result
+    
+    def on_error(message):
+        outcome['result'] = (False, message)
+    
+    def on_finished():
+        success, message = outcome['result'][:2]
+        progress_dialog.status_label.setText(f"✅ {message}" if success else f"⚠ {message}")
+        progress_dialog.status_label.setStyleSheet(
+            f"color: {'green' if success else 'orange'}; font-weight: bold;")
+        if success:
+            progress_dialog.progress_bar.setValue(STREAM_PROGRESS_STEPS)
+        progress_dialog.cancel_btn.setEnabled(False)
+        progress_dialog.close_btn.setEnabled(True)
+    
+    job = Job(run, report_progress=True)
+    progress_dialog.attach_job(job)
+    start_job(job, on_result=on_result, on_error=on_error, on_finished=on_finished)
+    # Returns once the job finished and the user closed the dialog
+    progress_dialog.exec()
+    return outcome['result']
+
+
 def get_selected_files_from_table(table_widget) -> List[Dict]:
     """
     Extract selected file data from a QTableWidget.
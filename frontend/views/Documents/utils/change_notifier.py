@@ -0,0 +1,54 @@
+"""
+Document Change Notifier
+
+Qt bridge for the document change feed. The feed calls its subscribers on
+whatever thread committed the change (often a worker running a bulk job),
+with the store lock held; the notifier turns that into a signal so views
+can apply the deltas on the GUI thread.
+"""
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class DocumentChangeNotifier(QObject):
+    """
+    Emits a signal whenever the document change feed moves forward.
+
+    Connect with Qt.ConnectionType.QueuedConnection so the slot runs after
+    the commit has finished, then call controller.get_changes_since().
+
+    Signals:
+        changed: Emitted with the new revision
+
+    Args:
+        controller (DocumentController): Controller whose change feed is followed
+        parent (QObject, optional): Parent object
+    """
+
+    changed = pyqtSignal(int)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.controller.subscribe_changes(self.changed.emit)
+
+
+_notifier = None
+
+
+def get_document_change_notifier(controller):
+    """
+    Get the process-wide change notifier, creating it on first use.
+
+    Must be called from the GUI thread.
+
+    Args:
+        controller (DocumentController): Controller used when first created
+
+    Returns:
+        DocumentChangeNotifier: Shared notifier
+    """
+    global _notifier
+    if _notifier is None:
+        _notifier = DocumentChangeNotifier(controller)
+    return _notifier
@@ -3,14 +3,32 @@ Icon Utility Module for Document Management System
 
 This module provides utilities for loading and managing icons/images
 for the document management interface.
+
+Icons are read once from a packed archive (assets/icons.zip, rebuilt with
+IconLoader.pack_icons()) and kept as compressed PNG bytes. Each requested
+size is decoded straight at that size and kept in a byte-bounded LRU that is
+shared with QPixmapCache, so building cards and rows never touches the disk.
 """
 
 import os
-from PyQt6.QtGui import QPixmap, QIcon
-from PyQt6.QtCore import Qt, QSize
+import threading
+import zipfile
+from collections import OrderedDict
+from PyQt6.QtGui import QPixmap, QIcon, QImageReader, QPixmapCache
+from PyQt6.QtCore import Qt, QSize, QBuffer, QByteArray, QIODevice
 from PyQt6.QtWidgets import QPushButton, QLabel
 
 
+# Packed icon set under assets/
+ICON_PACK_NAME = "icons.zip"
+
+# Byte budget of decoded icon pixmaps kept by IconLoader
+ICON_CACHE_BYTES = 4 * 1024 * 1024
+
+# Key prefix of icon entries in QPixmapCache
+PIXMAP_CACHE_PREFIX = "documents-icon:"
+
+
 class IconLoader:
     """
     Utility class for loading and managing icons from the Assets folder.
@@ -22,8 +40,15 @@ class IconLoader:
     - Handle fallbacks if icons don't load
     """
     
-    # Cache for loaded pixmaps to avoid reloading
-    _icon_cache = {}
+    # Compressed PNG bytes of every icon, read once from the pack
+    _icon_data = None
+    _icon_data_lock = threading.Lock()
+    
+    # Decoded pixmaps, least recently used first: {cache_key: QPixmap}
+    _icon_cache = OrderedDict()
+    _cache_bytes = 0
+    _hits = 0
+    _misses = 0
     
     @staticmethod
     def get_assets_path():
@@ -37,6 +62,120 @@ class IconLoader:
         assets_path = os.path.join(current_dir, '..', 'assets')
         return os.path.abspath(assets_path)
     
+    @staticmethod
+    def preload():
+        """
+        Read the packed icon set into memory (once per process).
+        
+        Falls back to the loose PNG files if assets/icons.zip is missing.
+        Safe to call before a QApplication exists.
+        
+        Returns:
+            int: Number of icons available
+        """
+        with IconLoader._icon_data_lock:
+            if IconLoader._icon_data is not None:
+                return len(IconLoader._icon_data)
+            
+            icon_data = {}
+            pack_path = os.path.join(IconLoader.get_assets_path(), ICON_PACK_NAME)
+            try:
+                with zipfile.ZipFile(pack_path) as pack:
+                    for name in pack.namelist():
+                        icon_data[name] = pack.read(name)
+            except (OSError, zipfile.BadZipFile):
+                print(f"⚠ Icon pack {ICON_PACK_NAME} not found, reading loose icons")
+                icon_data = IconLoader._read_loose_icons()
+            
+            IconLoader._icon_data = icon_data
+            return len(icon_data)
+    
+    @staticmethod
+    def _read_loose_icons():
+        """Read every PNG in the assets folder: {icon_name: bytes}"""
+        icon_data = {}
+        with os.scandir(IconLoader.get_assets_path()) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith('.png'):
+                    with open(entry.path, 'rb') as f:
+                        icon_data[entry.name] = f.read()
+        return icon_data
+    
+    @staticmethod
+    def pack_icons():
+        """
+        Rebuild assets/icons.zip from the PNG files in the assets folder.
+        
+        Run after adding or changing an icon. PNGs are already compressed,
+        so they are stored as-is.
+        
+        Returns:
+            str: Path of the written pack
+        """
+        assets_path = IconLoader.get_assets_path()
+        pack_path = os.path.join(assets_path, ICON_PACK_NAME)
+        icon_data = IconLoader._read_loose_icons()
+        tmp_path = pack_path + '.tmp'
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_STORED) as pack:
+            for name in sorted(icon_data):
+                pack.writestr(name, icon_data[name])
+        os.replace(tmp_path, pack_path)
+        
+        with IconLoader._icon_data_lock:
+            IconLoader._icon_data = icon_data
+        IconLoader.clear_cache()
+        print(f"✓ Packed {len(icon_data)} icons into {ICON_PACK_NAME}")
+        return pack_path
+    
+    @staticmethod
+    def _icon_bytes(icon_name):
+        """Compressed bytes of an icon (icons added after packing are read once from disk)"""
+        IconLoader.preload()
+        data = IconLoader._icon_data.get(icon_name)
+        if data is None:
+            icon_path = os.path.join(IconLoader.get_assets_path(), icon_name)
+            if not os.path.isfile(icon_path):
+                return None
+            with open(icon_path, 'rb') as f:
+                data = f.read()
+            IconLoader._icon_data[icon_name] = data
+        return data
+    
+    @staticmethod
+    def _decode(data, size):
+        """Decode PNG bytes, scaling while decoding so the full-size image is never kept"""
+        buffer = QBuffer()
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        reader = QImageReader(buffer)
+        if size:
+            original = reader.size()
+            if original.isValid():
+                reader.setScaledSize(original.scaled(
+                    size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        buffer.close()
+        if image.isNull():
+            return None
+        return QPixmap.fromImage(image)
+    
+    @staticmethod
+    def _pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+    
+    @staticmethod
+    def _remember(cache_key, pixmap):
+        """Add a pixmap to the LRU (evicting over budget) and to QPixmapCache"""
+        cache = IconLoader._icon_cache
+        if cache_key in cache:
+            IconLoader._cache_bytes -= IconLoader._pixmap_bytes(cache.pop(cache_key))
+        cache[cache_key] = pixmap
+        IconLoader._cache_bytes += IconLoader._pixmap_bytes(pixmap)
+        while IconLoader._cache_bytes > ICON_CACHE_BYTES and len(cache) > 1:
+            _key, evicted = cache.popitem(last=False)
+            IconLoader._cache_bytes -= IconLoader._pixmap_bytes(evicted)
+        QPixmapCache.insert(PIXMAP_CACHE_PREFIX + cache_key, pixmap)
+    
     @staticmethod
     def load_icon(icon_name, size=None, cache=True):
         """
@@ -52,29 +191,30 @@ class IconLoader:
         """
         cache_key = f"{icon_name}_{size}" if size else icon_name
         
-        # Check cache first
-        if cache and cache_key in IconLoader._icon_cache:
-            return IconLoader._icon_cache[cache_key]
+        # Check caches first (ours, then QPixmapCache which may outlive an eviction)
+        if cache:
+            pixmap = IconLoader._icon_cache.get(cache_key)
+            if pixmap is not None:
+                IconLoader._icon_cache.move_to_end(cache_key)
+                IconLoader._hits += 1
+                return pixmap
+            pixmap = QPixmapCache.find(PIXMAP_CACHE_PREFIX + cache_key)
+            if pixmap is not None and not pixmap.isNull():
+                IconLoader._hits += 1
+                IconLoader._remember(cache_key, pixmap)
+                return pixmap
+            IconLoader._misses += 1
         
-        icon_path = os.path.join(IconLoader.get_assets_path(), icon_name)
-        pixmap = QPixmap(icon_path)
+        data = IconLoader._icon_bytes(icon_name)
+        pixmap = IconLoader._decode(data, size) if data is not None else None
         
-        if pixmap.isNull():
-            print(f"Warning: Failed to load icon '{icon_name}' from {icon_path}")
+        if pixmap is None:
+            print(f"Warning: Failed to load icon '{icon_name}' from {IconLoader.get_assets_path()}")
             return None
         
-        # Scale if size provided
-        if size:
-            width, height = size
-            pixmap = pixmap.scaled(
-                width, height,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-        
         # Cache the pixmap
         if cache:
-            IconLoader._icon_cache[cache_key] = pixmap
+            IconLoader._remember(cache_key, pixmap)
         
         return pixmap
     
@@ -196,7 +336,27 @@ class IconLoader:
     @staticmethod
     def clear_cache():
         """Clear the icon cache to free up memory."""
+        for cache_key in IconLoader._icon_cache:
+            QPixmapCache.remove(PIXMAP_CACHE_PREFIX + cache_key)
         IconLoader._icon_cache.clear()
+        IconLoader._cache_bytes = 0
+    
+    @staticmethod
+    def get_cache_stats():
+        """
+        Get icon cache counters.
+        
+        Returns:
+            dict: hits, misses, entries, bytes, max_bytes and packed_icons
+        """
+        return {
+            'hits': IconLoader._hits,
+            'misses': IconLoader._misses,
+            'entries': len(IconLoader._icon_cache),
+            'bytes': IconLoader._cache_bytes,
+            'max_bytes': ICON_CACHE_BYTES,
+            'packed_icons': len(IconLoader._icon_data or {})
+        }
 
 
 # Convenience functions for common icons
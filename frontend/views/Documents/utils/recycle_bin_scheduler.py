@@ -0,0 +1,127 @@
+"""
+Recycle Bin Purge Scheduler
+
+Background timer that purges expired recycle-bin entries. Instead of
+scanning on every dashboard load, it asks the expiry index when the next
+entry is due, sleeps until then and runs the purge on a worker thread.
+"""
+
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from .workers import run_in_background
+
+
+# Re-check at least this often so newly deleted files are picked up
+MAX_CHECK_INTERVAL_MS = 60 * 60 * 1000
+
+# Delay before the first purge after start(), so it does not compete with startup
+STARTUP_DELAY_MS = 2000
+
+# Retry delay after a failed purge; doubles per consecutive failure, up to
+# MAX_CHECK_INTERVAL_MS (a failed purge leaves due entries, which would
+# otherwise re-arm the timer at 0 ms)
+RETRY_DELAY_MS = 60 * 1000
+
+
+class RecycleBinPurgeScheduler(QObject):
+    """
+    Timer-driven purge of expired recycle-bin files.
+
+    Signals:
+        purged: Emitted with the number of files purged by a run (only when > 0)
+
+    Args:
+        controller (DocumentController): Controller used to query and purge
+        parent (QObject, optional): Parent object
+    """
+
+    purged = pyqtSignal(int)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.job = None
+        self.failures = 0  # Consecutive failed runs
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_purge)
+
+    def start(self):
+        """Start scheduling (first check shortly after startup)"""
+        if not self.timer.isActive() and self.job is None:
+            self.timer.start(STARTUP_DELAY_MS)
+
+    def stop(self):
+        """Stop scheduling further purges"""
+        self.timer.stop()
+
+    def schedule_next(self):
+        """Arm the timer for the next due entry (capped at MAX_CHECK_INTERVAL_MS)"""
+        next_expiry = self.controller.next_recycle_bin_expiry()
+        if next_expiry is None:
+            delay_ms = MAX_CHECK_INTERVAL_MS
+        else:
+            delay_ms = int(max(0.0, next_expiry - time.time()) * 1000)
+            delay_ms = min(delay_ms, MAX_CHECK_INTERVAL_MS)
+        self.timer.start(delay_ms)
+
+    def run_purge(self):
+        """Purge due entries on a worker thread"""
+        if self.job is not None:
+            return
+        self.job = run_in_background(
+            self.controller.purge_expired_recycle_bin,
+            on_result=self._on_purge_result,
+            on_error=self._on_purge_error,
+            on_finished=self._on_purge_finished
+        )
+
+    def _on_purge_result(self, result):
+        """Report a finished purge"""
+        success, message, count = result
+        self.failures = 0 if success else self.failures + 1
+        if not success:
+            print(f"⚠ Recycle bin purge: {message}")
+        elif count > 0:
+            print(f"Auto-cleanup: {message}")
+        if count > 0:
+            self.purged.emit(count)
+
+    def _on_purge_error(self, message):
+        self.failures += 1
+        print(f"⚠ Recycle bin purge failed: {message}")
+
+    def _on_purge_finished(self):
+        self.job = None
+        if self.failures:
+            self.timer.start(self.retry_delay_ms())
+        else:
+            self.schedule_next()
+
+    def retry_delay_ms(self):
+        """Delay before retrying after the current run of failures"""
+        return min(RETRY_DELAY_MS * 2 ** (self.failures - 1), MAX_CHECK_INTERVAL_MS)
+
+
+_scheduler = None
+
+
+def get_recycle_bin_purge_scheduler(controller):
+    """
+    Get the process-wide purge scheduler, creating it on first use.
+
+    Must be called from the GUI thread.
+
+    Args:
+        controller (DocumentController): Controller used when first created
+
+    Returns:
+        RecycleBinPurgeScheduler: Shared scheduler
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RecycleBinPurgeScheduler(controller)
+    return _scheduler
@@ -5,10 +5,21 @@ This module provides utilities for routing users to appropriate dashboards
 based on their roles and permissions.
 """
 
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, Tuple
 from PyQt6.QtWidgets import QWidget
 
 
+# File permission bits (combined into one mask per file)
+PERMISSION_VIEW = 1
+PERMISSION_EDIT = 2
+PERMISSION_DELETE = 4
+PERMISSION_APPROVE = 8
+PERMISSION_ALL = PERMISSION_VIEW | PERMISSION_EDIT | PERMISSION_DELETE | PERMISSION_APPROVE
+
+# What every role may do with the files it uploaded itself
+OWNER_PERMISSIONS = PERMISSION_VIEW | PERMISSION_EDIT | PERMISSION_DELETE
+
+
 class RoleRouter:
     """
     Utility class for routing users to role-appropriate dashboards.
@@ -37,6 +48,19 @@ class RoleRouter:
         'student': ['student', 'org_officer', 'officer', 'learner']
     }
     
+    # File permissions per primary role: (own uploads, other users' files)
+    FILE_PERMISSIONS = {
+        'admin': (PERMISSION_ALL, PERMISSION_ALL),
+        'faculty': (OWNER_PERMISSIONS, 0),
+        'staff': (OWNER_PERMISSIONS, 0),
+        'student': (OWNER_PERMISSIONS, 0),
+        'guest': (OWNER_PERMISSIONS, 0)
+    }
+    
+    # Sub-roles whose file permissions differ from their primary role's,
+    # e.g. {'dean': (PERMISSION_ALL, PERMISSION_VIEW | PERMISSION_APPROVE)}
+    SUB_ROLE_FILE_PERMISSIONS = {}
+    
     # Legacy role lists (kept for backward compatibility)
     ADMIN_ROLES = ROLE_HIERARCHY['admin']
     FACULTY_ROLES = ROLE_HIERARCHY['faculty']
@@ -222,6 +246,33 @@ class RoleRouter:
         
         return False
     
+    @staticmethod
+    def get_file_permissions(primary_role: str = None, roles: list = None) -> Tuple[int, int]:
+        """
+        Get the file permission masks of a user.
+        
+        A sub-role listed in SUB_ROLE_FILE_PERMISSIONS wins; otherwise the
+        primary role category decides (see FILE_PERMISSIONS).
+        
+        Args:
+            primary_role (str): User's primary role
+            roles (list): List of all user roles
+            
+        Returns:
+            tuple: (mask for files the user uploaded, mask for other users' files),
+                   built from the PERMISSION_* bits
+            
+        Example:
+            own, others = RoleRouter.get_file_permissions('student')
+            can_edit_others = bool(others & PERMISSION_EDIT)  # False
+        """
+        sub_role = RoleRouter.get_sub_role(primary_role, roles)
+        if sub_role in RoleRouter.SUB_ROLE_FILE_PERMISSIONS:
+            return RoleRouter.SUB_ROLE_FILE_PERMISSIONS[sub_role]
+        
+        role_type = RoleRouter.get_primary_role(primary_role, roles)
+        return RoleRouter.FILE_PERMISSIONS.get(role_type, RoleRouter.FILE_PERMISSIONS['guest'])
+    
     @staticmethod
     def route_to_dashboard(username: str, roles: list, primary_role: str, token: str,
                           admin_dashboard: Callable = None,
@@ -0,0 +1,145 @@
+"""
+Search Pipeline
+
+Search-as-you-type for the Documents file tables.
+
+Keystrokes restart a debounce timer; only when typing pauses is the query
+run, on a worker thread, through the view's search function (normally
+DocumentController.search_file_ids). Every new keystroke bumps a generation
+counter and cancels the running job, so results of superseded queries are
+dropped. The worker only ranks file IDs; the FileTableModel then loads the
+records page by page as the table scrolls (normally through
+DocumentController.query_search_results), so a query matching 100k files
+copies out only the rows on screen.
+"""
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from ..services.search_index import SEARCH_RANK
+from .workers import run_in_background
+
+
+# Pause in typing before a query runs
+SEARCH_DEBOUNCE_MS = 250
+
+
+class SearchPipeline(QObject):
+    """
+    Debounced, cancellable search feeding a FileTableModel.
+
+    Connect a QLineEdit's textChanged to set_query() and its returnPressed
+    (or a search button) to search_now().
+
+    Signals:
+        search_started: Emitted with the query when it starts running
+        search_finished: Emitted with the query and result count once the first page is shown
+        search_cleared: Emitted when the query becomes empty (the view should reload its list)
+        search_failed: Emitted with an error message
+
+    Args:
+        model (FileTableModel): Model receiving the results
+        search_func (callable): query -> ranked list of file IDs (runs on a worker thread)
+        page_func (callable): (file_ids, sort_key, descending, cursor, limit) ->
+            page dict, as for FileTableModel.set_query; sort_key SEARCH_RANK
+            means best match first
+        debounce_ms (int): Pause in typing before a query runs
+        parent (QObject, optional): Parent object
+    """
+
+    search_started = pyqtSignal(str)
+    search_finished = pyqtSignal(str, int)
+    search_cleared = pyqtSignal()
+    search_failed = pyqtSignal(str)
+
+    def __init__(self, model, search_func, page_func, debounce_ms=SEARCH_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.search_func = search_func
+        self.page_func = page_func
+        self.query = ''
+        self.generation = 0
+        self.job = None
+        self._showing = False    # The model shows search results
+        self._list_sort = None   # Order of the model before the search took over
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self._run)
+
+    def is_active(self):
+        """True while a non-empty query is shown (or pending)"""
+        return bool(self.query)
+
+    def set_query(self, text):
+        """Handle a keystroke: drop the running query and restart the debounce"""
+        query = (text or '').strip()
+        if query == self.query:
+            return
+        self._supersede()
+        self.query = query
+        if not query:
+            self.debounce_timer.stop()
+            if self._showing:
+                # Give the list its own order back before the view reloads it
+                self._showing = False
+                self.model.clear(self._list_sort or ('file_id', False))
+            self.search_cleared.emit()
+            return
+        self.debounce_timer.start()
+
+    def search_now(self):
+        """Run the current query immediately (Enter key or search button)"""
+        self.debounce_timer.stop()
+        if self.query:
+            self._supersede()
+            self._run()
+
+    def refresh(self):
+        """Re-run the current query (e.g. after the documents changed)"""
+        self.search_now()
+
+    def cancel(self):
+        """Stop the running query"""
+        self.debounce_timer.stop()
+        self._supersede()
+
+    def _supersede(self):
+        self.generation += 1
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def _run(self):
+        generation = self.generation
+        query = self.query
+        self.search_started.emit(query)
+        self.job = run_in_background(
+            self.search_func, query,
+            on_result=lambda file_ids: self._on_results(generation, query, file_ids),
+            on_error=lambda message: self._on_error(generation, message)
+        )
+
+    def _on_results(self, generation, query, file_ids):
+        if generation != self.generation:
+            return  # A newer keystroke superseded this query
+        self.job = None
+        file_ids = list(file_ids or [])
+        if self._showing:
+            # Refreshed results keep the order picked in the header
+            sort_key, descending = self.model.sort_order() or (SEARCH_RANK, False)
+        else:
+            self._list_sort = self.model.sort_order()
+            sort_key, descending = SEARCH_RANK, False
+        self._showing = True
+        self.model.set_query(
+            lambda sort, desc, cursor, limit: self.page_func(file_ids, sort, desc, cursor, limit),
+            sort_key, descending)
+        self.search_finished.emit(query, len(file_ids))
+
+    def _on_error(self, generation, message):
+        if generation != self.generation:
+            return
+        self.job = None
+        print(f"⚠ Search failed: {message}")
+        self.search_failed.emit(message)
@@ -0,0 +1,124 @@
+"""
+Thumbnail Loader
+
+Qt side of the thumbnail cache (services/thumbnail_cache.py).
+
+Views ask for a pixmap while painting; the answer comes from QPixmapCache or
+is None. On a miss the thumbnail is generated (or read back from the disk
+cache) on the preview thread pool, decoded to a QImage there, and announced
+with thumbnail_ready so the view can repaint the rows showing that content.
+"""
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap, QPixmapCache
+
+from .workers import get_preview_thread_pool, run_in_background
+
+
+# Thumbnail edge used in the file tables
+TABLE_THUMBNAIL_SIZE = 32
+
+# Thumbnail edge used in the file details dialog
+DETAILS_THUMBNAIL_SIZE = 96
+
+
+def _load_thumbnail(controller, file_data, size):
+    """Worker side: generate/read the thumbnail and decode it (QImage is thread-safe)"""
+    path = controller.get_thumbnail(file_data, size)
+    if path is None:
+        return None
+    image = QImage(path)
+    return None if image.isNull() else image
+
+
+class ThumbnailLoader(QObject):
+    """
+    Asynchronous thumbnail pixmaps for file records.
+
+    Signals:
+        thumbnail_ready: Emitted with (sha256, size) once a pixmap is available
+
+    Args:
+        controller (DocumentController): Controller generating the thumbnails
+        parent (QObject, optional): Parent object
+    """
+
+    thumbnail_ready = pyqtSignal(str, int)
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._pending = set()   # (sha256, size) being generated
+        self._failed = set()    # (sha256, size) that cannot be previewed
+
+    @staticmethod
+    def _cache_key(sha256, size):
+        return f"documents-thumbnail:{sha256}:{size}"
+
+    def pixmap(self, file_data, size=TABLE_THUMBNAIL_SIZE):
+        """
+        Get a thumbnail pixmap without blocking.
+
+        Args:
+            file_data (dict): File record
+            size (int): Longest edge in pixels
+
+        Returns:
+            QPixmap or None: The thumbnail, or None until thumbnail_ready
+                             (or if the file cannot be previewed)
+        """
+        if not self.controller.can_preview(file_data):
+            return None
+        sha256 = file_data['sha256']
+        pixmap = QPixmapCache.find(self._cache_key(sha256, size))
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        self._request(file_data, size)
+        return None
+
+    def _request(self, file_data, size):
+        request = (file_data['sha256'], size)
+        if request in self._pending or request in self._failed:
+            return
+        self._pending.add(request)
+        run_in_background(
+            _load_thumbnail, self.controller, dict(file_data), size,
+            on_result=lambda image: self._on_loaded(request, image),
+            on_error=lambda message: self._on_failed(request, message),
+            pool=get_preview_thread_pool()
+        )
+
+    def _on_loaded(self, request, image):
+        self._pending.discard(request)
+        if image is None:
+            self._failed.add(request)
+            return
+        sha256, size = request
+        QPixmapCache.insert(self._cache_key(sha256, size), QPixmap.fromImage(image))
+        self.thumbnail_ready.emit(sha256, size)
+
+    def _on_failed(self, request, message):
+        self._pending.discard(request)
+        self._failed.add(request)
+        print(f"⚠ Thumbnail failed: {message}")
+
+
+_loader = None
+
+
+def get_thumbnail_loader(controller):
+    """
+    Get the process-wide thumbnail loader, creating it on first use.
+
+    Must be called from the GUI thread.
+
+    Args:
+        controller (DocumentController): Controller used when first created
+
+    Returns:
+        ThumbnailLoader: Shared loader
+    """
+    global _loader
+    if _loader is None:
+        _loader = ThumbnailLoader(controller)
+    return _loader
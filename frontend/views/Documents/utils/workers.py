@@ -0,0 +1,367 @@
+"""
+Background Workers Utility
+
+Runs Documents I/O (file copies, recycle-bin moves, bulk operations) on a
+QThreadPool so the Qt event loop never blocks. Jobs report progress and
+results back to the GUI thread through queued signals and can be cancelled
+cooperatively.
+"""
+
+import threading
+import traceback
+from typing import List, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+# Keep Documents I/O on its own pool so long copies never starve other users
+# of the global pool. A small worker count keeps disk access mostly sequential.
+MAX_WORKER_THREADS = 4
+
+# Thumbnail decoding gets its own small pool so previews never queue behind
+# (or slow down) file copies
+PREVIEW_WORKER_THREADS = 2
+
+# Items handed to a bulk batch function per call (one metadata commit each)
+BULK_BATCH_SIZE = 200
+
+_thread_pool = None
+_preview_thread_pool = None
+
+# Jobs are kept alive here until they finish (setAutoDelete is off)
+_active_jobs = set()
+
+
+def get_thread_pool():
+    """
+    Get the shared thread pool used for Documents background jobs.
+
+    Returns:
+        QThreadPool: Process-wide pool for Documents I/O
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(MAX_WORKER_THREADS)
+    return _thread_pool
+
+
+def get_preview_thread_pool():
+    """
+    Get the thread pool used for thumbnail generation.
+
+    Returns:
+        QThreadPool: Process-wide pool for preview decoding
+    """
+    global _preview_thread_pool
+    if _preview_thread_pool is None:
+        _preview_thread_pool = QThreadPool()
+        _preview_thread_pool.setMaxThreadCount(PREVIEW_WORKER_THREADS)
+    return _preview_thread_pool
+
+
+class CancelToken:
+    """
+    Thread-safe cancellation flag shared between the GUI and a job.
+
+    Long-running functions should poll is_cancelled() between units of work
+    and stop early when it returns True.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Request cancellation"""
+        self._event.set()
+
+    def is_cancelled(self):
+        """Check whether cancellation was requested"""
+        return self._event.is_set()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job to abort it after cancellation was requested"""
+    pass
+
+
+class WorkerSignals(QObject):
+    """
+    Signals emitted by a background job.
+
+    Signals:
+        started: Emitted when the job begins running
+        progress: Emitted with (current, total, status_text)
+        result: Emitted with the job function's return value
+        error: Emitted with an error message if the job raised
+        cancelled: Emitted if the job stopped because of cancellation
+        finished: Always emitted last, after result/error/cancelled
+    """
+
+    started = pyqtSignal()
+    # object rather than int: byte counts of large copies overflow a C++ int
+    progress = pyqtSignal(object, object, str)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+
+class Job(QRunnable):
+    """
+    QRunnable wrapping a plain function call.
+
+    When report_progress is True, the function receives two extra keyword
+    arguments: progress_callback(current, total, status_text="") and
+    cancel_token (CancelToken). Services expose these parameters so the same
+    code runs synchronously or on a worker.
+
+    Args:
+        fn (callable): Function to run on the worker thread
+        *args: Positional arguments for fn
+        report_progress (bool): Pass progress_callback/cancel_token to fn
+        **kwargs: Keyword arguments for fn
+    """
+
+    def __init__(self, fn, *args, report_progress=False, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.report_progress = report_progress
+        self.signals = WorkerSignals()
+        self.cancel_token = CancelToken()
+        # The pool must not delete the runnable while Python still holds it
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        """Request cooperative cancellation of the job"""
+        self.cancel_token.cancel()
+
+    def is_cancelled(self):
+        """Check whether cancellation was requested"""
+        return self.cancel_token.is_cancelled()
+
+    def emit_progress(self, current, total, status_text=""):
+        """Report progress to the GUI thread"""
+        self.signals.progress.emit(current, total, status_text or "")
+
+    def execute(self):
+        """Run the wrapped function and return its result"""
+        kwargs = dict(self.kwargs)
+        if self.report_progress:
+            kwargs['progress_callback'] = self.emit_progress
+            kwargs['cancel_token'] = self.cancel_token
+        return self.fn(*self.args, **kwargs)
+
+    def run(self):
+        """QRunnable entry point (executed on a pool thread)"""
+        self.signals.started.emit()
+        try:
+            result = self.execute()
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.error.emit(str(e))
+        else:
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class BulkJob(Job):
+    """
+    Job applying an operation to each item of a list.
+
+    Each item is processed independently; failures are collected instead of
+    aborting the run. Cancellation stops before the next item.
+
+    With batch_func the items are handed over in chunks of batch_size, so
+    the operation can commit a whole chunk at once; cancellation then stops
+    before the next chunk.
+
+    Args:
+        items (list): Items to process (usually file data dicts)
+        operation_func (callable): Takes an item, returns (success, message)
+        item_name_func (callable, optional): Formats an item for status text
+        batch_func (callable, optional): Takes a list of items, returns a list
+                                         of (success, message) in the same order;
+                                         used instead of operation_func
+        batch_size (int): Items per batch_func call
+
+    Result:
+        dict with keys successful, failed, failed_items, processed, cancelled
+    """
+
+    def __init__(self, items, operation_func=None, item_name_func=None,
+                 batch_func=None, batch_size=BULK_BATCH_SIZE):
+        super().__init__(operation_func)
+        self.items = list(items)
+        self.item_name_func = item_name_func or _default_item_name
+        self.batch_func = batch_func
+        self.batch_size = max(1, batch_size)
+
+    def execute(self):
+        """Process every item, emitting progress after each one (or each batch)"""
+        if self.batch_func is not None:
+            return self._execute_batches()
+
+        total = len(self.items)
+        successful = 0
+        failed_items: List[Tuple[str, str]] = []
+        processed = 0
+
+        for item in self.items:
+            if self.is_cancelled():
+                break
+
+            item_name = self.item_name_func(item)
+            self.emit_progress(processed, total, f"Processing: {item_name} ({processed + 1}/{total})")
+
+            try:
+                success, message = self.fn(item)
+                if success:
+                    successful += 1
+                else:
+                    failed_items.append((item_name, message))
+            except Exception as e:
+                failed_items.append((item_name, str(e)))
+
+            processed += 1
+            self.emit_progress(processed, total, f"Processed: {item_name} ({processed}/{total})")
+
+        return {
+            'successful': successful,
+            'failed': len(failed_items),
+            'failed_items': failed_items,
+            'processed': processed,
+            'cancelled': processed < total
+        }
+
+    def _execute_batches(self):
+        """Process the items in chunks through batch_func"""
+        total = len(self.items)
+        successful = 0
+        failed_items: List[Tuple[str, str]] = []
+        processed = 0
+
+        for start in range(0, total, self.batch_size):
+            if self.is_cancelled():
+                break
+
+            chunk = self.items[start:start + self.batch_size]
+            self.emit_progress(processed, total, f"Processing {len(chunk)} item(s) ({processed + len(chunk)}/{total})")
+
+            try:
+                outcomes = list(self.batch_func(chunk))
+            except Exception as e:
+                outcomes = [(False, str(e))] * len(chunk)
+            if len(outcomes) != len(chunk):
+                outcomes = [(False, "Operation returned no result")] * len(chunk)
+
+            for item, (success, message) in zip(chunk, outcomes):
+                if success:
+                    successful += 1
+                else:
+                    failed_items.append((self.item_name_func(item), message))
+
+            processed += len(chunk)
+            self.emit_progress(processed, total, f"Processed {processed}/{total}")
+
+        return {
+            'successful': successful,
+            'failed': len(failed_items),
+            'failed_items': failed_items,
+            'processed': processed,
+            'cancelled': processed < total
+        }
+
+
+def _default_item_name(item):
+    """Default display name for a bulk item (expects dict with 'filename' key)"""
+    if isinstance(item, dict):
+        return item.get('filename', str(item))
+    return str(item)
+
+
+def start_job(job, on_result=None, on_error=None, on_progress=None,
+              on_finished=None, on_cancelled=None, pool=None):
+    """
+    Connect callbacks to a job and start it on the Documents thread pool.
+
+    Callbacks are invoked on the GUI thread (queued connections).
+
+    Args:
+        job (Job): Job to start
+        on_result (callable, optional): Receives the job's return value
+        on_error (callable, optional): Receives an error message
+        on_progress (callable, optional): Receives (current, total, status_text)
+        on_finished (callable, optional): Called when the job ends
+        on_cancelled (callable, optional): Called if the job was cancelled
+        pool (QThreadPool, optional): Pool to run on (default: get_thread_pool())
+
+    Returns:
+        Job: The started job (keep a reference to cancel it)
+    """
+    if on_result:
+        job.signals.result.connect(on_result)
+    if on_error:
+        job.signals.error.connect(on_error)
+    if on_progress:
+        job.signals.progress.connect(on_progress)
+    if on_cancelled:
+        job.signals.cancelled.connect(on_cancelled)
+    if on_finished:
+        job.signals.finished.connect(on_finished)
+
+    _active_jobs.add(job)
+    job.signals.finished.connect(lambda: _active_jobs.discard(job))
+    (pool or get_thread_pool()).start(job)
+    return job
+
+
+def run_in_background(fn, *args, on_result=None, on_error=None, on_progress=None,
+                      on_finished=None, on_cancelled=None, report_progress=False, pool=None, **kwargs):
+    """
+    Run fn(*args, **kwargs) on a worker thread.
+
+    Example:
+        run_in_background(
+            controller.delete_file, file_id,
+            on_result=lambda res: print(res)
+        )
+
+    Returns:
+        Job: The started job
+    """
+    job = Job(fn, *args, report_progress=report_progress, **kwargs)
+    return start_job(
+        job,
+        on_result=on_result,
+        on_error=on_error,
+        on_progress=on_progress,
+        on_finished=on_finished,
+        on_cancelled=on_cancelled,
+        pool=pool
+    )
+
+
+def wait_for_jobs(timeout_ms=-1):
+    """
+    Block until all Documents background jobs finish (used on shutdown).
+
+    Args:
+        timeout_ms (int): Maximum wait in milliseconds, -1 waits forever
+
+    Returns:
+        bool: True if all jobs finished
+    """
+    for job in list(_active_jobs):
+        job.cancel()
+    if _preview_thread_pool is not None:
+        _preview_thread_pool.waitForDone(timeout_ms)
+    return get_thread_pool().waitForDone(timeout_ms)
+
@@ -5,9 +5,14 @@ This package contains reusable widgets for the Documents module.
 """
 
 from .empty_state import EmptyStateWidget, LoadingStateWidget, ErrorStateWidget
+from .file_table_model import FileTableModel, FileActionsDelegate, FileRole, enable_header_sorting
 
 __all__ = [
     'EmptyStateWidget',
     'LoadingStateWidget',
-    'ErrorStateWidget'
+    'ErrorStateWidget',
+    'FileTableModel',
+    'FileActionsDelegate',
+    'FileRole',
+    'enable_header_sorting'
 ]
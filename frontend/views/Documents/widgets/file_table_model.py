@@ -0,0 +1,674 @@
+"""
+File Table Model
+
+Shared QAbstractTableModel for the Documents file tables (dashboard,
+uploaded files, collection and deleted files views).
+
+- Rows are served lazily: the view only sees FETCH_BATCH_SIZE more rows each
+  time it scrolls near the end (canFetchMore/fetchMore), so 100k files cost
+  no more to show than a few hundred.
+- With set_query() the rows are not even held: each fetchMore() asks a paged
+  query (e.g. DocumentController.query_files) for the next QUERY_FETCH_SIZE
+  rows after a cursor, and sorting by a header re-runs the query in the store.
+- set_files() diffs by file_id and emits contiguous beginRemoveRows /
+  beginInsertRows ranges and per-row dataChanged, instead of rebuilding.
+- Row action buttons are painted by FileActionsDelegate rather than being
+  one QWidget per row.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from PyQt6.QtCore import (Qt, QAbstractTableModel, QModelIndex, QRect, QEvent,
+                          pyqtSignal)
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+
+from ..services.document_store import sort_value
+
+
+# Rows handed to the view per fetchMore() call
+FETCH_BATCH_SIZE = 500
+
+# Rows requested from a paged query per fetchMore() call
+QUERY_FETCH_SIZE = 100
+
+# Role returning the full file record of a row
+FileRole = Qt.ItemDataRole.UserRole + 1
+
+
+def default_file_key(record):
+    """Row key of a file record (file_id, or filename for records without one)"""
+    file_id = record.get('file_id')
+    return file_id if file_id is not None else record.get('filename')
+
+
+class FileTableModel(QAbstractTableModel):
+    """
+    Lazily fetched, keyed table model over file records.
+
+    Columns are described by dicts:
+        - {'title': '', 'checkbox': True}: per-row check box for bulk selection
+        - {'title': 'Filename', 'key': 'filename'}: record field (optional 'default')
+        - {'title': 'Status', 'value': func}: func(record) -> display text
+          (computed for visible rows only and cached until the row changes);
+          an optional 'foreground': func(record) -> color or None
+        - Any column may add 'decoration': func(record) -> QPixmap/QIcon or None
+          (asked on every paint, so it should answer from a cache)
+        - {'title': 'Actions', 'actions': True}: drawn by FileActionsDelegate
+        - Any column may add 'sort': record field the query orders by when
+          the column is sorted (see set_query and enable_header_sorting)
+
+    Signals:
+        checked_changed: Emitted with the number of checked rows
+
+    Args:
+        columns (list): Column descriptions (see above)
+        key_func (callable, optional): record -> unique row key (default: file_id)
+        parent (QObject, optional): Parent object
+    """
+
+    checked_changed = pyqtSignal(int)
+
+    def __init__(self, columns: List[Dict], key_func: Optional[Callable] = None, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.key_func = key_func or default_file_key
+        self._records = []       # All records, in display order
+        self._rows = {}          # {key: row}
+        self._fetched = 0        # Rows exposed to the view so far
+        self._checked = set()    # Keys of checked rows
+        self._values = {}        # {(key, column): cached 'value' column text}
+        self._changing = False   # Inside begin/end of a row change
+        # Paged query state (set_query)
+        self._query = None       # (sort_key, descending, cursor, limit) -> page dict
+        self._sort = None        # (sort_key, descending)
+        self._cursor = None      # next_cursor of the last page fetched
+        self._exhausted = True   # No page left after the cursor
+        self._total = 0          # total_estimate of the query
+        self.checkbox_column = next(
+            (i for i, column in enumerate(columns) if column.get('checkbox')), None)
+
+    # ==================== QAbstractTableModel ====================
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation != Qt.Orientation.Horizontal or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if section == self.checkbox_column:
+            return "☑"
+        return self.columns[section].get('title', '')
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == self.checkbox_column:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._fetched:
+            return None
+        record = self._records[index.row()]
+        column = self.columns[index.column()]
+
+        if role == FileRole:
+            return record
+        if role == Qt.ItemDataRole.CheckStateRole and column.get('checkbox'):
+            checked = self.key_func(record) in self._checked
+            return Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display_value(record, index.column())
+        if role == Qt.ItemDataRole.ForegroundRole and 'foreground' in column:
+            return column['foreground'](record)
+        if role == Qt.ItemDataRole.DecorationRole and 'decoration' in column:
+            return column['decoration'](record)
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if (role != Qt.ItemDataRole.CheckStateRole or not index.isValid()
+                or index.column() != self.checkbox_column):
+            return False
+        key = self.key_func(self._records[index.row()])
+        if Qt.CheckState(value) == Qt.CheckState.Checked:
+            self._checked.add(key)
+        else:
+            self._checked.discard(key)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.checked_changed.emit(len(self._checked))
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._changing:
+            return False
+        return self._fetched < len(self._records) or not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        if self._fetched == len(self._records):
+            self._fetch_page(QUERY_FETCH_SIZE)
+            return
+        count = min(FETCH_BATCH_SIZE, len(self._records) - self._fetched)
+        self._insert_fetched(count)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Re-run the query ordered by a column's 'sort' field (other columns are ignored)"""
+        sort_key = self.columns[column].get('sort') if 0 <= column < len(self.columns) else None
+        if self._query is None or sort_key is None:
+            return
+        self.set_query(self._query, sort_key, order == Qt.SortOrder.DescendingOrder)
+
+    def _insert_fetched(self, count, records=None):
+        """Expose count more rows to the view (appending records first, if given)"""
+        self._changing = True
+        try:
+            self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+            if records:
+                self._records.extend(records)
+            self._fetched += count
+            self.endInsertRows()
+        finally:
+            self._changing = False
+
+    def _display_value(self, record, column_index):
+        column = self.columns[column_index]
+        if 'value' in column:
+            cache_key = (self.key_func(record), column_index)
+            if cache_key not in self._values:
+                self._values[cache_key] = column['value'](record)
+            return self._values[cache_key]
+        if 'key' in column:
+            value = record.get(column['key'])
+            return str(value) if value is not None else column.get('default', '')
+        return None
+
+    # ==================== PAGED QUERY ====================
+
+    def set_query(self, query_func: Callable, sort_key: Optional[str] = None,
+                  descending: bool = False) -> None:
+        """
+        Serve rows from a paged query instead of a full list.
+
+        Calling it again with the same query and order reloads in place
+        (see reload); anything else starts over from the first page.
+
+        Args:
+            query_func (callable): (sort_key, descending, cursor, limit) ->
+                dict with 'files', 'next_cursor' and 'total_estimate'
+            sort_key (str, optional): Field the query orders by (default:
+                                      the last order used, else file_id)
+            descending (bool): Largest values first
+        """
+        if sort_key is None:
+            sort_key, descending = self._sort or ('file_id', False)
+        if self._query is not None and self._query == query_func and self._sort == (sort_key, descending):
+            self.reload()
+            return
+        self._reset(query_func, (sort_key, descending))
+        self._fetch_page(QUERY_FETCH_SIZE)
+
+    def reload(self) -> None:
+        """
+        Re-run the query for the rows fetched so far (at least one page).
+
+        Rows keep their check state; if the order is unchanged only the
+        changed rows are repainted.
+        """
+        if self._query is None:
+            return
+        sort_key, descending = self._sort
+        limit = max(len(self._records), QUERY_FETCH_SIZE)
+        page = self._query(sort_key, descending, None, limit)
+        records = page['files']
+        self._cursor = page['next_cursor']
+        self._exhausted = self._cursor is None
+        self._total = page['total_estimate']
+
+        keys = [self.key_func(record) for record in records]
+        if keys == [self.key_func(record) for record in self._records]:
+            for row, record in enumerate(records):
+                if record != self._records[row]:
+                    self._replace_row(row, record)
+            return
+
+        checked_before = len(self._checked)
+        self._changing = True
+        try:
+            self.beginResetModel()
+            self._records = list(records)
+            self._rows = {key: row for row, key in enumerate(keys)}
+            self._fetched = len(self._records)
+            self._values = {}
+            self._checked &= set(keys)
+            self.endResetModel()
+        finally:
+            self._changing = False
+        if len(self._checked) != checked_before:
+            self.checked_changed.emit(len(self._checked))
+
+    def sort_order(self):
+        """Get (sort_key, descending) of the paged query, or None if there is none"""
+        return self._sort if self._query is not None else None
+
+    def _fetch_page(self, limit):
+        """Append the next page of the query (exposed to the view right away)"""
+        if self._query is None or self._exhausted:
+            return
+        sort_key, descending = self._sort
+        page = self._query(sort_key, descending, self._cursor, limit)
+        self._cursor = page['next_cursor']
+        self._exhausted = self._cursor is None
+        self._total = page['total_estimate']
+        records = [record for record in page['files'] if self.key_func(record) not in self._rows]
+        if not records:
+            return
+        start = len(self._records)
+        for offset, record in enumerate(records):
+            self._rows[self.key_func(record)] = start + offset
+        self._insert_fetched(len(records), records)
+
+    def _drain(self):
+        """Fetch every remaining page (only for operations on all rows, e.g. select all)"""
+        while not self._exhausted:
+            sort_key, descending = self._sort
+            page = self._query(sort_key, descending, self._cursor, None)
+            self._cursor = page['next_cursor']
+            self._exhausted = self._cursor is None
+            self._total = page['total_estimate']
+            fresh = [record for record in page['files'] if self.key_func(record) not in self._rows]
+            start = len(self._records)
+            for offset, record in enumerate(fresh):
+                self._rows[self.key_func(record)] = start + offset
+            # Held back; fetchMore() exposes them as the view scrolls
+            self._records.extend(fresh)
+
+    # ==================== UPDATES ====================
+
+    def set_files(self, records: List[Dict]) -> None:
+        """
+        Replace the contents with records, diffing by key.
+
+        Removed rows leave in contiguous ranges, changed rows emit dataChanged,
+        and new rows are appended in the order given. Rows that are still
+        present keep their position and check state.
+
+        Args:
+            records (list): Fresh file records
+        """
+        fresh = {}
+        for record in records:
+            fresh[self.key_func(record)] = record
+
+        removed_rows = [row for row, record in enumerate(self._records)
+                        if self.key_func(record) not in fresh]
+        self._remove_row_ranges(removed_rows)
+
+        for row, old in enumerate(self._records):
+            key = self.key_func(old)
+            record = fresh.pop(key)
+            if record != old:
+                self._replace_row(row, record)
+
+        # What is left in fresh is new (dict keeps the input order)
+        self._append(list(fresh.values()))
+
+    def upsert_file(self, record: Dict) -> None:
+        """Update a row in place, or append it if it is not shown yet"""
+        row = self._rows.get(self.key_func(record))
+        if row is None:
+            self._append([record])
+        elif record != self._records[row]:
+            self._replace_row(row, record)
+
+    def append_files(self, records: List[Dict]) -> None:
+        """Append records in order as one batch (rows already shown are updated in place)"""
+        appended = []
+        for record in records:
+            row = self._rows.get(self.key_func(record))
+            if row is None:
+                appended.append(record)
+            elif record != self._records[row]:
+                self._replace_row(row, record)
+        self._append(appended)
+
+    def remove_files(self, keys) -> int:
+        """
+        Remove rows by key.
+
+        Args:
+            keys (iterable): Row keys (file IDs)
+
+        Returns:
+            int: Number of rows removed
+        """
+        rows = sorted(self._rows[key] for key in set(keys) if key in self._rows)
+        self._remove_row_ranges(rows)
+        return len(rows)
+
+    def apply_changes(self, changes: Dict, accept: Optional[Callable] = None) -> None:
+        """
+        Apply change-feed deltas (see DocumentController.get_changes_since).
+
+        Deleted files and records rejected by accept are removed in one pass,
+        changed rows are updated in place and new rows are appended as one batch.
+
+        Args:
+            changes (dict): Deltas with 'inserted', 'updated' and 'deleted'
+            accept (callable, optional): record -> True if it belongs in this table
+        """
+        removed = list(changes.get('deleted', ()))
+        appended = []
+        for record in list(changes.get('inserted', ())) + list(changes.get('updated', ())):
+            key = self.key_func(record)
+            if accept is not None and not accept(record):
+                removed.append(key)
+                continue
+            row = self._rows.get(key)
+            if row is None:
+                appended.append(record)
+            elif record != self._records[row]:
+                if self._query is not None and self._moves(self._records[row], record):
+                    appended.append(record)
+                else:
+                    self._replace_row(row, record)
+        removed_count = self.remove_files(removed)
+        if self._query is not None:
+            self._total = max(0, self._total - removed_count)
+            # New or re-sorted rows belong somewhere in the query order
+            if appended:
+                self.reload()
+            return
+        self._append(appended)
+
+    def _moves(self, old, new):
+        """True if a change moves a record in the query's sort order"""
+        sort_key = self._sort[0]
+        return sort_value(old, sort_key) != sort_value(new, sort_key)
+
+    def refresh_rows(self, predicate: Callable, roles: Optional[List] = None) -> int:
+        """
+        Repaint fetched rows whose record matches predicate (e.g. a thumbnail arrived).
+
+        Args:
+            predicate (callable): record -> True if the row should be repainted
+            roles (list, optional): Changed item data roles (default: all)
+
+        Returns:
+            int: Number of rows repainted
+        """
+        count = 0
+        last_column = len(self.columns) - 1
+        for row in range(self._fetched):
+            if predicate(self._records[row]):
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column), roles or [])
+                count += 1
+        return count
+
+    def clear(self, sort=None) -> None:
+        """
+        Remove every row (and detach the paged query, if any).
+
+        Args:
+            sort (tuple, optional): (sort_key, descending) for the next
+                                    set_query() (default: keep the current order)
+        """
+        self._reset(sort=sort)
+
+    def _reset(self, query=None, sort=None):
+        self._changing = True
+        try:
+            self.beginResetModel()
+            self._records = []
+            self._rows = {}
+            self._fetched = 0
+            self._values = {}
+            self._query = query
+            self._sort = sort or self._sort
+            self._cursor = None
+            self._exhausted = query is None
+            self._total = 0
+            had_checked = bool(self._checked)
+            self._checked = set()
+            self.endResetModel()
+        finally:
+            self._changing = False
+        if had_checked:
+            self.checked_changed.emit(0)
+
+    def _append(self, records):
+        if not records:
+            return
+        start = len(self._records)
+        for offset, record in enumerate(records):
+            self._rows[self.key_func(record)] = start + offset
+        # Announce at most one fetch batch, and only if the view already
+        # reached the end; the rest arrives through fetchMore()
+        visible = min(len(records), FETCH_BATCH_SIZE) if self._fetched == start else 0
+        if visible:
+            self._insert_fetched(visible, records)
+        else:
+            self._records.extend(records)
+
+    def _replace_row(self, row, record):
+        key = self.key_func(record)
+        self._records[row] = record
+        for column_index in range(len(self.columns)):
+            self._values.pop((key, column_index), None)
+        if row < self._fetched:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def _remove_row_ranges(self, rows):
+        """Remove sorted row indices in contiguous ranges, last range first"""
+        if not rows:
+            return
+        ranges = []
+        first = last = rows[0]
+        for row in rows[1:]:
+            if row == last + 1:
+                last = row
+            else:
+                ranges.append((first, last))
+                first = last = row
+        ranges.append((first, last))
+
+        checked_before = len(self._checked)
+        for first, last in reversed(ranges):
+            for record in self._records[first:last + 1]:
+                key = self.key_func(record)
+                self._rows.pop(key, None)
+                self._checked.discard(key)
+                for column_index in range(len(self.columns)):
+                    self._values.pop((key, column_index), None)
+
+            visible_last = min(last, self._fetched - 1)
+            if first <= visible_last:
+                self._changing = True
+                try:
+                    self.beginRemoveRows(QModelIndex(), first, visible_last)
+                    del self._records[first:last + 1]
+                    self._fetched -= visible_last - first + 1
+                    self.endRemoveRows()
+                finally:
+                    self._changing = False
+            else:
+                del self._records[first:last + 1]
+
+        # Re-number only the rows after the first removal
+        for row in range(ranges[0][0], len(self._records)):
+            self._rows[self.key_func(self._records[row])] = row
+
+        if len(self._checked) != checked_before:
+            self.checked_changed.emit(len(self._checked))
+
+    # ==================== QUERIES ====================
+
+    def file_at(self, row: int) -> Optional[Dict]:
+        """Get the record shown in a row"""
+        if 0 <= row < len(self._records):
+            return self._records[row]
+        return None
+
+    def row_of(self, key) -> Optional[int]:
+        """Get the row of a key (file_id), or None"""
+        return self._rows.get(key)
+
+    def find_file(self, key) -> Optional[Dict]:
+        """Get the record with a key (file_id), or None"""
+        row = self._rows.get(key)
+        return self._records[row] if row is not None else None
+
+    def find_file_by_name(self, filename: str) -> Optional[Dict]:
+        """Get the first record with a filename, or None"""
+        for record in self._records:
+            if record.get('filename') == filename:
+                return record
+        return None
+
+    def files(self) -> List[Dict]:
+        """Get every record in display order"""
+        return list(self._records)
+
+    def file_count(self) -> int:
+        """Total number of records (fetched or not; the query's estimate for a paged query)"""
+        if self._query is not None:
+            return max(len(self._records), self._total)
+        return len(self._records)
+
+    def checked_files(self) -> List[Dict]:
+        """Get the checked records in display order"""
+        if not self._checked:
+            return []
+        return [record for record in self._records if self.key_func(record) in self._checked]
+
+    def all_checked(self) -> bool:
+        """True if every record is checked"""
+        return (bool(self._records) and self._exhausted
+                and len(self._checked) == len(self._records))
+
+    def set_all_checked(self, checked: bool) -> None:
+        """Check or uncheck every record (including rows not fetched yet)"""
+        if checked:
+            # Bulk actions need every match, not just the pages seen so far
+            self._drain()
+            self._checked = {self.key_func(record) for record in self._records}
+        else:
+            self._checked = set()
+        if self._fetched and self.checkbox_column is not None:
+            self.dataChanged.emit(
+                self.index(0, self.checkbox_column),
+                self.index(self._fetched - 1, self.checkbox_column),
+                [Qt.ItemDataRole.CheckStateRole]
+            )
+        self.checked_changed.emit(len(self._checked))
+
+
+def enable_header_sorting(table) -> None:
+    """
+    Sort a query-backed FileTableModel by clicking its column headers.
+
+    Only columns with a 'sort' field react; clicking the sorted column again
+    flips the order. The sort itself runs in the store (FileTableModel.sort),
+    so no rows beyond the first page are loaded.
+
+    Args:
+        table (QTableView): Table showing a FileTableModel with set_query()
+    """
+    header = table.horizontalHeader()
+    model = table.model()
+
+    def show_indicator():
+        sort = model.sort_order()
+        section = next((i for i, column in enumerate(model.columns)
+                        if sort is not None and column.get('sort') == sort[0]), -1)
+        order = Qt.SortOrder.DescendingOrder if sort and sort[1] else Qt.SortOrder.AscendingOrder
+        header.setSortIndicator(section, order)
+
+    def on_section_clicked(section):
+        sort_key = model.columns[section].get('sort')
+        if sort_key is None or model.sort_order() is None:
+            show_indicator()
+            return
+        current_key, descending = model.sort_order()
+        descending = not descending if current_key == sort_key else False
+        model.sort(section, Qt.SortOrder.DescendingOrder if descending else Qt.SortOrder.AscendingOrder)
+        show_indicator()
+
+    header.setSortIndicatorShown(True)
+    header.setSectionsClickable(True)
+    header.sectionClicked.connect(on_section_clicked)
+    model.modelReset.connect(show_indicator)
+    show_indicator()
+
+
+class FileActionsDelegate(QStyledItemDelegate):
+    """
+    Paints row action buttons and reports clicks, so tables need no
+    per-row button widgets.
+
+    Signals:
+        action_triggered: Emitted with (action name, file record)
+
+    Args:
+        actions (list): [(action name, button label), ...] in display order
+        parent (QObject, optional): Parent object
+    """
+
+    action_triggered = pyqtSignal(str, dict)
+
+    BUTTON_SPACING = 6
+    BUTTON_MARGIN = 3
+
+    def __init__(self, actions, parent=None):
+        super().__init__(parent)
+        self.actions = actions
+
+    def _button_rects(self, rect):
+        """Split a cell into one rect per action"""
+        count = len(self.actions)
+        if count == 0:
+            return []
+        inner = rect.adjusted(self.BUTTON_MARGIN, self.BUTTON_MARGIN,
+                              -self.BUTTON_MARGIN, -self.BUTTON_MARGIN)
+        width = max(0, (inner.width() - self.BUTTON_SPACING * (count - 1)) // count)
+        return [
+            QRect(inner.left() + i * (width + self.BUTTON_SPACING), inner.top(), width, inner.height())
+            for i in range(count)
+        ]
+
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QApplication.style()
+        # Background and selection highlight without any text
+        option.text = ""
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        for (action, label), rect in zip(self.actions, self._button_rects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = label
+            button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        hint = super().sizeHint(option, index)
+        metrics = option.fontMetrics
+        width = sum(metrics.horizontalAdvance(label) + 24 for _action, label in self.actions)
+        width += self.BUTTON_SPACING * max(0, len(self.actions) - 1) + 2 * self.BUTTON_MARGIN
+        hint.setWidth(max(hint.width(), width))
+        return hint
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            position = event.position().toPoint()
+            for (action, _label), rect in zip(self.actions, self._button_rects(option.rect)):
+                if rect.contains(position):
+                    record = index.data(FileRole)
+                    if record is not None:
+                        self.action_triggered.emit(action, record)
+                    return True
+        return super().editorEvent(event, model, option, index)